@@ -0,0 +1,102 @@
+"""
+Compara a gravação de anexos reenviados: a gravação anterior (cada anexo
+gravado de novo no nome normalizado, mesmo se idêntico) com o armazém
+endereçado por conteúdo (`ArmazemAnexos`), em que um reenvio idêntico custa
+apenas o hash (a cópia publicada só é refeita quando o conteúdo muda).
+
+Os anexos vêm de `--distintos` planilhas diferentes, reenviadas até completar
+`--anexos` mensagens.
+
+Uso:
+    python -m benchmarks.bench_armazem_anexos [--anexos 200] [--distintos 10] [--linhas 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from benchmarks.geradores import gerar_planilha  # noqa: E402
+from source.email.extrair_excel_email import gravar_anexo  # noqa: E402
+from source.indice.indice_processados import (  # noqa: E402
+    NOME_ARQUIVO_INDICE,
+    IndiceProcessados,
+    calcular_hash_conteudo,
+)
+from source.indice.manifesto_pasta import ManifestoPasta  # noqa: E402
+
+
+def gravar_sempre(pasta: Path, anexos) -> float:
+    """A gravação anterior: grava, registra no manifesto e no índice (que relê o arquivo)."""
+    indice = IndiceProcessados(pasta / NOME_ARQUIVO_INDICE)
+    manifesto = ManifestoPasta(pasta)
+    inicio = time.perf_counter()
+    for id_mensagem, nome, conteudo in anexos:
+        caminho = pasta / nome
+        temporario = caminho.with_name(f".{caminho.name}.tmp")
+        with open(temporario, "wb") as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+        manifesto.registrar(caminho)
+        indice.registrar_anexo(id_mensagem, nome, caminho)
+    return time.perf_counter() - inicio
+
+
+def gravar_no_armazem(pasta: Path, anexos) -> float:
+    """A gravação atual (`gravar_anexo`), com o hash calculado na ingestão."""
+    indice = IndiceProcessados(pasta / NOME_ARQUIVO_INDICE)
+    inicio = time.perf_counter()
+    for id_mensagem, nome, conteudo in anexos:
+        gravar_anexo(
+            conteudo,
+            pasta / nome,
+            id_mensagem,
+            nome,
+            indice,
+            hash_conteudo=calcular_hash_conteudo(conteudo),
+        )
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--anexos", type=int, default=200)
+    parser.add_argument("--distintos", type=int, default=10)
+    parser.add_argument("--linhas", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="quantum_armazem_") as pasta:
+        pasta = Path(pasta)
+        conteudos = [
+            gerar_planilha(
+                pasta / f"origem_{i}.xlsx", args.linhas, semente=i
+            ).read_bytes()
+            for i in range(args.distintos)
+        ]
+        # Cada planilha é reenviada sempre com o mesmo nome de anexo
+        anexos = [
+            (
+                f"msg-{i}",
+                f"relatorio_{i % args.distintos}.xlsx",
+                conteudos[i % args.distintos],
+            )
+            for i in range(args.anexos)
+        ]
+        (pasta / "sempre").mkdir()
+        (pasta / "armazem").mkdir()
+        sempre = gravar_sempre(pasta / "sempre", anexos)
+        armazem = gravar_no_armazem(pasta / "armazem", anexos)
+
+    megabytes = sum(len(c) for _, _, c in anexos) / 2**20
+    print(
+        f"\n{args.anexos} anexos ({args.distintos} distintos), {megabytes:.1f} MB no total"
+    )
+    print(f"gravação a cada anexo : {sempre * 1000:9.1f} ms")
+    print(f"armazém por conteúdo  : {armazem * 1000:9.1f} ms")
+    # Cada conteúdo distinto é gravado no armazém e copiado uma vez para o nome publicado
+    gravados = 2 * sum(len(c) for c in conteudos) / 2**20
+    print(f"dados gravados        : {megabytes:.1f} MB vs {gravados:.1f} MB")
+    print(f"\naceleração: {sempre / armazem:.1f}x")
@@ -0,0 +1,71 @@
+"""
+Compara a leitura de uma planilha pelo openpyxl (leitura fria, que também grava
+o cache) com a leitura do mesmo conteúdo a partir do cache colunar.
+
+Uso:
+    python -m benchmarks.bench_cache_colunar [linhas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from source.manipulacao_excel.cache_colunar import cache_para  # noqa: E402
+from source.manipulacao_excel.manipulacao_excel import (  # noqa: E402
+    ler_arquivo_excel,
+)
+
+LINHAS_PADRAO = 50_000
+LEITURAS_QUENTES = 5
+
+
+def gerar_planilha(caminho: Path, linhas: int):
+    rng = np.random.default_rng(42)
+    retorno = rng.normal(0, 0.01, linhas)
+    retorno[rng.random(linhas) < 0.001] = np.nan
+    pd.DataFrame(
+        {
+            "Data": pd.date_range("2020-01-01", periods=linhas, freq="min"),
+            "Fundo": [f"FUNDO {i % 250:03d}" for i in range(linhas)],
+            "Cota": rng.uniform(1, 10, linhas),
+            "Patrimonio": rng.uniform(1e6, 1e9, linhas),
+            "Retorno": retorno,
+        }
+    ).to_excel(caminho, index=False)
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else LINHAS_PADRAO
+    pasta = Path(tempfile.mkdtemp(prefix="bench_cache_"))
+    caminho = pasta / "daily_fundos.xlsx"
+    gerar_planilha(caminho, linhas)
+    if cache_para(caminho) is None:
+        sys.exit("pyarrow não está instalado: o cache colunar está desativado.")
+
+    tempo_sem_cache, _ = medir(lambda: ler_arquivo_excel(caminho, usar_cache=False))
+    tempo_frio, df_frio = medir(lambda: ler_arquivo_excel(caminho))
+    tempos_quentes = []
+    for _ in range(LEITURAS_QUENTES):
+        tempo, df_quente = medir(lambda: ler_arquivo_excel(caminho))
+        tempos_quentes.append(tempo)
+    tempo_quente = min(tempos_quentes)
+
+    pd.testing.assert_frame_equal(df_frio, df_quente)
+    print(f"\nPlanilha: {linhas} linhas ({caminho.stat().st_size / 1e6:.1f} MB)")
+    print(f"sem cache (openpyxl)        : {tempo_sem_cache * 1000:9.1f} ms")
+    print(f"fria (openpyxl + gravação)  : {tempo_frio * 1000:9.1f} ms")
+    print(f"quente (cache colunar, min) : {tempo_quente * 1000:9.1f} ms")
+    print(f"aceleração da leitura quente: {tempo_sem_cache / tempo_quente:9.1f}x")
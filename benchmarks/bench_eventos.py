@@ -0,0 +1,98 @@
+"""
+Compara o registro de um evento nas duas formas: o par anterior (`print_log`
+e `logger_quantum.info`, cada um com a sua mensagem formatada e o seu carimbo
+de data e hora) com `registrar_evento` (um único evento com campos tipados,
+formatado apenas por quem o consome).
+
+Mede o custo para quem registra (o laço de chamadas) e o tempo total, até a
+thread de escrita gravar tudo em disco, com o console capturado (pipe) e no
+modo `--quiet`.
+
+Uso:
+    python -m benchmarks.bench_eventos [--eventos 50000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from colorama import Fore  # noqa: E402
+
+from benchmarks.bench_print_log import saida_drenada  # noqa: E402
+from source.logger import logger_config  # noqa: E402
+from source.logger.logger_config import (  # noqa: E402
+    ConsoleLog,
+    Logger,
+    print_log,
+    registrar_evento,
+)
+
+
+def par_anterior(i: int):
+    """Um evento como era registrado antes: console e arquivo separados."""
+    nome = f"relatorio_{i % 7}.xlsx"
+    print_log(
+        "INFO",
+        f"Verificação de qualidade: {i % 40} nulos encontrados (Limite: 30).",
+        theme_color=Fore.CYAN,
+    )
+    logger_config.logger_quantum.info(
+        f"Contagem de NaNs do arquivo '{nome}' finalizada: {i % 40} encontrados.",
+        extra_data={"arquivo": nome, "contagem_nan": i % 40, "limite": 30},
+    )
+
+
+def evento_unico(i: int):
+    registrar_evento(
+        "INFO",
+        "validacao",
+        "Verificação de qualidade: {contagem_nan} nulos encontrados (Limite: {limite}).",
+        theme_color=Fore.CYAN,
+        arquivo=f"relatorio_{i % 7}.xlsx",
+        contagem_nan=i % 40,
+        limite=30,
+    )
+
+
+def medir(funcao, eventos: int, nivel: str, pasta: Path):
+    """Troca o console e o logger do módulo por instâncias isoladas e mede."""
+    logger = Logger(str(pasta), tamanho_fila=eventos + 10)
+    logger_config.logger_quantum = logger
+    logger_config.console = ConsoleLog(nivel)
+    with saida_drenada(terminal=False, line_buffering=False):
+        inicio = time.perf_counter()
+        for i in range(eventos):
+            funcao(i)
+        chamadas = time.perf_counter() - inicio
+        logger_config.console.descarregar()
+        logger.save_logs(timeout=120)
+        total = time.perf_counter() - inicio
+    logger.close()
+    return chamadas, total
+
+
+def cenario(nome: str, eventos: int, nivel: str, pasta: Path):
+    anterior = medir(par_anterior, eventos, nivel, pasta / f"{nome}_par")
+    atual = medir(evento_unico, eventos, nivel, pasta / f"{nome}_evento")
+    for rotulo, antes, depois in zip(("chamadas", "até o disco"), anterior, atual):
+        print(
+            f"{nome:<8} {rotulo:<12}: {antes * 1e6 / eventos:6.2f} µs ->"
+            f" {depois * 1e6 / eventos:6.2f} µs por evento ({antes / depois:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--eventos", type=int, default=50_000)
+    args = parser.parse_args()
+
+    originais = logger_config.logger_quantum, logger_config.console
+    print(f"\n{args.eventos} eventos, par print_log + logger -> registrar_evento")
+    with tempfile.TemporaryDirectory(prefix="quantum_eventos_") as pasta:
+        cenario("pipe", args.eventos, "INFO", Path(pasta))
+        cenario("--quiet", args.eventos, "AVISO", Path(pasta))
+    logger_config.logger_quantum, logger_config.console = originais
@@ -0,0 +1,70 @@
+"""
+Compara a varredura antiga da caixa de entrada (Sort + leitura de ReceivedTime e
+Subject item a item, limitada a 50 mensagens) com o filtro `Items.Restrict`
+usado pelo `CaixaPostalOutlook`, em uma caixa falsa de 10 mil mensagens.
+
+Uso:
+    python -m benchmarks.bench_filtro_outlook
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from benchmarks.outlook_falso import criar_namespace_falso  # noqa: E402
+from source.email.caixa_postal import CaixaPostalOutlook  # noqa: E402
+from source.email.sessao_outlook import SessaoOutlook  # noqa: E402
+
+HEADLINE_PREFIX = "Daily Fundos"
+QUANTIDADE_MENSAGENS = 10_000
+# Custo típico de uma chamada COM entre processos no Outlook, usado na estimativa
+LATENCIA_COM_MS = 2.0
+
+
+def varredura_legada(aplicacao, headline_prefix: str):
+    """Reproduz a busca anterior: ordena a caixa inteira e lê até 50 itens via COM."""
+    namespace = aplicacao.GetNamespace("MAPI")
+    conta = next(f for f in namespace.Folders if "@asa.com.br" in f.Name.lower())
+    mensagens = conta.Folders["Caixa de Entrada"].Items
+    mensagens.Sort("[ReceivedTime]", True)
+    for i in range(min(50, mensagens.Count)):
+        msg = mensagens.Item(i + 1)
+        data_msg = msg.ReceivedTime.strftime("%Y-%m-%d")
+        data_hoje = datetime.now().strftime("%Y-%m-%d")
+        if data_msg != data_hoje:
+            return None
+        if msg.Subject and (
+            msg.Subject.endswith(headline_prefix)
+            or msg.Subject.startswith(headline_prefix)
+        ):
+            return msg.EntryID
+    return None
+
+
+def busca_com_filtro(aplicacao, headline_prefix: str):
+    caixa = CaixaPostalOutlook(SessaoOutlook(dispatch=lambda prog_id: aplicacao))
+    caixa.conectar()
+    msg = next(caixa.buscar_mensagens(headline_prefix, datetime.now().date()), None)
+    return msg.id_mensagem if msg else None
+
+
+def executar(nome: str, funcao, posicao_alvo: int):
+    aplicacao, contador = criar_namespace_falso(
+        QUANTIDADE_MENSAGENS, HEADLINE_PREFIX, posicao_alvo=posicao_alvo
+    )
+    encontrado = funcao(aplicacao, HEADLINE_PREFIX)
+    print(
+        f"{nome:<10} alvo na posição {posicao_alvo:>4}: "
+        f"{contador.total:>5} idas e voltas COM "
+        f"(~{contador.total * LATENCIA_COM_MS:7.1f} ms), encontrado={encontrado}"
+    )
+    return contador.total
+
+
+if __name__ == "__main__":
+    for posicao in (0, 40, 200):
+        legado = executar("legado", varredura_legada, posicao)
+        filtro = executar("restrict", busca_com_filtro, posicao)
+        print(f"{'':<10} idas e voltas evitadas: {legado - filtro}\n")
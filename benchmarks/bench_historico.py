@@ -0,0 +1,86 @@
+"""
+Compara duas formas de responder "a planilha de hoje está fora da tendência
+dos últimos N dias?": reler as N planilhas anteriores e resumi-las a cada
+execução, ou consultar o histórico diário do índice (`verificar_tendencias`),
+alimentado pelas validações anteriores.
+
+Uso:
+    python -m benchmarks.bench_historico [--dias 90] [--linhas 2000] [--consultas 50]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from benchmarks.geradores import gerar_planilha  # noqa: E402
+from source.indice.indice_processados import IndiceProcessados  # noqa: E402
+from source.manipulacao_excel.manipulacao_excel import ler_arquivo_excel  # noqa: E402
+from source.qualidade.historico import (  # noqa: E402
+    EstatisticasPlanilha,
+    verificar_tendencias,
+)
+
+
+def resumir(caminho: Path) -> EstatisticasPlanilha:
+    estatisticas = EstatisticasPlanilha(["Data", "Fundo"])
+    estatisticas.acumular(ler_arquivo_excel(caminho, usar_cache=False))
+    return estatisticas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dias", type=int, default=90)
+    parser.add_argument("--linhas", type=int, default=2000)
+    parser.add_argument("--consultas", type=int, default=50)
+    args = parser.parse_args()
+
+    hoje = date.today()
+    with tempfile.TemporaryDirectory(prefix="quantum_historico_") as pasta:
+        pasta = Path(pasta)
+        planilhas = {}
+        for dia in range(args.dias + 1):
+            planilhas[hoje - timedelta(days=dia)] = gerar_planilha(
+                pasta / f"dia_{dia:03d}.xlsx", args.linhas + dia % 7, semente=dia
+            )
+        atual = resumir(planilhas.pop(hoje))
+
+        # Releitura: o que seria preciso sem o histórico
+        inicio = time.perf_counter()
+        anteriores = {dia: resumir(caminho) for dia, caminho in planilhas.items()}
+        media_releitura = statistics.fmean(e.linhas for e in anteriores.values())
+        releitura = time.perf_counter() - inicio
+
+        # Histórico: cada validação anterior deixou o seu resumo no índice
+        indice = IndiceProcessados(pasta / "indice.db")
+        for dia, estatisticas in anteriores.items():
+            indice.registrar_estatisticas(
+                dia,
+                estatisticas.linhas,
+                estatisticas.colunas(),
+                hash_chaves=estatisticas.hash_chaves,
+            )
+        dias, media_historico, _ = indice.resumo_linhas(
+            hoje - timedelta(days=args.dias), hoje
+        )
+        assert dias == args.dias and abs(media_historico - media_releitura) < 1e-6
+
+        tempos = []
+        for _ in range(args.consultas):
+            inicio = time.perf_counter()
+            anomalias = verificar_tendencias(indice, hoje, atual, janela_dias=args.dias)
+            tempos.append(time.perf_counter() - inicio)
+
+    print(f"\n{args.dias} dias de histórico, planilhas de ~{args.linhas} linhas")
+    print(f"releitura das planilhas : {releitura * 1000:10.1f} ms")
+    print(
+        f"consulta ao histórico  : {statistics.median(tempos) * 1000:10.2f} ms"
+        f" (mediana de {args.consultas})"
+    )
+    print(f"anomalias na planilha de hoje: {len(anomalias)}")
+    print(f"\naceleração: {releitura / statistics.median(tempos):.0f}x")
@@ -0,0 +1,96 @@
+"""
+Mede o custo de inicialização do `main.py` com `python -X importtime`: o tempo
+acumulado de importação do módulo `main` e das bibliotecas pesadas (pandas,
+openpyxl, pyarrow, requests), que só deveriam ser carregadas quando uma
+planilha é lida ou uma notificação é enviada.
+
+Com `--revisao`, a mesma medição é feita em uma revisão anterior do
+repositório (extraída com `git archive` para uma pasta temporária), para
+comparar.
+
+Uso:
+    python -m benchmarks.bench_inicializacao [--repeticoes 7] [--revisao 6e111a6]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+BIBLIOTECAS_PESADAS = ("pandas", "numpy", "openpyxl", "pyarrow", "requests")
+
+
+def medir_importacao(raiz: Path) -> dict:
+    """Importa o `main` em um processo novo e devolve os tempos acumulados (ms)."""
+    ambiente = dict(os.environ, PASTA_LOG=tempfile.gettempdir(), PYTHONPATH=str(raiz))
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=raiz,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    tempos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, acumulado, modulo = linha.split("|")
+        modulo = modulo.strip()
+        if modulo == "main" or modulo in BIBLIOTECAS_PESADAS:
+            try:
+                tempos[modulo] = int(acumulado) / 1000
+            except ValueError:
+                continue  # Linha de cabeçalho
+    return tempos
+
+
+def medir(raiz: Path, repeticoes: int) -> dict:
+    execucoes = [medir_importacao(raiz) for _ in range(repeticoes)]
+    carregadas = sorted({m for e in execucoes for m in e if m != "main"})
+    return {
+        "main": statistics.median(e["main"] for e in execucoes),
+        "carregadas": carregadas,
+    }
+
+
+def extrair_revisao(revisao: str, destino: Path) -> Path:
+    arquivo = subprocess.run(
+        ["git", "archive", "--format=tar", revisao],
+        cwd=RAIZ,
+        capture_output=True,
+        check=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(arquivo)) as tar:
+        tar.extractall(destino)
+    return destino
+
+
+def relatorio(rotulo: str, medicao: dict):
+    carregadas = ", ".join(medicao["carregadas"]) or "nenhuma"
+    print(f"{rotulo:<12} import main: {medicao['main']:8.1f} ms (mediana)")
+    print(f"{'':<12} bibliotecas pesadas carregadas: {carregadas}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeticoes", type=int, default=7)
+    parser.add_argument("--revisao", help="revisão do git para comparar")
+    args = parser.parse_args()
+
+    atual = medir(RAIZ, args.repeticoes)
+    relatorio("atual", atual)
+    if args.revisao:
+        with tempfile.TemporaryDirectory(prefix="quantum_revisao_") as pasta:
+            anterior = medir(
+                extrair_revisao(args.revisao, Path(pasta)), args.repeticoes
+            )
+        relatorio(args.revisao, anterior)
+        print(f"\naceleração: {anterior['main'] / atual['main']:.1f}x")
@@ -0,0 +1,116 @@
+"""
+Compara a validação de uma planilha grande lida inteira (`ler_arquivo_excel` +
+`MotorRegras.avaliar`) com a leitura em lotes (`ler_excel_em_lotes` +
+`MotorRegras.avaliar_em_lotes`): tempo e pico de memória do processo. Cada
+modo roda em um processo próprio, para que um pico não contamine o outro, e os
+resultados das regras dos dois modos são conferidos.
+
+Uso:
+    python -m benchmarks.bench_leitura_em_lotes [--linhas 200000] [--lote 50000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.bench_motor_regras import gerar_planilha, montar_regras  # noqa: E402
+from source.manipulacao_excel.manipulacao_excel import (  # noqa: E402
+    ler_arquivo_excel,
+    ler_excel_em_lotes,
+)
+from source.observabilidade.medicoes import pico_memoria_processo  # noqa: E402
+from source.qualidade.motor_regras import MotorRegras  # noqa: E402
+
+
+def executar_modo(modo: str, caminho: Path, tamanho_lote: int) -> dict:
+    """Valida a planilha no modo informado; executada no processo filho."""
+    motor = MotorRegras(montar_regras())
+    pico_inicial = pico_memoria_processo()
+    inicio = time.perf_counter()
+    if modo == "completo":
+        df = ler_arquivo_excel(caminho, usar_cache=False)
+        relatorio = motor.avaliar(df, linhas_anteriores=1)
+    else:
+        relatorio = motor.avaliar_em_lotes(
+            ler_excel_em_lotes(caminho, tamanho_lote), linhas_anteriores=1
+        )
+    return {
+        "duracao_s": time.perf_counter() - inicio,
+        "pico_inicial_mb": pico_inicial / 2**20,
+        "pico_mb": pico_memoria_processo() / 2**20,
+        "valores": [r.valor for r in relatorio.resultados],
+    }
+
+
+def medir_em_processo(modo: str, caminho: Path, tamanho_lote: int) -> dict:
+    saida = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_leitura_em_lotes",
+            "--modo",
+            modo,
+            "--arquivo",
+            str(caminho),
+            "--lote",
+            str(tamanho_lote),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--lote", type=int, default=50_000)
+    parser.add_argument("--modo", choices=("completo", "lotes"), help=argparse.SUPPRESS)
+    parser.add_argument("--arquivo", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        resultado = executar_modo(args.modo, args.arquivo, args.lote)
+        print(json.dumps(resultado))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix="quantum_lotes_") as pasta:
+        caminho = Path(pasta) / "planilha.xlsx"
+        df = gerar_planilha(args.linhas)
+        # Algumas linhas repetidas para a regra 'chave_unica'
+        df = pd.concat([df, df.sample(n=25, random_state=3)], ignore_index=True)
+        df.to_excel(caminho, index=False)
+        tamanho_mb = caminho.stat().st_size / 2**20
+        print(
+            f"planilha: {len(df)} linhas x {df.shape[1]} colunas, {tamanho_mb:.1f} MB"
+        )
+
+        completo = medir_em_processo("completo", caminho, args.lote)
+        lotes = medir_em_processo("lotes", caminho, args.lote)
+
+    assert completo["valores"] == lotes["valores"], (
+        completo["valores"],
+        lotes["valores"],
+    )
+    for rotulo, medicao in (("leitura completa", completo), ("em lotes", lotes)):
+        print(
+            f"{rotulo:<17}: {medicao['duracao_s']:7.2f} s,"
+            f" pico de memória {medicao['pico_mb']:7.1f} MB"
+            f" (após importações: {medicao['pico_inicial_mb']:.1f} MB)"
+        )
+    acima_completo = completo["pico_mb"] - completo["pico_inicial_mb"]
+    acima_lotes = lotes["pico_mb"] - lotes["pico_inicial_mb"]
+    print(
+        "\nredução do pico acima das importações:"
+        f" {acima_completo / max(acima_lotes, 1):.1f}x"
+    )
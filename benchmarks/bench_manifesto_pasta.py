@@ -0,0 +1,122 @@
+"""
+Compara a busca da planilha mais recente por `glob` + `os.path.getmtime`
+(uma chamada de stat por arquivo a cada execução) com o manifesto da pasta,
+em uma pasta com muitas planilhas.
+
+A contagem considera apenas os.stat. Cada consulta ao manifesto concilia a
+pasta com uma passada de `os.scandir` e um DirEntry.stat() por planilha (não
+contado), que no Windows vem da própria listagem; só as planilhas novas ou
+alteradas são gravadas no banco.
+
+Uso:
+    python -m benchmarks.bench_manifesto_pasta [arquivos]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from source.indice.manifesto_pasta import ManifestoPasta  # noqa: E402
+
+ARQUIVOS_PADRAO = 50_000
+REPETICOES = 5
+INICIO = datetime(2020, 1, 1)
+
+
+class ContadorStat:
+    """Conta as chamadas de os.stat feitas durante um bloco."""
+
+    def __enter__(self):
+        self.chamadas = 0
+        self._original = os.stat
+
+        def stat_contado(*args, **kwargs):
+            self.chamadas += 1
+            return self._original(*args, **kwargs)
+
+        os.stat = stat_contado
+        return self
+
+    def __exit__(self, *args):
+        os.stat = self._original
+
+
+def gerar_pasta(pasta: Path, quantidade: int):
+    """Cria planilhas vazias com um minuto de diferença entre as datas de modificação."""
+    inicio = INICIO.timestamp()
+    for i in range(quantidade):
+        caminho = pasta / f"daily_fundos_{i:06d}.xlsx"
+        caminho.touch()
+        instante = inicio + i * 60
+        os.utime(caminho, (instante, instante))
+
+
+def mais_recente_glob(pasta: Path):
+    arquivos = list(pasta.glob("*.xlsx")) + list(pasta.glob("*.xls"))
+    return max(arquivos, key=os.path.getmtime)
+
+
+def medir(funcao, repeticoes: int = 1):
+    """Devolve o menor tempo, as chamadas de stat da última repetição e o resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        with ContadorStat() as contador:
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append(time.perf_counter() - inicio)
+    return min(tempos), contador.chamadas, resultado
+
+
+def relatorio(nome: str, tempo: float, chamadas_stat: int):
+    print(f"{nome:<36}: {tempo * 1000:10.2f} ms | {chamadas_stat:6d} chamadas de stat")
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else ARQUIVOS_PADRAO
+    pasta = Path(tempfile.mkdtemp(prefix="bench_manifesto_"))
+    print(f"Gerando {quantidade} planilhas em {pasta}...")
+    gerar_pasta(pasta, quantidade)
+    print()
+
+    tempo, stats, esperado = medir(lambda: mais_recente_glob(pasta), REPETICOES)
+    relatorio("glob + getmtime", tempo, stats)
+
+    manifesto = ManifestoPasta(pasta)
+    tempo, stats, _ = medir(manifesto.reconciliar)
+    relatorio("manifesto: 1ª conciliação (scandir)", tempo, stats)
+
+    tempo, stats, resultado = medir(manifesto.mais_recente, REPETICOES)
+    assert resultado == esperado, (resultado, esperado)
+    relatorio("manifesto: mais recente", tempo, stats)
+
+    instante = INICIO + timedelta(minutes=quantidade - 30)
+    tempo, stats, resultado = medir(lambda: manifesto.desde(instante), REPETICOES)
+    assert len(resultado) == 30
+    relatorio("manifesto: desde T (30 planilhas)", tempo, stats)
+
+    # Processo novo: o manifesto é lido do banco, sem regravar nada
+    tempo, stats, resultado = medir(lambda: ManifestoPasta(pasta).mais_recente())
+    assert resultado == esperado
+    relatorio("manifesto: novo processo", tempo, stats)
+
+    novo = pasta / "daily_fundos_novo.xlsx"
+    novo.touch()
+    tempo, stats, _ = medir(lambda: manifesto.registrar(novo))
+    relatorio("manifesto: registro na ingestão", tempo, stats)
+
+    tempo, stats, resultado = medir(manifesto.mais_recente)
+    assert resultado == novo
+    relatorio("manifesto: consulta após ingestão", tempo, stats)
+
+    # Uma planilha antiga sobrescrita no lugar passa a ser a mais recente
+    antiga = pasta / "daily_fundos_000000.xlsx"
+    with open(antiga, "r+b") as f:
+        f.write(b"1")
+    tempo, stats, resultado = medir(manifesto.mais_recente)
+    assert resultado == antiga == mais_recente_glob(pasta)
+    relatorio("manifesto: após sobrescrita no lugar", tempo, stats)
@@ -0,0 +1,117 @@
+"""
+Compara a avaliação de várias regras de qualidade com uma passada do pandas
+por regra (como seria estendendo `quantidade_nan`) com o `MotorRegras`, que
+agrupa as regras e compartilha conversões e máscaras entre as regras da mesma
+coluna. Os resultados das duas abordagens são conferidos.
+
+Uso:
+    python -m benchmarks.bench_motor_regras [linhas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from source.qualidade.motor_regras import MotorRegras  # noqa: E402
+
+LINHAS_PADRAO = 50_000
+REPETICOES = 5
+COLUNAS_NUMERICAS = ["Cota", "Patrimonio", "Retorno", "Retorno_Mes", "Retorno_Ano"]
+
+
+def gerar_planilha(linhas: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(
+        {
+            "Data": pd.date_range("2020-01-01", periods=linhas, freq="min"),
+            "Fundo": [f"FUNDO {i % 250:03d}" for i in range(linhas)],
+        }
+    )
+    for coluna in COLUNAS_NUMERICAS:
+        valores = rng.normal(0, 0.05, linhas)
+        valores[rng.random(linhas) < 0.001] = np.nan
+        df[coluna] = valores
+    # Uma coluna numérica que chegou como texto, com alguns valores inválidos
+    df["Cota_Texto"] = df["Cota"].astype(str)
+    df.loc[df.sample(frac=0.0005, random_state=1).index, "Cota_Texto"] = "n/d"
+    return df
+
+
+def montar_regras():
+    regras = []
+    for coluna in COLUNAS_NUMERICAS:
+        regras.append({"tipo": "nulos", "coluna": coluna, "limite": 5_000})
+        regras.append(
+            {"tipo": "intervalo", "coluna": coluna, "minimo": -0.2, "maximo": 0.2}
+        )
+    regras.append({"tipo": "tipo", "coluna": "Cota_Texto", "dado": "numerico"})
+    regras.append(
+        {"tipo": "intervalo", "coluna": "Cota_Texto", "minimo": -0.2, "maximo": 0.2}
+    )
+    regras.append({"tipo": "nulos", "coluna": "Cota_Texto", "limite": 0})
+    regras.append({"tipo": "chave_unica", "colunas": ["Data", "Fundo"]})
+    regras.append({"tipo": "variacao_linhas", "maxima_percentual": 20})
+    return regras
+
+
+def avaliar_por_regra(df: pd.DataFrame, regras, linhas_anteriores: int):
+    """Uma passada completa do pandas para cada regra."""
+    valores = []
+    for regra in regras:
+        tipo = regra["tipo"]
+        if tipo == "nulos":
+            valores.append(int(df[regra["coluna"]].isna().sum()))
+        elif tipo == "intervalo":
+            serie = pd.to_numeric(df[regra["coluna"]], errors="coerce")
+            fora = (serie < regra["minimo"]) | (serie > regra["maximo"])
+            valores.append(int(fora.sum()))
+        elif tipo == "tipo":
+            serie = df[regra["coluna"]]
+            convertida = pd.to_numeric(serie, errors="coerce")
+            valores.append(int((convertida.isna() & serie.notna()).sum()))
+        elif tipo == "chave_unica":
+            valores.append(int(df.duplicated(subset=regra["colunas"]).sum()))
+        else:
+            variacao = abs(len(df) - linhas_anteriores) / linhas_anteriores * 100
+            valores.append(round(variacao, 2))
+    return valores
+
+
+def medir(funcao):
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else LINHAS_PADRAO
+    df = gerar_planilha(linhas)
+    regras = montar_regras()
+    motor = MotorRegras(regras)
+    linhas_anteriores = int(linhas * 0.95)
+
+    tempo_por_regra, esperado = medir(
+        lambda: avaliar_por_regra(df, regras, linhas_anteriores)
+    )
+    tempo_motor, relatorio = medir(lambda: motor.avaliar(df, linhas_anteriores))
+    assert [r.valor for r in relatorio.resultados] == esperado, (
+        [r.valor for r in relatorio.resultados],
+        esperado,
+    )
+
+    print(f"\n{len(regras)} regras sobre {linhas} linhas x {df.shape[1]} colunas")
+    print(f"uma passada por regra : {tempo_por_regra * 1000:9.1f} ms")
+    print(f"motor de regras       : {tempo_motor * 1000:9.1f} ms")
+    print(f"aceleração            : {tempo_por_regra / tempo_motor:9.1f}x")
+    print(f"\n{relatorio}:")
+    for descricao, resumo in relatorio.fatos(apenas_falhas=True):
+        print(f"  {descricao}: {resumo}")
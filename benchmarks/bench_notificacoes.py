@@ -0,0 +1,180 @@
+"""
+Compara o envio antigo das notificações (um `requests.post` e uma conexão SMTP
+nova por notificação, bloqueando quem chama) com o `DespachanteNotificacoes`,
+usando um webhook HTTP local e um servidor SMTP local.
+
+O servidor SMTP usa o aiosmtpd quando ele está instalado; caso contrário, o
+módulo `smtpd` da biblioteca padrão (disponível até o Python 3.11).
+
+Uso:
+    python -m benchmarks.bench_notificacoes [notificacoes]
+"""
+
+import os
+import smtplib
+import sys
+import tempfile
+import threading
+import time
+from email.mime.text import MIMEText
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+import requests  # noqa: E402
+
+from source.notificacao.despachante import DespachanteNotificacoes  # noqa: E402
+
+NOTIFICACOES_PADRAO = 10
+# Latência simulada do webhook do Teams
+LATENCIA_WEBHOOK_S = 0.05
+
+
+class Contadores:
+    def __init__(self):
+        self.requisicoes_http = 0
+        self.conexoes_http = 0
+        self.mensagens_smtp = 0
+        self.conexoes_smtp = 0
+
+    def zerar(self):
+        self.__init__()
+
+
+contadores = Contadores()
+
+
+class WebhookFalso(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Mantém a conexão aberta entre requisições
+
+    def setup(self):
+        super().setup()
+        contadores.conexoes_http += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(LATENCIA_WEBHOOK_S)
+        contadores.requisicoes_http += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "1")
+        self.end_headers()
+        self.wfile.write(b"1")
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_webhook():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), WebhookFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}/webhook"
+
+
+def iniciar_smtp() -> int:
+    """Sobe um servidor SMTP local que apenas conta sessões e mensagens."""
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.smtp import SMTP
+
+        class Manipulador:
+            async def handle_EHLO(self, server, session, envelope, hostname, responses):
+                contadores.conexoes_smtp += 1
+                session.host_name = hostname
+                return responses
+
+            async def handle_DATA(self, server, session, envelope):
+                contadores.mensagens_smtp += 1
+                return "250 OK"
+
+        class ControladorSemTLS(Controller):
+            def factory(self):
+                return SMTP(self.handler, auth_require_tls=False)
+
+        controlador = ControladorSemTLS(Manipulador(), hostname="127.0.0.1", port=0)
+        controlador.start()
+        return controlador.server.sockets[0].getsockname()[1]
+    except ImportError:
+        import asyncore
+        import warnings
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            import smtpd
+
+        class ServidorContador(smtpd.SMTPServer):
+            def handle_accepted(self, conn, addr):
+                contadores.conexoes_smtp += 1
+                super().handle_accepted(conn, addr)
+
+            def process_message(self, *args, **kwargs):
+                contadores.mensagens_smtp += 1
+
+        servidor = ServidorContador(("127.0.0.1", 0), None)
+        threading.Thread(
+            target=asyncore.loop, kwargs={"timeout": 0.05}, daemon=True
+        ).start()
+        return servidor.socket.getsockname()[1]
+
+
+def card(i: int) -> dict:
+    return {
+        "@type": "MessageCard",
+        "themeColor": "d9534f",
+        "summary": f"Alerta {i}",
+        "sections": [{"activityTitle": f"Alerta {i}"}],
+    }
+
+
+def envio_legado(webhook_url: str, porta_smtp: int, quantidade: int):
+    for i in range(quantidade):
+        requests.post(webhook_url, json=card(i), verify=False).raise_for_status()
+        msg = MIMEText(f"<p>Alerta {i}</p>", "html")
+        msg["Subject"] = f"Alerta {i}"
+        with smtplib.SMTP("127.0.0.1", porta_smtp, timeout=10) as server:
+            server.ehlo("localhost")
+            server.sendmail("quantum@local", ["equipe@local"], msg.as_string())
+
+
+def envio_despachante(despachante, webhook_url: str, quantidade: int):
+    for i in range(quantidade):
+        despachante.enviar_teams(webhook_url, card(i))
+        despachante.enviar_email(
+            "quantum@local", None, ["equipe@local"], f"Alerta {i}", f"<p>{i}</p>"
+        )
+
+
+def relatorio(nome: str, bloqueado: float, total: float):
+    print(
+        f"{nome:<12} bloqueio de quem chama {bloqueado * 1000:8.1f} ms |"
+        f" entrega completa {total * 1000:8.1f} ms |"
+        f" HTTP {contadores.requisicoes_http} req/{contadores.conexoes_http} conexões |"
+        f" SMTP {contadores.mensagens_smtp} msg/{contadores.conexoes_smtp} sessões"
+    )
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else NOTIFICACOES_PADRAO
+    webhook_url = iniciar_webhook()
+    porta_smtp = iniciar_smtp()
+    print(f"{quantidade} alertas no Teams + {quantidade} e-mails:\n")
+
+    inicio = time.perf_counter()
+    envio_legado(webhook_url, porta_smtp, quantidade)
+    tempo_legado = time.perf_counter() - inicio
+    time.sleep(0.2)  # Deixa o servidor SMTP contabilizar a última mensagem
+    relatorio("legado", tempo_legado, tempo_legado)
+
+    contadores.zerar()
+    despachante = DespachanteNotificacoes(
+        janela_agrupamento=0.2,
+        servidor_smtp="127.0.0.1",
+        porta_smtp=porta_smtp,
+        usar_starttls=False,
+    )
+    inicio = time.perf_counter()
+    envio_despachante(despachante, webhook_url, quantidade)
+    bloqueado = time.perf_counter() - inicio
+    despachante.aguardar()
+    total = time.perf_counter() - inicio
+    time.sleep(0.2)
+    relatorio("despachante", bloqueado, total)
@@ -0,0 +1,102 @@
+"""
+Compara o `print_log` anterior (carimbo com `datetime.now().strftime`, cor
+resolvida e um `print` com vários códigos de estilo a cada chamada) com o
+`ConsoleLog` atual (prefixos em cache, buffer com descarga explícita, cores
+omitidas fora de um terminal e filtro de nível antes da formatação).
+
+Cenários: saída capturada (pipe, como no agendador), terminal (pseudo-terminal,
+onde disponível) e o modo `--quiet`, em que as mensagens INFO são descartadas.
+
+Uso:
+    python -m benchmarks.bench_print_log [--mensagens 100000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from colorama import Fore, Style  # noqa: E402
+
+from source.logger.logger_config import LOG_COLORS, ConsoleLog  # noqa: E402
+
+
+def print_log_anterior(level: str, message: str, theme_color: str = None):
+    """O `print_log` antes do `ConsoleLog`."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if level == "ERROR":
+        color = LOG_COLORS.get("ERROR")
+    elif theme_color:
+        color = theme_color
+    else:
+        color = LOG_COLORS.get(level, Fore.WHITE)
+
+    print(
+        f"{color}{Style.BRIGHT}[{level}]{Style.RESET_ALL} "
+        f"{color}{Style.BRIGHT}[{timestamp}]{Style.RESET_ALL} {message}"
+    )
+
+
+@contextlib.contextmanager
+def saida_drenada(terminal: bool, line_buffering: bool):
+    """Um `sys.stdout` sobre um pipe (ou pseudo-terminal) lido por uma thread."""
+    leitura, escrita = os.openpty() if terminal else os.pipe()
+
+    def drenar():
+        try:
+            while os.read(leitura, 1 << 16):
+                pass
+        except OSError:
+            pass  # Pseudo-terminal fechado
+
+    thread = threading.Thread(target=drenar, daemon=True)
+    thread.start()
+    saida = io.TextIOWrapper(
+        io.FileIO(escrita, "w"), encoding="utf-8", line_buffering=line_buffering
+    )
+    try:
+        with contextlib.redirect_stdout(saida):
+            yield saida
+    finally:
+        saida.close()
+        thread.join(5)
+        os.close(leitura)
+
+
+def medir(funcao, mensagens: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(mensagens):
+        funcao("INFO", f"Processando mensagem {i}: 'Daily Fundos'...", Fore.CYAN)
+    return time.perf_counter() - inicio
+
+
+def cenario(nome: str, mensagens: int, terminal: bool, nivel: str = "INFO"):
+    # Em um terminal o Python grava linha a linha; capturado, em blocos
+    with saida_drenada(terminal, line_buffering=terminal):
+        anterior = medir(print_log_anterior, mensagens)
+    console = ConsoleLog(nivel)
+    with saida_drenada(terminal, line_buffering=terminal):
+        atual = medir(console.escrever, mensagens)
+        console.descarregar()
+    print(
+        f"{nome:<24}: {anterior * 1e6 / mensagens:6.2f} µs -> "
+        f"{atual * 1e6 / mensagens:6.2f} µs por mensagem ({anterior / atual:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mensagens", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"\n{args.mensagens} mensagens INFO, anterior -> atual")
+    cenario("saída capturada (pipe)", args.mensagens, terminal=False)
+    if hasattr(os, "openpty"):
+        cenario("terminal (pty)", args.mensagens, terminal=True)
+    cenario("--quiet (pipe)", args.mensagens, terminal=False, nivel="AVISO")
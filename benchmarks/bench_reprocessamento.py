@@ -0,0 +1,113 @@
+"""
+Compara duas formas de recuperar um período de e-mails: repetir a execução
+diária dia a dia (`ingerir_excel_email` + `validar_arquivo_excel` para cada
+data, uma busca na caixa postal por dia) com o modo de reprocessamento
+(`reprocessar_periodo`: uma única busca, gravação em threads e validação em um
+pool de processos). Os resultados dos dois modos são conferidos.
+
+Uso:
+    python -m benchmarks.bench_reprocessamento [--dias 10] [--linhas 20000] [--processos N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from benchmarks.geradores import (  # noqa: E402
+    HEADLINE_PREFIX,
+    gerar_caixa_periodo,
+    gerar_planilha,
+)
+from source.email.caixa_postal import CaixaPostalLocal  # noqa: E402
+from source.email.extrair_excel_email import ingerir_excel_email  # noqa: E402
+from source.feeds.processar_feeds import Feed  # noqa: E402
+from source.indice.indice_processados import indice_da_pasta  # noqa: E402
+from source.manipulacao_excel.manipulacao_excel import (  # noqa: E402
+    PlanilhaValidada,
+    validar_arquivo_excel,
+)
+from source.pipeline.reprocessamento import reprocessar_periodo  # noqa: E402
+
+LIMITE_NULOS = 30
+
+
+def dia_a_dia(caixa: Path, destino: Path, inicio: date, fim: date) -> dict:
+    caixa_postal = CaixaPostalLocal(str(caixa))
+    status = {}
+    dia = inicio
+    while dia <= fim:
+        anexo = ingerir_excel_email(
+            str(destino), HEADLINE_PREFIX, caixa_postal, data=dia
+        )
+        anexo.aguardar_persistencia()
+        resultado = validar_arquivo_excel(
+            anexo.caminho,
+            LIMITE_NULOS,
+            indice=indice_da_pasta(destino),
+            conteudo=anexo.conteudo,
+            data=dia,
+        )
+        status[dia.isoformat()] = (
+            "OK" if isinstance(resultado, PlanilhaValidada) else "FALHA"
+        )
+        dia += timedelta(days=1)
+    return status
+
+
+def em_periodo(
+    caixa: Path, destino: Path, inicio: date, fim: date, processos: int
+) -> dict:
+    feed = Feed("bench", HEADLINE_PREFIX, destino, limites_null=LIMITE_NULOS)
+    resultados = reprocessar_periodo(
+        [feed],
+        inicio,
+        fim,
+        caixa_postal=CaixaPostalLocal(str(caixa)),
+        processos_validacao=processos,
+    )
+    return {r["data"]: r["status"] for r in resultados}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dias", type=int, default=10)
+    parser.add_argument("--linhas", type=int, default=20000)
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    fim = date.today() - timedelta(days=1)
+    inicio = fim - timedelta(days=args.dias - 1)
+    with tempfile.TemporaryDirectory(prefix="quantum_reprocessamento_") as pasta:
+        pasta = Path(pasta)
+        anexos = {}
+        for i in range(args.dias):
+            planilha = gerar_planilha(
+                pasta / f"dia_{i}.xlsx",
+                args.linhas,
+                proporcao_nulos=0.002 * (i % 2),
+                semente=i,
+            )
+            anexos[inicio + timedelta(days=i)] = planilha.read_bytes()
+        caixa = gerar_caixa_periodo(pasta / "caixa", anexos)
+
+        t0 = time.perf_counter()
+        sequencial = dia_a_dia(caixa, pasta / "dia_a_dia", inicio, fim)
+        t1 = time.perf_counter()
+        paralelo = em_periodo(caixa, pasta / "periodo", inicio, fim, args.processos)
+        t2 = time.perf_counter()
+        # Segunda execução: tudo já reprocessado, nada é refeito
+        repeticao = em_periodo(caixa, pasta / "periodo", inicio, fim, args.processos)
+        t3 = time.perf_counter()
+
+    assert sequencial == paralelo, (sequencial, paralelo)
+    assert repeticao == {}
+    print(f"\n{args.dias} dias, planilhas de {args.linhas} linhas")
+    print(f"dia a dia              : {(t1 - t0) * 1000:9.1f} ms")
+    print(f"reprocessamento ({args.processos} proc.): {(t2 - t1) * 1000:9.1f} ms")
+    print(f"retomada (nada a fazer): {(t3 - t2) * 1000:9.1f} ms")
+    print(f"\naceleração: {(t1 - t0) / (t2 - t1):.1f}x")
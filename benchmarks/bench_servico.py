@@ -0,0 +1,114 @@
+"""
+Compara o tempo de um trabalho em uma execução agendada "fria" (um processo
+novo de `python main.py --dry-run`, que importa tudo e conecta à caixa postal
+a cada vez) com o mesmo trabalho disparado pelo endpoint de controle do modo
+serviço, com o pipeline já aquecido.
+
+As duas abordagens usam a mesma caixa postal sintética (Maildir) e não gravam
+o anexo nem enviam notificações, então cada execução repete todo o trabalho.
+
+Uso:
+    python -m benchmarks.bench_servico [--execucoes 5] [--linhas 5000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+from benchmarks.geradores import (  # noqa: E402
+    HEADLINE_PREFIX,
+    gerar_caixa_local,
+    gerar_planilha,
+)
+from source.email.caixa_postal import CaixaPostalLocal  # noqa: E402
+from source.feeds.processar_feeds import Feed  # noqa: E402
+from source.pipeline.executor_async import ExecutorPipeline  # noqa: E402
+from source.servico.servico import ServicoQuantum  # noqa: E402
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def medir_frio(caixa: Path, destino: Path, execucoes: int) -> list:
+    ambiente = dict(
+        os.environ,
+        CAIXA_POSTAL_LOCAL=str(caixa),
+        HEADLINE_PREFIX=HEADLINE_PREFIX,
+        PASTA_RAIZ_QUANTUM=str(destino),
+    )
+    tempos = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py", "--dry-run"],
+            cwd=RAIZ,
+            env=ambiente,
+            capture_output=True,
+            check=True,
+        )
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _requisitar(url: str, metodo: str = "GET") -> dict:
+    with urllib.request.urlopen(urllib.request.Request(url, method=metodo)) as r:
+        return json.loads(r.read())
+
+
+def medir_quente(caixa: Path, destino: Path, execucoes: int) -> list:
+    pipeline = ExecutorPipeline(
+        caixa_postal=CaixaPostalLocal(str(caixa)),
+        tentativas=1,
+        persistir_anexos=False,
+        notificar=False,
+        apenas_novos=True,
+    )
+    feed = Feed("bench", HEADLINE_PREFIX, destino)
+    # Agenda anual: as execuções medidas são apenas as disparadas pelo controle
+    servico = ServicoQuantum([feed], "0 0 1 1 *", pipeline, porta=0)
+    servico.iniciar()
+    base = f"http://{servico.host}:{servico.porta}"
+    tempos = []
+    try:
+        for execucao in range(1, execucoes + 1):
+            inicio = time.perf_counter()
+            _requisitar(f"{base}/executar", "POST")
+            while _requisitar(f"{base}/status")["feeds"][0]["execucoes"] < execucao:
+                time.sleep(0.002)
+            tempos.append(time.perf_counter() - inicio)
+    finally:
+        servico.encerrar()
+    return tempos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--linhas", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="quantum_servico_") as pasta:
+        pasta = Path(pasta)
+        planilha = gerar_planilha(pasta / "planilha.xlsx", args.linhas)
+        caixa = gerar_caixa_local(pasta / "caixa", 20, planilha.read_bytes())
+        destino = pasta / "destino"
+        destino.mkdir()
+
+        frio = medir_frio(caixa, destino, args.execucoes)
+        quente = medir_quente(caixa, destino, args.execucoes)
+
+    print(f"\n{args.execucoes} execuções, planilha de {args.linhas} linhas")
+    for rotulo, tempos in (("processo novo", frio), ("serviço aquecido", quente)):
+        print(
+            f"{rotulo:<17}: {statistics.median(tempos) * 1000:9.1f} ms (mediana),"
+            f" {min(tempos) * 1000:9.1f} ms (mín.)"
+        )
+    print(f"\naceleração: {statistics.median(frio) / statistics.median(quente):.1f}x")
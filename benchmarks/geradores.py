@@ -0,0 +1,212 @@
+"""
+Geradores de dados sintéticos para os benchmarks: planilhas (linhas x colunas
+x proporção de nulos) e caixas postais com mensagens e anexos de tamanho
+configurável, em disco (Maildir ou pasta de .eml) ou via objetos COM falsos.
+"""
+
+import mailbox
+import os
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import format_datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.outlook_falso import (
+    AnexoFalso,
+    AplicacaoFalsa,
+    ContadorCOM,
+    ItemFalso,
+    NamespaceFalso,
+    PastaFalsa,
+)
+
+HEADLINE_PREFIX = "Daily Fundos"
+NOME_ANEXO = "Relatorio Diario.xlsx"
+
+
+def gerar_dataframe(
+    linhas: int, colunas: int = 5, proporcao_nulos: float = 0.001, semente: int = 42
+) -> pd.DataFrame:
+    """
+    Cria a planilha sintética: "Data", "Fundo", "Retorno" e colunas numéricas
+    extras até completar `colunas`. Cada coluna numérica recebe nulos na
+    proporção informada.
+    """
+    rng = np.random.default_rng(semente)
+    dados = {
+        "Data": pd.date_range("2020-01-01", periods=linhas, freq="min"),
+        "Fundo": [f"FUNDO {i % 250:03d}" for i in range(linhas)],
+    }
+    for i in range(max(1, colunas - 2)):
+        valores = rng.normal(0, 0.01, linhas)
+        valores[rng.random(linhas) < proporcao_nulos] = np.nan
+        dados["Retorno" if i == 0 else f"Valor_{i}"] = valores
+    return pd.DataFrame(dados)
+
+
+def gerar_planilha(
+    caminho: Path,
+    linhas: int,
+    colunas: int = 5,
+    proporcao_nulos: float = 0.001,
+    semente: int = 42,
+) -> Path:
+    """Grava a planilha sintética em `caminho` (.xlsx) e devolve o caminho."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    gerar_dataframe(linhas, colunas, proporcao_nulos, semente).to_excel(
+        caminho, index=False
+    )
+    return caminho
+
+
+def _recebimentos(quantidade: int, agora: datetime = None):
+    """Datas de recebimento do dia atual, da mais recente para a mais antiga."""
+    agora = (agora or datetime.now()).replace(microsecond=0)
+    inicio_do_dia = agora.replace(hour=0, minute=0, second=0)
+    passo = (agora - inicio_do_dia) / (quantidade + 1)
+    return [agora - passo * (i + 1) for i in range(quantidade)]
+
+
+def gerar_caixa_local(
+    pasta: Path,
+    mensagens: int,
+    anexo_alvo: bytes,
+    tamanho_anexo: int = 0,
+    posicao_alvo: int = None,
+    formato: str = "maildir",
+    headline_prefix: str = HEADLINE_PREFIX,
+) -> Path:
+    """
+    Cria uma caixa postal local com `mensagens` mensagens de hoje.
+
+    A mensagem alvo (padrão: no meio da caixa) tem o assunto procurado e a
+    planilha `anexo_alvo`; as demais têm um anexo binário de `tamanho_anexo`
+    bytes (nenhum, se 0).
+
+    Args:
+            formato (str): "maildir" ou "eml" (uma pasta de arquivos .eml).
+
+    Returns:
+            Path: O caminho a ser usado em `CaixaPostalLocal`.
+    """
+    pasta = Path(pasta)
+    pasta.parent.mkdir(parents=True, exist_ok=True)
+    if posicao_alvo is None:
+        posicao_alvo = mensagens // 2
+    # O Maildir só cria tmp/new/cur se a pasta ainda não existir
+    caixa = mailbox.Maildir(pasta, create=True) if formato == "maildir" else None
+    pasta.mkdir(exist_ok=True)
+    preenchimento = os.urandom(tamanho_anexo) if tamanho_anexo else b""
+
+    for i, recebido_em in enumerate(_recebimentos(mensagens)):
+        msg = EmailMessage()
+        msg["Date"] = format_datetime(recebido_em.astimezone())
+        msg["Message-ID"] = f"<bench.{i}@quantum.local>"
+        msg["From"] = "origem@quantum.local"
+        msg.set_content(f"Mensagem sintética {i}.")
+        if i == posicao_alvo:
+            msg["Subject"] = f"{headline_prefix} {recebido_em:%d/%m}"
+            msg.add_attachment(
+                anexo_alvo,
+                maintype="application",
+                subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                filename=NOME_ANEXO,
+            )
+        else:
+            msg["Subject"] = f"Mensagem {i}"
+            if preenchimento:
+                msg.add_attachment(
+                    preenchimento,
+                    maintype="application",
+                    subtype="octet-stream",
+                    filename=f"anexo_{i}.bin",
+                )
+        if caixa is not None:
+            caixa.add(msg)
+        else:
+            (pasta / f"{i:06d}.eml").write_bytes(msg.as_bytes())
+    return pasta
+
+
+def gerar_caixa_periodo(
+    pasta: Path,
+    anexos_por_dia: dict,
+    headline_prefix: str = HEADLINE_PREFIX,
+) -> Path:
+    """
+    Cria um Maildir com uma mensagem por dia, ao meio-dia, com o assunto
+    procurado e a planilha do dia ({date: bytes}) como anexo.
+
+    Returns:
+            Path: O caminho a ser usado em `CaixaPostalLocal`.
+    """
+    pasta = Path(pasta)
+    pasta.parent.mkdir(parents=True, exist_ok=True)
+    caixa = mailbox.Maildir(pasta, create=True)
+    for dia, anexo in sorted(anexos_por_dia.items()):
+        recebido_em = datetime.combine(dia, datetime.min.time()) + timedelta(hours=12)
+        msg = EmailMessage()
+        msg["Date"] = format_datetime(recebido_em.astimezone())
+        msg["Message-ID"] = f"<periodo.{dia:%Y%m%d}@quantum.local>"
+        msg["From"] = "origem@quantum.local"
+        msg["Subject"] = f"{headline_prefix} {dia:%d/%m}"
+        msg.set_content(f"Relatório de {dia:%d/%m/%Y}.")
+        msg.add_attachment(
+            anexo,
+            maintype="application",
+            subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename=NOME_ANEXO,
+        )
+        caixa.add(msg)
+    return pasta
+
+
+def gerar_caixa_com(
+    mensagens: int,
+    anexo_alvo: bytes,
+    tamanho_anexo: int = 0,
+    posicao_alvo: int = None,
+    headline_prefix: str = HEADLINE_PREFIX,
+):
+    """
+    Cria uma caixa de entrada COM falsa equivalente a `gerar_caixa_local`.
+
+    Returns:
+            tuple: (aplicação para usar como `dispatch`, contador de idas e voltas COM)
+    """
+    contador = ContadorCOM()
+    if posicao_alvo is None:
+        posicao_alvo = mensagens // 2
+    preenchimento = os.urandom(tamanho_anexo) if tamanho_anexo else b""
+    itens = []
+    for i, recebido_em in enumerate(_recebimentos(mensagens)):
+        if i == posicao_alvo:
+            assunto = f"{headline_prefix} {recebido_em:%d/%m}"
+            anexos = [AnexoFalso(contador, NOME_ANEXO, anexo_alvo)]
+        else:
+            assunto = f"Mensagem {i}"
+            anexos = (
+                [AnexoFalso(contador, f"anexo_{i}.bin", preenchimento)]
+                if preenchimento
+                else []
+            )
+        itens.append(ItemFalso(contador, f"ID{i:08d}", assunto, recebido_em, anexos))
+    # Mensagens antigas, fora do filtro do dia
+    ontem = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for i in range(mensagens):
+        itens.append(
+            ItemFalso(
+                contador,
+                f"ANT{i:08d}",
+                f"{headline_prefix} antigo {i}",
+                ontem - timedelta(minutes=10 * (i + 1)),
+            )
+        )
+
+    inbox = PastaFalsa(contador, "Caixa de Entrada", itens)
+    conta = PastaFalsa(contador, "quantum@asa.com.br", subpastas={inbox.Name: inbox})
+    return AplicacaoFalsa(contador, NamespaceFalso(contador, [conta])), contador
@@ -0,0 +1,172 @@
+"""
+Objetos COM falsos do Outlook para benchmarks.
+
+Cada acesso a um atributo ou método público (iniciado por maiúscula) conta
+como uma ida e volta ao servidor COM, o que permite comparar estratégias de
+busca sem o Outlook instalado.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+
+class ContadorCOM:
+    """Acumula o número de idas e voltas COM feitas nos objetos falsos."""
+
+    def __init__(self):
+        self.total = 0
+
+
+class _ObjetoCOMFalso:
+    def __getattribute__(self, nome):
+        if nome[:1].isupper():
+            object.__getattribute__(self, "_contador").total += 1
+        return object.__getattribute__(self, nome)
+
+
+class AnexoFalso(_ObjetoCOMFalso):
+    def __init__(self, contador, nome, conteudo: bytes = b""):
+        self._contador = contador
+        self.FileName = nome
+        self._conteudo = conteudo
+
+    def SaveAsFile(self, caminho):
+        with open(caminho, "wb") as f:
+            f.write(self._conteudo)
+
+    @property
+    def PropertyAccessor(self):
+        return AcessorPropriedadesFalso(self._contador, self._conteudo)
+
+
+class AcessorPropriedadesFalso(_ObjetoCOMFalso):
+    def __init__(self, contador, conteudo: bytes):
+        self._contador = contador
+        self._conteudo = conteudo
+
+    def GetProperty(self, nome_propriedade):
+        return memoryview(self._conteudo)
+
+
+class ItemFalso(_ObjetoCOMFalso):
+    def __init__(self, contador, entry_id, assunto, recebido_em, anexos=()):
+        self._contador = contador
+        self.EntryID = entry_id
+        self.Subject = assunto
+        self.ReceivedTime = recebido_em
+        self.Attachments = list(anexos)
+
+
+class ItensFalsos(_ObjetoCOMFalso):
+    """Coleção `Items` com `Sort`, `Item`, `Count` e um `Restrict` para filtros DASL."""
+
+    _DATAS = re.compile(r"'(\d{2}/\d{2}/\d{4} \d{2}:\d{2} [AP]M)'")
+    _PREFIXO = re.compile(r"LIKE '((?:[^']|'')*)%'")
+
+    def __init__(self, contador, itens):
+        self._contador = contador
+        self._itens = list(itens)
+
+    @property
+    def Count(self):
+        return len(self._itens)
+
+    def Item(self, indice):
+        return self._itens[indice - 1]
+
+    def Sort(self, campo, decrescente=False):
+        self._itens.sort(
+            key=lambda i: object.__getattribute__(i, "ReceivedTime"),
+            reverse=decrescente,
+        )
+
+    def Restrict(self, filtro):
+        # Avaliado "no servidor": não conta idas e voltas por item
+        inicio, fim = (
+            datetime.strptime(d, "%m/%d/%Y %I:%M %p").replace(tzinfo=timezone.utc)
+            for d in self._DATAS.findall(filtro)
+        )
+        prefixos = tuple(
+            p.replace("''", "'").lower() for p in self._PREFIXO.findall(filtro)
+        )
+        selecionados = []
+        for item in self._itens:
+            recebido = object.__getattribute__(item, "ReceivedTime").astimezone()
+            assunto = (object.__getattribute__(item, "Subject") or "").lower()
+            if inicio <= recebido < fim and (
+                assunto.startswith(prefixos) or assunto.endswith(prefixos)
+            ):
+                selecionados.append(item)
+        return ItensFalsos(self._contador, selecionados)
+
+
+class PastaFalsa(_ObjetoCOMFalso):
+    def __init__(self, contador, nome, itens=(), subpastas=None):
+        self._contador = contador
+        self.Name = nome
+        self.EntryID = f"PASTA-{nome}"
+        self.Items = ItensFalsos(contador, itens)
+        self.Folders = subpastas or {}
+
+
+class NamespaceFalso(_ObjetoCOMFalso):
+    def __init__(self, contador, contas):
+        self._contador = contador
+        self.Folders = contas
+
+
+class AplicacaoFalsa(_ObjetoCOMFalso):
+    """Substitui `Outlook.Application`; use `lambda prog_id: aplicacao` como `dispatch`."""
+
+    def __init__(self, contador, namespace):
+        self._contador = contador
+        self._namespace = namespace
+
+    def GetNamespace(self, nome):
+        return self._namespace
+
+
+def criar_namespace_falso(
+    quantidade: int,
+    headline_prefix: str,
+    posicao_alvo: int = 0,
+    mensagens_hoje: int = None,
+    anexo: bytes = b"",
+):
+    """
+    Cria um namespace falso com `quantidade` mensagens na Caixa de Entrada.
+
+    As `mensagens_hoje` mais recentes são do dia atual (padrão: 10% do total)
+    e a mensagem alvo, com o assunto esperado e um anexo .xlsx, ocupa a
+    `posicao_alvo` entre elas (0 é a mais recente).
+
+    Returns:
+            tuple: (aplicação, contador de idas e voltas COM)
+    """
+    contador = ContadorCOM()
+    if mensagens_hoje is None:
+        mensagens_hoje = max(1, quantidade // 10)
+    agora = datetime.now().replace(microsecond=0)
+    inicio_do_dia = agora.replace(hour=0, minute=0, second=0)
+    passo_hoje = (agora - inicio_do_dia) / (mensagens_hoje + 1)
+
+    itens = []
+    for i in range(quantidade):
+        if i < mensagens_hoje:
+            recebido_em = agora - passo_hoje * (i + 1)
+        else:
+            recebido_em = inicio_do_dia - timedelta(
+                minutes=10 * (i - mensagens_hoje + 1)
+            )
+        if i == posicao_alvo:
+            anexos = [AnexoFalso(contador, "Relatorio Diario.xlsx", anexo)]
+            assunto = f"{headline_prefix} {recebido_em:%d/%m}"
+        else:
+            anexos = []
+            assunto = f"Mensagem {i}"
+        itens.append(ItemFalso(contador, f"ID{i:08d}", assunto, recebido_em, anexos))
+
+    inbox = PastaFalsa(contador, "Caixa de Entrada", itens)
+    conta = PastaFalsa(contador, "quantum@asa.com.br", subpastas={inbox.Name: inbox})
+    namespace = NamespaceFalso(contador, [conta])
+    return AplicacaoFalsa(contador, namespace), contador
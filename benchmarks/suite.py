@@ -0,0 +1,415 @@
+"""
+Suíte de benchmarks do fluxo completo, com dados sintéticos: extração (Maildir,
+pasta de .eml e Outlook falso via COM), leitura da planilha, contagem de NaNs,
+regras de qualidade, log e notificação contra servidores locais.
+
+Cada etapa é medida `--repeticoes` vezes (tempo mínimo e mediana) e executada
+mais uma vez com o tracemalloc, para o pico de memória alocada pelo Python. O
+resultado é gravado em JSON, junto com os parâmetros e o commit, para comparar
+execuções ao longo do tempo (`--comparar`).
+
+Uso:
+    python -m benchmarks.suite [--linhas 20000] [--mensagens 1000] [--etapas leitura_openpyxl,log]
+    python -m benchmarks.suite --comparar benchmarks/resultados/suite_anterior.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("PASTA_LOG", tempfile.mkdtemp(prefix="quantum_logs_"))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.geradores import (  # noqa: E402
+    HEADLINE_PREFIX,
+    gerar_caixa_com,
+    gerar_caixa_local,
+    gerar_dataframe,
+    gerar_planilha,
+)
+from source.email.caixa_postal import (  # noqa: E402
+    CaixaPostalLocal,
+    CaixaPostalOutlook,
+)
+from source.email.extrair_excel_email import ingerir_excel_email  # noqa: E402
+from source.email.sessao_outlook import SessaoOutlook  # noqa: E402
+from source.logger.logger_config import Logger  # noqa: E402
+from source.manipulacao_excel.cache_colunar import cache_para  # noqa: E402
+from source.manipulacao_excel.manipulacao_excel import (  # noqa: E402
+    contar_nan_streaming,
+    ler_arquivo_excel,
+    ler_excel_em_lotes,
+    quantidade_nan,
+)
+from source.notificacao.despachante import DespachanteNotificacoes  # noqa: E402
+from source.qualidade.motor_regras import MotorRegras  # noqa: E402
+
+PASTA_RESULTADOS = Path(__file__).parent / "resultados"
+
+# Etapas registradas com @etapa, na ordem de execução
+ETAPAS = {}
+
+
+def etapa(nome: str):
+    """Registra uma etapa: a função recebe o contexto e devolve o que será medido."""
+
+    def registrar(funcao):
+        ETAPAS[nome] = funcao
+        return funcao
+
+    return registrar
+
+
+class Contexto:
+    """Parâmetros da execução e dados sintéticos, gerados sob demanda uma única vez."""
+
+    def __init__(self, args):
+        self.args = args
+        self.pasta = Path(tempfile.mkdtemp(prefix="quantum_suite_"))
+        self._cache = {}
+
+    def _obter(self, chave, criar):
+        if chave not in self._cache:
+            self._cache[chave] = criar()
+        return self._cache[chave]
+
+    @property
+    def planilha(self) -> Path:
+        return self._obter(
+            "planilha",
+            lambda: gerar_planilha(
+                self.pasta / "planilha" / "daily_fundos.xlsx",
+                self.args.linhas,
+                self.args.colunas,
+                self.args.nulos,
+            ),
+        )
+
+    @property
+    def conteudo_planilha(self) -> bytes:
+        return self._obter("conteudo", self.planilha.read_bytes)
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self._obter(
+            "dataframe",
+            lambda: gerar_dataframe(
+                self.args.linhas, self.args.colunas, self.args.nulos
+            ),
+        )
+
+    def caixa_local(self, formato: str) -> Path:
+        return self._obter(
+            f"caixa_{formato}",
+            lambda: gerar_caixa_local(
+                self.pasta / f"caixa_{formato}",
+                self.args.mensagens,
+                self.conteudo_planilha,
+                tamanho_anexo=self.args.tamanho_anexo,
+                formato=formato,
+            ),
+        )
+
+
+def _extrair(caixa_postal, pasta_destino: Path):
+    anexo = ingerir_excel_email(
+        pasta_destino,
+        HEADLINE_PREFIX,
+        caixa_postal,
+        usar_indice=False,
+        persistir=False,
+    )
+    assert anexo is not None, "A mensagem alvo não foi encontrada."
+    return anexo
+
+
+@etapa("extracao_maildir")
+def _extracao_maildir(ctx: Contexto):
+    caminho = ctx.caixa_local("maildir")
+    return lambda: _extrair(CaixaPostalLocal(caminho), ctx.pasta / "destino")
+
+
+@etapa("extracao_eml")
+def _extracao_eml(ctx: Contexto):
+    caminho = ctx.caixa_local("eml")
+    return lambda: _extrair(CaixaPostalLocal(caminho), ctx.pasta / "destino")
+
+
+@etapa("extracao_com")
+def _extracao_com(ctx: Contexto):
+    aplicacao, contador = gerar_caixa_com(
+        ctx.args.mensagens,
+        ctx.conteudo_planilha,
+        tamanho_anexo=ctx.args.tamanho_anexo,
+    )
+
+    def extrair():
+        contador.total = 0
+        caixa = CaixaPostalOutlook(SessaoOutlook(dispatch=lambda prog_id: aplicacao))
+        _extrair(caixa, ctx.pasta / "destino")
+        return {"idas_e_voltas_com": contador.total}
+
+    return extrair
+
+
+@etapa("leitura_openpyxl")
+def _leitura_openpyxl(ctx: Contexto):
+    caminho = ctx.planilha
+    return lambda: ler_arquivo_excel(caminho, usar_cache=False)
+
+
+@etapa("leitura_cache_colunar")
+def _leitura_cache_colunar(ctx: Contexto):
+    caminho = ctx.planilha
+    if cache_para(caminho) is None:
+        return None  # pyarrow não instalado
+    ler_arquivo_excel(caminho)  # Grava o cache
+    return lambda: ler_arquivo_excel(caminho)
+
+
+@etapa("contagem_nan_streaming")
+def _contagem_nan_streaming(ctx: Contexto):
+    caminho = ctx.planilha
+    return lambda: {"contagem_nan": contar_nan_streaming(caminho)}
+
+
+@etapa("contagem_nan_pandas")
+def _contagem_nan_pandas(ctx: Contexto):
+    df = ctx.dataframe
+    return lambda: {"contagem_nan": int(quantidade_nan(df))}
+
+
+def _regras_da_planilha(colunas, linhas: int) -> list:
+    colunas_numericas = [c for c in colunas if c not in ("Data", "Fundo")]
+    regras = [
+        {"tipo": "nulos", "coluna": c, "limite": linhas} for c in colunas_numericas
+    ]
+    regras += [
+        {"tipo": "intervalo", "coluna": c, "minimo": -1, "maximo": 1}
+        for c in colunas_numericas
+    ]
+    regras.append({"tipo": "chave_unica", "colunas": ["Data", "Fundo"]})
+    return regras
+
+
+@etapa("regras_qualidade")
+def _regras_qualidade(ctx: Contexto):
+    df = ctx.dataframe
+    regras = _regras_da_planilha(df.columns, len(df))
+    motor = MotorRegras(regras)
+    return lambda: {"regras": len(regras), "aprovado": motor.avaliar(df).aprovado}
+
+
+@etapa("regras_qualidade_em_lotes")
+def _regras_qualidade_em_lotes(ctx: Contexto):
+    # Lê a planilha do disco em lotes a cada execução, como na validação real
+    caminho = ctx.planilha
+    regras = _regras_da_planilha(ctx.dataframe.columns, ctx.args.linhas)
+    motor = MotorRegras(regras)
+    return lambda: {
+        "regras": len(regras),
+        "aprovado": motor.avaliar_em_lotes(ler_excel_em_lotes(caminho)).aprovado,
+    }
+
+
+@etapa("log")
+def _log(ctx: Contexto):
+    logger = Logger(ctx.pasta / "logs", name_prefix="suite")
+    entradas = ctx.args.entradas_log
+
+    def registrar():
+        inicio = time.perf_counter()
+        for i in range(entradas):
+            logger.info(f"Entrada de teste {i}", extra_data={"indice": i})
+        enfileirado = time.perf_counter() - inicio
+        logger.save_logs(timeout=60)
+        return {
+            "entradas": entradas,
+            "enfileiramento_s": round(enfileirado, 6),
+            "descartadas": logger.descartadas,
+        }
+
+    return registrar
+
+
+@etapa("notificacao")
+def _notificacao(ctx: Contexto):
+    from benchmarks.bench_notificacoes import card, iniciar_smtp, iniciar_webhook
+
+    webhook_url = iniciar_webhook()
+    porta_smtp = iniciar_smtp()
+    despachante = DespachanteNotificacoes(
+        janela_agrupamento=0.05,
+        servidor_smtp="127.0.0.1",
+        porta_smtp=porta_smtp,
+        usar_starttls=False,
+    )
+    quantidade = ctx.args.notificacoes
+
+    def notificar():
+        inicio = time.perf_counter()
+        for i in range(quantidade):
+            despachante.enviar_teams(webhook_url, card(i))
+            despachante.enviar_email(
+                "quantum@local", None, ["equipe@local"], f"Alerta {i}", f"<p>{i}</p>"
+            )
+        bloqueado = time.perf_counter() - inicio
+        despachante.aguardar()
+        return {
+            "notificacoes": 2 * quantidade,
+            "bloqueio_s": round(bloqueado, 6),
+            "falhas": despachante.falhas,
+        }
+
+    return notificar
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    """
+    Mede o tempo de `repeticoes` execuções e, em uma execução à parte (o
+    tracemalloc deixa o código mais lento), o pico de memória.
+    """
+    tempos = []
+    extras = None
+    for _ in range(repeticoes):
+        with redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            retorno = funcao()
+            tempos.append(time.perf_counter() - inicio)
+        extras = retorno if isinstance(retorno, dict) else extras
+
+    tracemalloc.start()
+    try:
+        with redirect_stdout(io.StringIO()):
+            funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    resultado = {
+        "tempo_min_s": round(min(tempos), 6),
+        "tempo_mediana_s": round(statistics.median(tempos), 6),
+        "repeticoes": repeticoes,
+        "pico_memoria_mb": round(pico / 1024 / 1024, 3),
+    }
+    if extras:
+        resultado["metricas"] = extras
+    return resultado
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(anterior: dict, atual: dict):
+    """Imprime a variação de tempo e memória de cada etapa presente nas duas execuções."""
+    print(
+        f"\nComparação com {anterior['metadados']['data']}"
+        f" (commit {anterior['metadados'].get('commit')}):"
+    )
+    for nome, medicao in atual["etapas"].items():
+        antes = anterior["etapas"].get(nome)
+        if not antes or "tempo_min_s" not in antes or "tempo_min_s" not in medicao:
+            continue
+        variacao_tempo = (medicao["tempo_min_s"] / antes["tempo_min_s"] - 1) * 100
+        variacao_memoria = medicao["pico_memoria_mb"] - antes["pico_memoria_mb"]
+        print(
+            f"  {nome:<24} {antes['tempo_min_s'] * 1000:10.1f} ->"
+            f" {medicao['tempo_min_s'] * 1000:10.1f} ms ({variacao_tempo:+6.1f}%) |"
+            f" memória {variacao_memoria:+8.2f} MB"
+        )
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--linhas", type=int, default=20_000)
+    parser.add_argument("--colunas", type=int, default=5)
+    parser.add_argument("--nulos", type=float, default=0.001, help="proporção")
+    parser.add_argument("--mensagens", type=int, default=1_000)
+    parser.add_argument(
+        "--tamanho-anexo", type=int, default=64 * 1024, help="bytes por anexo comum"
+    )
+    parser.add_argument("--entradas-log", type=int, default=20_000)
+    parser.add_argument("--notificacoes", type=int, default=20)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument(
+        "--etapas", default=",".join(ETAPAS), help="lista separada por vírgulas"
+    )
+    parser.add_argument("--saida", type=Path, help="arquivo JSON de resultado")
+    parser.add_argument("--comparar", type=Path, help="resultado anterior (JSON)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _argumentos()
+    nomes = [n.strip() for n in args.etapas.split(",") if n.strip()]
+    desconhecidas = [n for n in nomes if n not in ETAPAS]
+    if desconhecidas:
+        sys.exit(f"Etapas desconhecidas: {', '.join(desconhecidas)}")
+
+    ctx = Contexto(args)
+    resultado = {
+        "metadados": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "pandas": pd.__version__,
+            "parametros": {
+                chave: valor
+                for chave, valor in vars(args).items()
+                if chave not in ("saida", "comparar", "etapas")
+            },
+        },
+        "etapas": {},
+    }
+
+    print(f"Dados sintéticos em {ctx.pasta}\n")
+    for nome in nomes:
+        with redirect_stdout(io.StringIO()):
+            funcao = ETAPAS[nome](ctx)
+        if funcao is None:
+            resultado["etapas"][nome] = {"indisponivel": True}
+            print(f"{nome:<24} indisponível neste ambiente")
+            continue
+        medicao = medir(funcao, args.repeticoes)
+        resultado["etapas"][nome] = medicao
+        metricas = medicao.get("metricas")
+        print(
+            f"{nome:<24} {medicao['tempo_min_s'] * 1000:10.1f} ms (mín.)"
+            f" {medicao['tempo_mediana_s'] * 1000:10.1f} ms (mediana)"
+            f" {medicao['pico_memoria_mb']:9.2f} MB"
+            + (f" | {metricas}" if metricas else "")
+        )
+
+    saida = args.saida or PASTA_RESULTADOS / (
+        f"suite_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), "utf-8")
+    print(f"\nResultado gravado em {saida}")
+
+    if args.comparar:
+        comparar(json.loads(args.comparar.read_text("utf-8")), resultado)
@@ -1,148 +1,567 @@
+import argparse
 import os
-import time
+import sys
 import warnings
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-import pandas as pd
 from colorama import Fore
-from dotenv import load_dotenv
 
+# Importações locais. Os módulos que leem planilhas (pandas, openpyxl) e os
+# que enviam notificações (requests) importam essas bibliotecas apenas no
+# primeiro uso, então uma execução que não encontra nada novo inicia rápido.
 # from source.email.envia_email_alerta import enviar_email_alerta
 # from source.email.envia_email_sucesso import enviar_email_sucesso
-from source.email.extrair_excel_email import extrair_excel_email
-from source.logger.logger_config import logger_quantum, print_log
-from source.manipulacao_excel.manipulacao_excel import processar_excel_extraido
-from source.teams.envia_teams_alerta import enviar_teams_alerta
-from source.teams.envia_teams_sucesso import enviar_teams_sucesso
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
+from source.observabilidade.medicoes import medidor, perfilar, pico_memoria_processo
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
-# --- CONFIGURAÇÃO INICIAL ---
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
-
 # Define uma cor tema para os logs desta execução
 THEME_COLOR = Fore.MAGENTA
-
-# Carrega as variáveis de ambiente necessárias
-PASTA_RAIZ_QUANTUM = os.getenv("PASTA_RAIZ_QUANTUM")
-HEADLINE_PREFIX = os.getenv("HEADLINE_PREFIX")
-TEAMS_WEBHOOK_URL = os.getenv("TEAMS_WEBHOOK_URL")
+ETAPA = "processo"
 
 # Configurações da lógica de retentativa
 MAX_TENTATIVAS = 5
 INTERVALO_TENTATIVAS_SEGUNDOS = 30
 
+# Limite de valores nulos aceitos na coluna "Retorno". Se ARQUIVO_REGRAS
+# estiver definido, as regras de qualidade do arquivo (JSON/YAML) substituem
+# essa verificação
+LIMITES_NULL = 30
+
+
+def _feed_principal():
+    from source.feeds.processar_feeds import Feed
+
+    return Feed(
+        "quantum",
+        configuracao.headline_prefix,
+        configuracao.pasta_raiz_quantum,
+        limites_null=LIMITES_NULL,
+        regras=configuracao.arquivo_regras,
+    )
+
+
+def main(simular: bool = False):
+    """
+    Processa o relatório definido por HEADLINE_PREFIX e PASTA_RAIZ_QUANTUM:
+    extrai o anexo (com retentativas ou no modo de observação), valida a
+    planilha e notifica o Teams, por meio do pipeline assíncrono.
+
+    Args:
+            simular (bool): Se True, o anexo não é gravado nem registrado no índice
+                    e as notificações são apenas registradas no log.
+
+    Returns:
+            bool: False se a validação falhou ou o pipeline foi interrompido por um
+                    erro inesperado (o processo termina com código 1).
+    """
+    from source.pipeline.executor_async import Trabalho, executar_pipeline
 
-def main():
-    # --- ETAPA 1: Extrair anexo do e-mail com lógica de retentativa ---
     print_log(
         "AÇÃO", "Iniciando extração de anexo do e-mail...", theme_color=THEME_COLOR
     )
-    arquivo_salvo = False
-    for tentativa in range(1, MAX_TENTATIVAS + 1):
+    (resultado,) = executar_pipeline(
+        [Trabalho(_feed_principal())],
+        tentativas=MAX_TENTATIVAS,
+        intervalo_tentativas=INTERVALO_TENTATIVAS_SEGUNDOS,
+        prazo_observacao=configuracao.prazo_observacao_segundos,
+        limite_validacao=configuracao.limite_validacoes_simultaneas,
+        limite_notificacao=configuracao.limite_notificacoes_simultaneas,
+        persistir_anexos=configuracao.persistir_anexos and not simular,
+        notificar=not simular,
+    )
+
+    if resultado.status == "OK":
         print_log(
-            "AÇÃO",
-            f"Tentativa {tentativa}/{MAX_TENTATIVAS}: Buscando e-mail e extraindo anexo...",
+            "INFO",
+            "✅ --- PROCESSO QUANTUM CONCLUÍDO COM SUCESSO --- ✅",
             theme_color=THEME_COLOR,
         )
-        nome_arquivo_esperado = extrair_excel_email(PASTA_RAIZ_QUANTUM, HEADLINE_PREFIX)
-
-        if nome_arquivo_esperado:
-            caminho_completo_arquivo = Path(PASTA_RAIZ_QUANTUM) / nome_arquivo_esperado
-            if caminho_completo_arquivo.is_file():
-                print_log(
-                    "INFO",
-                    f"Sucesso! Arquivo '{nome_arquivo_esperado}' encontrado na pasta.",
-                    theme_color=Fore.GREEN,
-                )
-                logger_quantum.info(
-                    f"Arquivo '{nome_arquivo_esperado}' validado com sucesso na tentativa {tentativa}."
-                )
-                arquivo_salvo = True
-                break  # Sai do loop de tentativas
-
+        return True
+    if resultado.status == "FALHA" or resultado.erro is not None:
         print_log(
-            "AVISO",
-            f"Arquivo não encontrado na tentativa {tentativa}. Aguardando {INTERVALO_TENTATIVAS_SEGUNDOS} segundos...",
-            theme_color=Fore.YELLOW,
+            "INFO",
+            "❌ --- PROCESSO QUANTUM INTERROMPIDO DEVIDO A ERRO --- ❌",
+            theme_color=THEME_COLOR,
         )
-        if tentativa < MAX_TENTATIVAS:
-            time.sleep(INTERVALO_TENTATIVAS_SEGUNDOS)
+        return False
+    print_log(
+        "INFO",
+        "❌ --- PROCESSO QUANTUM INTERROMPIDO --- ❌",
+        theme_color=THEME_COLOR,
+    )
+    return True
 
-    if not arquivo_salvo:
-        msg_falha = "Arquivo não foi baixado após todas as tentativas."
-        print_log("ERROR", msg_falha)
-        logger_quantum.error(msg_falha)
-        return print_log(
+
+def main_lote(simular: bool = False):
+    """
+    Processa todos os feeds de ARQUIVO_FEEDS em uma única passada pela caixa de entrada.
+
+    Args:
+            simular (bool): Se True, as notificações são apenas registradas no log e
+                    os anexos são validados em memória, sem gravar nada na pasta nem
+                    no índice dos feeds.
+
+    Returns:
+            bool: False se a caixa postal não pôde ser acessada ou a validação de
+                    algum feed falhou (o processo termina com código 1).
+    """
+    from source.feeds.processar_feeds import carregar_feeds, processar_feeds
+    from source.manipulacao_excel.manipulacao_excel import descrever_contagem_nan
+    from source.teams.envia_teams_alerta import enviar_teams_alerta
+    from source.teams.envia_teams_sucesso import enviar_teams_sucesso
+
+    def notificar(funcao, *args, **kwargs):
+        if simular:
+            registrar_evento(
+                "AVISO",
+                "notificacao",
+                "Simulação: '{funcao}' não foi enviado.",
+                theme_color=Fore.YELLOW,
+                funcao=funcao.__name__,
+            )
+            return
+        funcao(*args, **kwargs)
+
+    feeds = carregar_feeds(configuracao.arquivo_feeds)
+    print_log(
+        "AÇÃO",
+        f"Modo em lote: {len(feeds)} feeds configurados em"
+        f" '{configuracao.arquivo_feeds}'.",
+        theme_color=THEME_COLOR,
+    )
+    resultados = processar_feeds(
+        feeds, persistir=configuracao.persistir_anexos and not simular
+    )
+    if resultados is None:
+        print_log(
             "INFO",
             "❌ --- PROCESSO QUANTUM INTERROMPIDO --- ❌",
             theme_color=THEME_COLOR,
         )
+        return False
+
+    for resultado in resultados:
+        feed = resultado.feed
+        for contagem_nan in resultado.contagens_excedidas():
+            logger_quantum.error(
+                f"Validação do feed '{feed.nome}' falhou:"
+                f" {descrever_contagem_nan(contagem_nan, feed.limites_null)}"
+                f" valores nulos encontrados (limite: {feed.limites_null})."
+            )
+            notificar(
+                enviar_teams_alerta, contagem_nan, feed.limites_null, feed=feed.nome
+            )
+        for relatorio in resultado.relatorios_com_falha():
+            logger_quantum.error(
+                f"Validação do feed '{feed.nome}' falhou: {relatorio}.",
+                extra_data=relatorio.para_dict(),
+            )
+            notificar(enviar_teams_alerta, relatorio=relatorio, feed=feed.nome)
+        for arquivo in resultado.arquivos_ilegiveis():
+            logger_quantum.error(
+                f"Validação do feed '{feed.nome}' falhou: o arquivo '{arquivo}'"
+                " não pôde ser lido."
+            )
+            notificar(enviar_teams_alerta, None, feed.limites_null, feed=feed.nome)
 
-    # --- ETAPA 2: Processar a planilha e verificar a qualidade dos dados ---
-    limites_null = 30
+    if all(resultado.status == "OK" for resultado in resultados):
+        notificar(enviar_teams_sucesso)
+        logger_quantum.info("Confirmação de sucesso enviada para o Teams.")
+        print_log(
+            "INFO",
+            "✅ --- PROCESSO QUANTUM CONCLUÍDO COM SUCESSO --- ✅",
+            theme_color=THEME_COLOR,
+        )
+        return True
     print_log(
-        "AÇÃO",
-        f"Processando planilha e verificando se há mais de {limites_null} valores nulos...",
+        "INFO",
+        "❌ --- PROCESSO QUANTUM CONCLUÍDO COM PENDÊNCIAS --- ❌",
         theme_color=THEME_COLOR,
     )
-    resultado_processamento = processar_excel_extraido(
-        Path(PASTA_RAIZ_QUANTUM), limites_null
+    return not any(resultado.status == "FALHA" for resultado in resultados)
+
+
+def servico(simular: bool = False):
+    """
+    Modo serviço: mantém o pipeline aquecido e processa cada feed (ARQUIVO_FEEDS
+    ou o feed de HEADLINE_PREFIX) nos horários da sua agenda cron, até ser
+    encerrado pelo endpoint de controle (PORTA_SERVICO) ou por Ctrl+C.
+
+    A própria agenda faz o papel das retentativas: cada execução consulta a
+    caixa postal uma vez, e anexos já processados não são notificados de novo.
+
+    Args:
+            simular (bool): Se True, as notificações são apenas registradas no log
+                    e os anexos não são gravados.
+    """
+    from source.feeds.processar_feeds import carregar_feeds
+    from source.pipeline.executor_async import ExecutorPipeline
+    from source.servico.servico import ServicoQuantum
+
+    feeds = (
+        carregar_feeds(configuracao.arquivo_feeds)
+        if configuracao.arquivo_feeds
+        else [_feed_principal()]
+    )
+    pipeline = ExecutorPipeline(
+        tentativas=1,
+        prazo_observacao=configuracao.prazo_observacao_segundos,
+        limite_validacao=configuracao.limite_validacoes_simultaneas,
+        limite_notificacao=configuracao.limite_notificacoes_simultaneas,
+        persistir_anexos=configuracao.persistir_anexos and not simular,
+        notificar=not simular,
+        apenas_novos=True,
     )
-    logger_quantum.info("Processamento da planilha concluído.")
+    ServicoQuantum(
+        feeds,
+        configuracao.agenda_servico,
+        pipeline,
+        configuracao.porta_servico,
+        apos_execucao=registrar_medicoes,
+    ).executar()
 
-    # --- ETAPA 3: Tomar decisão com base na qualidade dos dados ---
-    if not isinstance(resultado_processamento, pd.DataFrame):
-        # CASO DE FALHA: Muitos valores nulos
-        contagem_nan = resultado_processamento
-        print_log(
-            "AVISO",
-            f"Limite de valores nulos excedido! Encontrados: {contagem_nan}. Limite: {limites_null}.",
+
+def reprocessar(inicio: date, fim: date):
+    """
+    Modo de reprocessamento: extrai e valida os anexos dos e-mails recebidos de
+    `inicio` a `fim` para os feeds (ARQUIVO_FEEDS ou o feed de HEADLINE_PREFIX),
+    sem enviar notificações. Pode ser repetido após uma interrupção: os dias já
+    reprocessados são ignorados.
+    """
+    from source.feeds.processar_feeds import carregar_feeds
+    from source.pipeline.reprocessamento import reprocessar_periodo
+
+    feeds = (
+        carregar_feeds(configuracao.arquivo_feeds)
+        if configuracao.arquivo_feeds
+        else [_feed_principal()]
+    )
+    resultados = reprocessar_periodo(feeds, inicio, fim)
+    if resultados is None:
+        return print_log(
+            "INFO",
+            "❌ --- REPROCESSAMENTO INTERROMPIDO --- ❌",
+            theme_color=THEME_COLOR,
         )
-        logger_quantum.error(
-            f"Validação falhou: {contagem_nan} valores nulos encontrados (limite: {limites_null})."
+    if all(resultado["status"] == "OK" for resultado in resultados):
+        return print_log(
+            "INFO",
+            "✅ --- REPROCESSAMENTO CONCLUÍDO COM SUCESSO --- ✅",
+            theme_color=THEME_COLOR,
         )
+    return print_log(
+        "INFO",
+        "❌ --- REPROCESSAMENTO CONCLUÍDO COM PENDÊNCIAS --- ❌",
+        theme_color=THEME_COLOR,
+    )
 
-        print_log("AÇÃO", "Enviando alerta para o Teams...", theme_color=THEME_COLOR)
-        enviar_teams_alerta(contagem_nan, limites_null)
-        logger_quantum.info("Alerta enviado para o Teams.")
-        return print_log(
+
+def validar_pasta(pasta: Path) -> bool:
+    """
+    Valida todas as planilhas de uma pasta (carga retroativa de arquivos já
+    baixados) com `validar_pasta_em_lote`, sem acessar a caixa postal nem
+    notificar. O resumo em JSON é gravado na própria pasta.
+
+    Returns:
+            bool: True se todas as planilhas foram aprovadas.
+    """
+    from source.manipulacao_excel.manipulacao_excel import validar_pasta_em_lote
+
+    if not pasta.is_dir():
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "A pasta a validar não existe: {pasta}",
+            pasta=str(pasta),
+        )
+        print_log(
             "INFO",
-            "❌ --- PROCESSO QUANTUM INTERROMPIDO DEVIDO A ERRO --- ❌",
+            "❌ --- VALIDAÇÃO DA PASTA INTERROMPIDA --- ❌",
             theme_color=THEME_COLOR,
         )
-    else:
-        # CASO DE SUCESSO: Dados válidos
+        return False
+
+    reprovados = 0
+    for resultado in validar_pasta_em_lote(pasta, LIMITES_NULL):
+        reprovados += not resultado["aprovado"]
         print_log(
-            "AÇÃO",
-            "Enviando confirmação de sucesso para o Teams...",
+            "INFO" if resultado["aprovado"] else "AVISO",
+            f"{resultado['arquivo']}: "
+            + (
+                f"{resultado['contagem_nan']} nulos"
+                if resultado["contagem_nan"] is not None
+                else resultado.get("erro", "falha")
+            ),
             theme_color=THEME_COLOR,
         )
-        enviar_teams_sucesso()
-        logger_quantum.info("Confirmação de sucesso enviada para o Teams.")
-        return print_log(
+    if reprovados:
+        print_log(
             "INFO",
-            "✅ --- PROCESSO QUANTUM CONCLUÍDO COM SUCESSO --- ✅",
+            "❌ --- VALIDAÇÃO DA PASTA CONCLUÍDA COM PENDÊNCIAS --- ❌",
+            theme_color=THEME_COLOR,
+        )
+        return False
+    print_log(
+        "INFO",
+        "✅ --- VALIDAÇÃO DA PASTA CONCLUÍDA COM SUCESSO --- ✅",
+        theme_color=THEME_COLOR,
+    )
+    return True
+
+
+def verificar() -> bool:
+    """
+    Confere a configuração e a caixa postal sem baixar, validar ou notificar:
+    variáveis obrigatórias, feeds e regras de qualidade, pastas de destino e
+    quantas mensagens de hoje ainda não foram processadas.
+
+    Returns:
+            bool: True se a configuração e a caixa postal estiverem utilizáveis.
+    """
+    from source.email.caixa_postal import assunto_corresponde, criar_caixa_postal
+    from source.feeds.processar_feeds import carregar_feeds
+    from source.indice.indice_processados import indice_da_pasta
+
+    pendencias = configuracao.pendencias()
+    if pendencias:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Variáveis de ambiente ausentes: {variaveis}.",
+            variaveis=", ".join(pendencias),
+        )
+        return False
+
+    try:
+        feeds = (
+            carregar_feeds(configuracao.arquivo_feeds)
+            if configuracao.arquivo_feeds
+            else [_feed_principal()]
+        )
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Configuração de feeds ou regras inválida: {erro}",
+            exc=e,
+            erro=str(e),
+        )
+        return False
+
+    for feed in feeds:
+        if not feed.pasta_destino.is_dir():
+            print_log(
+                "AVISO",
+                f"Feed '{feed.nome}': a pasta '{feed.pasta_destino}' ainda não existe.",
+                theme_color=Fore.YELLOW,
+            )
+
+    caixa_postal = criar_caixa_postal()
+    if not caixa_postal.conectar():
+        print_log("ERROR", "Não foi possível acessar a caixa postal.")
+        return False
+
+    prefixos = tuple(feed.headline_prefix for feed in feeds)
+    mensagens = list(caixa_postal.buscar_mensagens(prefixos, datetime.now().date()))
+    for feed in feeds:
+        do_feed = [
+            m for m in mensagens if assunto_corresponde(m.assunto, feed.headline_prefix)
+        ]
+        novas = do_feed
+        # Sem a pasta ainda não há índice; a verificação não cria nenhum dos dois
+        if feed.pasta_destino.is_dir():
+            indice = indice_da_pasta(feed.pasta_destino)
+            novas = [m for m in do_feed if not indice.anexo_processado(m.id_mensagem)]
+        registrar_evento(
+            "INFO",
+            ETAPA,
+            "Feed '{feed}': {mensagens} mensagem(ns) de hoje, {novas} ainda não"
+            " processada(s).",
             theme_color=THEME_COLOR,
+            feed=feed.nome,
+            mensagens=len(do_feed),
+            novas=len(novas),
+        )
+    return True
+
+
+def registrar_medicoes():
+    """
+    Registra no log os tempos por etapa da execução e o pico de memória do
+    processo, e exporta as métricas.
+    """
+    resumo = medidor.resumo()
+    pico = pico_memoria_processo()
+    logger_quantum.info(
+        "Medições das etapas da execução.",
+        extra_data={
+            "etapas": resumo,
+            "pico_memoria_mb": round(pico / 2**20, 1) if pico is not None else None,
+        },
+    )
+    if not configuracao.arquivo_metricas:
+        return
+    try:
+        caminho = medidor.exportar(configuracao.arquivo_metricas)
+        logger_quantum.info(f"Métricas da execução exportadas para '{caminho}'.")
+    except OSError as e:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Não foi possível exportar as métricas para '{arquivo}': {erro}",
+            exc=e,
+            arquivo=configuracao.arquivo_metricas,
+            erro=str(e),
+        )
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Processo Quantum")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument(
+        "--check-only",
+        action="store_true",
+        help="confere a configuração e a caixa postal e lista as mensagens"
+        " pendentes, sem baixar, validar ou notificar",
+    )
+    modo.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="executa a extração e a validação sem enviar notificações e sem"
+        " gravar os anexos",
+    )
+    parser.add_argument(
+        "--servico",
+        action="store_true",
+        help="executa continuamente, processando os feeds nos horários das suas"
+        " agendas (AGENDA_SERVICO), com controle HTTP local em PORTA_SERVICO",
+    )
+    parser.add_argument(
+        "--from",
+        dest="inicio",
+        type=date.fromisoformat,
+        metavar="AAAA-MM-DD",
+        help="reprocessa os e-mails recebidos a partir desta data (sem notificar)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="fim",
+        type=date.fromisoformat,
+        metavar="AAAA-MM-DD",
+        help="último dia do reprocessamento (padrão: ontem, ou o dia de --from se"
+        " ele for hoje); hoje só é incluído se pedido explicitamente",
+    )
+    parser.add_argument(
+        "--validar-pasta",
+        type=Path,
+        metavar="PASTA",
+        help="valida todas as planilhas já baixadas na pasta, em paralelo, e grava"
+        " um resumo em JSON (sem acessar a caixa postal nem notificar)",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="exibe no console apenas avisos e erros (o log em arquivo não muda)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="grava um perfil (cProfile) da execução na pasta de logs",
+    )
+    args = parser.parse_args()
+    if args.fim and not args.inicio:
+        parser.error("--to exige --from")
+    if args.inicio:
+        # Hoje fica com a execução diária, que publica e registra o anexo
+        args.fim = args.fim or max(args.inicio, datetime.now().date() - timedelta(1))
+        if args.fim < args.inicio:
+            parser.error("--to não pode ser anterior a --from")
+        if args.servico or args.check_only or args.dry_run:
+            parser.error(
+                "--from não pode ser combinado com --servico, --check-only ou --dry-run"
+            )
+    if args.validar_pasta and (
+        args.inicio or args.servico or args.check_only or args.dry_run
+    ):
+        parser.error(
+            "--validar-pasta não pode ser combinado com --from, --servico,"
+            " --check-only ou --dry-run"
         )
+    return args
 
 
 if __name__ == "__main__":
-    print_log(
-        "INFO", "🚀 --- INICIANDO PROCESSO QUANTUM --- 🚀", theme_color=THEME_COLOR
+    args = _argumentos()
+    if args.quiet:
+        # Pelo ambiente, o nível também vale para os processos de validação
+        os.environ["NIVEL_CONSOLE"] = "AVISO"
+        console.definir_nivel("AVISO")
+
+    if args.check_only:
+        sys.exit(0 if verificar() else 1)
+    if not configuracao.pasta_log:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "A variável de ambiente PASTA_LOG não foi definida: o log em arquivo"
+            " é obrigatório.",
+        )
+        sys.exit(1)
+
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        "🚀 --- INICIANDO PROCESSO QUANTUM --- 🚀",
+        theme_color=THEME_COLOR,
+        argumentos=vars(args),
     )
-    logger_quantum.info("Processo Quantum iniciado.")
 
+    perfil = (
+        perfilar(Path(configuracao.pasta_log) / "perfis")
+        if args.profile
+        else nullcontext()
+    )
+    # Código de saída para o agendador: diferente de zero quando algo falhou
+    codigo_saida = 0
     try:
-        main()
+        with perfil as caminho_perfil:
+            if args.validar_pasta:
+                codigo_saida = 0 if validar_pasta(args.validar_pasta) else 1
+            elif args.inicio:
+                reprocessar(args.inicio, args.fim)
+            elif args.servico:
+                servico(simular=args.dry_run)
+            elif configuracao.arquivo_feeds:
+                codigo_saida = 0 if main_lote(simular=args.dry_run) else 1
+            else:
+                codigo_saida = 0 if main(simular=args.dry_run) else 1
+        if caminho_perfil:
+            print_log("INFO", f"Perfil da execução gravado em {caminho_perfil}.")
     except Exception as e:
         # Tratamento de erro para qualquer falha inesperada no processo
-        print_log("ERROR", f"Ocorreu um erro crítico que interrompeu o processo: {e}")
-        logger_quantum.error(f"Erro fatal na execução do main.py: {e}", exc=e)
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Ocorreu um erro crítico que interrompeu o processo: {erro}",
+            exc=e,
+            erro=str(e),
+        )
         print_log(
             "INFO",
             "❌ --- PROCESSO QUANTUM INTERROMPIDO DEVIDO A ERRO --- ❌",
             theme_color=THEME_COLOR,
         )
         raise
+    finally:
+        registrar_medicoes()
+    sys.exit(codigo_saida)
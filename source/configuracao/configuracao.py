@@ -0,0 +1,107 @@
+import os
+
+from dotenv import load_dotenv
+
+
+def _inteiro(valor: str, padrao: int) -> int:
+    return int(valor) if valor else padrao
+
+
+def _decimal(valor: str, padrao: float) -> float:
+    return float(valor) if valor else padrao
+
+
+def _ligado(valor: str, padrao: bool) -> bool:
+    """Interpreta variáveis do tipo liga/desliga: apenas "0" desliga."""
+    return padrao if not valor else valor != "0"
+
+
+class Configuracao:
+    """
+    Configuração do processo, lida das variáveis de ambiente (e do arquivo
+    .env) uma única vez, na importação deste módulo. Os demais módulos leem
+    daqui em vez de chamar `os.getenv`.
+
+    Os valores numéricos e liga/desliga já são convertidos; variáveis ausentes
+    ficam com o padrão documentado no README.
+    """
+
+    def __init__(self, ambiente: dict = None):
+        """
+        Args:
+                ambiente (dict): As variáveis a usar (padrão: `os.environ`).
+        """
+        amb = os.environ if ambiente is None else ambiente
+
+        # Fluxo principal
+        self.pasta_raiz_quantum = amb.get("PASTA_RAIZ_QUANTUM")
+        self.headline_prefix = amb.get("HEADLINE_PREFIX")
+        self.arquivo_feeds = amb.get("ARQUIVO_FEEDS")
+        self.arquivo_regras = amb.get("ARQUIVO_REGRAS")
+        self.caixa_postal_local = amb.get("CAIXA_POSTAL_LOCAL")
+        self.prazo_observacao_segundos = _decimal(
+            amb.get("PRAZO_OBSERVACAO_SEGUNDOS"), 0.0
+        )
+        self.persistir_anexos = _ligado(amb.get("PERSISTIR_ANEXOS"), True)
+        self.limite_validacoes_simultaneas = _inteiro(
+            amb.get("LIMITE_VALIDACOES_SIMULTANEAS"), 1
+        )
+        self.limite_notificacoes_simultaneas = _inteiro(
+            amb.get("LIMITE_NOTIFICACOES_SIMULTANEAS"), 4
+        )
+
+        # Leitura em lotes de planilhas grandes
+        self.linhas_por_lote = _inteiro(amb.get("LINHAS_POR_LOTE"), 50_000)
+        self.tamanho_minimo_lotes_mb = _decimal(amb.get("TAMANHO_MINIMO_LOTES_MB"), 10)
+
+        # Histórico e verificações de tendência das planilhas validadas
+        self.janela_historico_dias = _inteiro(amb.get("JANELA_HISTORICO_DIAS"), 90)
+        self.desvios_anomalia = _decimal(amb.get("DESVIOS_ANOMALIA"), 3.0)
+
+        # Modo serviço
+        self.agenda_servico = amb.get("AGENDA_SERVICO") or "*/15 * * * *"
+        self.porta_servico = _inteiro(amb.get("PORTA_SERVICO"), 8765)
+
+        # Logs e métricas
+        self.pasta_log = amb.get("PASTA_LOG")
+        self.arquivo_metricas = amb.get("ARQUIVO_METRICAS")
+        self.nivel_console = amb.get("NIVEL_CONSOLE") or "INFO"
+
+        # Cache colunar
+        self.pasta_cache_colunar = amb.get("PASTA_CACHE_COLUNAR")
+        self.tamanho_maximo_cache_mb = _decimal(
+            amb.get("TAMANHO_MAXIMO_CACHE_MB"), 1024
+        )
+
+        # Notificações
+        self.teams_webhook_url = amb.get("TEAMS_WEBHOOK_URL")
+        self.email_user = amb.get("EMAIL_USER")
+        self.email_password = amb.get("EMAIL_PASSWORD")
+        self.email_destinatario = amb.get("EMAIL_DESTINATARIO")
+        self.smtp_servidor = amb.get("SMTP_SERVIDOR") or "smtp.office365.com"
+        self.smtp_porta = _inteiro(amb.get("SMTP_PORTA"), 587)
+        self.smtp_starttls = _ligado(amb.get("SMTP_STARTTLS"), True)
+
+    @property
+    def destinatarios_email(self) -> list:
+        """Os destinatários de EMAIL_DESTINATARIO (separados por vírgula)."""
+        return [
+            email.strip()
+            for email in (self.email_destinatario or "").split(",")
+            if email.strip()
+        ]
+
+    def pendencias(self) -> list:
+        """Variáveis obrigatórias ausentes para o modo de execução configurado."""
+        obrigatorias = {"PASTA_LOG": self.pasta_log}
+        if not self.arquivo_feeds:
+            obrigatorias["HEADLINE_PREFIX"] = self.headline_prefix
+            obrigatorias["PASTA_RAIZ_QUANTUM"] = self.pasta_raiz_quantum
+        return [nome for nome, valor in obrigatorias.items() if not valor]
+
+
+# Único ponto em que o .env é carregado
+load_dotenv()
+
+# Configuração compartilhada por todo o processo
+configuracao = Configuracao()
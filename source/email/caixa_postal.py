@@ -0,0 +1,577 @@
+import mailbox
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from email import message_from_binary_file, policy
+from email.errors import HeaderParseError
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from colorama import Fore
+
+# Importações locais padronizadas
+from source.configuracao.configuracao import configuracao
+from source.email.sessao_outlook import SessaoOutlook, sessao_outlook
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+from source.observabilidade.medicoes import medir
+
+ETAPA = "extracao"
+
+# Propriedade MAPI com o conteúdo binário de um anexo
+PR_ATTACH_DATA_BIN = "http://schemas.microsoft.com/mapi/proptag/0x37010102"
+
+
+@medir("inicializar_outlook")
+def inicializar_outlook():
+    """
+    Obtém a conexão com a aplicação Outlook a partir da sessão do processo.
+
+    A conexão é aberta apenas uma vez e reaproveitada enquanto responder; se
+    falhar, a sessão reinicia o Outlook e aguarda que ele fique pronto.
+
+    Returns:
+            win32com.client.Dispatch: O objeto 'namespace' do Outlook em caso de sucesso,
+                                                            ou None se a conexão falhar mesmo após a reinicialização.
+    """
+    return sessao_outlook.obter_namespace()
+
+
+def _prefixos(headline_prefix: str | tuple) -> tuple:
+    """Normaliza um prefixo ou uma coleção de prefixos para uma tupla."""
+    if isinstance(headline_prefix, str):
+        return (headline_prefix,)
+    return tuple(headline_prefix)
+
+
+def assunto_corresponde(assunto: str, headline_prefix: str | tuple) -> bool:
+    """Indica se o assunto começa ou termina com o `headline_prefix` (ou um deles)."""
+    headline_prefix = _prefixos(headline_prefix)
+    return bool(assunto) and (
+        assunto.startswith(headline_prefix) or assunto.endswith(headline_prefix)
+    )
+
+
+# --- INTERFACE COMUM DAS CAIXAS POSTAIS ---
+class CaixaPostal:
+    """
+    Interface de uma fonte de e-mails para o `extrair_excel_email`.
+
+    Cada implementação devolve as mensagens que atendem ao filtro de data e
+    assunto, da mais recente para a mais antiga, como objetos com `id_mensagem`,
+    `assunto`, `recebido_em` e `anexos` (cada anexo com `nome` e `salvar(caminho)`).
+    """
+
+    descricao = "caixa postal"
+
+    def conectar(self) -> bool:
+        """Prepara o acesso à caixa de entrada. Retorna False em caso de falha."""
+        raise NotImplementedError
+
+    def buscar_mensagens(self, headline_prefix: str | tuple, data: date):
+        """
+        Itera sobre as mensagens recebidas em `data` cujo assunto corresponde ao
+        prefixo. Aceita uma tupla de prefixos para buscar vários de uma só vez.
+        """
+        return self.buscar_periodo(headline_prefix, data, data)
+
+    def buscar_periodo(self, headline_prefix: str | tuple, inicio: date, fim: date):
+        """
+        Como `buscar_mensagens`, para as mensagens recebidas de `inicio` a `fim`
+        (inclusive), com uma única consulta à caixa postal.
+        """
+        raise NotImplementedError
+
+    def aguardar_novas_mensagens(self, timeout: float) -> bool:
+        """
+        Bloqueia até a chegada de uma nova mensagem ou até o fim do `timeout`
+        (em segundos). Retorna True se algo novo chegou.
+        """
+        raise NotImplementedError
+
+
+# --- BACKEND OUTLOOK (COM) ---
+def _assinar_nova_mensagem(aplicacao, ao_receber):
+    """Assina o evento NewMailEx da aplicação Outlook; `ao_receber` é chamado a cada e-mail."""
+    import win32com.client
+
+    class EventosOutlook:
+        def OnNewMailEx(self, ids_recebidos):
+            ao_receber()
+
+    return win32com.client.DispatchWithEvents(aplicacao, EventosOutlook)
+
+
+def _bombear_mensagens_com():
+    """Entrega os eventos COM pendentes da thread atual."""
+    import pythoncom
+
+    pythoncom.PumpWaitingMessages()
+
+
+class AnexoOutlook:
+    """Anexo de uma mensagem do Outlook, acessado via COM."""
+
+    def __init__(self, anexo_com):
+        self._anexo = anexo_com
+
+    @property
+    def nome(self) -> str:
+        return self._anexo.FileName
+
+    def salvar(self, caminho: str):
+        with medir("salvar_anexo") as medicao:
+            self._anexo.SaveAsFile(caminho)
+            medicao.registrar(bytes=os.path.getsize(caminho))
+
+    def ler_bytes(self) -> bytes:
+        """
+        Lê o conteúdo do anexo direto da propriedade MAPI PR_ATTACH_DATA_BIN.
+        Anexos grandes demais para o PropertyAccessor são lidos por meio de um
+        arquivo temporário.
+        """
+        with medir("leitura_anexo") as medicao:
+            conteudo = self._ler_conteudo()
+            medicao.registrar(bytes=len(conteudo))
+        return conteudo
+
+    def _ler_conteudo(self) -> bytes:
+        try:
+            return bytes(self._anexo.PropertyAccessor.GetProperty(PR_ATTACH_DATA_BIN))
+        except Exception as e:
+            logger_quantum.info(
+                f"PR_ATTACH_DATA_BIN indisponível para '{self.nome}' ({e});"
+                " lendo por arquivo temporário."
+            )
+        with tempfile.TemporaryDirectory(prefix="quantum_anexo_") as pasta:
+            caminho = os.path.join(pasta, "anexo")
+            self._anexo.SaveAsFile(caminho)
+            with open(caminho, "rb") as f:
+                return f.read()
+
+
+class MensagemOutlook:
+    """Mensagem do Outlook. Cada propriedade é lida via COM apenas quando acessada."""
+
+    def __init__(self, item_com):
+        self._item = item_com
+
+    @property
+    def id_mensagem(self) -> str:
+        return self._item.EntryID
+
+    @property
+    def assunto(self) -> str:
+        return self._item.Subject
+
+    @property
+    def recebido_em(self) -> datetime:
+        return self._item.ReceivedTime
+
+    @property
+    def anexos(self):
+        return [AnexoOutlook(anexo) for anexo in self._item.Attachments]
+
+
+def _escapar_dasl(valor: str) -> str:
+    """Escapa aspas simples para uso dentro de um literal de uma consulta DASL."""
+    return valor.replace("'", "''")
+
+
+def montar_filtro_dasl(
+    headline_prefix: str | tuple, data: date, data_final: date = None
+) -> str:
+    """
+    Monta o filtro DASL do `Items.Restrict` para as mensagens de um dia (ou de
+    `data` a `data_final`, inclusive) cujo assunto começa ou termina com o
+    prefixo (ou com qualquer um dos prefixos). As datas do DASL são em UTC.
+    """
+    inicio = datetime.combine(data, datetime.min.time()).astimezone(timezone.utc)
+    fim = datetime.combine(
+        (data_final or data) + timedelta(days=1), datetime.min.time()
+    ).astimezone(timezone.utc)
+    formato = "%m/%d/%Y %I:%M %p"
+    campo_data = '"urn:schemas:httpmail:datereceived"'
+    campo_assunto = '"urn:schemas:httpmail:subject"'
+    condicoes_assunto = " OR ".join(
+        f"{campo_assunto} LIKE '{prefixo}%' OR {campo_assunto} LIKE '%{prefixo}'"
+        for prefixo in map(_escapar_dasl, _prefixos(headline_prefix))
+    )
+    return (
+        f"@SQL=({campo_data} >= '{inicio.strftime(formato)}'"
+        f" AND {campo_data} < '{fim.strftime(formato)}')"
+        f" AND ({condicoes_assunto})"
+    )
+
+
+class CaixaPostalOutlook(CaixaPostal):
+    """
+    Caixa de entrada de uma conta do Outlook, acessada via win32com.
+
+    A busca é feita no próprio repositório de e-mails com `Items.Restrict`, de
+    modo que apenas as mensagens que atendem ao filtro são lidas via COM.
+
+    A assinatura do evento NewMailEx fica ligada à aplicação da conexão em que
+    foi feita; se a sessão reconectar, ela é refeita na próxima espera.
+    `assinar_eventos` e `bombear_mensagens` podem ser trocados por objetos
+    falsos para testes.
+    """
+
+    descricao = "Outlook"
+
+    def __init__(
+        self,
+        sessao: SessaoOutlook = None,
+        assinar_eventos=_assinar_nova_mensagem,
+        bombear_mensagens=_bombear_mensagens_com,
+    ):
+        self._sessao = sessao or sessao_outlook
+        self._assinar = assinar_eventos
+        self._bombear = bombear_mensagens
+        self._inbox = None
+        self._assinatura_eventos = None
+        self._conexao_assinada = None
+        self._nova_mensagem = threading.Event()
+
+    def conectar(self) -> bool:
+        # A sessão reaproveita a conexão aberta e só reconecta se ela não responder
+        with medir("inicializar_outlook"):
+            self._inbox = self._sessao.obter_caixa_entrada()
+        if self._inbox is None:
+            logger_quantum.error(
+                "Processo de extração de e-mail interrompido: Caixa de Entrada do"
+                " Outlook não disponível."
+            )
+            return False
+        print_log(
+            "INFO",
+            "Caixa de entrada encontrada. Filtrando os e-mails...",
+            theme_color=Fore.CYAN,
+        )
+        return True
+
+    def buscar_periodo(self, headline_prefix: str | tuple, inicio: date, fim: date):
+        filtro = montar_filtro_dasl(headline_prefix, inicio, fim)
+        try:
+            with medir("busca_caixa_postal") as medicao:
+                mensagens = self._inbox.Items.Restrict(filtro)
+                mensagens.Sort("[ReceivedTime]", True)
+                quantidade = mensagens.Count
+                medicao.registrar(mensagens=quantidade)
+        except Exception as e:
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Erro ao filtrar a caixa de entrada do Outlook: {erro}",
+                exc=e,
+                filtro=filtro,
+                erro=str(e),
+            )
+            return
+        logger_quantum.info(
+            f"Filtro aplicado na caixa de entrada: {quantidade} mensagens"
+            " correspondentes, ordenadas por data."
+        )
+        for i in range(quantidade):
+            msg = MensagemOutlook(mensagens.Item(i + 1))
+            # O LIKE do DASL ignora maiúsculas; confirma a regra exata do prefixo
+            if assunto_corresponde(msg.assunto, headline_prefix):
+                yield msg
+
+    def _assinar_eventos(self):
+        """Assina o evento NewMailEx da aplicação da conexão atual da sessão."""
+        self._assinatura_eventos = self._assinar(
+            self._inbox.Application, self._nova_mensagem.set
+        )
+        self._conexao_assinada = self._sessao.conexoes
+        logger_quantum.info("Assinatura do evento NewMailEx do Outlook realizada.")
+
+    def aguardar_novas_mensagens(self, timeout: float) -> bool:
+        if self._conexao_assinada != self._sessao.conexoes:
+            if self._assinatura_eventos is not None:
+                logger_quantum.info(
+                    "A sessão do Outlook foi reaberta: renovando a assinatura do"
+                    " evento NewMailEx."
+                )
+                self._assinatura_eventos = None
+            self._assinar_eventos()
+            # Uma mensagem pode ter chegado entre a última busca e a assinatura
+            return True
+
+        # Os eventos COM só são entregues enquanto a fila de mensagens é bombeada
+        limite = time.monotonic() + timeout
+        while not self._nova_mensagem.is_set() and time.monotonic() < limite:
+            self._bombear()
+            time.sleep(0.05)
+        chegou = self._nova_mensagem.is_set()
+        self._nova_mensagem.clear()
+        return chegou
+
+
+# --- BACKEND LOCAL (MAILDIR, MBOX OU PASTA DE .EML) ---
+def _ler_cabecalhos(arquivo):
+    """Lê apenas o bloco de cabeçalhos de uma mensagem, sem carregar o corpo."""
+    linhas = []
+    for linha in arquivo:
+        if linha in (b"\r\n", b"\n"):
+            break
+        linhas.append(linha)
+    return BytesHeaderParser(policy=policy.compat32).parsebytes(b"".join(linhas))
+
+
+def _decodificar_assunto(assunto):
+    """
+    Decodifica as palavras codificadas (RFC 2047, ex: '=?utf-8?q?Relat=C3=B3rio?=')
+    do assunto, que o parser compat32 mantém como estão. Um assunto malformado
+    é devolvido sem decodificação.
+    """
+    if assunto is None:
+        return None
+    try:
+        assunto = str(make_header(decode_header(str(assunto))))
+    except (HeaderParseError, LookupError, UnicodeDecodeError):
+        assunto = str(assunto)
+    return assunto.strip()
+
+
+def _data_recebimento(cabecalhos, data_alternativa: datetime = None) -> datetime:
+    """Converte o cabeçalho 'Date' para a hora local, sem fuso horário."""
+    try:
+        data = parsedate_to_datetime(cabecalhos["Date"])
+    except (TypeError, ValueError):
+        return data_alternativa or datetime.min
+    if data.tzinfo is not None:
+        data = data.astimezone().replace(tzinfo=None)
+    return data
+
+
+class AnexoLocal:
+    """Anexo de uma mensagem local, já decodificado em memória."""
+
+    def __init__(self, nome: str, conteudo: bytes):
+        self.nome = nome
+        self.conteudo = conteudo
+
+    def salvar(self, caminho: str):
+        with open(caminho, "wb") as f:
+            f.write(self.conteudo)
+
+    def ler_bytes(self) -> bytes:
+        return self.conteudo
+
+
+class MensagemLocal:
+    """
+    Mensagem lida de um arquivo local. Apenas os cabeçalhos são lidos na
+    listagem; o corpo é decodificado quando os anexos são solicitados.
+    """
+
+    def __init__(self, abrir, cabecalhos, recebido_em: datetime, chave: str):
+        self._abrir = abrir
+        self.recebido_em = recebido_em
+        self.id_mensagem = (cabecalhos["Message-ID"] or chave).strip()
+        # Decodificado uma vez: a mensagem fica no cache entre as buscas
+        self.assunto = _decodificar_assunto(cabecalhos["Subject"])
+
+    @property
+    def anexos(self):
+        with self._abrir() as arquivo:
+            mensagem = message_from_binary_file(arquivo, policy=policy.default)
+        return [
+            AnexoLocal(parte.get_filename(), parte.get_payload(decode=True) or b"")
+            for parte in mensagem.iter_attachments()
+            if parte.get_filename()
+        ]
+
+
+class CaixaPostalLocal(CaixaPostal):
+    """
+    Caixa postal lida do disco: um diretório Maildir, um arquivo mbox ou uma
+    pasta com arquivos .eml. Permite executar o processo sem o Outlook.
+    """
+
+    descricao = "caixa postal local"
+    # Intervalo de verificação do modo de observação (um stat por caminho observado)
+    intervalo_observacao = 0.2
+
+    def __init__(self, caminho: str):
+        self.caminho = Path(caminho)
+        # Cabeçalhos já lidos, por nome de arquivo (com data de modificação e
+        # tamanho): novas buscas só leem o que é novo ou mudou
+        self._cache_mensagens = {}
+        self._estado_ultima_busca = None
+
+    def _mensagem_em_cache(self, chave: str, ler_mensagem, assinatura=None):
+        """
+        Devolve a mensagem já lida com a chave, ou a lê. Com `assinatura` (data
+        de modificação e tamanho do arquivo), uma entrada lida de um arquivo que
+        mudou desde então, por exemplo ainda sendo gravado, é lida de novo.
+        """
+        em_cache = self._cache_mensagens.get(chave)
+        if em_cache is not None and em_cache[0] == assinatura:
+            return em_cache[1]
+        mensagem = ler_mensagem()
+        self._cache_mensagens[chave] = (assinatura, mensagem)
+        return mensagem
+
+    def _listar_maildir(self):
+        caixa = mailbox.Maildir(self.caminho, factory=None, create=False)
+
+        def ler_mensagem(chave):
+            with caixa.get_file(chave) as arquivo:
+                cabecalhos = _ler_cabecalhos(arquivo)
+            # O nome único de um Maildir começa com o instante da entrega
+            prefixo = chave.split(".", 1)[0]
+            data_entrega = (
+                datetime.fromtimestamp(int(prefixo)) if prefixo.isdigit() else None
+            )
+            return MensagemLocal(
+                lambda: caixa.get_file(chave),
+                cabecalhos,
+                _data_recebimento(cabecalhos, data_entrega),
+                chave,
+            )
+
+        # A entrega no Maildir é atômica (tmp/ -> new/): o nome basta como chave
+        for chave in caixa.iterkeys():
+            yield self._mensagem_em_cache(chave, lambda c=chave: ler_mensagem(c))
+
+    def _listar_mbox(self):
+        caixa = mailbox.mbox(self.caminho, factory=None, create=False)
+        for chave in caixa.iterkeys():
+            with caixa.get_file(chave) as arquivo:
+                cabecalhos = _ler_cabecalhos(arquivo)
+            yield MensagemLocal(
+                lambda k=chave: caixa.get_file(k),
+                cabecalhos,
+                _data_recebimento(cabecalhos),
+                f"{self.caminho.name}:{chave}",
+            )
+
+    def _listar_eml(self):
+        def ler_mensagem(caminho_msg: Path, mtime: float):
+            with open(caminho_msg, "rb") as arquivo:
+                cabecalhos = _ler_cabecalhos(arquivo)
+            return MensagemLocal(
+                lambda: open(caminho_msg, "rb"),
+                cabecalhos,
+                _data_recebimento(cabecalhos, datetime.fromtimestamp(mtime)),
+                caminho_msg.name,
+            )
+
+        # Um .eml pode ser lido enquanto ainda está sendo copiado para a pasta
+        with os.scandir(self.caminho) as entradas:
+            for entrada in entradas:
+                if not entrada.name.endswith(".eml") or entrada.name.startswith("."):
+                    continue
+                try:
+                    if not entrada.is_file():
+                        continue
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                yield self._mensagem_em_cache(
+                    entrada.name,
+                    lambda c=Path(entrada.path), t=info.st_mtime: ler_mensagem(c, t),
+                    (info.st_mtime_ns, info.st_size),
+                )
+
+    def _e_maildir(self) -> bool:
+        return (self.caminho / "cur").is_dir() and (self.caminho / "new").is_dir()
+
+    def _listar(self):
+        if self.caminho.is_file():
+            return self._listar_mbox()
+        if self._e_maildir():
+            return self._listar_maildir()
+        return self._listar_eml()
+
+    def _estado_observado(self):
+        """Assinatura barata do conteúdo: mtime e tamanho dos caminhos observados."""
+        if self._e_maildir():
+            caminhos = (self.caminho / "new", self.caminho / "cur")
+        else:
+            caminhos = (self.caminho,)
+        estado = []
+        for caminho in caminhos:
+            try:
+                info = os.stat(caminho)
+                estado.append((info.st_mtime_ns, info.st_size))
+            except FileNotFoundError:
+                estado.append(None)
+        return estado
+
+    def aguardar_novas_mensagens(self, timeout: float) -> bool:
+        # Compara com o estado da última busca para não perder o que chegou entre elas
+        estado_inicial = self._estado_ultima_busca or self._estado_observado()
+        self._estado_ultima_busca = None
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            time.sleep(
+                min(self.intervalo_observacao, max(0, limite - time.monotonic()))
+            )
+            if self._estado_observado() != estado_inicial:
+                return True
+        return False
+
+    def conectar(self) -> bool:
+        if not self.caminho.exists():
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "A caixa postal local não foi encontrada em: {caminho}",
+                caminho=str(self.caminho),
+            )
+            return False
+
+        print_log(
+            "INFO",
+            f"Caixa postal local encontrada: {self.caminho}",
+            theme_color=Fore.CYAN,
+        )
+        return True
+
+    def buscar_periodo(self, headline_prefix: str | tuple, inicio: date, fim: date):
+        # Apenas os cabeçalhos são lidos para filtrar; só as correspondentes são ordenadas
+        self._estado_ultima_busca = self._estado_observado()
+        try:
+            with medir("busca_caixa_postal") as medicao:
+                encontradas = [
+                    msg
+                    for msg in self._listar()
+                    if assunto_corresponde(msg.assunto, headline_prefix)
+                    and inicio <= msg.recebido_em.date() <= fim
+                ]
+                medicao.registrar(mensagens=len(encontradas))
+        except Exception as e:
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Erro ao ler a caixa postal local: {erro}",
+                exc=e,
+                caminho=str(self.caminho),
+                erro=str(e),
+            )
+            return iter(())
+        encontradas.sort(key=lambda m: m.recebido_em, reverse=True)
+        logger_quantum.info(
+            f"Filtro aplicado na caixa postal local '{self.caminho}':"
+            f" {len(encontradas)} mensagens correspondentes, ordenadas por data."
+        )
+        return iter(encontradas)
+
+
+def criar_caixa_postal() -> CaixaPostal:
+    """
+    Cria a caixa postal configurada no ambiente.
+
+    Se a variável CAIXA_POSTAL_LOCAL apontar para um Maildir, mbox ou pasta de
+    .eml, usa o backend local; caso contrário, usa o Outlook.
+    """
+    caminho_local = configuracao.caixa_postal_local
+    if caminho_local:
+        return CaixaPostalLocal(caminho_local)
+    return CaixaPostalOutlook()
@@ -1,37 +1,34 @@
-import os
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-
 from colorama import Fore
-from dotenv import load_dotenv
 
 # Importações locais
-from source.logger.logger_config import logger_quantum, print_log
-
-smtplib.SMTP.debuglevel = 1
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+from source.manipulacao_excel.manipulacao_excel import descrever_contagem_nan
+from source.notificacao.despachante import despachante
+from source.qualidade.motor_regras import RelatorioQualidade
 
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+ETAPA = "notificacao"
 
 
-def enviar_email_alerta(contagem_nan: int, limite: int):
+def enviar_email_alerta(
+    contagem_nan: int = None, limite: int = None, relatorio: RelatorioQualidade = None
+):
     """
     Envia um e-mail de alerta sobre a baixa qualidade dos
     dados em uma planilha.
 
     Esta função é acionada quando a contagem de valores nulos (NaN) em uma verificação
-    excede o limite pré-configurado. Ela lê as credenciais de e-mail e as configurações
-    do servidor SMTP a partir de variáveis de ambiente e envia um e-mail formatado
-    em HTML para o destinatário especificado.
+    excede o limite pré-configurado. Ela lê as credenciais de e-mail a partir de
+    variáveis de ambiente e entrega ao despachante de notificações um e-mail
+    formatado em HTML, que é enviado em segundo plano. Falhas de autenticação ou
+    de conexão são registradas pelo despachante.
 
     Args:
-            contagem_nan (int): O número de valores NaN que foram encontrados.
+            contagem_nan (int): O número de valores NaN que foram encontrados
+                    (exibido como "> limite" se for uma `ContagemParcial`).
             limite (int): O limite máximo de valores NaN que era permitido.
-
-    Raises:
-            - smtplib.SMTPAuthenticationError: Se as credenciais (usuário/senha) forem inválidas.
-            - Exception: Para outros erros relacionados à conexão ou envio do e-mail.
+            relatorio (RelatorioQualidade): O relatório das regras de qualidade; se
+                    informado, o e-mail lista as regras que falharam.
     """
     theme_color = Fore.RED  # Vermelho para indicar alerta
     print_log(
@@ -39,18 +36,18 @@ def enviar_email_alerta(contagem_nan: int, limite: int):
     )
 
     # --- CONFIGURAÇÕES DO E-MAIL ---
-    email_remetente = os.getenv("EMAIL_USER")
-    senha_remetente = os.getenv("EMAIL_PASSWORD")
-    email_destinatario = os.getenv("EMAIL_DESTINATARIO")
-    lista_destinatarios = [email.strip() for email in email_destinatario.split(",")]
+    email_remetente = configuracao.email_user
+    senha_remetente = configuracao.email_password
+    lista_destinatarios = configuracao.destinatarios_email
 
     if not all([email_remetente, senha_remetente, lista_destinatarios]):
-        error_msg = (
+        registrar_evento(
+            "ERROR",
+            ETAPA,
             "As variáveis de ambiente EMAIL_USER, EMAIL_PASSWORD ou"
-            " EMAIL_DESTINATARIO não foram encontradas."
+            " EMAIL_DESTINATARIO não foram encontradas.",
+            canal="email",
         )
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
         return
 
     logger_quantum.info(
@@ -58,17 +55,11 @@ def enviar_email_alerta(contagem_nan: int, limite: int):
         f" {lista_destinatarios}."
     )
 
-    # Configurações do servidor SMTP (Outlook)
-    smtp_server = "smtp.office365.com"
-    smtp_port = 587
-
     # --- CRIAÇÃO DA MENSAGEM ---
-    msg = MIMEMultipart()
-    msg["From"] = email_remetente
-    msg["To"] = ", ".join(lista_destinatarios)
-    msg["Subject"] = (
-        f"⚠️ Alerta de Qualidade de Dados: {contagem_nan} Valores Nulos Encontrados"
+    nulos = (
+        None if contagem_nan is None else descrever_contagem_nan(contagem_nan, limite)
     )
+    assunto = f"⚠️ Alerta de Qualidade de Dados: {nulos} Valores Nulos Encontrados"
 
     corpo_email = f"""
     <html>
@@ -77,7 +68,7 @@ def enviar_email_alerta(contagem_nan: int, limite: int):
         <p>Olá,</p>
         <p>A verificação automática detectou um problema na planilha recém-processada.</p>
         <ul style="list-style-type: none; padding: 0;">
-            <li style="padding: 5px;"><strong>Valores Nulos/NaN Encontrados:</strong> <span style="color: #d9534f; font-weight: bold;">{contagem_nan}</span></li>
+            <li style="padding: 5px;"><strong>Valores Nulos/NaN Encontrados:</strong> <span style="color: #d9534f; font-weight: bold;">{nulos}</span></li>
             <li style="padding: 5px;"><strong>Limite Permitido:</strong> {limite}</li>
         </ul>
         <p>A quantidade de dados ausentes excedeu o limite configurado.</p>
@@ -87,38 +78,30 @@ def enviar_email_alerta(contagem_nan: int, limite: int):
     </body>
     </html>
     """
-    msg.attach(MIMEText(corpo_email, "html"))
+    if relatorio is not None:
+        assunto = f"⚠️ Alerta de Qualidade de Dados: {relatorio}"
+        itens = "".join(
+            f'<li style="padding: 5px;"><strong>{descricao}:</strong> {resumo}</li>'
+            for descricao, resumo in relatorio.fatos(apenas_falhas=True)
+        )
+        corpo_email = f"""
+    <html>
+    <body style="font-family: sans-serif;">
+        <h2 style="color: #d9534f;">Alerta de Qualidade de Dados</h2>
+        <p>Olá,</p>
+        <p>A verificação automática detectou problemas na planilha recém-processada ({relatorio}):</p>
+        <ul style="list-style-type: none; padding: 0;">{itens}</ul>
+        <p><strong>Ação recomendada:</strong> Por favor, verifique a planilha de origem para garantir a integridade dos dados antes de uma nova execução.</p>
+        <br>
+        <p><em>Este é um e-mail automático.</em></p>
+    </body>
+    </html>
+    """
     logger_quantum.info("Corpo do e-mail de alerta construído.")
 
     # --- ENVIO DO E-MAIL ---
-    try:
-        print_log(
-            "INFO",
-            f"Conectando ao servidor SMTP ({smtp_server})...",
-            theme_color=theme_color,
-        )
-        with smtplib.SMTP(smtp_server, smtp_port, timeout=10) as server:
-            server.ehlo("localhost")
-            server.starttls()
-            server.ehlo("localhost")
-            logger_quantum.info("Conexão TLS estabelecida.")
-            server.login(email_remetente, senha_remetente)
-            logger_quantum.info("Login no servidor SMTP realizado com sucesso.")
-            server.send_message(msg)
-            success_msg = (
-                f"E-mail de alerta enviado com sucesso para {lista_destinatarios}!"
-            )
-            print_log("INFO", success_msg, theme_color=Fore.GREEN)
-            logger_quantum.info(success_msg)
-
-    except smtplib.SMTPAuthenticationError as e:
-        error_msg = (
-            "Erro de autenticação SMTP. Verifique seu e-mail e senha (ou senha de app)."
-        )
-        print_log("ERROR", error_msg)
-        logger_quantum.error(f"{error_msg} | Exception: {e}", exc=e)
-
-    except Exception as e:
-        error_msg = f"Falha inesperada ao enviar o e-mail: {e}"
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg, exc=e)
+    # A conexão SMTP e a entrega em segundo plano ficam a cargo do despachante
+    despachante.enviar_email(
+        email_remetente, senha_remetente, lista_destinatarios, assunto, corpo_email
+    )
+    logger_quantum.info(f"E-mail de alerta enfileirado para {lista_destinatarios}.")
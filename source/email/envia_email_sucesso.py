@@ -1,25 +1,26 @@
-import os
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-
 from colorama import Fore
-from dotenv import load_dotenv
 
 # Importações locais
-from source.logger.logger_config import logger_quantum, print_log
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+from source.notificacao.despachante import despachante
+from source.qualidade.motor_regras import RelatorioQualidade
 
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+ETAPA = "notificacao"
 
 
-def enviar_email_sucesso():
+def enviar_email_sucesso(relatorio: RelatorioQualidade = None):
     """
     Envia um e-mail de confirmação após um processamento bem-sucedido.
 
     Esta função é chamada quando a verificação de qualidade dos dados passa e os dados
     são salvos corretamente. Ela informa ao destinatário que o processo foi concluído
-    sem problemas. As credenciais e o destinatário são lidos de variáveis de ambiente.
+    sem problemas. As credenciais e o destinatário são lidos de variáveis de ambiente
+    e o envio é feito em segundo plano pelo despachante de notificações.
+
+    Args:
+            relatorio (RelatorioQualidade): O relatório das regras de qualidade; se
+                    informado, o e-mail lista o resultado de cada regra.
     """
     theme_color = Fore.GREEN  # Verde para indicar sucesso
     print_log(
@@ -29,18 +30,18 @@ def enviar_email_sucesso():
     )
 
     # --- CONFIGURAÇÕES DO E-MAIL ---
-    email_remetente = os.getenv("EMAIL_USER")
-    senha_remetente = os.getenv("EMAIL_PASSWORD")
-    email_destinatario = os.getenv("EMAIL_DESTINATARIO")
-    lista_destinatarios = [email.strip() for email in email_destinatario.split(",")]
+    email_remetente = configuracao.email_user
+    senha_remetente = configuracao.email_password
+    lista_destinatarios = configuracao.destinatarios_email
 
     if not all([email_remetente, senha_remetente, lista_destinatarios]):
-        error_msg = (
+        registrar_evento(
+            "ERROR",
+            ETAPA,
             "As variáveis de ambiente EMAIL_USER, EMAIL_PASSWORD ou"
-            " EMAIL_DESTINATARIO não foram encontradas."
+            " EMAIL_DESTINATARIO não foram encontradas.",
+            canal="email",
         )
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
         return
 
     logger_quantum.info(
@@ -48,54 +49,35 @@ def enviar_email_sucesso():
         f" sucesso para {lista_destinatarios}."
     )
 
-    # Configurações do servidor SMTP (Outlook)
-    smtp_server = "smtp.office365.com"
-    smtp_port = 587
-
     # --- CRIAÇÃO DA MENSAGEM ---
-    msg = MIMEMultipart()
-    msg["From"] = email_remetente
-    msg["To"] = ", ".join(lista_destinatarios)
-    msg["Subject"] = "✅ Processo Concluído com Sucesso"
+    assunto = "✅ Processo Concluído com Sucesso"
+
+    detalhes = ""
+    if relatorio is not None:
+        itens = "".join(
+            f'<li style="padding: 5px;"><strong>{descricao}:</strong> {resumo}</li>'
+            for descricao, resumo in relatorio.fatos()
+        )
+        detalhes = f'<ul style="list-style-type: none; padding: 0;">{itens}</ul>'
 
-    corpo_email = """
+    corpo_email = f"""
     <html>
     <body style="font-family: sans-serif;">
         <h2 style="color: #5cb85c;">Relatório de Qualidade de Dados</h2>
         <p>Olá,</p>
         <p>A verificação automática da planilha e o salvamento dos dados foram concluídos com <strong>sucesso</strong>.</p>
         <p>Nenhum problema que exigisse atenção imediata foi detectado e os dados foram atualizados no destino.</p>
+        {detalhes}
         <br>
         <p><em>Este é um e-mail automático.</em></p>
     </body>
     </html>
     """
-    msg.attach(MIMEText(corpo_email, "html"))
     logger_quantum.info("Corpo do e-mail de sucesso construído.")
 
     # --- ENVIO DO E-MAIL ---
-    try:
-        print_log(
-            "INFO",
-            f"Conectando ao servidor SMTP ({smtp_server})...",
-            theme_color=theme_color,
-        )
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            logger_quantum.info("Conexão TLS estabelecida.")
-            server.login(email_remetente, senha_remetente)
-            logger_quantum.info("Login no servidor SMTP realizado com sucesso.")
-            server.send_message(msg)
-            success_msg = f"E-mail de sucesso enviado para {lista_destinatarios}!"
-            print_log("INFO", success_msg, theme_color=theme_color)
-            logger_quantum.info(success_msg)
-
-    except smtplib.SMTPAuthenticationError as e:
-        error_msg = "Erro de autenticação SMTP. Verifique seu e-mail e senha."
-        print_log("ERROR", error_msg)
-        logger_quantum.error(f"{error_msg} | Exception: {e}", exc=e)
-
-    except Exception as e:
-        error_msg = f"Falha inesperada ao enviar o e-mail: {e}"
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg, exc=e)
+    # A conexão SMTP e a entrega em segundo plano ficam a cargo do despachante
+    despachante.enviar_email(
+        email_remetente, senha_remetente, lista_destinatarios, assunto, corpo_email
+    )
+    logger_quantum.info(f"E-mail de sucesso enfileirado para {lista_destinatarios}.")
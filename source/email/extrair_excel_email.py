@@ -1,187 +1,402 @@
-import os
-import sys
 import time
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
 from pathlib import Path
 
-import win32com.client
 from colorama import Fore
 
 # Importações locais padronizadas
-from source.logger.logger_config import logger_quantum, print_log
+from source.email.caixa_postal import inicializar_outlook  # noqa: F401
+from source.email.caixa_postal import CaixaPostal, criar_caixa_postal
+from source.indice.armazem_anexos import armazem_da_pasta
+from source.indice.indice_processados import calcular_hash_conteudo, indice_da_pasta
+from source.indice.manifesto_pasta import manifesto_da_pasta
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
 
-# Ajusta o PATH se estiver rodando como um executável PyInstaller
-if getattr(sys, "frozen", False):
-    dll_path = os.path.join(sys._MEIPASS, "libs")
-    os.environ["PATH"] = dll_path + os.pathsep + os.environ.get("PATH", "")
+ETAPA = "extracao"
 
+# Gravação dos anexos ingeridos em segundo plano, um por vez
+_executor_persistencia = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="persistencia"
+)
 
-def inicializar_outlook():
-    """
-    Tenta estabelecer uma conexão com a aplicação Outlook.
 
-    Se a conexão inicial falhar, a função tentará forçar o encerramento do processo
-    do Outlook, reiniciá-lo e tentar a conexão novamente.
+def normalizar_nome_anexo(nome_anexo: str) -> str:
+    """Nome usado ao salvar o anexo: minúsculas, espaços e hífens trocados por '_'."""
+    return nome_anexo.lower().replace(" ", "_").replace("-", "_")
+
+
+def salvar_anexo_excel(
+    anexo, pasta_destino: str, id_mensagem: str, indice=None, data: date = None
+):
+    """
+    Salva um anexo .xlsx no armazém da pasta de destino e o publica com o nome
+    normalizado (minúsculas, espaços e hífens trocados por '_'), registrando-o
+    no índice, se informado (veja `gravar_anexo`).
 
     Returns:
-            win32com.client.Dispatch: O objeto 'namespace' do Outlook em caso de sucesso,
-                                                            ou None se a conexão falhar mesmo após a reinicialização.
+            str: O nome do arquivo salvo.
     """
-    theme_color = Fore.BLUE
-    print_log("AÇÃO", "Conectando ao Outlook...", theme_color=theme_color)
-    try:
-        outlook_app = win32com.client.Dispatch("Outlook.Application")
-        namespace = outlook_app.GetNamespace("MAPI")
-        _ = namespace.Folders  # Acesso para forçar a inicialização
-        print_log(
-            "INFO",
-            "Conexão com o Outlook estabelecida com sucesso.",
-            theme_color=theme_color,
-        )
-        logger_quantum.info("Conexão com Outlook bem-sucedida.")
-        return namespace
-    except Exception as e:
-        print_log(
-            "AVISO",
-            f"Falha ao conectar ao Outlook: {e}. Tentando reiniciar o aplicativo.",
-            theme_color=Fore.YELLOW,
-        )
-        logger_quantum.error(f"Falha inicial ao conectar ao Outlook: {e}", exc=e)
-        os.system("taskkill /f /im outlook.exe > nul 2>&1")
-        time.sleep(2)
-        os.startfile("outlook.exe")
-        time.sleep(8)
+    caminho = Path(pasta_destino) / normalizar_nome_anexo(anexo.nome)
+    gravar_anexo(anexo.ler_bytes(), caminho, id_mensagem, anexo.nome, indice, data)
+    return caminho.name
+
+
+def gravar_anexo(
+    conteudo: bytes,
+    caminho: Path,
+    id_mensagem: str,
+    nome_anexo: str,
+    indice=None,
+    data: date = None,
+    hash_conteudo: str = None,
+):
+    """
+    Guarda o conteúdo do anexo no armazém da pasta (`ArmazemAnexos`), que só o
+    grava se ele ainda não estiver lá, e o publica em `caminho` (uma cópia do
+    arquivo do armazém). O anexo fica registrado no índice, se informado.
+
+    Um reenvio idêntico não grava nada; um anexo diferente com o mesmo nome
+    substitui o arquivo publicado, mas o anterior continua no armazém.
+    """
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    armazem = armazem_da_pasta(caminho.parent)
+    hash_conteudo, gravado = armazem.guardar(
+        conteudo,
+        id_mensagem,
+        nome_anexo,
+        data or datetime.now().date(),
+        hash_conteudo,
+    )
+    if armazem.publicar(hash_conteudo, caminho):
+        manifesto_da_pasta(caminho.parent).registrar(caminho)
+    if indice:
+        indice.registrar_anexo(id_mensagem, nome_anexo, caminho, hash_conteudo)
+
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        (
+            "Anexo '{arquivo}' salvo em: {caminho}"
+            if gravado
+            else "Anexo '{arquivo}' idêntico a um já armazenado ({hash:.12})."
+            " Gravação ignorada."
+        ),
+        theme_color=Fore.CYAN,
+        arquivo=caminho.name,
+        caminho=str(caminho),
+        hash=hash_conteudo,
+        tamanho_bytes=len(conteudo),
+        gravado=gravado,
+    )
+
+
+class AnexoIngerido:
+    """
+    Anexo .xlsx lido da mensagem para a memória. A validação usa `conteudo`
+    diretamente; a gravação em `caminho` é feita em segundo plano, se pedida.
+    `ja_processado` indica que o anexo veio do índice, de uma execução anterior;
+    nesse caso o conteúdo é lido sob demanda de `origem` (padrão: `caminho`).
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        caminho: Path,
+        id_mensagem: str,
+        conteudo: bytes = None,
+        persistencia: Future = None,
+        ja_processado: bool = False,
+        hash_conteudo: str = None,
+        origem: Path = None,
+    ):
+        self.nome = nome
+        self.caminho = caminho
+        self.id_mensagem = id_mensagem
+        self._conteudo = conteudo
+        self.persistencia = persistencia
+        self.ja_processado = ja_processado
+        self.hash_conteudo = hash_conteudo
+        self.origem = origem or caminho
+
+    @property
+    def conteudo(self) -> bytes:
+        """O conteúdo do anexo (lido do arquivo já salvo, se veio do índice)."""
+        if self._conteudo is None:
+            self._conteudo = self.origem.read_bytes()
+        return self._conteudo
+
+    def aguardar_persistencia(self, timeout: float = None) -> bool:
+        """
+        Aguarda a gravação do anexo em disco.
+
+        Returns:
+                bool: False se a gravação falhou; True se terminou ou não foi pedida.
+        """
+        if self.persistencia is None:
+            return True
         try:
-            outlook_app = win32com.client.Dispatch("Outlook.Application")
-            namespace = outlook_app.GetNamespace("MAPI")
-            _ = namespace.Folders
-            print_log(
-                "INFO",
-                "Conexão com o Outlook restabelecida após reinicialização.",
-                theme_color=theme_color,
-            )
-            logger_quantum.info("Conexão com Outlook restabelecida.")
-            return namespace
-        except Exception as e_after_restart:
-            error_msg = (
-                "Não foi possível conectar ao Outlook mesmo após reiniciar:"
-                f" {e_after_restart}"
+            self.persistencia.result(timeout)
+            return True
+        except Exception as e:
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Falha ao gravar o anexo '{arquivo}' em disco: {erro}",
+                exc=e,
+                arquivo=self.nome,
+                erro=str(e),
             )
-            print_log("ERROR", error_msg)
-            logger_quantum.error(error_msg, exc=e_after_restart)
-            return None
+            return False
 
 
-def extrair_excel_email(pasta_raiz_quantum: str, headline_prefix: str):
+def _anexo_ja_processado(pasta: Path, indice, id_mensagem: str):
     """
-    Busca e-mails recentes no Outlook, encontra um com um assunto específico
-    e salva seu anexo .xlsx.
+    O anexo já salvo de uma mensagem: o arquivo da pasta, se continua intacto,
+    ou o conteúdo guardado no armazém (ex: quando outro anexo com o mesmo nome
+    substituiu o arquivo publicado).
 
-    A função se conecta à conta 'asa.com.br' no Outlook, procura na Caixa de Entrada
-    pelos e-mails mais recentes recebidos no dia atual que correspondam ao
-    'headline_prefix'. Ao encontrar o primeiro e-mail correspondente, salva seu
-    anexo .xlsx na pasta raiz especificada.
+    Só conta como processada uma mensagem registrada no índice por uma execução
+    diária: o reprocessamento guarda os anexos no armazém sem publicá-los nem
+    registrá-los, e a execução diária ainda precisa fazer isso.
+
+    Returns:
+            AnexoIngerido: O anexo já processado, ou None se a mensagem for nova.
+    """
+    arquivo_existente = indice.anexo_processado(id_mensagem)
+    if arquivo_existente:
+        return AnexoIngerido(
+            arquivo_existente.name,
+            arquivo_existente,
+            id_mensagem,
+            ja_processado=True,
+        )
+    if not indice.mensagem_registrada(id_mensagem):
+        return None
+    armazem = armazem_da_pasta(pasta)
+    armazenados = armazem.anexos_da_mensagem(id_mensagem)
+    if not armazenados:
+        return None
+    nome_anexo, hash_conteudo = armazenados[0]
+    return AnexoIngerido(
+        normalizar_nome_anexo(nome_anexo),
+        pasta / normalizar_nome_anexo(nome_anexo),
+        id_mensagem,
+        ja_processado=True,
+        hash_conteudo=hash_conteudo,
+        origem=armazem.caminho(hash_conteudo),
+    )
+
+
+def ingerir_excel_email(
+    pasta_raiz_quantum: str,
+    headline_prefix: str,
+    caixa_postal: CaixaPostal = None,
+    usar_indice: bool = True,
+    data: date = None,
+    persistir: bool = True,
+):
+    """
+    Busca o e-mail do dia com o assunto procurado e lê seu anexo .xlsx para a
+    memória, sem passar pelo disco.
+
+    Se `persistir` for True, o anexo é gravado na pasta raiz em segundo plano
+    (veja `AnexoIngerido.aguardar_persistencia`) e registrado no índice; a
+    validação pode começar imediatamente sobre `AnexoIngerido.conteudo`.
 
     Args:
             pasta_raiz_quantum (str): O caminho da pasta onde o anexo Excel será salvo.
             headline_prefix (str): O prefixo ou sufixo do assunto do e-mail a ser procurado.
+            caixa_postal (CaixaPostal): A fonte de e-mails; se omitida, usa `criar_caixa_postal()`.
+            usar_indice (bool): Se False, ignora o índice de mensagens já processadas.
+            data (date): O dia de recebimento procurado (padrão: hoje).
+            persistir (bool): Se False, o anexo fica apenas em memória.
+
+    Returns:
+            AnexoIngerido: O anexo encontrado, ou None.
     """
     theme_color = Fore.CYAN
     print_log(
         "INFO", "--- INICIANDO BUSCA POR E-MAIL QUANTUM ---", theme_color=theme_color
     )
-    namespace = inicializar_outlook()
-    if not namespace:
-        logger_quantum.error(
-            "Processo de extração de e-mail interrompido: namespace do Outlook não"
-            " inicializado."
-        )
-        return
-
-    try:
-        asa_account = next(
-            (f for f in namespace.Folders if "@asa.com.br" in f.Name.lower()), None
-        )
-        if not asa_account:
-            print_log("ERROR", "Conta ASA não encontrada no Outlook.")
-            logger_quantum.error(
-                "Conta de e-mail da ASA não foi encontrada no Outlook."
-            )
-            return
-
-        inbox = asa_account.Folders["Caixa de Entrada"]
-        mensagens = inbox.Items
-        mensagens.Sort("[ReceivedTime]", True)
-        print_log(
-            "INFO",
-            "Caixa de entrada encontrada. Verificando os e-mails mais recentes...",
-            theme_color=theme_color,
-        )
-        logger_quantum.info(
-            f"Verificando {mensagens.Count} mensagens na caixa de entrada, ordenadas"
-            " por data."
-        )
-
-    except Exception as e:
-        print_log("ERROR", f"Erro ao acessar pastas do Outlook: {e}")
-        logger_quantum.error(f"Erro fatal ao acessar pastas do Outlook: {e}", exc=e)
+    if caixa_postal is None:
+        caixa_postal = criar_caixa_postal()
+    if not caixa_postal.conectar():
         return
 
+    pasta = Path(pasta_raiz_quantum)
+    indice = indice_da_pasta(pasta) if usar_indice else None
     email_encontrado = False
-    for i in range(min(50, mensagens.Count)):  # Aumentado o limite de busca para 50
+    msg = None
+    data = data or datetime.now().date()
+    for msg in caixa_postal.buscar_mensagens(headline_prefix, data):
         try:
-            msg = mensagens.Item(i + 1)
-            data_msg = msg.ReceivedTime.strftime("%Y-%m-%d")
-            data_hoje = datetime.now().strftime("%Y-%m-%d")
-
-            if data_msg != data_hoje:
-                print_log(
-                    "INFO",
-                    "Busca encerrada. E-mails de hoje já foram todos verificados.",
-                    theme_color=theme_color,
-                )
-                logger_quantum.info(
-                    "Busca finalizada ao encontrar e-mail de data anterior."
-                )
-                return
-
-            if msg.Subject and (
-                msg.Subject.endswith(headline_prefix)
-                or msg.Subject.startswith(headline_prefix)
-            ):
-                email_encontrado = True
-                msg_processando = f"E-mail correspondente encontrado: '{msg.Subject}'"
-                print_log("INFO", msg_processando, theme_color=theme_color)
-                logger_quantum.info(msg_processando)
-
-                for anexo in msg.Attachments:
-                    if anexo.FileName.lower().endswith(".xlsx"):
-                        nome_formatado = (
-                            anexo.FileName.lower().replace(" ", "_").replace("-", "_")
-                        )
-                        Path(pasta_raiz_quantum).mkdir(parents=True, exist_ok=True)
-                        caminho_anexo_salvo = os.path.join(
-                            pasta_raiz_quantum, nome_formatado
-                        )
-                        anexo.SaveAsFile(caminho_anexo_salvo)
+            email_encontrado = True
+            registrar_evento(
+                "INFO",
+                ETAPA,
+                "E-mail correspondente encontrado: '{assunto}'",
+                theme_color=theme_color,
+                assunto=msg.assunto,
+                id_mensagem=msg.id_mensagem,
+            )
+
+            if indice:
+                anexo_existente = _anexo_ja_processado(pasta, indice, msg.id_mensagem)
+                if anexo_existente:
+                    registrar_evento(
+                        "INFO",
+                        ETAPA,
+                        "Anexo '{arquivo}' já processado anteriormente e intacto na"
+                        " pasta. Download ignorado.",
+                        theme_color=theme_color,
+                        arquivo=anexo_existente.nome,
+                        id_mensagem=msg.id_mensagem,
+                    )
+                    return anexo_existente
 
-                        msg_anexo_salvo = (
-                            f"Anexo '{nome_formatado}' salvo em: {caminho_anexo_salvo}"
+            for anexo in msg.anexos:
+                if anexo.nome.lower().endswith(".xlsx"):
+                    conteudo = anexo.ler_bytes()
+                    hash_conteudo = calcular_hash_conteudo(conteudo)
+                    caminho = pasta / normalizar_nome_anexo(anexo.nome)
+                    logger_quantum.info(
+                        f"Anexo '{anexo.nome}' lido para a memória"
+                        f" ({len(conteudo)} bytes)."
+                    )
+                    persistencia = None
+                    if persistir:
+                        persistencia = _executor_persistencia.submit(
+                            gravar_anexo,
+                            conteudo,
+                            caminho,
+                            msg.id_mensagem,
+                            anexo.nome,
+                            indice,
+                            msg.recebido_em.date(),
+                            hash_conteudo,
                         )
-                        print_log("INFO", msg_anexo_salvo, theme_color=theme_color)
-                        logger_quantum.info(msg_anexo_salvo)
-                        return nome_formatado
+                    return AnexoIngerido(
+                        caminho.name,
+                        caminho,
+                        msg.id_mensagem,
+                        conteudo,
+                        persistencia,
+                        hash_conteudo=hash_conteudo,
+                    )
 
         except Exception as e:
-            error_detail = f"Falha ao processar o e-mail: {msg.Subject if 'msg' in locals() else 'Desconhecido'}."
-            print_log("ERROR", f"{error_detail} Detalhes: {e}")
-            logger_quantum.error(error_detail, exc=e)
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Falha ao processar o e-mail: {assunto}. Detalhes: {erro}",
+                exc=e,
+                assunto=msg.assunto if msg is not None else "Desconhecido",
+                erro=str(e),
+            )
 
     if not email_encontrado:
-        print_log(
+        registrar_evento(
             "AVISO",
-            "Nenhum e-mail correspondente encontrado nos e-mails de hoje.",
+            ETAPA,
+            "Nenhum e-mail correspondente encontrado nos e-mails de {data:%d/%m/%Y}.",
             theme_color=Fore.YELLOW,
+            data=data,
         )
-        logger_quantum.info("Nenhum e-mail do Quantum encontrado para a data de hoje.")
     print_log("INFO", "--- BUSCA POR E-MAIL CONCLUÍDA ---", theme_color=Fore.CYAN)
+
+
+def extrair_excel_email(
+    pasta_raiz_quantum: str,
+    headline_prefix: str,
+    caixa_postal: CaixaPostal = None,
+    usar_indice: bool = True,
+    data: date = None,
+):
+    """
+    Busca e-mails recentes na caixa postal, encontra um com um assunto específico
+    e salva seu anexo .xlsx.
+
+    Por padrão a função se conecta à conta 'asa.com.br' no Outlook (ou à caixa
+    postal local definida em CAIXA_POSTAL_LOCAL) e procura na Caixa de Entrada
+    pelos e-mails mais recentes recebidos no dia atual (ou em `data`) que correspondam ao
+    'headline_prefix'. Ao encontrar o primeiro e-mail correspondente, salva seu
+    anexo .xlsx na pasta raiz especificada e aguarda a gravação terminar.
+
+    Args:
+            pasta_raiz_quantum (str): O caminho da pasta onde o anexo Excel será salvo.
+            headline_prefix (str): O prefixo ou sufixo do assunto do e-mail a ser procurado.
+            caixa_postal (CaixaPostal): A fonte de e-mails; se omitida, usa `criar_caixa_postal()`.
+            usar_indice (bool): Se False, ignora o índice de mensagens já processadas.
+            data (date): O dia de recebimento procurado (padrão: hoje).
+
+    Returns:
+            str: O nome do arquivo salvo, ou None.
+    """
+    anexo = ingerir_excel_email(
+        pasta_raiz_quantum, headline_prefix, caixa_postal, usar_indice, data
+    )
+    if anexo is None or not anexo.aguardar_persistencia():
+        return None
+    return anexo.nome
+
+
+def observar_excel_email(
+    pasta_raiz_quantum: str,
+    headline_prefix: str,
+    prazo_segundos: float,
+    caixa_postal: CaixaPostal = None,
+):
+    """
+    Aguarda a chegada do e-mail com o anexo .xlsx, reagindo a novas mensagens.
+
+    Em vez de repetir a conexão e a busca em intervalos fixos, mantém a mesma
+    caixa postal aberta e só refaz a busca quando ela sinaliza uma nova mensagem
+    (evento NewMailEx no Outlook, alteração da pasta no backend local).
+
+    Args:
+            pasta_raiz_quantum (str): O caminho da pasta onde o anexo Excel será salvo.
+            headline_prefix (str): O prefixo ou sufixo do assunto do e-mail a ser procurado.
+            prazo_segundos (float): Tempo máximo de espera pelo e-mail.
+            caixa_postal (CaixaPostal): A fonte de e-mails; se omitida, usa `criar_caixa_postal()`.
+
+    Returns:
+            str: O nome do arquivo salvo, ou None se o prazo terminar sem o anexo.
+    """
+    if caixa_postal is None:
+        caixa_postal = criar_caixa_postal()
+
+    limite = time.monotonic() + prazo_segundos
+    nome_arquivo = extrair_excel_email(
+        pasta_raiz_quantum, headline_prefix, caixa_postal
+    )
+    while nome_arquivo is None and caixa_postal.conectar():
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            break
+        print_log(
+            "INFO",
+            f"Aguardando novas mensagens por até {restante:.0f} segundos...",
+            theme_color=Fore.CYAN,
+        )
+        console.descarregar()
+        if not caixa_postal.aguardar_novas_mensagens(restante):
+            break
+        nome_arquivo = extrair_excel_email(
+            pasta_raiz_quantum, headline_prefix, caixa_postal
+        )
+
+    if nome_arquivo is None:
+        registrar_evento(
+            "AVISO",
+            ETAPA,
+            "Prazo de observação de {prazo_s:.0f} segundos encerrado.",
+            theme_color=Fore.YELLOW,
+            prazo_s=prazo_segundos,
+        )
+    return nome_arquivo
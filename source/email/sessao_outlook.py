@@ -0,0 +1,209 @@
+import os
+import sys
+import time
+
+from colorama import Fore
+
+# Importações locais padronizadas
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+
+ETAPA = "extracao"
+
+# Ajusta o PATH se estiver rodando como um executável PyInstaller
+if getattr(sys, "frozen", False):
+    dll_path = os.path.join(sys._MEIPASS, "libs")
+    os.environ["PATH"] = dll_path + os.pathsep + os.environ.get("PATH", "")
+
+
+def _dispatch_outlook(prog_id: str):
+    """Cria o objeto COM da aplicação (importa o win32com apenas quando necessário)."""
+    import win32com.client
+
+    return win32com.client.Dispatch(prog_id)
+
+
+def _reiniciar_processo_outlook():
+    """Força o encerramento do Outlook e o inicia novamente."""
+    os.system("taskkill /f /im outlook.exe > nul 2>&1")
+    os.startfile("outlook.exe")
+
+
+class SessaoOutlook:
+    """
+    Mantém uma única conexão com o Outlook (namespace MAPI, conta e Caixa de
+    Entrada) durante toda a vida do processo.
+
+    A cada uso o handle da Caixa de Entrada é verificado com uma única chamada
+    COM; o Outlook só é reiniciado quando a conexão de fato não responde, e a
+    prontidão após o reinício é verificada com espera exponencial em vez de
+    pausas fixas. `dispatch`, `reiniciar_outlook` e `dormir` podem ser trocados
+    por objetos falsos para testes e benchmarks.
+
+    `conexoes` conta as conexões abertas: quem guarda objetos ligados à
+    aplicação (como a assinatura de eventos) compara o valor para saber se a
+    sessão foi reaberta.
+    """
+
+    def __init__(
+        self,
+        dominio_conta: str = "@asa.com.br",
+        nome_pasta: str = "Caixa de Entrada",
+        dispatch=_dispatch_outlook,
+        reiniciar_outlook=_reiniciar_processo_outlook,
+        dormir=time.sleep,
+        espera_inicial: float = 0.5,
+        espera_maxima: float = 8.0,
+        prazo_reinicio: float = 60.0,
+    ):
+        self.dominio_conta = dominio_conta
+        self.nome_pasta = nome_pasta
+        self._dispatch = dispatch
+        self._reiniciar_outlook = reiniciar_outlook
+        self._dormir = dormir
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.prazo_reinicio = prazo_reinicio
+        self._namespace = None
+        self._inbox = None
+        self.conexoes = 0
+        self.reinicios = 0
+
+    def invalidar(self):
+        """Descarta os handles atuais; a próxima chamada abre uma nova conexão."""
+        self._namespace = None
+        self._inbox = None
+
+    def _saudavel(self) -> bool:
+        """Verificação barata: uma única propriedade COM da Caixa de Entrada."""
+        try:
+            _ = self._inbox.EntryID
+            return True
+        except Exception as e:
+            logger_quantum.error(f"Sessão do Outlook não respondeu: {e}", exc=e)
+            return False
+
+    def _conectar(self) -> bool:
+        """
+        Abre o namespace MAPI e localiza a Caixa de Entrada da conta.
+
+        Returns:
+                bool: False se a conta ou a pasta não existirem.
+
+        Raises:
+                Exception: Se a comunicação com o Outlook falhar.
+        """
+        outlook_app = self._dispatch("Outlook.Application")
+        namespace = outlook_app.GetNamespace("MAPI")
+        pastas = namespace.Folders  # Acesso para forçar a inicialização
+        self._namespace = namespace
+        self.conexoes += 1
+
+        conta = next(
+            (f for f in pastas if self.dominio_conta in f.Name.lower()),
+            None,
+        )
+        if not conta:
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Conta de e-mail da ASA não foi encontrada no Outlook.",
+                conta=self.dominio_conta,
+            )
+            return False
+        self._inbox = conta.Folders[self.nome_pasta]
+        return True
+
+    def _aguardar_pronto(self) -> bool:
+        """Tenta conectar com espera exponencial até o Outlook responder ou o prazo acabar."""
+        espera = self.espera_inicial
+        decorrido = 0.0
+        while decorrido < self.prazo_reinicio:
+            self._dormir(espera)
+            decorrido += espera
+            try:
+                return self._conectar()
+            except Exception as e:
+                logger_quantum.info(
+                    f"Outlook ainda não está pronto após {decorrido:.1f}s: {e}"
+                )
+                espera = min(espera * 2, self.espera_maxima)
+        return False
+
+    def _reconectar(self) -> bool:
+        theme_color = Fore.BLUE
+        print_log("AÇÃO", "Conectando ao Outlook...", theme_color=theme_color)
+        try:
+            conectado = self._conectar()
+        except Exception as e:
+            registrar_evento(
+                "AVISO",
+                ETAPA,
+                "Falha ao conectar ao Outlook: {erro}. Tentando reiniciar o aplicativo.",
+                theme_color=Fore.YELLOW,
+                exc=e,
+                erro=str(e),
+            )
+        else:
+            # Sem a conta ou a pasta, reiniciar o Outlook não resolve
+            if conectado:
+                registrar_evento(
+                    "INFO",
+                    ETAPA,
+                    "Conexão com o Outlook estabelecida com sucesso.",
+                    theme_color=theme_color,
+                )
+            return conectado
+
+        self.invalidar()
+        self.reinicios += 1
+        self._reiniciar_outlook()
+        if self._aguardar_pronto():
+            registrar_evento(
+                "INFO",
+                ETAPA,
+                "Conexão com o Outlook restabelecida após reinicialização.",
+                theme_color=theme_color,
+                reinicios=self.reinicios,
+            )
+            return True
+
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Não foi possível conectar ao Outlook mesmo após reiniciar"
+            " (prazo de {prazo_s:.0f}s).",
+            prazo_s=self.prazo_reinicio,
+        )
+        return False
+
+    def obter_caixa_entrada(self):
+        """
+        Devolve o handle da Caixa de Entrada, reaproveitando a conexão atual
+        enquanto ela responder.
+
+        Returns:
+                O objeto COM da Caixa de Entrada, ou None se não for possível conectar.
+        """
+        if self._inbox is not None:
+            if self._saudavel():
+                return self._inbox
+            print_log(
+                "AVISO",
+                "A conexão com o Outlook deixou de responder. Reconectando...",
+                theme_color=Fore.YELLOW,
+            )
+            self.invalidar()
+
+        if not self._reconectar():
+            return None
+        return self._inbox
+
+    def obter_namespace(self):
+        """Devolve o namespace MAPI da sessão, conectando se necessário."""
+        if self.obter_caixa_entrada() is None and self._namespace is None:
+            return None
+        return self._namespace
+
+
+# Sessão compartilhada por todo o processo
+sessao_outlook = SessaoOutlook()
@@ -0,0 +1,308 @@
+import json
+import numbers
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from colorama import Fore
+
+# Importações locais
+from source.email.caixa_postal import (
+    CaixaPostal,
+    assunto_corresponde,
+    criar_caixa_postal,
+)
+from source.email.extrair_excel_email import (
+    normalizar_nome_anexo,
+    salvar_anexo_excel,
+)
+from source.indice.armazem_anexos import armazem_da_pasta
+from source.indice.indice_processados import indice_da_pasta
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
+from source.manipulacao_excel.manipulacao_excel import (
+    ContagemParcial,
+    PlanilhaValidada,
+    validar_arquivo_excel,
+)
+from source.qualidade.motor_regras import MotorRegras, RelatorioQualidade
+from source.servico.agenda import ExpressaoCron
+
+ETAPA = "lote"
+
+
+class Feed:
+    """
+    Um relatório recebido por e-mail: o prefixo do assunto que o identifica,
+    a pasta onde seus anexos são salvos e a regra de validação aplicada.
+
+    Se `regras` for informado (uma lista de regras ou o caminho de um arquivo
+    JSON/YAML), as regras de qualidade substituem a contagem de NaNs de
+    `coluna` contra `limites_null`. A `agenda` (expressão cron) é usada pelo
+    modo serviço; sem ela, vale AGENDA_SERVICO.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        headline_prefix: str,
+        pasta_destino: str,
+        coluna: str = "Retorno",
+        limites_null: int = 30,
+        regras=None,
+        agenda: str = None,
+    ):
+        self.nome = nome
+        self.headline_prefix = headline_prefix
+        self.pasta_destino = Path(pasta_destino)
+        self.coluna = coluna
+        self.limites_null = limites_null
+        self.motor = MotorRegras.de_config(regras) if regras else None
+        self.agenda = ExpressaoCron(agenda) if agenda else None
+
+
+class ResultadoFeed:
+    """Arquivos, validações e tempos de um feed em uma execução em lote."""
+
+    def __init__(self, feed: Feed):
+        self.feed = feed
+        self.arquivos = []
+        # Conteúdo dos anexos mantidos só em memória (sem persistir), por caminho
+        self.conteudos = {}
+        self.validacoes = {}
+        self.tempo_extracao = 0.0
+        self.tempo_validacao = 0.0
+
+    @property
+    def status(self) -> str:
+        if not self.arquivos:
+            return "SEM ARQUIVO"
+        if all(isinstance(r, PlanilhaValidada) for r in self.validacoes.values()):
+            return "OK"
+        return "FALHA"
+
+    def contagens_excedidas(self):
+        """Contagens de NaN dos arquivos que excederam o limite do feed."""
+        # A leitura completa devolve numpy.int64, a leitura em streaming int (ou
+        # uma ContagemParcial, mantida para que o alerta mostre "> limite")
+        return [
+            r if isinstance(r, ContagemParcial) else int(r)
+            for r in self.validacoes.values()
+            if isinstance(r, numbers.Integral)
+        ]
+
+    def arquivos_ilegiveis(self):
+        """Nomes dos arquivos que não puderam ser lidos (validação sem resultado)."""
+        return [nome for nome, r in self.validacoes.items() if r is None]
+
+    def relatorios_com_falha(self):
+        """Relatórios dos arquivos reprovados pelas regras de qualidade do feed."""
+        return [
+            r for r in self.validacoes.values() if isinstance(r, RelatorioQualidade)
+        ]
+
+
+def carregar_feeds(caminho_config: str):
+    """
+    Lê a configuração dos feeds de um arquivo JSON no formato:
+
+        {"feeds": [{"nome": "quantum", "headline_prefix": "Daily Fundos",
+                    "pasta_destino": "W:/quantum", "coluna": "Retorno",
+                    "limites_null": 30}]}
+
+    Cada feed pode ter também "regras": uma lista de regras de qualidade ou o
+    caminho de um arquivo com elas (veja `source.qualidade.motor_regras`), e
+    "agenda": a expressão cron do feed no modo serviço (ex: "*/15 7-10 * * 1-5").
+
+    Returns:
+            list[Feed]: Os feeds configurados.
+    """
+    with open(caminho_config, encoding="utf-8") as f:
+        config = json.load(f)
+    return [Feed(**item) for item in config["feeds"]]
+
+
+def _armazenados(feed: Feed, id_mensagem: str):
+    """
+    Os anexos de uma mensagem guardados no armazém do feed, para quando o
+    arquivo publicado na pasta foi substituído por outro com o mesmo nome.
+    """
+    armazem = armazem_da_pasta(feed.pasta_destino)
+    return [
+        armazem.caminho(hash_conteudo)
+        for _, hash_conteudo in armazem.anexos_da_mensagem(id_mensagem)
+    ]
+
+
+def _extrair_anexos_dos_feeds(
+    caixa_postal: CaixaPostal, feeds, resultados, persistir: bool = True
+):
+    """
+    Percorre a caixa de entrada uma única vez com o filtro de todos os prefixos e
+    encaminha cada anexo .xlsx das mensagens correspondentes para o seu feed.
+    Sem `persistir`, os anexos novos ficam apenas em memória e nada é
+    registrado no índice.
+    """
+    theme_color = Fore.CYAN
+    prefixos = tuple(feed.headline_prefix for feed in feeds)
+    indices = {feed.nome: indice_da_pasta(feed.pasta_destino) for feed in feeds}
+
+    for msg in caixa_postal.buscar_mensagens(prefixos, datetime.now().date()):
+        inicio = time.perf_counter()
+        try:
+            assunto = msg.assunto
+            destinos = [
+                f for f in feeds if assunto_corresponde(assunto, f.headline_prefix)
+            ]
+            registrar_evento(
+                "INFO",
+                ETAPA,
+                "E-mail '{assunto}' encaminhado para os feeds: {feeds}",
+                theme_color=theme_color,
+                assunto=assunto,
+                id_mensagem=msg.id_mensagem,
+                feeds=", ".join(f.nome for f in destinos),
+            )
+
+            pendentes = []
+            for feed in destinos:
+                existentes = indices[feed.nome].anexos_processados(
+                    msg.id_mensagem
+                ) or _armazenados(feed, msg.id_mensagem)
+                if existentes:
+                    resultados[feed.nome].arquivos.extend(existentes)
+                else:
+                    pendentes.append(feed)
+
+            if pendentes:
+                for anexo in msg.anexos:
+                    if not anexo.nome.lower().endswith(".xlsx"):
+                        continue
+                    for feed in pendentes:
+                        if not persistir:
+                            caminho = feed.pasta_destino / normalizar_nome_anexo(
+                                anexo.nome
+                            )
+                            resultados[feed.nome].arquivos.append(caminho)
+                            resultados[feed.nome].conteudos[caminho] = anexo.ler_bytes()
+                            continue
+                        nome_arquivo = salvar_anexo_excel(
+                            anexo,
+                            feed.pasta_destino,
+                            msg.id_mensagem,
+                            indices[feed.nome],
+                            msg.recebido_em.date(),
+                        )
+                        resultados[feed.nome].arquivos.append(
+                            feed.pasta_destino / nome_arquivo
+                        )
+        except Exception as e:
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Falha ao processar o e-mail: {assunto}. Detalhes: {erro}",
+                exc=e,
+                assunto=msg.assunto,
+                erro=str(e),
+            )
+            continue
+
+        duracao = time.perf_counter() - inicio
+        for feed in destinos:
+            resultados[feed.nome].tempo_extracao += duracao / len(destinos)
+
+
+def _validar_feed(resultado: ResultadoFeed, persistir: bool = True):
+    """
+    Valida todos os arquivos de um feed com a regra do próprio feed. Sem
+    `persistir`, a validação não grava resultados nem histórico no índice.
+    """
+    feed = resultado.feed
+    inicio = time.perf_counter()
+    indice = indice_da_pasta(feed.pasta_destino) if persistir else None
+    for caminho in resultado.arquivos:
+        resultado.validacoes[caminho.name] = validar_arquivo_excel(
+            caminho,
+            feed.limites_null,
+            coluna=feed.coluna,
+            indice=indice,
+            conteudo=resultado.conteudos.get(caminho),
+            motor=feed.motor,
+        )
+    resultado.tempo_validacao = time.perf_counter() - inicio
+    return resultado
+
+
+def processar_feeds(
+    feeds,
+    caixa_postal: CaixaPostal = None,
+    max_workers: int = None,
+    persistir: bool = True,
+):
+    """
+    Processa vários feeds em uma única passada pela caixa de entrada.
+
+    Todos os anexos .xlsx das mensagens de hoje que correspondem a algum
+    prefixo são salvos na pasta do respectivo feed (inclusive vários anexos por
+    mensagem). Em seguida as validações dos feeds são executadas em paralelo.
+    Com `persistir=False` (simulação), os anexos novos são validados em memória
+    e nada é gravado na pasta nem no índice dos feeds.
+
+    Args:
+            feeds (list[Feed]): Os feeds a processar.
+            caixa_postal (CaixaPostal): A fonte de e-mails; se omitida, usa `criar_caixa_postal()`.
+            max_workers (int): Número máximo de validações simultâneas (padrão: um por feed).
+            persistir (bool): Se False, não grava os anexos nem registra nada no índice.
+
+    Returns:
+            list[ResultadoFeed]: O resultado de cada feed, na ordem da configuração,
+            ou None se não for possível acessar a caixa postal.
+    """
+    theme_color = Fore.CYAN
+    print_log(
+        "INFO",
+        f"--- INICIANDO PROCESSAMENTO EM LOTE DE {len(feeds)} FEEDS ---",
+        theme_color=theme_color,
+    )
+    if caixa_postal is None:
+        caixa_postal = criar_caixa_postal()
+    if not caixa_postal.conectar():
+        return None
+
+    resultados = {feed.nome: ResultadoFeed(feed) for feed in feeds}
+    inicio = time.perf_counter()
+    _extrair_anexos_dos_feeds(caixa_postal, feeds, resultados, persistir)
+    logger_quantum.info(
+        f"Passada única pela caixa de entrada concluída em"
+        f" {time.perf_counter() - inicio:.2f}s."
+    )
+    console.descarregar()
+
+    com_arquivos = [r for r in resultados.values() if r.arquivos]
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(com_arquivos))) as ex:
+        list(ex.map(partial(_validar_feed, persistir=persistir), com_arquivos))
+
+    for resultado in resultados.values():
+        registrar_evento(
+            "INFO",
+            ETAPA,
+            "Feed '{feed}': {status} | {arquivos} arquivo(s) |"
+            " extração {tempo_extracao:.2f}s | validação {tempo_validacao:.2f}s",
+            theme_color=theme_color,
+            feed=resultado.feed.nome,
+            status=resultado.status,
+            arquivos=len(resultado.arquivos),
+            tempo_extracao=round(resultado.tempo_extracao, 4),
+            tempo_validacao=round(resultado.tempo_validacao, 4),
+        )
+    print_log(
+        "INFO", "--- PROCESSAMENTO EM LOTE CONCLUÍDO ---", theme_color=theme_color
+    )
+    console.descarregar()
+    return list(resultados.values())
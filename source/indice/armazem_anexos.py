@@ -0,0 +1,221 @@
+import os
+import shutil
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+# Importações locais
+from source.indice.indice_processados import (
+    NOME_ARQUIVO_INDICE,
+    calcular_hash_conteudo,
+    conectar_banco,
+)
+from source.logger.logger_config import logger_quantum
+
+PASTA_ARMAZEM = ".anexos"
+
+
+class ArmazemAnexos:
+    """
+    Armazém endereçado por conteúdo dos anexos de uma pasta: cada anexo é
+    gravado uma única vez, em `.anexos/<2 primeiros dígitos>/<sha256>.xlsx`, e
+    um manifesto no banco do `IndiceProcessados` liga cada mensagem (e a data
+    de recebimento) ao hash do seu anexo.
+
+    Um reenvio idêntico custa apenas o cálculo do hash; anexos diferentes com o
+    mesmo nome não se sobrescrevem, pois cada conteúdo tem o seu arquivo. A
+    leitura por hash monta o caminho diretamente, sem listar a pasta.
+    """
+
+    def __init__(self, caminho_pasta: Path):
+        self.caminho_pasta = Path(caminho_pasta)
+        self.pasta_blobs = self.caminho_pasta / PASTA_ARMAZEM
+        self.caminho_pasta.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = conectar_banco(self.caminho_pasta / NOME_ARQUIVO_INDICE)
+        with self._conexao:
+            self._conexao.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS anexos_armazenados (
+                    id_mensagem TEXT NOT NULL,
+                    nome_anexo TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    armazenado_em TEXT NOT NULL,
+                    PRIMARY KEY (id_mensagem, nome_anexo)
+                );
+                CREATE INDEX IF NOT EXISTS ix_armazenados_data
+                    ON anexos_armazenados (data);
+                CREATE INDEX IF NOT EXISTS ix_armazenados_hash
+                    ON anexos_armazenados (hash);
+                CREATE TABLE IF NOT EXISTS anexos_publicados (
+                    arquivo TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                );
+                """
+            )
+
+    def caminho(self, hash_conteudo: str) -> Path:
+        """O caminho do conteúdo com o hash informado (exista ou não)."""
+        return self.pasta_blobs / hash_conteudo[:2] / f"{hash_conteudo}.xlsx"
+
+    def contem(self, hash_conteudo: str, tamanho: int = None) -> bool:
+        """Indica se o conteúdo está no armazém (e tem o tamanho esperado, se informado)."""
+        try:
+            info = self.caminho(hash_conteudo).stat()
+        except FileNotFoundError:
+            return False
+        return tamanho is None or info.st_size == tamanho
+
+    def ler(self, hash_conteudo: str) -> bytes:
+        """Lê um conteúdo do armazém pelo hash (FileNotFoundError se não existir)."""
+        return self.caminho(hash_conteudo).read_bytes()
+
+    def guardar(
+        self,
+        conteudo: bytes,
+        id_mensagem: str,
+        nome_anexo: str,
+        data: date,
+        hash_conteudo: str = None,
+    ):
+        """
+        Guarda o conteúdo de um anexo (se ainda não estiver no armazém) e o
+        registra no manifesto para a mensagem.
+
+        Args:
+                conteudo (bytes): O conteúdo do anexo.
+                id_mensagem (str): O identificador da mensagem.
+                nome_anexo (str): O nome original do anexo.
+                data (date): A data de recebimento da mensagem.
+                hash_conteudo (str): O SHA-256 do conteúdo, se já calculado.
+
+        Returns:
+                tuple: (hash do conteúdo, True se o conteúdo foi gravado agora ou
+                False se já estava no armazém)
+        """
+        hash_conteudo = hash_conteudo or calcular_hash_conteudo(conteudo)
+        gravado = not self.contem(hash_conteudo, len(conteudo))
+        if gravado:
+            destino = self.caminho(hash_conteudo)
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            temporario = destino.with_name(
+                f".{destino.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temporario, "wb") as f:
+                f.write(conteudo)
+            os.replace(temporario, destino)
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO anexos_armazenados VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    id_mensagem,
+                    nome_anexo,
+                    data.isoformat(),
+                    hash_conteudo,
+                    len(conteudo),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        return hash_conteudo, gravado
+
+    def publicar(self, hash_conteudo: str, caminho: Path) -> bool:
+        """
+        Coloca uma cópia do conteúdo na pasta com o nome de exibição `caminho`,
+        substituindo o arquivo anterior de forma atômica.
+
+        A cópia (e não um link físico) garante que editar o arquivo publicado
+        não altera o conteúdo do armazém, do qual outras mensagens podem
+        depender. O tamanho e a data de modificação da cópia ficam registrados:
+        se o arquivo publicado continuar como foi deixado, um reenvio idêntico
+        não copia nada.
+
+        Returns:
+                bool: False se `caminho` já era o conteúdo informado.
+        """
+        origem = self.caminho(hash_conteudo)
+        caminho = Path(caminho)
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT hash, tamanho, mtime_ns FROM anexos_publicados"
+                " WHERE arquivo = ?",
+                (caminho.name,),
+            ).fetchone()
+        try:
+            info = caminho.stat()
+            atual = (hash_conteudo, info.st_size, info.st_mtime_ns)
+            if registro is not None and tuple(registro) == atual:
+                return False
+        except FileNotFoundError:
+            pass
+        temporario = caminho.with_name(
+            f".{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        shutil.copyfile(origem, temporario)
+        info = temporario.stat()
+        os.replace(temporario, caminho)
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO anexos_publicados VALUES (?, ?, ?, ?)",
+                (caminho.name, hash_conteudo, info.st_size, info.st_mtime_ns),
+            )
+        return True
+
+    def anexos_da_mensagem(self, id_mensagem: str):
+        """
+        Lista os anexos armazenados de uma mensagem cujo conteúdo continua no
+        armazém.
+
+        Returns:
+                list[tuple]: (nome do anexo, hash), na ordem em que foram armazenados.
+        """
+        with self._lock:
+            registros = self._conexao.execute(
+                "SELECT nome_anexo, hash, tamanho FROM anexos_armazenados"
+                " WHERE id_mensagem = ? ORDER BY armazenado_em, rowid",
+                (id_mensagem,),
+            ).fetchall()
+        return [
+            (nome_anexo, hash_conteudo)
+            for nome_anexo, hash_conteudo, tamanho in registros
+            if self.contem(hash_conteudo, tamanho)
+        ]
+
+    def por_data(self, inicio: date, fim: date = None):
+        """
+        Lista os anexos recebidos entre `inicio` e `fim` (inclusive; padrão: só
+        `inicio`), pela data de recebimento.
+
+        Returns:
+                list[tuple]: (data, id da mensagem, nome do anexo, hash), por data.
+        """
+        fim = fim or inicio
+        with self._lock:
+            registros = self._conexao.execute(
+                "SELECT data, id_mensagem, nome_anexo, hash FROM anexos_armazenados"
+                " WHERE data >= ? AND data <= ? ORDER BY data, armazenado_em, rowid",
+                (inicio.isoformat(), fim.isoformat()),
+            ).fetchall()
+        return [
+            (date.fromisoformat(data), id_mensagem, nome_anexo, hash_conteudo)
+            for data, id_mensagem, nome_anexo, hash_conteudo in registros
+        ]
+
+
+_armazens_abertos = {}
+_lock_armazens = threading.Lock()
+
+
+def armazem_da_pasta(caminho_pasta) -> ArmazemAnexos:
+    """Devolve o armazém de anexos da pasta, abrindo-o apenas uma vez por processo."""
+    caminho_pasta = Path(caminho_pasta).resolve()
+    with _lock_armazens:
+        armazem = _armazens_abertos.get(caminho_pasta)
+        if armazem is None:
+            armazem = ArmazemAnexos(caminho_pasta)
+            _armazens_abertos[caminho_pasta] = armazem
+            logger_quantum.info(f"Armazém de anexos aberto em: {armazem.pasta_blobs}")
+        return armazem
@@ -0,0 +1,373 @@
+import hashlib
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+# Importações locais
+from source.logger.logger_config import logger_quantum
+
+NOME_ARQUIVO_INDICE = ".quantum_indice.sqlite3"
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+def calcular_hash_arquivo(caminho: Path) -> str:
+    """Calcula o SHA-256 do conteúdo de um arquivo, lendo-o em blocos."""
+    sha256 = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b""):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def conectar_banco(caminho_banco: Path) -> sqlite3.Connection:
+    """
+    Abre o banco de índices da pasta. O diário em modo TRUNCATE permanece na
+    pasta entre as transações, em vez de ser criado e apagado a cada uma, e
+    assim não altera a data de modificação da pasta (veja `ManifestoPasta`).
+    """
+    conexao = sqlite3.connect(caminho_banco, check_same_thread=False, timeout=30)
+    conexao.execute("PRAGMA journal_mode=TRUNCATE")
+    return conexao
+
+
+def calcular_hash_conteudo(conteudo: bytes) -> str:
+    """Calcula o SHA-256 de um conteúdo já carregado em memória."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+class IndiceProcessados:
+    """
+    Índice persistente (SQLite) dos e-mails e anexos já processados e das
+    validações já executadas.
+
+    Os anexos são indexados pelo identificador da mensagem (EntryID no Outlook,
+    Message-ID nos backends locais) junto com o hash do conteúdo salvo; as
+    validações são indexadas pelo hash do arquivo, pela coluna e pelo limite.
+    Execuções repetidas no mesmo dia reaproveitam esses registros.
+
+    O índice guarda também o histórico diário das planilhas validadas (linhas,
+    hash das colunas-chave e estatísticas por coluna), consultado pelas
+    verificações de tendência sem reler as planilhas antigas.
+    """
+
+    def __init__(self, caminho_banco: Path):
+        self.caminho_banco = Path(caminho_banco)
+        self.caminho_banco.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = conectar_banco(self.caminho_banco)
+        with self._conexao:
+            self._conexao.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS anexos_processados (
+                    id_mensagem TEXT NOT NULL,
+                    nome_anexo TEXT NOT NULL,
+                    arquivo TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    processado_em TEXT NOT NULL,
+                    PRIMARY KEY (id_mensagem, nome_anexo)
+                );
+                CREATE INDEX IF NOT EXISTS ix_anexos_arquivo
+                    ON anexos_processados (arquivo);
+                CREATE TABLE IF NOT EXISTS validacoes (
+                    hash TEXT NOT NULL,
+                    coluna TEXT NOT NULL,
+                    limite INTEGER NOT NULL,
+                    contagem_nan INTEGER NOT NULL,
+                    validado_em TEXT NOT NULL,
+                    PRIMARY KEY (hash, coluna, limite)
+                );
+                CREATE TABLE IF NOT EXISTS linhas_por_data (
+                    data TEXT PRIMARY KEY,
+                    linhas INTEGER NOT NULL,
+                    registrado_em TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS estatisticas_colunas (
+                    data TEXT NOT NULL,
+                    coluna TEXT NOT NULL,
+                    nulos INTEGER NOT NULL,
+                    minimo REAL,
+                    maximo REAL,
+                    media REAL,
+                    PRIMARY KEY (coluna, data)
+                );
+                CREATE INDEX IF NOT EXISTS ix_estatisticas_data
+                    ON estatisticas_colunas (data);
+                """
+            )
+            # Índices criados antes do histórico não têm o hash das colunas-chave
+            colunas = {
+                linha[1]
+                for linha in self._conexao.execute("PRAGMA table_info(linhas_por_data)")
+            }
+            if "hash_chaves" not in colunas:
+                self._conexao.execute(
+                    "ALTER TABLE linhas_por_data ADD COLUMN hash_chaves TEXT"
+                )
+
+    def anexos_processados(self, id_mensagem: str):
+        """
+        Lista os anexos já salvos de uma mensagem cujos arquivos continuam
+        intactos no disco (mesmo tamanho e data de modificação).
+
+        Returns:
+                list[Path]: Os caminhos dos arquivos salvos (vazia se a mensagem for nova).
+        """
+        with self._lock:
+            registros = self._conexao.execute(
+                "SELECT arquivo, tamanho, mtime_ns FROM anexos_processados"
+                " WHERE id_mensagem = ? ORDER BY processado_em, rowid",
+                (id_mensagem,),
+            ).fetchall()
+        intactos = []
+        for arquivo, tamanho, mtime_ns in registros:
+            caminho = self.caminho_banco.parent / arquivo
+            try:
+                info = caminho.stat()
+            except FileNotFoundError:
+                continue
+            if info.st_size == tamanho and info.st_mtime_ns == mtime_ns:
+                intactos.append(caminho)
+        return intactos
+
+    def anexo_processado(self, id_mensagem: str):
+        """
+        Procura um anexo já salvo de uma mensagem cujo arquivo continua intacto.
+
+        Returns:
+                Path: O caminho do arquivo salvo, ou None se a mensagem for nova.
+        """
+        intactos = self.anexos_processados(id_mensagem)
+        return intactos[0] if intactos else None
+
+    def mensagem_registrada(self, id_mensagem: str) -> bool:
+        """
+        Indica se algum anexo da mensagem foi registrado por uma execução
+        diária, mesmo que o arquivo salvo não esteja mais intacto.
+        """
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT 1 FROM anexos_processados WHERE id_mensagem = ? LIMIT 1",
+                (id_mensagem,),
+            ).fetchone()
+        return registro is not None
+
+    def registrar_anexo(
+        self,
+        id_mensagem: str,
+        nome_anexo: str,
+        caminho: Path,
+        hash_conteudo: str = None,
+    ) -> str:
+        """
+        Registra um anexo salvo e devolve o hash do seu conteúdo (calculado a
+        partir do arquivo, se não for informado).
+        """
+        caminho = Path(caminho)
+        hash_conteudo = hash_conteudo or calcular_hash_arquivo(caminho)
+        info = caminho.stat()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO anexos_processados VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    id_mensagem,
+                    nome_anexo,
+                    caminho.name,
+                    hash_conteudo,
+                    info.st_size,
+                    info.st_mtime_ns,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        return hash_conteudo
+
+    def hash_do_arquivo(self, caminho: Path) -> str:
+        """
+        Devolve o hash do conteúdo de um arquivo da pasta, usando o valor já
+        registrado quando tamanho e data de modificação não mudaram.
+        """
+        caminho = Path(caminho)
+        info = caminho.stat()
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT hash FROM anexos_processados"
+                " WHERE arquivo = ? AND tamanho = ? AND mtime_ns = ?",
+                (caminho.name, info.st_size, info.st_mtime_ns),
+            ).fetchone()
+        if registro:
+            return registro[0]
+        return calcular_hash_arquivo(caminho)
+
+    def validacao_registrada(self, hash_conteudo: str, coluna: str, limite: int):
+        """Devolve a contagem de NaNs já calculada para o arquivo, ou None."""
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT contagem_nan FROM validacoes"
+                " WHERE hash = ? AND coluna = ? AND limite = ?",
+                (hash_conteudo, coluna, limite),
+            ).fetchone()
+        return registro[0] if registro else None
+
+    def registrar_validacao(
+        self, hash_conteudo: str, coluna: str, limite: int, contagem_nan: int
+    ):
+        """Guarda o resultado de uma validação para reaproveitamento."""
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO validacoes VALUES (?, ?, ?, ?, ?)",
+                (
+                    hash_conteudo,
+                    coluna,
+                    limite,
+                    int(contagem_nan),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def linhas_anteriores(self, data: date):
+        """Quantidade de linhas da planilha mais recente anterior a `data`, ou None."""
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT linhas FROM linhas_por_data WHERE data < ?"
+                " ORDER BY data DESC LIMIT 1",
+                (data.isoformat(),),
+            ).fetchone()
+        return registro[0] if registro else None
+
+    def registrar_linhas(self, data: date, linhas: int, hash_chaves: str = None):
+        """Guarda a quantidade de linhas da planilha do dia (para a variação diária)."""
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO linhas_por_data"
+                " (data, linhas, registrado_em, hash_chaves) VALUES (?, ?, ?, ?)",
+                (
+                    data.isoformat(),
+                    int(linhas),
+                    datetime.now().isoformat(timespec="seconds"),
+                    hash_chaves,
+                ),
+            )
+
+    def registrar_estatisticas(
+        self, data: date, linhas: int, colunas: dict, hash_chaves: str = None
+    ):
+        """
+        Guarda o resumo da planilha do dia: as linhas, o hash das colunas-chave e,
+        por coluna, nulos, mínimo, máximo e média (veja `EstatisticasPlanilha`).
+        Uma nova validação no mesmo dia substitui o registro.
+        """
+        registrado_em = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO linhas_por_data"
+                " (data, linhas, registrado_em, hash_chaves) VALUES (?, ?, ?, ?)",
+                (data.isoformat(), int(linhas), registrado_em, hash_chaves),
+            )
+            self._conexao.execute(
+                "DELETE FROM estatisticas_colunas WHERE data = ?", (data.isoformat(),)
+            )
+            self._conexao.executemany(
+                "INSERT INTO estatisticas_colunas VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        data.isoformat(),
+                        coluna,
+                        int(valores["nulos"]),
+                        valores.get("minimo"),
+                        valores.get("maximo"),
+                        valores.get("media"),
+                    )
+                    for coluna, valores in colunas.items()
+                ],
+            )
+
+    def dia_anterior(self, data: date):
+        """
+        O registro da planilha mais recente anterior a `data`.
+
+        Returns:
+                tuple: (data, linhas, hash_chaves), ou None se não houver histórico.
+        """
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT data, linhas, hash_chaves FROM linhas_por_data"
+                " WHERE data < ? ORDER BY data DESC LIMIT 1",
+                (data.isoformat(),),
+            ).fetchone()
+        if registro is None:
+            return None
+        return date.fromisoformat(registro[0]), registro[1], registro[2]
+
+    def resumo_linhas(self, inicio: date, fim: date):
+        """
+        Dias, média e variância da quantidade de linhas no período [inicio, fim),
+        calculadas pelo próprio SQLite.
+
+        Returns:
+                tuple: (dias, média, variância); média e variância são None sem dias.
+        """
+        with self._lock:
+            dias, media, media_quadrados = self._conexao.execute(
+                "SELECT COUNT(*), AVG(linhas), AVG(linhas * linhas)"
+                " FROM linhas_por_data WHERE data >= ? AND data < ?",
+                (inicio.isoformat(), fim.isoformat()),
+            ).fetchone()
+        return dias, media, _variancia(media, media_quadrados)
+
+    def resumo_colunas(self, inicio: date, fim: date) -> dict:
+        """
+        Por coluna, no período [inicio, fim): dias, média e variância dos nulos e
+        da média diária dos valores.
+
+        Returns:
+                dict: {coluna: {"dias", "nulos": (média, variância),
+                        "media": (média, variância)}}
+        """
+        with self._lock:
+            registros = self._conexao.execute(
+                "SELECT coluna, COUNT(*), AVG(nulos), AVG(nulos * nulos),"
+                " AVG(media), AVG(media * media)"
+                " FROM estatisticas_colunas WHERE data >= ? AND data < ?"
+                " GROUP BY coluna",
+                (inicio.isoformat(), fim.isoformat()),
+            ).fetchall()
+        return {
+            coluna: {
+                "dias": dias,
+                "nulos": (media_nulos, _variancia(media_nulos, quadrados_nulos)),
+                "media": (media_valores, _variancia(media_valores, quadrados_valores)),
+            }
+            for (
+                coluna,
+                dias,
+                media_nulos,
+                quadrados_nulos,
+                media_valores,
+                quadrados_valores,
+            ) in registros
+        }
+
+
+def _variancia(media, media_quadrados):
+    """Variância populacional a partir de E[x] e E[x²] (sem negativos por arredondamento)."""
+    if media is None or media_quadrados is None:
+        return None
+    return max(media_quadrados - media * media, 0.0)
+
+
+_indices_abertos = {}
+_lock_indices = threading.Lock()
+
+
+def indice_da_pasta(caminho_pasta) -> IndiceProcessados:
+    """Devolve o índice da pasta de anexos, abrindo-o apenas uma vez por processo."""
+    caminho_banco = (Path(caminho_pasta) / NOME_ARQUIVO_INDICE).resolve()
+    with _lock_indices:
+        indice = _indices_abertos.get(caminho_banco)
+        if indice is None:
+            indice = IndiceProcessados(caminho_banco)
+            _indices_abertos[caminho_banco] = indice
+            logger_quantum.info(f"Índice de processados aberto em: {caminho_banco}")
+        return indice
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Importações locais
+from source.indice.indice_processados import NOME_ARQUIVO_INDICE, conectar_banco
+from source.logger.logger_config import logger_quantum
+
+EXTENSOES_EXCEL = (".xlsx", ".xls")
+
+
+def eh_planilha_excel(nome: str) -> bool:
+    """Indica se o nome é de uma planilha (ignora temporários e arquivos de trava do Excel)."""
+    return nome.lower().endswith(EXTENSOES_EXCEL) and not nome.startswith((".", "~$"))
+
+
+class ManifestoPasta:
+    """
+    Manifesto das planilhas de uma pasta (nome, data de modificação e tamanho),
+    guardado no mesmo banco SQLite do `IndiceProcessados`.
+
+    "Planilha mais recente" e "planilhas desde T" usam o índice por data de
+    modificação do banco, em vez de ordenar a listagem da pasta. O manifesto é
+    atualizado a cada anexo salvo (`registrar`) e, antes de cada consulta,
+    conciliado com a pasta por uma única passada de `os.scandir`, que compara
+    data de modificação e tamanho de cada planilha com os registrados. Só as
+    planilhas novas ou alteradas são gravadas no banco.
+
+    Nem a data de modificação da pasta nem o inode do arquivo mudam quando uma
+    planilha é sobrescrita no lugar, por isso a conciliação não os usa como
+    atalho. No Windows, `DirEntry.stat()` vem da própria listagem, sem uma
+    chamada de stat por arquivo.
+
+    O manifesto não cria a pasta: quem grava anexos a cria antes, e uma
+    consulta a uma pasta inexistente falha com `NotADirectoryError`.
+    """
+
+    def __init__(self, caminho_pasta: Path):
+        self.caminho_pasta = Path(caminho_pasta)
+        self.caminho_banco = self.caminho_pasta / NOME_ARQUIVO_INDICE
+        if not self.caminho_pasta.is_dir():
+            raise NotADirectoryError(f"A pasta não existe: {self.caminho_pasta}")
+        self._lock = threading.Lock()
+        self._conexao = conectar_banco(self.caminho_banco)
+        with self._conexao:
+            self._conexao.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS arquivos_pasta (
+                    nome TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    inode INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_arquivos_pasta_mtime
+                    ON arquivos_pasta (mtime_ns, nome);
+                """
+            )
+
+    def reconciliar(self) -> int:
+        """
+        Concilia o manifesto com o conteúdo da pasta: planilhas novas, alteradas
+        (inclusive sobrescritas no lugar) e removidas.
+
+        Returns:
+                int: A quantidade de planilhas novas, alteradas ou removidas.
+        """
+        inicio = time.perf_counter()
+        with self._lock:
+            registrados = {
+                nome: (mtime_ns, tamanho, inode)
+                for nome, mtime_ns, tamanho, inode in self._conexao.execute(
+                    "SELECT nome, mtime_ns, tamanho, inode FROM arquivos_pasta"
+                )
+            }
+
+        atuais = {}
+        with os.scandir(self.caminho_pasta) as entradas:
+            for entrada in entradas:
+                if not eh_planilha_excel(entrada.name):
+                    continue
+                try:
+                    if not entrada.is_file():
+                        continue
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                atuais[entrada.name] = (info.st_mtime_ns, info.st_size, info.st_ino)
+
+        removidos = [(nome,) for nome in registrados.keys() - atuais.keys()]
+        # O inode não entra na comparação: no Windows a listagem o informa como 0
+        alterados = [
+            (nome, *dados)
+            for nome, dados in atuais.items()
+            if registrados.get(nome, ())[:2] != dados[:2]
+        ]
+        if not removidos and not alterados:
+            return 0
+        with self._lock, self._conexao:
+            self._conexao.executemany(
+                "DELETE FROM arquivos_pasta WHERE nome = ?", removidos
+            )
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO arquivos_pasta VALUES (?, ?, ?, ?)", alterados
+            )
+        logger_quantum.info(
+            f"Manifesto de '{self.caminho_pasta}' conciliado: {len(atuais)} planilhas,"
+            f" {len(alterados)} novas ou alteradas, {len(removidos)} removidas"
+            f" ({time.perf_counter() - inicio:.3f}s)."
+        )
+        return len(alterados) + len(removidos)
+
+    def registrar(self, caminho: Path):
+        """Atualiza o manifesto com um arquivo que acabou de ser salvo na pasta."""
+        caminho = Path(caminho)
+        if not eh_planilha_excel(caminho.name):
+            return
+        info = caminho.stat()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO arquivos_pasta VALUES (?, ?, ?, ?)",
+                (caminho.name, info.st_mtime_ns, info.st_size, info.st_ino),
+            )
+
+    def mais_recente(self):
+        """
+        Devolve a planilha modificada por último.
+
+        Returns:
+                Path: O caminho da planilha, ou None se a pasta não tiver nenhuma.
+        """
+        self.reconciliar()
+        with self._lock:
+            registro = self._conexao.execute(
+                "SELECT nome FROM arquivos_pasta ORDER BY mtime_ns DESC, nome DESC"
+                " LIMIT 1"
+            ).fetchone()
+        return self.caminho_pasta / registro[0] if registro else None
+
+    def desde(self, instante: datetime):
+        """
+        Lista as planilhas modificadas a partir de `instante`, da mais antiga à
+        mais recente.
+
+        Returns:
+                list[Path]: Os caminhos das planilhas.
+        """
+        self.reconciliar()
+        limite_ns = int(instante.timestamp() * 1_000_000_000)
+        with self._lock:
+            registros = self._conexao.execute(
+                "SELECT nome FROM arquivos_pasta WHERE mtime_ns >= ?"
+                " ORDER BY mtime_ns, nome",
+                (limite_ns,),
+            ).fetchall()
+        return [self.caminho_pasta / nome for (nome,) in registros]
+
+    def planilhas(self):
+        """Lista todas as planilhas da pasta, em ordem alfabética."""
+        self.reconciliar()
+        with self._lock:
+            registros = self._conexao.execute(
+                "SELECT nome FROM arquivos_pasta ORDER BY nome"
+            ).fetchall()
+        return [self.caminho_pasta / nome for (nome,) in registros]
+
+
+_manifestos_abertos = {}
+_lock_manifestos = threading.Lock()
+
+
+def manifesto_da_pasta(caminho_pasta) -> ManifestoPasta:
+    """Devolve o manifesto da pasta de anexos, abrindo-o apenas uma vez por processo."""
+    caminho_pasta = Path(caminho_pasta).resolve()
+    with _lock_manifestos:
+        manifesto = _manifestos_abertos.get(caminho_pasta)
+        if manifesto is None:
+            manifesto = ManifestoPasta(caminho_pasta)
+            _manifestos_abertos[caminho_pasta] = manifesto
+        return manifesto
@@ -1,19 +1,21 @@
 import atexit
 import json
 import os
+import queue
+import sys
+import threading
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
 
 from colorama import Fore, Style
-from dotenv import load_dotenv
 
-load_dotenv()
+from source.configuracao.configuracao import configuracao
 
-# Carrega as variáveis de ambiente necessárias
-PASTA_LOG = os.getenv("PASTA_LOG")
+PASTA_LOG = configuracao.pasta_log
 
-# --- FUNÇÃO DE APRESENTAÇÃO PARA O TERMINAL ---
+# --- APRESENTAÇÃO NO TERMINAL ---
 LOG_COLORS = {
     "INFO": Fore.GREEN,
     "ERROR": Fore.RED,
@@ -21,95 +23,504 @@ LOG_COLORS = {
     "AÇÃO": Fore.CYAN,
 }
 
+# Ordem dos níveis para o filtro do console (NIVEL_CONSOLE)
+NIVEIS_CONSOLE = {"INFO": 10, "AÇÃO": 20, "AVISO": 30, "ERROR": 40}
 
-def print_log(level: str, message: str, theme_color: str = None):
-    """Imprime uma mensagem formatada e colorida no terminal."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    # Lógica de seleção de cor corrigida e mais clara
-    if level == "ERROR":
-        color = LOG_COLORS.get("ERROR")  # Prioridade 1: Erros são sempre vermelhos
-    elif theme_color:
-        color = theme_color  # Prioridade 2: Usar a cor do tema se ela for fornecida
-    else:
-        # Prioridade 3: Usar a cor padrão do nível, com branco como fallback
-        color = LOG_COLORS.get(level, Fore.WHITE)
-
-    print(
-        f"{color}{Style.BRIGHT}[{level}]{Style.RESET_ALL} "
-        f"{color}{Style.BRIGHT}[{timestamp}]{Style.RESET_ALL} {message}"
+# Níveis gravados na saída imediatamente: anunciam uma espera ou um problema
+NIVEIS_DESCARGA_IMEDIATA = frozenset({"AÇÃO", "AVISO", "ERROR"})
+
+
+class Evento:
+    """
+    Um evento do processo, registrado uma única vez e consumido pelo console e
+    pelo log em arquivo.
+
+    Além do nível e da etapa, o evento guarda campos tipados (arquivo, contagem
+    de nulos, duração...), gravados como chaves próprias no JSON. A mensagem é
+    um modelo preenchido com esses campos (`str.format`) apenas quando alguém a
+    lê: o console, se o nível for exibido, ou a thread de escrita do arquivo.
+    Os valores dos campos não devem ser alterados depois do registro.
+    """
+
+    __slots__ = (
+        "momento",
+        "level",
+        "etapa",
+        "modelo",
+        "campos",
+        "theme_color",
+        "excecao",
+        "_mensagem",
     )
 
+    def __init__(
+        self,
+        level: str,
+        etapa: str,
+        modelo: str,
+        campos: dict = None,
+        theme_color: str = None,
+        formatar: bool = True,
+        momento: float = None,
+    ):
+        self.momento = time.time() if momento is None else momento
+        self.level = level
+        self.etapa = etapa
+        self.modelo = modelo
+        self.campos = campos or {}
+        self.theme_color = theme_color
+        self.excecao = None
+        self._mensagem = None if formatar and campos else modelo
+
+    @property
+    def mensagem(self) -> str:
+        """A mensagem com os campos preenchidos (formatada na primeira leitura)."""
+        if self._mensagem is None:
+            try:
+                self._mensagem = self.modelo.format_map(self.campos)
+            except (KeyError, IndexError, ValueError):
+                self._mensagem = self.modelo
+        return self._mensagem
+
+    def como_dict(self, carimbo: str = None) -> dict:
+        """A entrada do log em arquivo (`carimbo`: a data e hora já formatada)."""
+        mensagem = self.mensagem
+        if self.excecao is not None:
+            mensagem = f"{mensagem} | Exception: {self.excecao}"
+        entrada = {
+            "timestamp": carimbo
+            or time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.momento)),
+            "level": self.level,
+            "message": mensagem,
+        }
+        if self.etapa:
+            entrada["etapa"] = self.etapa
+        entrada.update(self.campos)
+        return entrada
+
+
+class ConsoleLog:
+    """
+    Escrita das mensagens de `print_log` no terminal.
+
+    O nível é conferido antes de qualquer formatação: abaixo do nível mínimo a
+    chamada termina sem montar nada. Os prefixos coloridos de cada combinação de
+    nível e cor são montados uma única vez, e o carimbo de data e hora só é
+    refeito quando o segundo muda.
+
+    As linhas vão para um buffer, gravado na saída quando passa de
+    `tamanho_buffer` caracteres, quando a última gravação tem mais de
+    `intervalo_flush` segundos, nas mensagens de ação, aviso e erro, nos pontos
+    em que o processo fica esperando (`descarregar`) e no encerramento. Se a
+    saída não for um terminal (redirecionada para um arquivo ou capturada pelo
+    agendador), as cores são omitidas.
+
+    Para que as linhas pendentes não apareçam depois de um traceback, os
+    tratadores de exceções não capturadas (`sys.excepthook` e
+    `threading.excepthook`) gravam o buffer antes de imprimir o erro.
+    """
+
+    def __init__(
+        self,
+        nivel: str = "INFO",
+        intervalo_flush: float = 0.5,
+        tamanho_buffer: int = 8192,
+        saida=None,
+    ):
+        """
+        Args:
+            nivel (str): Nível mínimo exibido (INFO, AÇÃO, AVISO ou ERROR).
+            intervalo_flush (float): Tempo máximo, em segundos, entre gravações na saída.
+            tamanho_buffer (int): Caracteres acumulados a partir dos quais o buffer é gravado.
+            saida: Arquivo de saída fixo (padrão: o `sys.stdout` do momento).
+        """
+        self.definir_nivel(nivel)
+        self.intervalo_flush = intervalo_flush
+        self.tamanho_buffer = tamanho_buffer
+        self._saida_fixa = saida
+        self._reiniciar()
+        if hasattr(os, "register_at_fork"):  # Só existe em sistemas Unix
+            os.register_at_fork(after_in_child=self._reiniciar)
+
+    def _reiniciar(self):
+        """Estado inicial (também no filho após um fork, que não herda o buffer)."""
+        self._lock = threading.Lock()
+        self._saida = None
+        self._cores = False
+        self._prefixos = {}
+        self._segundo = None
+        self._carimbo = ""
+        self._buffer = []
+        self._tamanho = 0
+        self._ultima_descarga = time.monotonic()
+
+    def definir_nivel(self, nivel: str):
+        """Muda o nível mínimo exibido (níveis desconhecidos equivalem a INFO)."""
+        self.nivel = str(nivel).upper()
+        self.nivel_minimo = NIVEIS_CONSOLE.get(self.nivel, NIVEIS_CONSOLE["INFO"])
+
+    def _trocar_saida(self, saida):
+        """Passa a escrever em `saida`, gravando o que estava pendente na anterior."""
+        self._gravar_buffer()
+        self._saida = saida
+        try:
+            self._cores = saida.isatty()
+        except (AttributeError, ValueError, OSError):
+            self._cores = False
+        self._prefixos.clear()
+
+    def _prefixo(self, level: str, theme_color: str):
+        """Partes fixas da linha, antes e depois do carimbo de data e hora."""
+        if not self._cores:
+            return f"[{level}] [", "] "
+        if level == "ERROR":
+            color = LOG_COLORS["ERROR"]  # Erros são sempre vermelhos
+        else:
+            color = theme_color or LOG_COLORS.get(level, Fore.WHITE)
+        return (
+            f"{color}{Style.BRIGHT}[{level}]{Style.RESET_ALL} {color}{Style.BRIGHT}[",
+            f"]{Style.RESET_ALL} ",
+        )
+
+    def escrever(
+        self, level: str, message: str, theme_color: str = None, momento: float = None
+    ):
+        """Acrescenta uma linha ao buffer (ou a descarta, se abaixo do nível mínimo)."""
+        if NIVEIS_CONSOLE.get(level, 0) < self.nivel_minimo:
+            return
+        with self._lock:
+            saida = self._saida_fixa or sys.stdout
+            if saida is not self._saida:
+                self._trocar_saida(saida)
+            segundo = int(time.time() if momento is None else momento)
+            if segundo != self._segundo:
+                self._segundo = segundo
+                self._carimbo = time.strftime(
+                    "%Y-%m-%d %H:%M:%S", time.localtime(segundo)
+                )
+            prefixo = self._prefixos.get((level, theme_color))
+            if prefixo is None:
+                prefixo = self._prefixo(level, theme_color)
+                self._prefixos[(level, theme_color)] = prefixo
+            linha = f"{prefixo[0]}{self._carimbo}{prefixo[1]}{message}\n"
+            self._buffer.append(linha)
+            self._tamanho += len(linha)
+            if (
+                level in NIVEIS_DESCARGA_IMEDIATA
+                or self._tamanho >= self.tamanho_buffer
+                or time.monotonic() - self._ultima_descarga >= self.intervalo_flush
+            ):
+                self._gravar_buffer()
+
+    def _gravar_buffer(self):
+        self._ultima_descarga = time.monotonic()
+        if not self._buffer:
+            return
+        texto = "".join(self._buffer)
+        self._buffer.clear()
+        self._tamanho = 0
+        if self._saida is None:
+            return  # Sem console (ex.: pythonw)
+        try:
+            self._saida.write(texto)
+            self._saida.flush()
+        except (OSError, ValueError):
+            pass  # Saída fechada ou interrompida: o log em arquivo continua
+
+    def descarregar(self):
+        """Grava na saída as linhas pendentes no buffer."""
+        with self._lock:
+            self._gravar_buffer()
+
+
+console = ConsoleLog(configuracao.nivel_console)
+atexit.register(console.descarregar)
+
+
+def _descarregar_antes(tratador):
+    """Envolve um tratador de exceções para gravar o console antes do traceback."""
+
+    def tratar(*args):
+        console.descarregar()
+        tratador(*args)
+
+    return tratar
+
+
+sys.excepthook = _descarregar_antes(sys.excepthook)
+threading.excepthook = _descarregar_antes(threading.excepthook)
+
+
+def print_log(level: str, message: str, theme_color: str = None):
+    """Imprime uma mensagem formatada (e colorida, em um terminal) no console."""
+    console.escrever(level, message, theme_color)
+
+
+# Sentinela que encerra a thread de escrita do Logger
+_PARAR = object()
+
 
 # --- CLASSE DE LOGGING SILENCIOSA PARA ARQUIVOS ---
 class Logger:
     """
-    Classe de logging silenciosa. Apenas escreve em arquivos JSON (info e error)
-    ao final da execução. Não imprime no terminal.
+    Classe de logging silenciosa. Escreve em arquivos JSON Lines (info e error)
+    durante a execução. Não imprime no terminal.
+
+    `info` e `error` apenas montam a entrada e a colocam em uma fila limitada,
+    sem bloquear; uma thread em segundo plano acrescenta as linhas aos arquivos
+    do dia (estrutura ano/mês), grava o buffer em disco periodicamente e abre um
+    novo arquivo quando o atual passa do tamanho máximo. Se a fila estiver
+    cheia, a entrada é descartada e a quantidade descartada é registrada.
+
+    Sem diretório (PASTA_LOG ausente) nada é gravado em arquivo: o logger
+    continua utilizável, para que `main.py --check-only` possa apontar a
+    variável que falta (`Configuracao.pendencias`).
+
+    A fila é uma `queue.SimpleQueue` (sem trava de Python ao enfileirar); o
+    limite é conferido pelo tamanho atual da fila antes de cada entrada.
     """
 
-    def __init__(self, log_directory: str, name_prefix: str = "log"):
+    def __init__(
+        self,
+        log_directory: str,
+        name_prefix: str = "log",
+        tamanho_fila: int = 10_000,
+        intervalo_flush: float = 1.0,
+        tamanho_maximo_bytes: int = 50 * 1024 * 1024,
+    ):
         """
-        Inicializa o Logger e configura os caminhos dos arquivos de log com base na data.
+        Inicializa o Logger e inicia a thread de escrita.
 
         Args:
-            log_directory (str): O diretório base para todos os logs (ex: 'logs').
+            log_directory (str): O diretório base para todos os logs (ex: 'logs');
+                se for None, as entradas são descartadas.
             name_prefix (str): Um prefixo para os nomes dos arquivos de log (ex: 'quantum').
+            tamanho_fila (int): Máximo de entradas aguardando escrita.
+            intervalo_flush (float): Intervalo máximo, em segundos, entre gravações em disco.
+            tamanho_maximo_bytes (int): Tamanho a partir do qual o arquivo do dia é rotacionado.
         """
-        self.base_log_dir = Path(log_directory)
+        self.base_log_dir = Path(log_directory) if log_directory else None
         self.name_prefix = name_prefix
-        self.info_entries = []
-        self.error_entries = []
-
-        # --- Configuração do caminho do log com base na data ---
-        now = datetime.now()
-        year = now.strftime("%Y")
-        month = now.strftime("%m")
-        date_str = now.strftime("%Y%m%d")
-
-        # Cria a estrutura de diretórios ano/mês
-        todays_log_dir = self.base_log_dir / year / month
-        todays_log_dir.mkdir(parents=True, exist_ok=True)
-
-        # Define os caminhos completos para os arquivos de log de info e erro
-        self.info_log_path = todays_log_dir / f"{self.name_prefix}_info_{date_str}.json"
-        self.error_log_path = (
-            todays_log_dir / f"{self.name_prefix}_error_{date_str}.json"
+        self.tamanho_fila = tamanho_fila
+        self.intervalo_flush = intervalo_flush
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self.descartadas = 0
+        self._iniciar_escritor()
+        if hasattr(os, "register_at_fork"):  # Só existe em sistemas Unix
+            os.register_at_fork(after_in_child=self._reiniciar_apos_fork)
+        atexit.register(self.close)
+
+    def _reiniciar_apos_fork(self):
+        """
+        No filho após um fork: descarta os arquivos herdados e recria o escritor.
+
+        Os buffers herdados ainda não gravados pertencem ao pai. O descritor de
+        cada arquivo herdado passa a apontar para o /dev/null antes de o objeto
+        ser descartado, então o flush feito na coleta não duplica essas linhas.
+        """
+        nulo = os.open(os.devnull, os.O_WRONLY)
+        try:
+            for _, _, arquivo in self._arquivos.values():
+                os.dup2(nulo, arquivo.fileno())
+        finally:
+            os.close(nulo)
+        self._iniciar_escritor()
+
+    def _iniciar_escritor(self):
+        """Cria a fila, os arquivos abertos e a thread de escrita."""
+        self._fila = queue.SimpleQueue()
+        self._arquivos = {}
+        # Bytes de cada arquivo aberto, sem o tell(), que forçaria um flush a cada linha
+        self._tamanhos = {}
+        self._descartadas_registradas = 0
+        self._segundo = None
+        self._escritor = threading.Thread(
+            target=self._escrever_continuamente, name="logger-escritor", daemon=True
         )
+        self._escritor.start()
 
-        atexit.register(self.save_logs)
+    def _caminho_log(self, nivel: str, momento: datetime, parte: int) -> Path:
+        """<base>/AAAA/MM/<prefixo>_<nível>_AAAAMMDD[.N].jsonl"""
+        sufixo = f".{parte}" if parte else ""
+        return (
+            self.base_log_dir
+            / momento.strftime("%Y")
+            / momento.strftime("%m")
+            / f"{self.name_prefix}_{nivel}_{momento.strftime('%Y%m%d')}{sufixo}.jsonl"
+        )
 
-    def _add_log_entry(
-        self, level: str, message: str, entry_list: list, extra_data: dict = None
-    ):
-        """Adiciona uma entrada de log à lista apropriada na memória."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = {"timestamp": timestamp, "level": level, "message": message}
-        if extra_data:
-            log_entry.update(extra_data)
-        entry_list.append(log_entry)
+    def _arquivo_para(self, nivel: str, momento: datetime):
+        """Devolve o arquivo aberto para a entrada, rotacionando por data e tamanho."""
+        atual = self._arquivos.get(nivel)
+        if atual is not None:
+            data, parte, arquivo = atual
+            if (
+                data == momento.date()
+                and self._tamanhos[nivel] < self.tamanho_maximo_bytes
+            ):
+                return arquivo
+            arquivo.close()
+            parte = parte + 1 if data == momento.date() else 0
+        else:
+            parte = 0
+
+        # Continua o arquivo do dia se ainda couber; senão passa para a próxima parte
+        caminho = self._caminho_log(nivel, momento, parte)
+        while caminho.exists() and caminho.stat().st_size >= self.tamanho_maximo_bytes:
+            parte += 1
+            caminho = self._caminho_log(nivel, momento, parte)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        arquivo = open(caminho, "a", encoding="utf-8")
+        self._arquivos[nivel] = (momento.date(), parte, arquivo)
+        self._tamanhos[nivel] = arquivo.tell()
+        return arquivo
+
+    def _gravar(self, evento: Evento):
+        segundo = int(evento.momento)
+        if segundo != self._segundo:
+            # A data e hora só são refeitas quando o segundo muda
+            self._segundo = segundo
+            self._momento = datetime.fromtimestamp(segundo)
+            self._carimbo = self._momento.strftime("%Y-%m-%d %H:%M:%S")
+        nivel = "error" if evento.level == "ERROR" else "info"
+        arquivo = self._arquivo_para(nivel, self._momento)
+        linha = (
+            json.dumps(evento.como_dict(self._carimbo), ensure_ascii=False, default=str)
+            + "\n"
+        )
+        arquivo.write(linha)
+        self._tamanhos[nivel] += (
+            len(linha) if linha.isascii() else len(linha.encode("utf-8"))
+        )
+
+    def _flush_arquivos(self):
+        for _, _, arquivo in self._arquivos.values():
+            arquivo.flush()
+
+    def _escrever_continuamente(self):
+        """Laço da thread de escrita."""
+        ultimo_flush = time.monotonic()
+        while True:
+            try:
+                item = self._fila.get(timeout=self.intervalo_flush)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, Evento):
+                try:
+                    self._gravar(item)
+                except Exception:
+                    console.descarregar()
+                    traceback.print_exc()
+            elif item is not None:
+                # Pedido de flush (save_logs/close): um Event ou o sentinela de parada
+                self._flush_arquivos()
+                if item is _PARAR:
+                    for _, _, arquivo in self._arquivos.values():
+                        arquivo.close()
+                    self._arquivos.clear()
+                    return
+                item.set()
+                continue
+
+            if self.descartadas != self._descartadas_registradas:
+                perdidas = self.descartadas - self._descartadas_registradas
+                self._descartadas_registradas = self.descartadas
+                self._gravar(
+                    Evento(
+                        "ERROR",
+                        None,
+                        "{perdidas} entradas de log descartadas: fila de escrita cheia.",
+                        {"perdidas": perdidas},
+                    )
+                )
+
+            agora = time.monotonic()
+            if item is None or agora - ultimo_flush >= self.intervalo_flush:
+                self._flush_arquivos()
+                ultimo_flush = agora
+
+    def registrar(self, evento: Evento):
+        """Enfileira um evento para a thread de escrita, sem bloquear."""
+        if self.base_log_dir is None:
+            return
+        if self._fila.qsize() >= self.tamanho_fila:
+            self.descartadas += 1
+        else:
+            self._fila.put(evento)
+
+    def _add_log_entry(self, level: str, message: str, extra_data: dict = None):
+        # Mensagens já formatadas por quem chamou: o texto é gravado como está
+        self.registrar(Evento(level, None, message, extra_data, formatar=False))
 
     def info(self, message: str, extra_data: dict = None):
-        """Registra uma mensagem de informação na memória."""
-        self._add_log_entry("INFO", message, self.info_entries, extra_data=extra_data)
+        """Registra uma mensagem de informação."""
+        self._add_log_entry("INFO", message, extra_data=extra_data)
 
-    def error(self, message: str, exc: Exception = None):
-        """Registra uma mensagem de erro na memória."""
-        extra = {}
-        full_message = message
+    def error(self, message: str, exc: Exception = None, extra_data: dict = None):
+        """Registra uma mensagem de erro."""
+        evento = Evento("ERROR", None, message, dict(extra_data or {}), formatar=False)
         if exc:
-            extra["traceback"] = traceback.format_exc()
-            full_message = f"{message} | Exception: {str(exc)}"
-        self._add_log_entry("ERROR", full_message, self.error_entries, extra_data=extra)
+            _anexar_excecao(evento, exc)
+        self.registrar(evento)
 
-    def save_logs(self):
-        """Salva as listas de logs em seus respectivos arquivos JSON, se não estiverem vazias."""
-        if self.info_entries:
-            with open(self.info_log_path, "w", encoding="utf-8") as f:
-                json.dump(self.info_entries, f, indent=4, ensure_ascii=False)
-        if self.error_entries:
-            with open(self.error_log_path, "w", encoding="utf-8") as f:
-                json.dump(self.error_entries, f, indent=4, ensure_ascii=False)
+    def save_logs(self, timeout: float = 5.0) -> bool:
+        """
+        Aguarda a escrita das entradas já enfileiradas e grava os arquivos em disco.
+
+        Returns:
+            bool: False se a thread de escrita não concluir dentro do prazo.
+        """
+        if not self._escritor.is_alive():
+            return False
+        concluido = threading.Event()
+        self._fila.put(concluido)
+        return concluido.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Grava as entradas pendentes, fecha os arquivos e encerra a thread de escrita."""
+        if not self._escritor.is_alive():
+            return
+        self._fila.put(_PARAR)
+        self._escritor.join(timeout)
+
+
+def _anexar_excecao(evento: Evento, exc: Exception):
+    evento.excecao = str(exc)
+    # O traceback precisa ser capturado na thread de quem chamou
+    evento.campos["traceback"] = traceback.format_exc()
 
 
 # Cria uma instância do logger com o diretório de logs e o prefixo
 logger_quantum = Logger(PASTA_LOG, name_prefix="quantum")
+
+
+def registrar_evento(
+    level: str,
+    etapa: str,
+    mensagem: str,
+    /,
+    *,
+    theme_color: str = None,
+    exc: Exception = None,
+    **campos,
+):
+    """
+    Registra um evento no console e no log em arquivo, com um único carimbo de
+    data e hora e sem formatar a mensagem antecipadamente.
+
+    Args:
+            level (str): INFO, AÇÃO, AVISO ou ERROR.
+            etapa (str): A etapa do processo (ex.: "extracao", "validacao").
+            mensagem (str): Modelo da mensagem, preenchido com os campos
+                    (ex.: "Encontrados {contagem_nan} nulos em {arquivo}.").
+            theme_color (str): A cor do console (erros são sempre vermelhos).
+            exc (Exception): A exceção tratada; o traceback vai para o arquivo.
+            **campos: Os dados do evento, gravados como chaves do JSON.
+    """
+    evento = Evento(level, etapa, mensagem, campos, theme_color)
+    if exc is not None:
+        _anexar_excecao(evento, exc)
+    if NIVEIS_CONSOLE.get(level, 0) >= console.nivel_minimo:
+        console.escrever(level, evento.mensagem, theme_color, evento.momento)
+    logger_quantum.registrar(evento)
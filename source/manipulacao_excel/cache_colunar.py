@@ -0,0 +1,233 @@
+import importlib.util
+import json
+import numbers
+import os
+import threading
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# Importações locais
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import logger_quantum
+
+# O pyarrow é opcional: sem ele o cache fica desativado. Como o pandas, só é
+# importado quando uma planilha é de fato lida ou gravada no cache
+PYARROW_DISPONIVEL = importlib.util.find_spec("pyarrow") is not None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+EXTENSAO_CACHE = ".arrow"
+# Marca de um conteúdo que o Arrow não representa (ex.: colunas com valores de
+# tipos misturados). Ela expira, pois uma nova versão do pyarrow pode aceitá-lo
+EXTENSAO_FALHA = ".falha"
+VALIDADE_FALHA_SEGUNDOS = 7 * 24 * 60 * 60
+# Chave, nos metadados do esquema, dos rótulos originais das colunas
+CHAVE_ROTULOS = b"quantum.rotulos_colunas"
+
+
+def _codificar_rotulo(rotulo):
+    """Rótulo de coluna como [tipo, valor] em JSON (TypeError se não suportado)."""
+    import pandas as pd
+
+    if isinstance(rotulo, str):
+        return ["str", rotulo]
+    if isinstance(rotulo, bool):
+        return ["bool", rotulo]
+    if isinstance(rotulo, numbers.Integral):
+        return ["int", int(rotulo)]
+    if isinstance(rotulo, numbers.Real):
+        return ["float", repr(float(rotulo))]
+    if isinstance(rotulo, pd.Timestamp):
+        return ["timestamp", rotulo.isoformat()]
+    if isinstance(rotulo, (datetime, date, time)):
+        return [type(rotulo).__name__, rotulo.isoformat()]
+    raise TypeError(f"rótulo de coluna não suportado: {rotulo!r}")
+
+
+def _decodificar_rotulo(tipo: str, valor):
+    if tipo == "float":
+        return float(valor)
+    if tipo == "timestamp":
+        import pandas as pd
+
+        return pd.Timestamp(valor)
+    if tipo in ("datetime", "date", "time"):
+        return {"datetime": datetime, "date": date, "time": time}[tipo].fromisoformat(
+            valor
+        )
+    return valor
+
+
+class CacheColunar:
+    """
+    Cache de planilhas já lidas, gravadas em formato colunar (Arrow IPC/Feather
+    sem compressão, que pode ser mapeado em memória).
+
+    Cada entrada é nomeada pelo SHA-256 do conteúdo do Excel de origem, então
+    qualquer alteração no arquivo gera uma nova entrada. Quando o diretório
+    passa de `tamanho_maximo_bytes`, as entradas usadas há mais tempo (pela data
+    de modificação, atualizada a cada acerto) são removidas.
+
+    Um acerto devolve o mesmo DataFrame da leitura do Excel: as colunas são
+    gravadas com nomes posicionais e os rótulos originais (números, datas,
+    textos) ficam nos metadados do esquema. Um conteúdo que o Arrow não
+    representa (ex.: uma coluna com números e textos misturados) não é
+    guardado; uma marca `<hash>.falha` evita tentar e registrar o erro de novo
+    a cada execução, por até VALIDADE_FALHA_SEGUNDOS. Falhas ao gravar o
+    arquivo (disco cheio, permissão) não deixam marca: a próxima leitura tenta
+    de novo.
+    """
+
+    def __init__(self, diretorio: Path, tamanho_maximo_bytes: int):
+        self.diretorio = Path(diretorio)
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self._lock = threading.Lock()
+
+    def _caminho(self, hash_conteudo: str) -> Path:
+        return self.diretorio / f"{hash_conteudo}{EXTENSAO_CACHE}"
+
+    def _caminho_falha(self, hash_conteudo: str) -> Path:
+        return self.diretorio / f"{hash_conteudo}{EXTENSAO_FALHA}"
+
+    def _falha_recente(self, hash_conteudo: str) -> bool:
+        """Indica se o conteúdo tem uma marca de falha ainda dentro da validade."""
+        try:
+            marcada_em = self._caminho_falha(hash_conteudo).stat().st_mtime
+        except OSError:
+            return False
+        return datetime.now().timestamp() - marcada_em < VALIDADE_FALHA_SEGUNDOS
+
+    def obter(self, hash_conteudo: str):
+        """Devolve o DataFrame em cache, ou None se não houver entrada."""
+        from pyarrow import feather
+
+        caminho = self._caminho(hash_conteudo)
+        try:
+            tabela = feather.read_table(caminho, memory_map=True)
+            rotulos = json.loads(tabela.schema.metadata[CHAVE_ROTULOS])
+            df = tabela.to_pandas()
+            df.columns = [_decodificar_rotulo(tipo, valor) for tipo, valor in rotulos]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger_quantum.error(
+                f"Entrada de cache inválida '{caminho.name}': {e}", exc=e
+            )
+            caminho.unlink(missing_ok=True)
+            return None
+        os.utime(caminho)  # Marca como usada recentemente (LRU)
+        return df
+
+    def guardar(self, hash_conteudo: str, df: "pd.DataFrame") -> bool:
+        """Grava o DataFrame no cache e aplica o limite de tamanho."""
+        import pyarrow as pa
+        from pyarrow import feather
+
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        if self._falha_recente(hash_conteudo):
+            return False  # Já se sabe que este conteúdo não cabe no cache
+        try:
+            rotulos = json.dumps([_codificar_rotulo(r) for r in df.columns])
+            tabela = pa.Table.from_pandas(
+                df.set_axis([str(i) for i in range(df.shape[1])], axis=1)
+            )
+        except (TypeError, ValueError, pa.ArrowException) as e:
+            # Conversão determinística: o mesmo conteúdo falharia de novo
+            self._caminho_falha(hash_conteudo).touch()
+            logger_quantum.error(
+                f"A planilha não pode ser representada no cache colunar: {e}."
+                " O conteúdo não será guardado nas próximas leituras.",
+                exc=e,
+            )
+            return False
+
+        caminho = self._caminho(hash_conteudo)
+        temporario = caminho.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tabela = tabela.replace_schema_metadata(
+                {**tabela.schema.metadata, CHAVE_ROTULOS: rotulos.encode()}
+            )
+            feather.write_feather(tabela, temporario, compression="uncompressed")
+            os.replace(temporario, caminho)
+        except Exception as e:
+            # Falha transitória (disco, permissão): a próxima leitura tenta de novo
+            temporario.unlink(missing_ok=True)
+            logger_quantum.error(
+                f"Não foi possível gravar a planilha no cache colunar: {e}", exc=e
+            )
+            return False
+        self._aplicar_limite()
+        return True
+
+    def _aplicar_limite(self):
+        """
+        Remove as entradas menos usadas até o cache caber no tamanho máximo, e
+        as marcas de falha vencidas. Erros do sistema de arquivos são
+        ignorados: a leitura não depende disso.
+        """
+        vencimento_falhas = datetime.now().timestamp() - VALIDADE_FALHA_SEGUNDOS
+        with self._lock:
+            entradas = []
+            total = 0
+            try:
+                with os.scandir(self.diretorio) as it:
+                    for entrada in it:
+                        if entrada.name.endswith(EXTENSAO_FALHA):
+                            try:
+                                if entrada.stat().st_mtime < vencimento_falhas:
+                                    os.remove(entrada.path)
+                            except OSError:
+                                pass  # Removida por outro processo
+                        elif entrada.name.endswith(EXTENSAO_CACHE):
+                            try:
+                                info = entrada.stat()
+                            except OSError:
+                                continue
+                            entradas.append(
+                                (info.st_mtime_ns, info.st_size, entrada.path)
+                            )
+                            total += info.st_size
+            except OSError as e:
+                logger_quantum.error(
+                    f"Não foi possível listar o cache colunar: {e}", exc=e
+                )
+                return
+            entradas.sort()
+            for _, tamanho, caminho in entradas:
+                if total <= self.tamanho_maximo_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                    total -= tamanho
+                    logger_quantum.info(
+                        f"Entrada removida do cache colunar (LRU): {Path(caminho).name}"
+                    )
+                except OSError:
+                    continue  # Removida por outro processo ou em uso (Windows)
+
+
+_caches_abertos = {}
+
+
+def cache_para(caminho_excel: Path):
+    """
+    Devolve o cache colunar usado para um arquivo Excel, ou None se o pyarrow
+    não estiver instalado.
+
+    O diretório é definido por PASTA_CACHE_COLUNAR (padrão: '.cache_colunar' na
+    pasta do arquivo) e o limite por TAMANHO_MAXIMO_CACHE_MB (padrão: 1024).
+    """
+    if not PYARROW_DISPONIVEL:
+        return None
+    diretorio = configuracao.pasta_cache_colunar or (
+        Path(caminho_excel).parent / ".cache_colunar"
+    )
+    diretorio = Path(diretorio).resolve()
+    cache = _caches_abertos.get(diretorio)
+    if cache is None:
+        tamanho_maximo = int(configuracao.tamanho_maximo_cache_mb * 1024 * 1024)
+        cache = CacheColunar(diretorio, tamanho_maximo)
+        _caches_abertos[diretorio] = cache
+    return cache
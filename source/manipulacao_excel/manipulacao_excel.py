@@ -1,132 +1,1038 @@
+import io
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from colorama import Fore
 
 # Importações locais
-from source.logger.logger_config import logger_quantum, print_log
+from source.configuracao.configuracao import configuracao
+from source.indice.indice_processados import (
+    calcular_hash_arquivo,
+    calcular_hash_conteudo,
+    indice_da_pasta,
+)
+from source.indice.manifesto_pasta import manifesto_da_pasta
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
+from source.manipulacao_excel.cache_colunar import cache_para
+from source.observabilidade.medicoes import medir, pico_memoria_processo
+from source.qualidade.historico import EstatisticasPlanilha, verificar_tendencias
+from source.qualidade.motor_regras import MotorRegras, RelatorioQualidade
 
+# O pandas e o openpyxl são importados dentro das funções que leem planilhas:
+# execuções que não encontram nada novo não pagam o custo de carregá-los
+if TYPE_CHECKING:
+    import pandas as pd
 
-def ler_arquivo_excel(caminho_excel: Path):
+ETAPA = "validacao"
+
+# Valores textuais que o pandas interpreta como NaN por padrão ao ler o Excel.
+# Mantidos aqui para que a contagem em streaming seja idêntica à do pd.read_excel.
+VALORES_NA_PADRAO = frozenset(
+    {
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    }
+)
+
+
+class ContagemParcial(int):
+    """
+    Contagem de nulos de uma leitura em streaming interrompida ao exceder o
+    limite: o total real da planilha é pelo menos esse valor. Use
+    `descrever_contagem_nan` para exibi-la.
+    """
+
+    __slots__ = ()
+
+
+def descrever_contagem_nan(contagem_nan: int, limite: int) -> str:
+    """Texto da contagem para alertas e logs ("> limite" se ela for parcial)."""
+    if isinstance(contagem_nan, ContagemParcial):
+        return f"> {limite}"
+    return str(int(contagem_nan))
+
+
+class PlanilhaValidada:
+    """
+    Resultado de uma validação aprovada. O DataFrame completo só é carregado
+    quando o atributo `dataframe` é acessado pela primeira vez (a partir do
+    conteúdo em memória, se houver, ou do arquivo).
+    """
+
+    def __init__(
+        self,
+        caminho: Path,
+        contagem_nan: int,
+        dataframe: "pd.DataFrame" = None,
+        conteudo: bytes = None,
+        relatorio: RelatorioQualidade = None,
+    ):
+        self.caminho = caminho
+        self.contagem_nan = contagem_nan
+        self._dataframe = dataframe
+        self._conteudo = conteudo
+        self.relatorio = relatorio
+
+    @property
+    def dataframe(self):
+        """Lê a planilha completa sob demanda e mantém o resultado em cache."""
+        if self._dataframe is None:
+            self._dataframe = ler_arquivo_excel(self.caminho, conteudo=self._conteudo)
+        return self._dataframe
+
+    def em_lotes(self, tamanho_lote: int = None):
+        """
+        Percorre a planilha em lotes de linhas (veja `ler_excel_em_lotes`), para
+        consumidores que não precisam dela inteira em memória. Se o DataFrame já
+        foi carregado, ou se a planilha é um .xls, os lotes são fatias dele.
+        """
+        tamanho_lote = tamanho_lote or configuracao.linhas_por_lote
+        if self._dataframe is None and _le_em_streaming(self.caminho):
+            yield from ler_excel_em_lotes(
+                self.caminho, tamanho_lote, conteudo=self._conteudo
+            )
+            return
+        for inicio in range(0, len(self.dataframe), tamanho_lote):
+            fim = inicio + tamanho_lote
+            yield self.dataframe.iloc[inicio:fim]
+
+
+def _origem(caminho_excel: Path, conteudo: bytes = None):
+    """Origem de leitura: um buffer sobre o conteúdo em memória ou o próprio arquivo."""
+    return io.BytesIO(conteudo) if conteudo is not None else caminho_excel
+
+
+def _le_em_streaming(caminho_excel: Path) -> bool:
+    """
+    Indica se a planilha pode ser lida em streaming. O modo somente leitura do
+    openpyxl só abre o formato .xlsx; arquivos .xls são lidos pelo pandas.
+    """
+    return caminho_excel.suffix.lower() != ".xls"
+
+
+def ler_arquivo_excel(
+    caminho_excel: Path, usar_cache: bool = True, conteudo: bytes = None
+):
     """
     Lê um arquivo Excel e o carrega em um DataFrame do pandas.
 
+    Na primeira leitura a planilha é gravada no cache colunar (quando o pyarrow
+    está instalado); as leituras seguintes do mesmo conteúdo vêm do cache, sem
+    passar pelo openpyxl.
+
     Args:
             caminho_excel (Path): O caminho completo para o arquivo Excel.
+            usar_cache (bool): Se False, sempre lê o Excel diretamente.
+            conteudo (bytes): O conteúdo do arquivo já em memória; se informado, o
+                    disco não é lido e `caminho_excel` serve apenas para identificá-lo.
 
     Returns:
             pd.DataFrame: Um DataFrame com os dados do arquivo, ou None se ocorrer um erro.
     """
-    if not caminho_excel.is_file():
-        error_msg = (
-            f"O arquivo não foi encontrado no caminho especificado: {caminho_excel}"
+    if conteudo is None and not caminho_excel.is_file():
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "O arquivo não foi encontrado no caminho especificado: {caminho}",
+            caminho=str(caminho_excel),
         )
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
         return None
 
     try:
+        cache = cache_para(caminho_excel) if usar_cache else None
+        if cache is not None:
+            hash_conteudo = (
+                calcular_hash_conteudo(conteudo)
+                if conteudo is not None
+                else calcular_hash_arquivo(caminho_excel)
+            )
+            df = cache.obter(hash_conteudo)
+            if df is not None:
+                logger_quantum.info(
+                    f"Arquivo '{caminho_excel.name}' lido do cache colunar."
+                )
+                return df
+
+        import pandas as pd
+
         print_log("INFO", f"Lendo o arquivo Excel: {caminho_excel.name}...")
-        df = pd.read_excel(caminho_excel)
+        tamanho = (
+            len(conteudo) if conteudo is not None else caminho_excel.stat().st_size
+        )
+        with medir("leitura_excel", bytes=tamanho) as medicao:
+            df = pd.read_excel(_origem(caminho_excel, conteudo))
+            medicao.registrar(linhas=len(df))
         logger_quantum.info(f"Arquivo '{caminho_excel.name}' lido com sucesso.")
+        if cache is not None:
+            cache.guardar(hash_conteudo, df)
         return df
     except Exception as e:
-        error_msg = (
-            "Ocorreu um erro inesperado ao tentar ler o arquivo"
-            f" '{caminho_excel.name}': {e}"
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Ocorreu um erro inesperado ao tentar ler o arquivo '{arquivo}': {erro}",
+            exc=e,
+            arquivo=caminho_excel.name,
+            erro=str(e),
         )
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg, exc=e)
         return None
 
 
-def quantidade_nan(dataframe: pd.DataFrame):
+def _nomes_colunas(cabecalho) -> list:
+    """
+    Nomes das colunas como o `pd.read_excel` os gera: 'Unnamed: <posição>' para
+    cabeçalhos vazios e sufixos '.1', '.2'... para nomes repetidos.
+    """
+    nomes, ocorrencias = [], {}
+    for posicao, nome in enumerate(cabecalho):
+        if nome is None or nome == "":
+            nome = f"Unnamed: {posicao}"
+        original = nome
+        while nome in ocorrencias:
+            ocorrencias[original] += 1
+            nome = f"{original}.{ocorrencias[original] - 1}"
+        ocorrencias.setdefault(nome, 1)
+        nomes.append(nome)
+    return nomes
+
+
+def _converter_celula(valor):
+    """Converte o valor bruto de uma célula como o `pd.read_excel` faria."""
+    if isinstance(valor, str):
+        return None if valor in VALORES_NA_PADRAO else valor
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _montar_lote(linhas: list, colunas: list, reduzir_tipos: bool):
     """
-    Conta a quantidade de valores NaN especificamente na coluna 'Retorno' de um DataFrame.
+    Monta o DataFrame de um lote. Com `reduzir_tipos`, inteiros passam para o
+    menor tipo que comporta os valores do lote e textos com muitas repetições
+    viram categorias; números decimais ficam em float64, para não perder precisão.
+    """
+    import pandas as pd
+
+    lote = pd.DataFrame.from_records(linhas, columns=colunas)
+    if not reduzir_tipos:
+        return lote
+    for posicao in range(lote.shape[1]):
+        serie = lote.iloc[:, posicao]
+        if pd.api.types.is_integer_dtype(serie):
+            lote.isetitem(posicao, pd.to_numeric(serie, downcast="integer"))
+        elif pd.api.types.is_string_dtype(serie) and serie.nunique() <= len(serie) // 2:
+            lote.isetitem(posicao, serie.astype("category"))
+    return lote
+
+
+def ler_excel_em_lotes(
+    caminho_excel: Path,
+    tamanho_lote: int = None,
+    conteudo: bytes = None,
+    reduzir_tipos: bool = True,
+):
+    """
+    Lê a primeira aba de um arquivo Excel em lotes de `tamanho_lote` linhas,
+    com o modo somente leitura do openpyxl, sem materializar a planilha inteira.
+
+    Os lotes seguem as regras do `pd.read_excel` (cabeçalho na primeira linha,
+    valores textuais de NaN, linhas vazias no final descartadas). As colunas são
+    as do cabeçalho; células à direita da última coluna nomeada são ignoradas.
+    Como os tipos são reduzidos lote a lote, a mesma coluna pode ter tipos
+    diferentes em lotes diferentes.
+
+    Args:
+            caminho_excel (Path): O caminho completo para o arquivo Excel.
+            tamanho_lote (int): Linhas por lote (padrão: LINHAS_POR_LOTE).
+            conteudo (bytes): O conteúdo do arquivo já em memória (opcional).
+            reduzir_tipos (bool): Se False, mantém os tipos inferidos pelo pandas.
+
+    Yields:
+            pd.DataFrame: Os lotes, em ordem. Uma planilha sem linhas de dados
+            produz um único lote vazio, apenas com as colunas.
+    """
+    from openpyxl import load_workbook
+
+    tamanho_lote = tamanho_lote or configuracao.linhas_por_lote
+    workbook = load_workbook(
+        _origem(caminho_excel, conteudo),
+        read_only=True,
+        data_only=True,
+        keep_links=False,
+    )
+    try:
+        planilha = workbook.worksheets[0]
+        planilha.reset_dimensions()
+        linhas = planilha.iter_rows(values_only=True)
+
+        cabecalho = list(next(linhas, ()))
+        while cabecalho and (cabecalho[-1] is None or cabecalho[-1] == ""):
+            cabecalho.pop()
+        colunas = _nomes_colunas(cabecalho)
+        largura = len(colunas)
+        linha_vazia = (None,) * largura
+
+        lote = []
+        linhas_vazias_pendentes = 0
+        produzidos = 0
+        for linha in linhas:
+            if all(valor is None or valor == "" for valor in linha):
+                # Só entram se houver dados depois (o pandas descarta as finais)
+                linhas_vazias_pendentes += 1
+                continue
+            if linhas_vazias_pendentes:
+                lote.extend([linha_vazia] * linhas_vazias_pendentes)
+                linhas_vazias_pendentes = 0
+            valores = tuple(_converter_celula(valor) for valor in linha[:largura])
+            lote.append(valores + (None,) * (largura - len(valores)))
+            while len(lote) >= tamanho_lote:
+                yield _montar_lote(lote[:tamanho_lote], colunas, reduzir_tipos)
+                produzidos += 1
+                del lote[:tamanho_lote]
+        if lote or not produzidos:
+            yield _montar_lote(lote, colunas, reduzir_tipos)
+    finally:
+        workbook.close()
+
+
+def quantidade_nan(dataframe: "pd.DataFrame", coluna: str = "Retorno"):
+    """
+    Conta a quantidade de valores NaN em uma coluna (por padrão, 'Retorno') de um DataFrame.
 
     Args:
             dataframe (pd.DataFrame): O DataFrame a ser analisado.
+            coluna (str): A coluna a ser verificada (padrão: 'Retorno').
 
     Returns:
-            int: A quantidade total de valores NaN encontrados na coluna 'Retorno'.
+            int: A quantidade total de valores NaN encontrados na coluna.
     """
-    if "Retorno" not in dataframe.columns:
-        error_msg = (
-            "A coluna 'Retorno' não foi encontrada no DataFrame para a contagem de"
-            " NaNs."
+    if coluna not in dataframe.columns:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "A coluna '{coluna}' não foi encontrada no DataFrame para a contagem de"
+            " NaNs.",
+            coluna=coluna,
         )
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
         return 0
 
-    contagem_nan = dataframe["Retorno"].isna().sum()
+    with medir("contagem_nan", linhas=len(dataframe)):
+        contagem_nan = dataframe[coluna].isna().sum()
     logger_quantum.info(
-        f"Contagem de NaNs na coluna 'Retorno' finalizada: {contagem_nan}"
+        f"Contagem de NaNs na coluna '{coluna}' finalizada: {contagem_nan}"
         " encontrados."
     )
     return contagem_nan
 
 
-def ler_excel_mais_recente_da_pasta(caminho_pasta: Path):
+def _valor_e_nan(valor) -> bool:
+    """Indica se o valor bruto de uma célula seria lido como NaN pelo pandas."""
+    return valor is None or (isinstance(valor, str) and valor in VALORES_NA_PADRAO)
+
+
+@medir("contagem_nan_streaming")
+def contar_nan_streaming(
+    caminho_excel: Path,
+    limite: int = None,
+    coluna: str = "Retorno",
+    conteudo: bytes = None,
+    estatisticas: EstatisticasPlanilha = None,
+):
     """
-    Encontra e lê o arquivo Excel (.xlsx ou .xls) mais recente em uma pasta.
+    Conta os valores NaN de uma única coluna lendo a planilha em modo streaming.
+
+    Usa o modo somente leitura do openpyxl para percorrer as linhas uma a uma, sem
+    materializar um DataFrame. A contagem reproduz as regras do `pd.read_excel`
+    (cabeçalho na primeira linha, linhas vazias no final descartadas) e é
+    interrompida assim que ultrapassa o `limite`, quando ele é informado.
+    Arquivos .xls, que o openpyxl não abre, são lidos inteiros pelo pandas.
+
+    Args:
+            caminho_excel (Path): O caminho completo para o arquivo Excel.
+            limite (int): Limite de nulos; a leitura para ao ser excedido.
+            coluna (str): O nome da coluna a ser verificada.
+            conteudo (bytes): O conteúdo do arquivo já em memória (opcional).
+            estatisticas (EstatisticasPlanilha): Recebe as linhas e os nulos da
+                    coluna para o histórico, se a planilha for lida até o fim.
+
+    Returns:
+            int: A quantidade de NaNs encontrados (uma `ContagemParcial` se a
+            leitura parou ao exceder o limite), 0 se a coluna não existir, ou
+            None se ocorrer um erro de leitura.
+    """
+    if conteudo is None and not caminho_excel.is_file():
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "O arquivo não foi encontrado no caminho especificado: {caminho}",
+            caminho=str(caminho_excel),
+        )
+        return None
+
+    if not _le_em_streaming(caminho_excel):
+        df_excel = ler_arquivo_excel(caminho_excel, conteudo=conteudo)
+        if df_excel is None:
+            return None
+        if estatisticas is not None:
+            estatisticas.acumular(df_excel)
+        return quantidade_nan(df_excel, coluna)
+
+    try:
+        from openpyxl import load_workbook
+
+        print_log(
+            "INFO", f"Validando o arquivo Excel em streaming: {caminho_excel.name}..."
+        )
+        workbook = load_workbook(
+            _origem(caminho_excel, conteudo),
+            read_only=True,
+            data_only=True,
+            keep_links=False,
+        )
+        try:
+            planilha = workbook.worksheets[0]
+            planilha.reset_dimensions()
+            linhas = planilha.iter_rows(values_only=True)
+
+            cabecalho = next(linhas, ())
+            if coluna not in cabecalho:
+                registrar_evento(
+                    "ERROR",
+                    ETAPA,
+                    "A coluna '{coluna}' não foi encontrada na planilha para a"
+                    " contagem de NaNs.",
+                    coluna=coluna,
+                    arquivo=caminho_excel.name,
+                )
+                return 0
+            indice_coluna = cabecalho.index(coluna)
+
+            contagem_nan = 0
+            linhas_dados = 0
+            linhas_vazias_pendentes = 0
+            interrompida = False
+            for linha in linhas:
+                if all(valor is None or valor == "" for valor in linha):
+                    # Só conta se houver dados depois (o pandas descarta as finais)
+                    linhas_vazias_pendentes += 1
+                    continue
+
+                valor = linha[indice_coluna] if indice_coluna < len(linha) else None
+                contagem_nan += linhas_vazias_pendentes + _valor_e_nan(valor)
+                linhas_dados += linhas_vazias_pendentes + 1
+                linhas_vazias_pendentes = 0
+                if limite is not None and contagem_nan > limite:
+                    interrompida = True
+                    break
+        finally:
+            workbook.close()
+    except Exception as e:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Ocorreu um erro inesperado ao tentar validar o arquivo '{arquivo}': {erro}",
+            exc=e,
+            arquivo=caminho_excel.name,
+            erro=str(e),
+        )
+        return None
+
+    if estatisticas is not None and not interrompida:
+        estatisticas.registrar_contagem(coluna, linhas_dados, contagem_nan)
+    detalhe = " (leitura interrompida ao exceder o limite)" if interrompida else ""
+    logger_quantum.info(
+        f"Contagem de NaNs em streaming na coluna '{coluna}' finalizada:"
+        f" {contagem_nan} encontrados{detalhe}."
+    )
+    return ContagemParcial(contagem_nan) if interrompida else contagem_nan
+
+
+def localizar_excel_mais_recente(caminho_pasta: Path):
+    """
+    Encontra o arquivo Excel (.xlsx ou .xls) mais recente em uma pasta.
+
+    A consulta usa o manifesto da pasta (`manifesto_da_pasta`), que só volta a
+    listar a pasta quando ela foi alterada desde a última consulta.
 
     Args:
             caminho_pasta (Path): O caminho para a pasta que contém os arquivos.
 
     Returns:
-            pd.DataFrame: Um DataFrame com os dados do arquivo mais recente, ou None se não for encontrado.
+            Path: O caminho do arquivo mais recente, ou None se não for encontrado.
     """
     caminho_pasta = Path(caminho_pasta)
     if not caminho_pasta.is_dir():
-        error_msg = f"A pasta não foi encontrada em: {caminho_pasta}"
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "A pasta não foi encontrada em: {pasta}",
+            pasta=str(caminho_pasta),
+        )
         return None
 
     print_log("INFO", f"Procurando por arquivos Excel em: {caminho_pasta}")
-    arquivos_excel = list(caminho_pasta.glob("*.xlsx")) + list(
-        caminho_pasta.glob("*.xls")
-    )
+    arquivo_mais_recente = manifesto_da_pasta(caminho_pasta).mais_recente()
 
-    if not arquivos_excel:
-        msg = f"Nenhum arquivo Excel (.xlsx ou .xls) encontrado na pasta."
-        print_log("AVISO", msg, theme_color=Fore.YELLOW)
-        logger_quantum.info(msg)
+    if arquivo_mais_recente is None:
+        registrar_evento(
+            "AVISO",
+            ETAPA,
+            "Nenhum arquivo Excel (.xlsx ou .xls) encontrado na pasta.",
+            theme_color=Fore.YELLOW,
+            pasta=str(caminho_pasta),
+        )
         return None
 
-    arquivo_mais_recente = max(arquivos_excel, key=os.path.getmtime)
-    print_log("INFO", f"Arquivo mais recente encontrado: {arquivo_mais_recente.name}")
-    logger_quantum.info(
-        f"Arquivo mais recente para processamento: {arquivo_mais_recente.name}"
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        "Arquivo mais recente encontrado: {arquivo}",
+        arquivo=arquivo_mais_recente.name,
     )
+    return arquivo_mais_recente
+
+
+def ler_excel_mais_recente_da_pasta(caminho_pasta: Path):
+    """
+    Encontra e lê o arquivo Excel (.xlsx ou .xls) mais recente em uma pasta.
+
+    Args:
+            caminho_pasta (Path): O caminho para a pasta que contém os arquivos.
+
+    Returns:
+            pd.DataFrame: Um DataFrame com os dados do arquivo mais recente, ou None se não for encontrado.
+    """
+    arquivo_mais_recente = localizar_excel_mais_recente(caminho_pasta)
+    if arquivo_mais_recente is None:
+        return None
     return ler_arquivo_excel(arquivo_mais_recente)
 
 
-def processar_excel_extraido(caminho_pasta: Path, limites_null: int):
+def validar_arquivo_excel(
+    caminho_excel: Path,
+    limites_null: int,
+    coluna: str = "Retorno",
+    streaming: bool = True,
+    indice=None,
+    conteudo: bytes = None,
+    motor: MotorRegras = None,
+    data: date = None,
+):
+    """
+    Verifica a qualidade (contagem de NaNs em uma coluna) de um arquivo Excel.
+
+    No modo `streaming` (padrão) apenas a coluna é percorrida, com parada
+    antecipada ao exceder o limite, e o DataFrame só é lido se for solicitado.
+    Se um `indice` de processados for informado, o resultado fica registrado
+    pelo hash do arquivo e é reaproveitado enquanto o conteúdo não mudar.
+
+    Com um `indice`, as linhas e os nulos da coluna (ou, fora do modo
+    streaming, as estatísticas de todas as colunas) entram no histórico diário
+    e são comparados com a tendência dos dias anteriores (veja
+    `_registrar_historico`).
+
+    Com um `motor` de regras, a contagem de NaNs dá lugar às regras
+    configuradas (veja `validar_com_regras`).
+
+    Args:
+            caminho_excel (Path): O caminho completo para o arquivo Excel.
+            limites_null (int): O número máximo de valores nulos permitidos.
+            coluna (str): A coluna verificada.
+            streaming (bool): Se False, lê a planilha inteira com o pandas antes de validar
+                    (arquivos .xls são sempre lidos assim).
+            indice (IndiceProcessados): Índice de validações já executadas (opcional).
+            conteudo (bytes): O conteúdo do anexo já em memória; se informado, a
+                    validação é feita sobre ele, sem ler o arquivo do disco.
+            motor (MotorRegras): As regras de qualidade do feed (opcional).
+            data (date): A data de referência da planilha (padrão: hoje).
+
+    Returns:
+            PlanilhaValidada: A planilha validada se a contagem de nulos for aceitável.
+            int: A contagem de nulos se o limite for excedido (uma
+                    `ContagemParcial` se a leitura em streaming parou no limite).
+            RelatorioQualidade: O relatório, se alguma regra do `motor` falhar.
+            None: Se ocorrer um erro.
+    """
+    if motor is not None:
+        return validar_com_regras(
+            caminho_excel,
+            motor,
+            coluna=coluna,
+            indice=indice,
+            conteudo=conteudo,
+            data=data,
+        )
+
+    contagem_nan = None
+    if indice:
+        hash_conteudo = (
+            calcular_hash_conteudo(conteudo)
+            if conteudo is not None
+            else indice.hash_do_arquivo(caminho_excel)
+        )
+        contagem_nan = indice.validacao_registrada(hash_conteudo, coluna, limites_null)
+        if contagem_nan is not None:
+            registrar_evento(
+                "INFO",
+                ETAPA,
+                "Arquivo '{arquivo}' inalterado desde a última validação."
+                " Resultado reaproveitado do índice.",
+                arquivo=caminho_excel.name,
+                contagem_nan=int(contagem_nan),
+            )
+
+    df_excel = None
+    if contagem_nan is None:
+        estatisticas = EstatisticasPlanilha() if indice else None
+        if streaming and _le_em_streaming(caminho_excel):
+            contagem_nan = contar_nan_streaming(
+                caminho_excel,
+                limite=limites_null,
+                coluna=coluna,
+                conteudo=conteudo,
+                estatisticas=estatisticas,
+            )
+            if contagem_nan is None:
+                return None
+        else:
+            df_excel = ler_arquivo_excel(caminho_excel, conteudo=conteudo)
+            if df_excel is None:
+                return None
+            contagem_nan = quantidade_nan(df_excel, coluna=coluna)
+            if estatisticas is not None:
+                estatisticas.acumular(df_excel)
+        if indice and not isinstance(contagem_nan, ContagemParcial):
+            # Contagens parciais não são reaproveitadas: o total real é maior
+            indice.registrar_validacao(
+                hash_conteudo, coluna, limites_null, contagem_nan
+            )
+        if indice:
+            # Leituras interrompidas pelo limite não têm linhas para o histórico
+            if estatisticas.colunas():
+                _registrar_historico(
+                    indice, data or datetime.now().date(), estatisticas
+                )
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        "Verificação de qualidade: {nulos} nulos encontrados (Limite: {limite}).",
+        arquivo=caminho_excel.name,
+        coluna=coluna,
+        nulos=descrever_contagem_nan(contagem_nan, limites_null),
+        contagem_nan=int(contagem_nan),
+        contagem_parcial=isinstance(contagem_nan, ContagemParcial),
+        limite=limites_null,
+    )
+
+    if contagem_nan > limites_null:
+        return contagem_nan
+    return PlanilhaValidada(
+        caminho_excel, contagem_nan, dataframe=df_excel, conteudo=conteudo
+    )
+
+
+def validar_com_regras(
+    caminho_excel: Path,
+    motor: MotorRegras,
+    coluna: str = "Retorno",
+    indice=None,
+    conteudo: bytes = None,
+    data: date = None,
+):
+    """
+    Lê a planilha e aplica todas as regras de qualidade do `motor` em uma
+    única avaliação vetorizada. Planilhas .xlsx a partir de
+    TAMANHO_MINIMO_LOTES_MB são avaliadas em lotes (veja `avaliar_excel_em_lotes`),
+    sem manter o DataFrame completo em memória.
+
+    Com um `indice`, as estatísticas da planilha entram no histórico diário
+    (veja `_registrar_historico`) e as linhas do dia anterior são usadas pela
+    regra 'variacao_linhas'.
+
+    Returns:
+            PlanilhaValidada: A planilha validada (com o `relatorio`) se todas as regras passarem.
+            RelatorioQualidade: O relatório, se alguma regra falhar.
+            None: Se ocorrer um erro de leitura.
+    """
+    data = data or datetime.now().date()
+    linhas_anteriores = indice.linhas_anteriores(data) if indice else None
+    estatisticas = EstatisticasPlanilha(motor.colunas_chave) if indice else None
+
+    df_excel = None
+    tamanho = _tamanho_origem(caminho_excel, conteudo)
+    if (
+        tamanho is not None
+        and tamanho >= configuracao.tamanho_minimo_lotes_mb * 2**20
+        and _le_em_streaming(caminho_excel)
+    ):
+        relatorio = avaliar_excel_em_lotes(
+            caminho_excel,
+            motor,
+            conteudo=conteudo,
+            linhas_anteriores=linhas_anteriores,
+            estatisticas=estatisticas,
+        )
+        if relatorio is None:
+            return None
+    else:
+        df_excel = ler_arquivo_excel(caminho_excel, conteudo=conteudo)
+        if df_excel is None:
+            return None
+        relatorio = motor.avaliar(df_excel, linhas_anteriores=linhas_anteriores)
+        if estatisticas is not None:
+            estatisticas.acumular(df_excel)
+    if indice:
+        _registrar_historico(indice, data, estatisticas)
+
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        "Verificação de qualidade: {regras} regras avaliadas, {falhas} com falha.",
+        arquivo=caminho_excel.name,
+        regras=len(relatorio.resultados),
+        falhas=len(relatorio.falhas),
+    )
+    if not relatorio.aprovado:
+        return relatorio
+    return PlanilhaValidada(
+        caminho_excel,
+        relatorio.contagem_nulos(coluna),
+        dataframe=df_excel,
+        conteudo=conteudo,
+        relatorio=relatorio,
+    )
+
+
+def _registrar_historico(indice, data: date, estatisticas: EstatisticasPlanilha):
+    """
+    Compara o resumo da planilha com o histórico do índice (veja
+    `verificar_tendencias`), registra as anomalias como avisos e guarda o resumo
+    como o registro do dia.
+
+    Returns:
+            list[Anomalia]: As métricas fora da tendência.
+    """
+    with medir("historico_planilhas", linhas=estatisticas.linhas):
+        anomalias = verificar_tendencias(
+            indice,
+            data,
+            estatisticas,
+            janela_dias=configuracao.janela_historico_dias,
+            desvios=configuracao.desvios_anomalia,
+        )
+        indice.registrar_estatisticas(
+            data,
+            estatisticas.linhas,
+            estatisticas.colunas(),
+            hash_chaves=estatisticas.hash_chaves,
+        )
+    for anomalia in anomalias:
+        registrar_evento(
+            "AVISO",
+            ETAPA,
+            "Fora da tendência histórica: {anomalia}.",
+            theme_color=Fore.YELLOW,
+            anomalia=anomalia,
+            **anomalia.para_dict(),
+        )
+    return anomalias
+
+
+def _tamanho_origem(caminho_excel: Path, conteudo: bytes = None):
+    """Tamanho em bytes do conteúdo em memória ou do arquivo (None se não existir)."""
+    if conteudo is not None:
+        return len(conteudo)
+    try:
+        return caminho_excel.stat().st_size
+    except OSError:
+        return None
+
+
+def avaliar_excel_em_lotes(
+    caminho_excel: Path,
+    motor: MotorRegras,
+    tamanho_lote: int = None,
+    conteudo: bytes = None,
+    linhas_anteriores: int = None,
+    estatisticas: EstatisticasPlanilha = None,
+):
+    """
+    Aplica as regras do `motor` à planilha lida em lotes (`ler_excel_em_lotes`),
+    com a memória limitada ao tamanho do lote. O tamanho do maior lote e o pico
+    de memória do processo ficam registrados no log da execução.
+
+    Args:
+            caminho_excel (Path): O caminho completo para o arquivo Excel.
+            motor (MotorRegras): As regras de qualidade do feed.
+            tamanho_lote (int): Linhas por lote (padrão: LINHAS_POR_LOTE).
+            conteudo (bytes): O conteúdo do arquivo já em memória (opcional).
+            linhas_anteriores (int): Linhas da planilha do dia anterior (opcional).
+            estatisticas (EstatisticasPlanilha): Acumula o resumo da planilha para o
+                    histórico, na mesma leitura (opcional).
+
+    Returns:
+            RelatorioQualidade: O resultado das regras, ou None se ocorrer um erro.
+    """
+    tamanho_lote = tamanho_lote or configuracao.linhas_por_lote
+    lotes = 0
+    maior_lote = 0
+
+    def lotes_medidos():
+        nonlocal lotes, maior_lote
+        for lote in ler_excel_em_lotes(caminho_excel, tamanho_lote, conteudo=conteudo):
+            lotes += 1
+            maior_lote = max(maior_lote, int(lote.memory_usage(deep=True).sum()))
+            if estatisticas is not None:
+                estatisticas.acumular(lote)
+            yield lote
+
+    print_log("INFO", f"Lendo o arquivo Excel em lotes: {caminho_excel.name}...")
+    try:
+        with medir(
+            "validacao_em_lotes", bytes=_tamanho_origem(caminho_excel, conteudo)
+        ) as medicao:
+            relatorio = motor.avaliar_em_lotes(lotes_medidos(), linhas_anteriores)
+            medicao.registrar(lotes=lotes, linhas=relatorio.linhas)
+    except Exception as e:
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Ocorreu um erro inesperado ao tentar validar em lotes o arquivo"
+            " '{arquivo}': {erro}",
+            exc=e,
+            arquivo=caminho_excel.name,
+            erro=str(e),
+        )
+        return None
+
+    pico = pico_memoria_processo()
+    modelo = (
+        "Arquivo '{arquivo}' validado em {lotes} lote(s) de até {linhas_por_lote}"
+        " linhas: maior lote com {maior_lote_mb:.1f} MB"
+    )
+    if pico is not None:
+        modelo += ", pico de memória do processo de {pico_memoria_mb:.1f} MB"
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        f"{modelo}.",
+        arquivo=caminho_excel.name,
+        lotes=lotes,
+        linhas=relatorio.linhas,
+        linhas_por_lote=tamanho_lote,
+        maior_lote_bytes=maior_lote,
+        pico_memoria_bytes=pico,
+        maior_lote_mb=maior_lote / 2**20,
+        pico_memoria_mb=pico / 2**20 if pico is not None else None,
+    )
+    return relatorio
+
+
+def processar_excel_extraido(
+    caminho_pasta: Path,
+    limites_null: int,
+    streaming: bool = True,
+    usar_indice: bool = True,
+):
     """
     Orquestra a leitura do Excel mais recente e a verificação de qualidade (contagem de NaNs).
 
+    No modo `streaming` (padrão) apenas a coluna 'Retorno' é percorrida, com parada
+    antecipada ao exceder o limite, e o DataFrame só é lido se for solicitado.
+    Com `usar_indice`, o resultado fica registrado pelo hash do arquivo e é
+    reaproveitado enquanto o conteúdo não mudar.
+
     Args:
             caminho_pasta (Path): A pasta onde o arquivo Excel de entrada está localizado.
             limites_null (int): O número máximo de valores nulos permitidos.
+            streaming (bool): Se False, lê a planilha inteira com o pandas antes de validar.
+            usar_indice (bool): Se False, ignora o índice de validações já executadas.
 
     Returns:
-            pd.DataFrame: O DataFrame do Excel se a contagem de nulos for aceitável.
+            PlanilhaValidada: A planilha validada se a contagem de nulos for aceitável.
             int: A contagem de nulos se o limite for excedido.
             None: Se nenhum arquivo for encontrado ou ocorrer um erro.
     """
-    df_excel = ler_excel_mais_recente_da_pasta(caminho_pasta)
-    if df_excel is None:
+    caminho_excel = localizar_excel_mais_recente(caminho_pasta)
+    if caminho_excel is None:
         return None  # Erro já logado pela função anterior
 
-    contagem_nan = quantidade_nan(df_excel)
-    print_log(
-        "INFO",
-        f"Verificação de qualidade: {contagem_nan} nulos encontrados (Limite: {limites_null}).",
+    indice = indice_da_pasta(caminho_pasta) if usar_indice else None
+    return validar_arquivo_excel(
+        caminho_excel, limites_null, streaming=streaming, indice=indice
     )
 
-    if contagem_nan > limites_null:
-        return contagem_nan
-    return df_excel
+
+def _validar_arquivo_isolado(caminho_excel: Path, limites_null: int, coluna: str):
+    """
+    Lê e valida um único arquivo. Executada nos processos do pool, por isso
+    devolve apenas dados simples (serializáveis) em vez de DataFrames.
+    """
+    inicio = time.perf_counter()
+    resultado = {"arquivo": caminho_excel.name, "linhas": None, "contagem_nan": None}
+    df_excel = ler_arquivo_excel(caminho_excel)
+    if df_excel is None:
+        resultado["erro"] = "Falha na leitura do arquivo."
+    else:
+        resultado["linhas"] = len(df_excel)
+        resultado["contagem_nan"] = int(quantidade_nan(df_excel, coluna=coluna))
+    resultado["aprovado"] = (
+        resultado["contagem_nan"] is not None
+        and resultado["contagem_nan"] <= limites_null
+    )
+    resultado["duracao_s"] = round(time.perf_counter() - inicio, 4)
+    # Processos do pool criados por fork encerram sem executar o atexit
+    logger_quantum.save_logs()
+    console.descarregar()
+    return resultado
+
+
+def validar_pasta_em_lote(
+    caminho_pasta: Path,
+    limites_null: int,
+    coluna: str = "Retorno",
+    max_workers: int = None,
+    arquivo_resumo: Path = None,
+):
+    """
+    Valida todas as planilhas Excel de uma pasta em paralelo, em um pool de processos.
+
+    Usada em reprocessamentos e cargas retroativas (`main.py --validar-pasta`).
+    Cada arquivo é lido com `ler_arquivo_excel` e verificado com `quantidade_nan`
+    em um processo separado; os resultados são devolvidos à medida que ficam
+    prontos. O resumo consolidado é gravado em JSON ao final, mesmo que o
+    consumidor pare antes (os arquivos ainda não iniciados são cancelados e o
+    resumo traz `"completo": false`) ou que ocorra um erro.
+
+    Args:
+            caminho_pasta (Path): A pasta com os arquivos Excel.
+            limites_null (int): O número máximo de valores nulos permitidos.
+            coluna (str): A coluna verificada.
+            max_workers (int): Número máximo de processos (padrão: número de CPUs).
+            arquivo_resumo (Path): Onde gravar o resumo (padrão: na própria pasta).
+
+    Yields:
+            dict: arquivo, linhas, contagem_nan, aprovado e duracao_s de cada arquivo.
+
+    Raises:
+            NotADirectoryError: Se a pasta não existir (nada é criado nela).
+    """
+    caminho_pasta = Path(caminho_pasta)
+    if not caminho_pasta.is_dir():
+        raise NotADirectoryError(f"A pasta não existe: {caminho_pasta}")
+    arquivos_excel = manifesto_da_pasta(caminho_pasta).planilhas()
+    max_workers = max_workers or os.cpu_count() or 1
+    registrar_evento(
+        "AÇÃO",
+        ETAPA,
+        "Validando {total_arquivos} arquivos Excel em '{pasta}' com {processos}"
+        " processos...",
+        total_arquivos=len(arquivos_excel),
+        pasta=str(caminho_pasta),
+        processos=max_workers,
+    )
+
+    inicio = time.perf_counter()
+    resultados = []
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futuros = {
+            executor.submit(
+                _validar_arquivo_isolado, caminho, limites_null, coluna
+            ): caminho
+            for caminho in arquivos_excel
+        }
+        for futuro in as_completed(futuros):
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                resultado = {
+                    "arquivo": futuros[futuro].name,
+                    "linhas": None,
+                    "contagem_nan": None,
+                    "aprovado": False,
+                    "duracao_s": None,
+                    "erro": str(e),
+                }
+                logger_quantum.error(
+                    f"Falha ao validar '{futuros[futuro].name}' no pool: {e}", exc=e
+                )
+            resultados.append(resultado)
+            logger_quantum.info(
+                f"Arquivo '{resultado['arquivo']}' validado em lote.",
+                extra_data=resultado,
+            )
+            yield resultado
+    finally:
+        # Se o consumidor parou antes do fim, os arquivos pendentes são cancelados
+        executor.shutdown(wait=True, cancel_futures=True)
+        _gravar_resumo_lote(
+            caminho_pasta,
+            {
+                "pasta": str(caminho_pasta),
+                "coluna": coluna,
+                "limites_null": limites_null,
+                "processos": max_workers,
+                "completo": len(resultados) == len(arquivos_excel),
+                "arquivos_na_pasta": len(arquivos_excel),
+                "total_arquivos": len(resultados),
+                "aprovados": sum(1 for r in resultados if r["aprovado"]),
+                "reprovados": sum(1 for r in resultados if not r["aprovado"]),
+                "duracao_total_s": round(time.perf_counter() - inicio, 4),
+                "arquivos": sorted(resultados, key=lambda r: r["arquivo"]),
+            },
+            arquivo_resumo,
+        )
+
+
+def _gravar_resumo_lote(caminho_pasta: Path, resumo: dict, arquivo_resumo: Path = None):
+    """Grava o resumo de `validar_pasta_em_lote` e registra o resultado."""
+    if arquivo_resumo is None:
+        arquivo_resumo = (
+            caminho_pasta
+            / f"resumo_validacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+    with open(arquivo_resumo, "w", encoding="utf-8") as f:
+        json.dump(resumo, f, indent=4, ensure_ascii=False)
+
+    registrar_evento(
+        "INFO" if resumo["completo"] else "AVISO",
+        ETAPA,
+        (
+            "Validação em lote concluída em {duracao_total_s:.2f}s: {aprovados}"
+            " aprovados, {reprovados} reprovados. Resumo salvo em: {arquivo_resumo}"
+            if resumo["completo"]
+            else "Validação em lote interrompida após {total_arquivos} de"
+            " {arquivos_na_pasta} arquivos ({aprovados} aprovados, {reprovados}"
+            " reprovados). Resumo parcial salvo em: {arquivo_resumo}"
+        ),
+        **{chave: valor for chave, valor in resumo.items() if chave != "arquivos"},
+        arquivo_resumo=str(arquivo_resumo),
+    )
@@ -0,0 +1,396 @@
+import atexit
+import queue
+import smtplib
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from colorama import Fore
+
+# Importações locais
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+from source.observabilidade.medicoes import medir
+
+ETAPA = "notificacao"
+
+# Erros de SMTP que justificam reconectar e tentar novamente
+ERROS_SMTP_TRANSITORIOS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    smtplib.SMTPHeloError,
+    OSError,
+)
+
+# Sentinela enfileirada por `encerrar`: a thread de entrega fecha as conexões e para
+_ENCERRAR = object()
+
+
+class NotificacaoTeams:
+    """Um MessageCard a ser publicado em um webhook do Teams."""
+
+    canal = "teams"
+
+    def __init__(self, webhook_url: str, card: dict):
+        self.webhook_url = webhook_url
+        self.card = card
+
+    @property
+    def destino(self):
+        return self.webhook_url
+
+
+class NotificacaoEmail:
+    """Um e-mail HTML a ser enviado por SMTP."""
+
+    canal = "email"
+
+    def __init__(
+        self, remetente: str, senha: str, destinatarios: list, assunto: str, html: str
+    ):
+        self.remetente = remetente
+        self.senha = senha
+        self.destinatarios = list(destinatarios)
+        self.assunto = assunto
+        self.html = html
+
+    @property
+    def destino(self):
+        return (self.remetente, tuple(self.destinatarios))
+
+
+def agrupar_cards(cards: list) -> dict:
+    """Junta vários MessageCards em um único card com todas as seções."""
+    if len(cards) == 1:
+        return cards[0]
+    # Um alerta no grupo define a cor do card agrupado
+    cores = [c.get("themeColor") for c in cards]
+    return {
+        "@type": "MessageCard",
+        "@context": "http://schema.org/extensions",
+        "themeColor": "d9534f" if "d9534f" in cores else cores[0],
+        "summary": f"{len(cards)} notificações: "
+        + "; ".join(c.get("summary", "") for c in cards),
+        "sections": [secao for c in cards for secao in c.get("sections", [])],
+    }
+
+
+def agrupar_emails(emails: list) -> NotificacaoEmail:
+    """Junta vários e-mails para os mesmos destinatários em uma única mensagem."""
+    if len(emails) == 1:
+        return emails[0]
+    primeiro = emails[0]
+    assunto = f"{len(emails)} notificações: " + "; ".join(e.assunto for e in emails)
+    html = "<hr>".join(e.html for e in emails)
+    return NotificacaoEmail(
+        primeiro.remetente, primeiro.senha, primeiro.destinatarios, assunto, html
+    )
+
+
+class DespachanteNotificacoes:
+    """
+    Entrega as notificações do Teams e de e-mail em segundo plano.
+
+    `enviar_teams` e `enviar_email` apenas enfileiram a notificação e retornam.
+    Uma thread de entrega aguarda `janela_agrupamento` segundos após a primeira
+    notificação e junta tudo o que chegou para o mesmo destino em um único envio.
+    Os webhooks usam uma `requests.Session` com pool de conexões, timeout e
+    novas tentativas; os e-mails reaproveitam uma conexão SMTP autenticada, que
+    só é reaberta quando deixa de responder.
+
+    O servidor SMTP é definido por SMTP_SERVIDOR, SMTP_PORTA e SMTP_STARTTLS
+    (padrão: smtp.office365.com, 587, com STARTTLS), a menos que seja
+    informado na criação. O `requests` só é importado no primeiro envio ao Teams.
+    """
+
+    def __init__(
+        self,
+        janela_agrupamento: float = 1.0,
+        timeout: float = 10.0,
+        tentativas: int = 3,
+        espera_inicial: float = 1.0,
+        dormir=time.sleep,
+        servidor_smtp: str = None,
+        porta_smtp: int = None,
+        usar_starttls: bool = None,
+    ):
+        self.janela_agrupamento = janela_agrupamento
+        self.timeout = timeout
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self._dormir = dormir
+        self.servidor_smtp = servidor_smtp or configuracao.smtp_servidor
+        self.porta_smtp = porta_smtp or configuracao.smtp_porta
+        self.usar_starttls = (
+            configuracao.smtp_starttls if usar_starttls is None else usar_starttls
+        )
+
+        self._fila = queue.Queue()
+        self._condicao = threading.Condition()
+        self._pendentes = 0
+        self._sessao_http = None
+        self._smtp = None
+        self._smtp_login = None
+        self._entregador = None
+        self.envios = 0
+        self.falhas = 0
+        atexit.register(self.encerrar)
+
+    # --- API pública ---
+    def enviar_teams(self, webhook_url: str, card: dict):
+        """Enfileira um MessageCard para o webhook informado."""
+        self._enfileirar(NotificacaoTeams(webhook_url, card))
+
+    def enviar_email(
+        self, remetente: str, senha: str, destinatarios: list, assunto: str, html: str
+    ):
+        """Enfileira um e-mail HTML. Sem senha, o envio é feito sem login."""
+        self._enfileirar(
+            NotificacaoEmail(remetente, senha, destinatarios, assunto, html)
+        )
+
+    def aguardar(self, timeout: float = 30.0) -> bool:
+        """
+        Bloqueia até que todas as notificações enfileiradas sejam entregues.
+
+        Returns:
+            bool: False se ainda houver notificações pendentes ao fim do prazo.
+        """
+        with self._condicao:
+            return self._condicao.wait_for(lambda: self._pendentes == 0, timeout)
+
+    def encerrar(self, timeout: float = 30.0):
+        """
+        Entrega o que estiver pendente e fecha as conexões.
+
+        As conexões são fechadas pela própria thread de entrega, depois do
+        último envio. Se ela não terminar no prazo (um envio ainda em
+        andamento), as conexões ficam abertas até o fim do processo em vez de
+        serem fechadas no meio do envio.
+        """
+        prazo = time.monotonic() + timeout
+        if self._pendentes:
+            print_log(
+                "INFO",
+                f"Aguardando a entrega de {self._pendentes} notificação(ões)...",
+                theme_color=Fore.CYAN,
+            )
+        if not self.aguardar(timeout):
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "{pendentes} notificação(ões) não foram entregues no prazo de"
+                " {prazo_s:.0f}s.",
+                pendentes=self._pendentes,
+                prazo_s=timeout,
+            )
+        with self._condicao:
+            entregador = self._entregador
+            if entregador is not None and entregador.is_alive():
+                self._fila.put(_ENCERRAR)
+            else:
+                entregador = None
+        if entregador is None:
+            self._fechar_conexoes()
+            return
+        entregador.join(max(0.0, prazo - time.monotonic()))
+        if entregador.is_alive():
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "A entrega de notificações não terminou no prazo de {prazo_s:.0f}s;"
+                " as conexões não foram fechadas.",
+                prazo_s=timeout,
+            )
+
+    def _fechar_conexoes(self):
+        self._fechar_smtp()
+        if self._sessao_http is not None:
+            self._sessao_http.close()
+            self._sessao_http = None
+
+    # --- Fila e thread de entrega ---
+    def _enfileirar(self, notificacao):
+        # Sob a condição: a thread de entrega só para com a fila vazia
+        with self._condicao:
+            self._pendentes += 1
+            if self._entregador is None or not self._entregador.is_alive():
+                self._entregador = threading.Thread(
+                    target=self._entregar_continuamente,
+                    name="despachante-notificacoes",
+                    daemon=True,
+                )
+                self._entregador.start()
+            self._fila.put(notificacao)
+
+    def _coletar_lote(self) -> list:
+        """
+        Espera a primeira notificação e junta as que chegarem na janela de
+        agrupamento. Um pedido de encerramento fecha o lote na hora.
+        """
+        lote = [self._fila.get()]
+        limite = time.monotonic() + self.janela_agrupamento
+        while lote[-1] is not _ENCERRAR:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _entregar_continuamente(self):
+        while True:
+            lote = self._coletar_lote()
+            encerrar = lote[-1] is _ENCERRAR
+            if encerrar:
+                lote.pop()
+            grupos = {}
+            for notificacao in lote:
+                grupos.setdefault((notificacao.canal, notificacao.destino), []).append(
+                    notificacao
+                )
+            for (canal, _), notificacoes in grupos.items():
+                try:
+                    with medir(f"envio_{canal}", notificacoes=len(notificacoes)):
+                        if canal == "teams":
+                            self._publicar_teams(
+                                notificacoes[0].webhook_url,
+                                agrupar_cards([n.card for n in notificacoes]),
+                            )
+                        else:
+                            self._enviar_smtp(agrupar_emails(notificacoes))
+                    self.envios += 1
+                    registrar_evento(
+                        "INFO",
+                        ETAPA,
+                        "{notificacoes} notificação(ões) entregue(s) via {canal} em"
+                        " um único envio.",
+                        theme_color=Fore.GREEN,
+                        canal=canal,
+                        notificacoes=len(notificacoes),
+                    )
+                except smtplib.SMTPAuthenticationError as e:
+                    self.falhas += 1
+                    registrar_evento(
+                        "ERROR",
+                        ETAPA,
+                        "Erro de autenticação SMTP. Verifique seu e-mail e senha"
+                        " (ou senha de app).",
+                        exc=e,
+                        canal=canal,
+                        notificacoes=len(notificacoes),
+                    )
+                except Exception as e:
+                    self.falhas += 1
+                    registrar_evento(
+                        "ERROR",
+                        ETAPA,
+                        "Falha ao entregar notificação via {canal}: {erro}",
+                        exc=e,
+                        canal=canal,
+                        notificacoes=len(notificacoes),
+                        erro=str(e),
+                    )
+            with self._condicao:
+                self._pendentes -= len(lote)
+                self._condicao.notify_all()
+            if encerrar:
+                self._fechar_conexoes()
+                with self._condicao:
+                    if self._fila.empty():
+                        self._entregador = None
+                        return
+
+    # --- Teams ---
+    def _sessao(self):
+        """A `requests.Session` dos webhooks, criada (e importada) no primeiro uso."""
+        if self._sessao_http is None:
+            import requests
+            import urllib3
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # Os webhooks são chamados com verify=False
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            retry = Retry(
+                total=self.tentativas,
+                backoff_factor=self.espera_inicial,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+            )
+            sessao = requests.Session()
+            sessao.mount("https://", HTTPAdapter(max_retries=retry))
+            sessao.mount("http://", HTTPAdapter(max_retries=retry))
+            sessao.headers["Content-Type"] = "application/json"
+            self._sessao_http = sessao
+        return self._sessao_http
+
+    def _publicar_teams(self, webhook_url: str, card: dict):
+        response = self._sessao().post(
+            webhook_url, json=card, timeout=self.timeout, verify=False
+        )
+        response.raise_for_status()
+
+    # --- SMTP ---
+    def _fechar_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+            self._smtp_login = None
+
+    def _conexao_smtp(self, remetente: str, senha: str) -> smtplib.SMTP:
+        """Devolve a conexão SMTP aberta se ela responder ao NOOP; senão abre outra."""
+        if self._smtp is not None and self._smtp_login == remetente:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except ERROS_SMTP_TRANSITORIOS:
+                pass
+        self._fechar_smtp()
+
+        smtp = smtplib.SMTP(self.servidor_smtp, self.porta_smtp, timeout=self.timeout)
+        smtp.ehlo("localhost")
+        if self.usar_starttls:
+            smtp.starttls()
+            smtp.ehlo("localhost")
+        if senha:
+            smtp.login(remetente, senha)
+        logger_quantum.info(
+            f"Conexão SMTP aberta com {self.servidor_smtp}:{self.porta_smtp}."
+        )
+        self._smtp = smtp
+        self._smtp_login = remetente
+        return smtp
+
+    def _enviar_smtp(self, email: NotificacaoEmail):
+        msg = MIMEMultipart()
+        msg["From"] = email.remetente
+        msg["To"] = ", ".join(email.destinatarios)
+        msg["Subject"] = email.assunto
+        msg.attach(MIMEText(email.html, "html"))
+
+        espera = self.espera_inicial
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                self._conexao_smtp(email.remetente, email.senha).send_message(msg)
+                return
+            except ERROS_SMTP_TRANSITORIOS as e:
+                self._fechar_smtp()
+                if tentativa == self.tentativas:
+                    raise
+                logger_quantum.info(
+                    f"Envio SMTP falhou (tentativa {tentativa}): {e}."
+                    f" Nova tentativa em {espera:.1f}s."
+                )
+                self._dormir(espera)
+                espera *= 2
+
+
+# Despachante compartilhado por todo o processo
+despachante = DespachanteNotificacoes()
@@ -0,0 +1,341 @@
+import functools
+import io
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Prefixo das métricas exportadas
+PREFIXO_METRICAS = "quantum"
+
+
+class Medicao:
+    """
+    Uma execução medida de uma etapa: duração, se terminou com exceção e
+    contadores livres (bytes, linhas, mensagens...).
+    """
+
+    __slots__ = ("nome", "inicio", "duracao", "erro", "contadores")
+
+    def __init__(self, nome: str, contadores: dict = None):
+        self.nome = nome
+        self.inicio = time.time()
+        self.duracao = None
+        self.erro = False
+        self.contadores = dict(contadores or {})
+
+    def registrar(self, **contadores):
+        """Acrescenta contadores à medição (ex: `registrar(bytes=..., linhas=...)`)."""
+        for chave, valor in contadores.items():
+            if valor is not None:
+                self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def para_dict(self) -> dict:
+        return {
+            "etapa": self.nome,
+            "inicio": self.inicio,
+            "duracao": self.duracao,
+            "erro": self.erro,
+            **self.contadores,
+        }
+
+    # Enviada de volta pelos processos do executor de validação
+    def __getstate__(self):
+        return {chave: getattr(self, chave) for chave in self.__slots__}
+
+    def __setstate__(self, estado):
+        for chave, valor in estado.items():
+            setattr(self, chave, valor)
+
+
+class _Cronometro:
+    """Gerenciador de contexto e decorador devolvido por `Medidor.medir`."""
+
+    def __init__(self, medidor, nome: str, contadores: dict):
+        self._medidor = medidor
+        self._nome = nome
+        self._contadores = contadores
+        self._medicao = None
+        self._inicio = None
+
+    def __enter__(self) -> Medicao:
+        self._medicao = Medicao(self._nome, self._contadores)
+        self._inicio = time.perf_counter()
+        return self._medicao
+
+    def __exit__(self, tipo_exc, exc, tb):
+        self._medicao.duracao = time.perf_counter() - self._inicio
+        self._medicao.erro = tipo_exc is not None
+        self._medidor.registrar(self._medicao)
+        return False
+
+    def __call__(self, funcao):
+        # Como decorador, cada chamada cria o seu próprio cronômetro
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with _Cronometro(self._medidor, self._nome, self._contadores):
+                return funcao(*args, **kwargs)
+
+        return medida
+
+
+class Medidor:
+    """
+    Registra as medições das etapas do processo (thread-safe).
+
+    Os totais por etapa são acumulados a cada medição; apenas as
+    `maximo_medicoes` medições mais recentes são mantidas individualmente.
+    """
+
+    def __init__(self, maximo_medicoes: int = 10_000):
+        self._trava = threading.Lock()
+        self._medicoes = deque(maxlen=maximo_medicoes)
+        self._totais = {}
+
+    def medir(self, nome: str, **contadores) -> _Cronometro:
+        """
+        Mede uma etapa. Pode ser usado como gerenciador de contexto, que devolve
+        a `Medicao` para que contadores sejam acrescentados, ou como decorador.
+
+            with medidor.medir("leitura_excel", bytes=tamanho) as medicao:
+                df = pd.read_excel(caminho)
+                medicao.registrar(linhas=len(df))
+        """
+        return _Cronometro(self, nome, contadores)
+
+    def registrar(self, medicao: Medicao):
+        """Acrescenta uma medição já concluída aos totais."""
+        with self._trava:
+            self._medicoes.append(medicao)
+            totais = self._totais.setdefault(
+                medicao.nome,
+                {
+                    "execucoes": 0,
+                    "erros": 0,
+                    "duracao_total": 0.0,
+                    "duracao_maxima": 0.0,
+                    "contadores": {},
+                },
+            )
+            totais["execucoes"] += 1
+            totais["erros"] += medicao.erro
+            totais["duracao_total"] += medicao.duracao
+            totais["duracao_maxima"] = max(totais["duracao_maxima"], medicao.duracao)
+            for chave, valor in medicao.contadores.items():
+                totais["contadores"][chave] = totais["contadores"].get(chave, 0) + valor
+
+    def incorporar(self, medicoes):
+        """Registra medições feitas em outro processo."""
+        for medicao in medicoes:
+            self.registrar(medicao)
+
+    def drenar(self) -> list:
+        """Devolve e descarta as medições registradas (e os seus totais)."""
+        with self._trava:
+            medicoes = list(self._medicoes)
+            self._medicoes.clear()
+            self._totais.clear()
+        return medicoes
+
+    def medicoes(self) -> list:
+        with self._trava:
+            return list(self._medicoes)
+
+    def resumo(self) -> dict:
+        """Totais por etapa: execuções, erros, durações (s) e contadores somados."""
+        with self._trava:
+            return {
+                nome: {
+                    "execucoes": t["execucoes"],
+                    "erros": t["erros"],
+                    "duracao_total": round(t["duracao_total"], 6),
+                    "duracao_maxima": round(t["duracao_maxima"], 6),
+                    **t["contadores"],
+                }
+                for nome, t in self._totais.items()
+            }
+
+    def exportar(self, caminho: Path, formato: str = None) -> Path:
+        """
+        Grava os totais por etapa no formato texto do Prometheus (para o
+        textfile collector do node_exporter) ou em OpenMetrics.
+
+        O arquivo é escrito em um temporário e renomeado, para que o coletor
+        nunca leia um arquivo pela metade.
+
+        Args:
+                caminho (Path): O arquivo de destino.
+                formato (str): "prometheus" ou "openmetrics"; por padrão, OpenMetrics
+                        se a extensão for ".om" e Prometheus nos demais casos.
+
+        Returns:
+                Path: O caminho do arquivo gravado.
+        """
+        caminho = Path(caminho)
+        if formato is None:
+            formato = "openmetrics" if caminho.suffix == ".om" else "prometheus"
+        texto = formatar_metricas(self.resumo(), openmetrics=formato == "openmetrics")
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_name(f".{caminho.name}.{os.getpid()}.tmp")
+        temporario.write_text(texto, encoding="utf-8")
+        os.replace(temporario, caminho)
+        return caminho
+
+
+def _escapar_rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatar_metricas(resumo: dict, openmetrics: bool = False) -> str:
+    """Converte o `Medidor.resumo()` em texto no formato do Prometheus/OpenMetrics."""
+    familias = [
+        ("etapa_execucoes", "counter", "Execuções de cada etapa.", "execucoes"),
+        ("etapa_erros", "counter", "Execuções que terminaram com erro.", "erros"),
+        (
+            "etapa_duracao_segundos",
+            "counter",
+            "Tempo total gasto em cada etapa.",
+            "duracao_total",
+        ),
+        (
+            "etapa_duracao_maxima_segundos",
+            "gauge",
+            "Maior duração de uma execução da etapa.",
+            "duracao_maxima",
+        ),
+    ]
+    fixos = {chave for *_, chave in familias}
+    contadores = sorted(
+        {chave for totais in resumo.values() for chave in totais} - fixos
+    )
+    familias += [
+        (f"etapa_{chave}", "counter", f"Soma de '{chave}' nas execuções.", chave)
+        for chave in contadores
+    ]
+
+    linhas = []
+    for nome, tipo, ajuda, chave in familias:
+        familia = f"{PREFIXO_METRICAS}_{nome}"
+        # No OpenMetrics o nome da família de um counter não leva o sufixo _total
+        amostra = f"{familia}_total" if tipo == "counter" else familia
+        linhas.append(f"# HELP {familia if openmetrics else amostra} {ajuda}")
+        linhas.append(f"# TYPE {familia if openmetrics else amostra} {tipo}")
+        for etapa, totais in sorted(resumo.items()):
+            if chave in totais:
+                linhas.append(
+                    f'{amostra}{{etapa="{_escapar_rotulo(etapa)}"}} {totais[chave]}'
+                )
+
+    ultima = f"{PREFIXO_METRICAS}_ultima_execucao_timestamp_segundos"
+    linhas.append(f"# HELP {ultima} Momento da exportação (epoch).")
+    linhas.append(f"# TYPE {ultima} gauge")
+    linhas.append(f"{ultima} {time.time():.3f}")
+    if openmetrics:
+        linhas.append("# EOF")
+    return "\n".join(linhas) + "\n"
+
+
+@contextmanager
+def perfilar(pasta_destino: Path, prefixo: str = "perfil", linhas: int = 40):
+    """
+    Executa o bloco sob o cProfile e grava o perfil da execução em
+    `<pasta_destino>/<prefixo>_AAAAMMDD_HHMMSS.prof` (para o snakeviz/pstats),
+    com um resumo em texto das funções de maior tempo acumulado ao lado.
+
+    O cProfile só mede a thread que o ativa; por isso cada thread iniciada
+    durante o bloco (executores da caixa postal, da validação e de
+    notificações) ganha o seu próprio perfil, e todos são somados no arquivo
+    gravado. Threads já em execução antes do bloco não são perfiladas, e a
+    validação em outros processos aparece como espera.
+    """
+    import cProfile
+    import pstats
+
+    pasta_destino = Path(pasta_destino)
+    pasta_destino.mkdir(parents=True, exist_ok=True)
+    base = pasta_destino / f"{prefixo}_{datetime.now():%Y%m%d_%H%M%S}"
+    perfis = []
+    trava = threading.Lock()
+
+    def perfilar_thread(frame, evento, argumento):
+        # Primeira chamada na nova thread: o perfil dela substitui este gancho
+        perfil_thread = cProfile.Profile()
+        with trava:
+            perfis.append(perfil_thread)
+        perfil_thread.enable()
+
+    perfil = cProfile.Profile()
+    threading.setprofile(perfilar_thread)
+    perfil.enable()
+    try:
+        yield base.with_suffix(".prof")
+    finally:
+        perfil.disable()
+        threading.setprofile(None)
+        resumo = io.StringIO()
+        estatisticas = pstats.Stats(perfil, stream=resumo)
+        with trava:
+            for perfil_thread in perfis:
+                estatisticas.add(perfil_thread)
+        estatisticas.dump_stats(base.with_suffix(".prof"))
+        estatisticas.sort_stats("cumulative").print_stats(linhas)
+        base.with_suffix(".txt").write_text(resumo.getvalue(), encoding="utf-8")
+
+
+def pico_memoria_processo() -> int:
+    """
+    Pico de memória residente (RSS) do processo atual até agora, em bytes,
+    ou None se a plataforma não informar.
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class _ContadoresMemoria(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            contadores = _ContadoresMemoria()
+            contadores.cb = ctypes.sizeof(contadores)
+            processo = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(
+                processo, ctypes.byref(contadores), contadores.cb
+            ):
+                return None
+            return int(contadores.PeakWorkingSetSize)
+
+        if sys.platform.startswith("linux"):
+            # O ru_maxrss do Linux herda o pico do processo pai através do exec;
+            # o VmHWM é do próprio processo
+            with open("/proc/self/status", encoding="ascii") as status:
+                for linha in status:
+                    if linha.startswith("VmHWM:"):
+                        return int(linha.split()[1]) * 1024
+
+        import resource
+
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss vem em bytes no macOS e em KiB no Linux
+        return pico if sys.platform == "darwin" else pico * 1024
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+# Medidor compartilhado por todo o processo
+medidor = Medidor()
+medir = medidor.medir
@@ -0,0 +1,475 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from functools import partial
+from pathlib import Path
+
+from colorama import Fore
+
+# Importações locais
+from source.email.caixa_postal import CaixaPostal, criar_caixa_postal
+from source.email.extrair_excel_email import ingerir_excel_email
+from source.feeds.processar_feeds import Feed
+from source.indice.indice_processados import indice_da_pasta
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
+from source.manipulacao_excel.manipulacao_excel import (
+    PlanilhaValidada,
+    descrever_contagem_nan,
+    validar_arquivo_excel,
+)
+from source.notificacao.despachante import despachante
+from source.observabilidade.medicoes import medidor
+from source.qualidade.motor_regras import MotorRegras, RelatorioQualidade
+from source.teams.envia_teams_alerta import enviar_teams_alerta
+from source.teams.envia_teams_sucesso import enviar_teams_sucesso
+
+# No modo de observação, a thread do COM é liberada a cada fatia de espera
+# para que os outros trabalhos também possam consultar a caixa postal
+FATIA_OBSERVACAO_SEGUNDOS = 5.0
+
+
+def _inicializar_com():
+    """Inicializa o COM na thread dedicada à caixa postal (apenas no Windows)."""
+    try:
+        import pythoncom
+    except ImportError:
+        return
+    pythoncom.CoInitialize()
+
+
+def _aquecer_validacao():
+    """Importa no executor de validação as bibliotecas que leem as planilhas."""
+    import numpy  # noqa: F401
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+
+
+def _validar_em_processo(
+    caminho_excel: Path,
+    limites_null: int,
+    coluna: str,
+    conteudo: bytes,
+    motor: MotorRegras = None,
+    data: date = None,
+):
+    """
+    Valida o conteúdo de um anexo no executor de validação, usando o índice da sua pasta.
+
+    Returns:
+            tuple: (resultado da validação, medições feitas no processo do pool, que
+                    o processo principal incorpora ao seu medidor)
+    """
+    resultado = validar_arquivo_excel(
+        caminho_excel,
+        limites_null,
+        coluna=coluna,
+        indice=indice_da_pasta(caminho_excel.parent),
+        conteudo=conteudo,
+        motor=motor,
+        data=data,
+    )
+    if multiprocessing.parent_process() is None:
+        # Executor de threads: as medições já estão no medidor do processo
+        return resultado, []
+    # Processos do pool encerram sem executar o atexit
+    logger_quantum.save_logs()
+    console.descarregar()
+    return resultado, medidor.drenar()
+
+
+class Trabalho:
+    """Um feed a ser processado para uma data de recebimento."""
+
+    def __init__(self, feed: Feed, data: date = None):
+        self.feed = feed
+        self.data = data or datetime.now().date()
+
+    @property
+    def nome(self) -> str:
+        return f"{self.feed.nome} {self.data:%Y-%m-%d}"
+
+
+class ResultadoTrabalho:
+    """Arquivo extraído, resultado da validação e tempos de cada etapa de um trabalho."""
+
+    def __init__(self, trabalho: Trabalho):
+        self.trabalho = trabalho
+        self.anexo = None
+        self.arquivo = None
+        self.validacao = None
+        self.ja_processado = False
+        # Exceção inesperada que interrompeu o pipeline (registrada, não propagada)
+        self.erro = None
+        self.tempos = {}
+
+    @property
+    def status(self) -> str:
+        if self.ja_processado:
+            return "JA PROCESSADO"
+        if self.arquivo is None:
+            return "SEM ARQUIVO"
+        if isinstance(self.validacao, PlanilhaValidada):
+            return "OK"
+        return "FALHA"
+
+
+class ExecutorPipeline:
+    """
+    Executa extração, validação e notificação de vários trabalhos ao mesmo tempo
+    com asyncio.
+
+    Cada etapa é uma corrotina e todo o trabalho bloqueante roda em executores:
+    a caixa postal em uma única thread (o COM do Outlook não pode ser usado de
+    várias threads), a validação em um executor com até `limite_validacao`
+    tarefas (processos quando o limite é maior que 1) e as notificações em um
+    pool de threads com até `limite_notificacao` envios. Assim a notificação de
+    um trabalho se sobrepõe à leitura da planilha do próximo.
+
+    O anexo é validado a partir dos bytes lidos da mensagem; a gravação na
+    pasta do feed (desligada com `persistir_anexos=False`) acontece em
+    segundo plano e é aguardada apenas ao final da execução. Com
+    `notificar=False` as notificações são apenas registradas no log, e com
+    `apenas_novos=True` um anexo já processado em uma execução anterior não é
+    validado nem notificado de novo. Além do índice da pasta, o executor
+    lembra as mensagens que já atendeu, o que cobre as execuções sem
+    `persistir_anexos` (nada é registrado no índice).
+
+    Executores, semáforos e caixa postal são criados por `iniciar()` e
+    liberados por `encerrar()`. `executar()` faz as duas coisas se o executor
+    ainda não tiver sido iniciado; no modo serviço ele é iniciado uma vez e
+    reaproveitado por todas as execuções.
+    """
+
+    def __init__(
+        self,
+        caixa_postal: CaixaPostal = None,
+        limite_validacao: int = 1,
+        limite_notificacao: int = 4,
+        tentativas: int = 5,
+        intervalo_tentativas: float = 30,
+        prazo_observacao: float = 0,
+        persistir_anexos: bool = True,
+        notificar: bool = True,
+        apenas_novos: bool = False,
+    ):
+        self.caixa_postal = caixa_postal
+        self.limite_validacao = limite_validacao
+        self.limite_notificacao = limite_notificacao
+        self.tentativas = tentativas
+        self.intervalo_tentativas = intervalo_tentativas
+        self.prazo_observacao = prazo_observacao
+        self.persistir_anexos = persistir_anexos
+        self.notificar = notificar
+        self.apenas_novos = apenas_novos
+        self._mensagens_atendidas = set()
+        self._iniciado = False
+
+    async def _na_caixa_postal(self, funcao, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor_com, lambda: funcao(*args, **kwargs)
+        )
+
+    async def _extrair(self, trabalho: Trabalho):
+        """Etapa 1: aguarda o e-mail do trabalho e lê o anexo para a memória."""
+        feed = trabalho.feed
+
+        async def buscar():
+            return await self._na_caixa_postal(
+                ingerir_excel_email,
+                feed.pasta_destino,
+                feed.headline_prefix,
+                caixa_postal=self.caixa_postal,
+                data=trabalho.data,
+                persistir=self.persistir_anexos,
+            )
+
+        if self.prazo_observacao > 0:
+            limite = time.monotonic() + self.prazo_observacao
+            anexo = await buscar()
+            while anexo is None:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                if await self._na_caixa_postal(
+                    self.caixa_postal.aguardar_novas_mensagens,
+                    min(restante, FATIA_OBSERVACAO_SEGUNDOS),
+                ):
+                    anexo = await buscar()
+        else:
+            for tentativa in range(1, self.tentativas + 1):
+                anexo = await buscar()
+                if anexo or tentativa == self.tentativas:
+                    break
+                print_log(
+                    "AVISO",
+                    f"[{trabalho.nome}] Arquivo não encontrado na tentativa"
+                    f" {tentativa}/{self.tentativas}. Aguardando"
+                    f" {self.intervalo_tentativas:.0f} segundos...",
+                    theme_color=Fore.YELLOW,
+                )
+                await asyncio.sleep(self.intervalo_tentativas)
+        return anexo
+
+    async def _validar(self, trabalho: Trabalho, anexo):
+        """Etapa 2: valida o conteúdo do anexo no executor de validação."""
+        loop = asyncio.get_running_loop()
+        async with self._semaforo_validacao:
+            resultado, medicoes = await loop.run_in_executor(
+                self._executor_validacao,
+                _validar_em_processo,
+                anexo.caminho,
+                trabalho.feed.limites_null,
+                trabalho.feed.coluna,
+                anexo.conteudo,
+                trabalho.feed.motor,
+                trabalho.data,
+            )
+        medidor.incorporar(medicoes)
+        return resultado
+
+    async def _enviar(self, trabalho: Trabalho, funcao, *args):
+        """Executa um envio no pool de notificações (ou só o registra, em simulação)."""
+        if not self.notificar:
+            nome = getattr(funcao, "func", funcao).__name__
+            registrar_evento(
+                "AVISO",
+                "notificacao",
+                "[{trabalho}] Simulação: '{funcao}' não foi enviado.",
+                theme_color=Fore.YELLOW,
+                trabalho=trabalho.nome,
+                funcao=nome,
+            )
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor_io, funcao, *args)
+
+    async def _notificar(self, trabalho: Trabalho, resultado: ResultadoTrabalho):
+        """Etapa 3: envia o alerta ou a confirmação de sucesso do trabalho."""
+        async with self._semaforo_notificacao:
+            if resultado.status == "OK":
+                await self._enviar(
+                    trabalho, enviar_teams_sucesso, resultado.validacao.relatorio
+                )
+            elif isinstance(resultado.validacao, RelatorioQualidade):
+                relatorio = resultado.validacao
+                registrar_evento(
+                    "AVISO",
+                    "validacao",
+                    "[{trabalho}] Regras de qualidade com falha: {falhas} de {regras}.",
+                    trabalho=trabalho.nome,
+                    falhas=len(relatorio.falhas),
+                    regras=len(relatorio.resultados),
+                    **relatorio.para_dict(),
+                )
+                await self._enviar(
+                    trabalho,
+                    partial(
+                        enviar_teams_alerta,
+                        relatorio=relatorio,
+                        feed=trabalho.feed.nome,
+                    ),
+                )
+            elif resultado.status == "FALHA" and resultado.validacao is None:
+                # Erro de leitura: a planilha quebrada também gera alerta
+                registrar_evento(
+                    "AVISO",
+                    "validacao",
+                    "[{trabalho}] A planilha '{arquivo}' não pôde ser lida.",
+                    trabalho=trabalho.nome,
+                    arquivo=resultado.arquivo.name,
+                )
+                await self._enviar(
+                    trabalho,
+                    partial(enviar_teams_alerta, feed=trabalho.feed.nome),
+                    None,
+                    trabalho.feed.limites_null,
+                )
+            elif resultado.status == "FALHA":
+                registrar_evento(
+                    "AVISO",
+                    "validacao",
+                    "[{trabalho}] Limite de valores nulos excedido! Encontrados:"
+                    " {nulos}. Limite: {limite}.",
+                    trabalho=trabalho.nome,
+                    nulos=descrever_contagem_nan(
+                        resultado.validacao, trabalho.feed.limites_null
+                    ),
+                    contagem_nan=int(resultado.validacao),
+                    limite=trabalho.feed.limites_null,
+                )
+                await self._enviar(
+                    trabalho,
+                    partial(enviar_teams_alerta, feed=trabalho.feed.nome),
+                    resultado.validacao,
+                    trabalho.feed.limites_null,
+                )
+
+    async def _processar(self, trabalho: Trabalho) -> ResultadoTrabalho:
+        resultado = ResultadoTrabalho(trabalho)
+        etapas = (
+            ("extracao", lambda: self._extrair(trabalho)),
+            ("validacao", lambda: self._validar(trabalho, resultado.anexo)),
+            ("notificacao", lambda: self._notificar(trabalho, resultado)),
+        )
+        try:
+            for etapa, corrotina in etapas:
+                inicio = time.perf_counter()
+                retorno = await corrotina()
+                resultado.tempos[etapa] = round(time.perf_counter() - inicio, 4)
+                console.descarregar()
+                if etapa == "extracao":
+                    resultado.anexo = retorno
+                    if retorno is None:
+                        registrar_evento(
+                            "ERROR",
+                            etapa,
+                            "[{trabalho}] Arquivo não foi baixado após todas as"
+                            " tentativas.",
+                            trabalho=trabalho.nome,
+                            tentativas=self.tentativas,
+                        )
+                        break
+                    resultado.arquivo = retorno.caminho
+                    if self.apenas_novos and (
+                        retorno.ja_processado
+                        or retorno.id_mensagem in self._mensagens_atendidas
+                    ):
+                        resultado.ja_processado = True
+                        logger_quantum.info(
+                            f"[{trabalho.nome}] Anexo '{retorno.nome}' já processado"
+                            " em uma execução anterior. Validação ignorada."
+                        )
+                        break
+                elif etapa == "validacao":
+                    resultado.validacao = retorno
+                else:
+                    self._mensagens_atendidas.add(resultado.anexo.id_mensagem)
+        except Exception as e:
+            resultado.erro = e
+            registrar_evento(
+                "ERROR",
+                etapa,
+                "[{trabalho}] Falha inesperada no pipeline: {erro}",
+                exc=e,
+                trabalho=trabalho.nome,
+                erro=str(e),
+            )
+
+        registrar_evento(
+            "INFO",
+            "pipeline",
+            " | ".join(
+                ["[{trabalho}] {status}"]
+                + [f"{etapa} {{tempos[{etapa}]:.2f}}s" for etapa in resultado.tempos]
+            ),
+            theme_color=Fore.CYAN,
+            trabalho=trabalho.nome,
+            status=resultado.status,
+            tempos=resultado.tempos,
+        )
+        console.descarregar()
+        return resultado
+
+    def iniciar(self):
+        """Cria a caixa postal (se não informada), os executores e os semáforos."""
+        if self._iniciado:
+            return
+        if self.caixa_postal is None:
+            self.caixa_postal = criar_caixa_postal()
+        self._semaforo_validacao = asyncio.Semaphore(self.limite_validacao)
+        self._semaforo_notificacao = asyncio.Semaphore(self.limite_notificacao)
+        self._executor_com = ThreadPoolExecutor(
+            max_workers=1, initializer=_inicializar_com, thread_name_prefix="com"
+        )
+        if self.limite_validacao > 1:
+            # "spawn" em todas as plataformas: um filho criado por fork herdaria
+            # o estado das conexões SQLite abertas pelo índice no processo pai
+            self._executor_validacao = ProcessPoolExecutor(
+                max_workers=self.limite_validacao,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._executor_validacao = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="validacao"
+            )
+        self._executor_io = ThreadPoolExecutor(
+            max_workers=self.limite_notificacao, thread_name_prefix="notificacao"
+        )
+        self._iniciado = True
+
+    def aquecer(self):
+        """
+        Carrega o pandas e o openpyxl em cada processo de validação, para que a
+        primeira planilha não pague o custo das importações.
+        """
+        self.iniciar()
+        futuros = [
+            self._executor_validacao.submit(_aquecer_validacao)
+            for _ in range(self.limite_validacao)
+        ]
+        for futuro in futuros:
+            futuro.result()
+
+    def encerrar(self):
+        """Aguarda e libera os executores criados por `iniciar()`."""
+        if not self._iniciado:
+            return
+        self._iniciado = False
+        for executor in (
+            self._executor_com,
+            self._executor_validacao,
+            self._executor_io,
+        ):
+            executor.shutdown(wait=True)
+
+    async def executar(self, trabalhos):
+        """
+        Processa todos os trabalhos concorrentemente.
+
+        Returns:
+                list[ResultadoTrabalho]: Os resultados, na ordem dos trabalhos.
+        """
+        iniciado_aqui = not self._iniciado
+        self.iniciar()
+        try:
+            resultados = await asyncio.gather(
+                *(self._processar(trabalho) for trabalho in trabalhos)
+            )
+            # Gravações dos anexos e notificações acontecem em segundo plano
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        self._executor_io, resultado.anexo.aguardar_persistencia
+                    )
+                    for resultado in resultados
+                    if resultado.anexo is not None
+                ),
+                loop.run_in_executor(self._executor_io, despachante.aguardar),
+            )
+            return list(resultados)
+        finally:
+            if iniciado_aqui:
+                self.encerrar()
+
+
+def executar_pipeline(trabalhos, **opcoes):
+    """
+    Ponto de entrada síncrono: executa os trabalhos com um `ExecutorPipeline`.
+
+    Args:
+            trabalhos (list[Trabalho]): Os feeds e datas a processar.
+            **opcoes: Repassadas ao `ExecutorPipeline` (limites, tentativas, prazo).
+
+    Returns:
+            list[ResultadoTrabalho]: O resultado de cada trabalho.
+    """
+    return asyncio.run(ExecutorPipeline(**opcoes).executar(trabalhos))
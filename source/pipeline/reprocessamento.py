@@ -0,0 +1,408 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from colorama import Fore
+
+# Importações locais
+from source.email.caixa_postal import (
+    CaixaPostal,
+    assunto_corresponde,
+    criar_caixa_postal,
+)
+from source.email.extrair_excel_email import normalizar_nome_anexo
+from source.indice.armazem_anexos import armazem_da_pasta
+from source.indice.indice_processados import calcular_hash_conteudo, indice_da_pasta
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
+from source.manipulacao_excel.manipulacao_excel import (
+    ContagemParcial,
+    PlanilhaValidada,
+    validar_arquivo_excel,
+)
+from source.qualidade.motor_regras import MotorRegras, RelatorioQualidade
+
+THEME_COLOR = Fore.BLUE
+ETAPA = "reprocessamento"
+
+# Subpasta da pasta de cada feed com o resultado de cada dia reprocessado
+PASTA_RESULTADOS = "reprocessamento"
+
+
+def _caminho_resultado(pasta_destino: Path, data: date) -> Path:
+    return Path(pasta_destino) / PASTA_RESULTADOS / f"{data.isoformat()}.json"
+
+
+def _gravar_resultado(caminho: Path, resultado: dict):
+    """Grava o resultado do dia de forma atômica: um arquivo existente está completo."""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(f".{caminho.name}.{os.getpid()}.tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(temporario, caminho)
+
+
+def _validar_dia(
+    pasta_destino: Path,
+    nome_arquivo: str,
+    caminho_armazenado: Path,
+    limites_null: int,
+    coluna: str,
+    motor: MotorRegras,
+    data: date,
+):
+    """
+    Valida o anexo de um dia a partir do armazém da pasta. Executada nos
+    processos do pool, por isso devolve apenas dados simples (serializáveis).
+    """
+    inicio = time.perf_counter()
+    resultado = validar_arquivo_excel(
+        Path(pasta_destino) / nome_arquivo,
+        limites_null,
+        coluna=coluna,
+        indice=indice_da_pasta(pasta_destino),
+        conteudo=Path(caminho_armazenado).read_bytes(),
+        motor=motor,
+        data=data,
+    )
+    resumo = {"status": "OK", "contagem_nan": None, "relatorio": None}
+    if resultado is None:
+        resumo["status"] = "ERRO"
+    elif isinstance(resultado, RelatorioQualidade):
+        resumo.update(status="FALHA", relatorio=resultado.para_dict())
+    elif isinstance(resultado, PlanilhaValidada):
+        resumo["contagem_nan"] = resultado.contagem_nan
+        if resultado.relatorio is not None:
+            resumo["relatorio"] = resultado.relatorio.para_dict()
+    else:
+        resumo.update(status="FALHA", contagem_nan=resultado)
+    if resumo["contagem_nan"] is not None:
+        # Uma contagem parcial só diz que o limite foi excedido (veja ContagemParcial)
+        resumo["contagem_parcial"] = isinstance(resumo["contagem_nan"], ContagemParcial)
+        resumo["contagem_nan"] = int(resumo["contagem_nan"])
+    resumo["duracao_validacao_s"] = round(time.perf_counter() - inicio, 4)
+    if multiprocessing.parent_process() is not None:
+        # Processos do pool encerram sem executar o atexit
+        logger_quantum.save_logs()
+        console.descarregar()
+    return resumo
+
+
+class DiaReprocessado:
+    """O anexo escolhido para um feed em um dia do período."""
+
+    def __init__(self, feed, data: date, id_mensagem: str, assunto: str):
+        self.feed = feed
+        self.data = data
+        self.id_mensagem = id_mensagem
+        self.assunto = assunto
+        self.nome_arquivo = None
+        self.hash_conteudo = None
+
+    def para_dict(self) -> dict:
+        return {
+            "feed": self.feed.nome,
+            "data": self.data.isoformat(),
+            "id_mensagem": self.id_mensagem,
+            "assunto": self.assunto,
+            "arquivo": self.nome_arquivo,
+            "hash": self.hash_conteudo,
+        }
+
+
+def _guardar_anexo(dia: DiaReprocessado, conteudo: bytes, nome_anexo: str):
+    """
+    Guarda o anexo do dia no armazém do feed (nas threads de extração). O
+    anexo não é publicado na pasta: o arquivo com o nome de exibição continua
+    sendo o da execução diária mais recente, e não o de um dia antigo.
+    """
+    dia.nome_arquivo = normalizar_nome_anexo(nome_anexo)
+    hash_conteudo, gravado = armazem_da_pasta(dia.feed.pasta_destino).guardar(
+        conteudo,
+        dia.id_mensagem,
+        nome_anexo,
+        dia.data,
+        calcular_hash_conteudo(conteudo),
+    )
+    dia.hash_conteudo = hash_conteudo
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        (
+            "Anexo '{arquivo}' de {data:%d/%m/%Y} guardado no armazém."
+            if gravado
+            else "Anexo '{arquivo}' de {data:%d/%m/%Y} já estava no armazém."
+        ),
+        theme_color=THEME_COLOR,
+        feed=dia.feed.nome,
+        data=dia.data,
+        arquivo=dia.nome_arquivo,
+        hash=hash_conteudo,
+        tamanho_bytes=len(conteudo),
+        gravado=gravado,
+    )
+    return dia
+
+
+def _selecionar_dias(caixa_postal: CaixaPostal, feeds, inicio: date, fim: date):
+    """
+    Percorre as mensagens do período (uma única consulta para todos os feeds)
+    e escolhe, para cada feed e dia, a mensagem mais recente com anexo .xlsx,
+    como a execução diária faria. Dias com resultado gravado são ignorados.
+
+    Returns:
+            tuple: (lista de (DiaReprocessado, anexo ou None se o conteúdo já estiver
+            no armazém), dias já reprocessados)
+    """
+    prefixos = tuple(feed.headline_prefix for feed in feeds)
+    escolhidos = {}
+    ja_reprocessados = 0
+    for msg in caixa_postal.buscar_periodo(prefixos, inicio, fim):
+        data = msg.recebido_em.date()
+        for feed in feeds:
+            chave = (feed.nome, data)
+            if chave in escolhidos or not assunto_corresponde(
+                msg.assunto, feed.headline_prefix
+            ):
+                continue
+            if _caminho_resultado(feed.pasta_destino, data).is_file():
+                escolhidos[chave] = None
+                ja_reprocessados += 1
+                continue
+
+            dia = DiaReprocessado(feed, data, msg.id_mensagem, msg.assunto)
+            armazenados = armazem_da_pasta(feed.pasta_destino).anexos_da_mensagem(
+                msg.id_mensagem
+            )
+            if armazenados:
+                # Extraído por uma execução anterior: não relê a mensagem
+                nome_anexo, dia.hash_conteudo = armazenados[0]
+                dia.nome_arquivo = normalizar_nome_anexo(nome_anexo)
+                escolhidos[chave] = (dia, None)
+                continue
+            anexo = next(
+                (a for a in msg.anexos if a.nome.lower().endswith(".xlsx")), None
+            )
+            if anexo is not None:
+                escolhidos[chave] = (dia, anexo)
+    return [item for item in escolhidos.values() if item], ja_reprocessados
+
+
+def reprocessar_periodo(
+    feeds,
+    inicio: date,
+    fim: date,
+    caixa_postal: CaixaPostal = None,
+    threads_extracao: int = 4,
+    processos_validacao: int = None,
+):
+    """
+    Reprocessa as mensagens recebidas de `inicio` a `fim` (inclusive): uma única
+    consulta filtrada à caixa postal enumera as mensagens de todos os feeds no
+    período, os anexos são guardados no armazém de cada feed por um pool de
+    threads e validados, à medida que ficam prontos, por um pool de processos.
+
+    O resultado de cada dia é gravado em `<pasta do feed>/reprocessamento/<data>.json`
+    assim que fica pronto. Uma execução interrompida pode ser repetida com o
+    mesmo período: os dias com resultado gravado são ignorados e os anexos já
+    guardados não são lidos de novo da caixa postal. Nenhuma notificação é
+    enviada.
+
+    A leitura dos anexos acontece na thread que consulta a caixa postal (o COM
+    do Outlook não pode ser usado de outras threads); as threads de extração
+    calculam o hash e gravam os anexos.
+
+    Args:
+            feeds (list[Feed]): Os feeds reprocessados.
+            inicio (date): O primeiro dia do período.
+            fim (date): O último dia do período.
+            caixa_postal (CaixaPostal): A fonte de e-mails; se omitida, usa `criar_caixa_postal()`.
+            threads_extracao (int): Threads que gravam os anexos.
+            processos_validacao (int): Processos de validação (padrão: número de CPUs);
+                    com 1, a validação roda em uma thread do próprio processo.
+
+    Returns:
+            list[dict]: O resultado de cada dia reprocessado nesta execução, ou None
+            se a caixa postal não estiver disponível.
+    """
+    if caixa_postal is None:
+        caixa_postal = criar_caixa_postal()
+    if not caixa_postal.conectar():
+        return None
+
+    processos_validacao = processos_validacao or os.cpu_count() or 1
+    dias_periodo = (fim - inicio).days + 1
+    registrar_evento(
+        "AÇÃO",
+        ETAPA,
+        "Reprocessando {dias} dia(s), de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}, para"
+        " {feeds} feed(s)...",
+        theme_color=THEME_COLOR,
+        dias=dias_periodo,
+        inicio=inicio,
+        fim=fim,
+        feeds=len(feeds),
+    )
+
+    inicio_execucao = time.perf_counter()
+    resultados = []
+    if processos_validacao > 1:
+        # "spawn": um filho criado por fork herdaria as conexões SQLite abertas
+        validacao = ProcessPoolExecutor(
+            max_workers=processos_validacao,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    else:
+        validacao = ThreadPoolExecutor(max_workers=1, thread_name_prefix="validacao")
+    with ThreadPoolExecutor(
+        max_workers=threads_extracao, thread_name_prefix="reprocessamento"
+    ) as extracao, validacao:
+        selecionados, ja_reprocessados = _selecionar_dias(
+            caixa_postal, feeds, inicio, fim
+        )
+        total = len(selecionados)
+        registrar_evento(
+            "INFO",
+            ETAPA,
+            "{total} dia(s) de feed a reprocessar; {ja_reprocessados} já"
+            " reprocessado(s) anteriormente.",
+            theme_color=THEME_COLOR,
+            total=total,
+            ja_reprocessados=ja_reprocessados,
+        )
+
+        gravacoes = {}
+        validacoes = {}
+
+        def encaminhar(futuro):
+            """Envia para a validação um anexo já guardado."""
+            dia = gravacoes.pop(futuro)
+            try:
+                futuro.result()
+            except Exception as e:
+                resultados.append(_registrar_dia(dia, {"status": "ERRO"}, e))
+                return
+            validacoes[_submeter_validacao(validacao, dia)] = dia
+
+        for dia, anexo in selecionados:
+            if anexo is None:
+                validacoes[_submeter_validacao(validacao, dia)] = dia
+                continue
+            # O conteúdo é lido aqui, na thread da caixa postal
+            futuro = extracao.submit(_guardar_anexo, dia, anexo.ler_bytes(), anexo.nome)
+            gravacoes[futuro] = dia
+            # As validações começam enquanto os próximos anexos são lidos
+            for concluido in [f for f in gravacoes if f.done()]:
+                encaminhar(concluido)
+        for concluido in as_completed(list(gravacoes)):
+            encaminhar(concluido)
+
+        for futuro in as_completed(validacoes):
+            dia = validacoes[futuro]
+            try:
+                resumo, erro = futuro.result(), None
+            except Exception as e:
+                resumo, erro = {"status": "ERRO"}, e
+            resultados.append(_registrar_dia(dia, resumo, erro))
+            print_log(
+                "INFO",
+                f"[{len(resultados)}/{total}] {dia.feed.nome} {dia.data:%d/%m/%Y}:"
+                f" {resultados[-1]['status']}",
+                theme_color=THEME_COLOR,
+            )
+
+    _registrar_dias_sem_email(feeds, inicio, fim)
+    duracao = time.perf_counter() - inicio_execucao
+    aprovados = sum(1 for r in resultados if r["status"] == "OK")
+    registrar_evento(
+        "INFO",
+        ETAPA,
+        "Reprocessamento concluído em {duracao_s:.1f}s: {reprocessados} dia(s)"
+        " reprocessado(s), {aprovados} aprovado(s), {reprovados} com falha ou erro.",
+        theme_color=THEME_COLOR,
+        inicio=inicio,
+        fim=fim,
+        threads_extracao=threads_extracao,
+        processos_validacao=processos_validacao,
+        duracao_s=round(duracao, 4),
+        reprocessados=len(resultados),
+        aprovados=aprovados,
+        reprovados=len(resultados) - aprovados,
+    )
+    return sorted(resultados, key=lambda r: (r["data"], r["feed"]))
+
+
+def _submeter_validacao(validacao, dia: DiaReprocessado):
+    feed = dia.feed
+    return validacao.submit(
+        _validar_dia,
+        feed.pasta_destino,
+        dia.nome_arquivo,
+        armazem_da_pasta(feed.pasta_destino).caminho(dia.hash_conteudo),
+        feed.limites_null,
+        feed.coluna,
+        feed.motor,
+        dia.data,
+    )
+
+
+def _registrar_dia(dia: DiaReprocessado, resumo: dict, erro: Exception = None):
+    """
+    Registra o resultado do dia no log e, se a validação chegou a um veredito,
+    o grava (dias com erro são tentados de novo na próxima execução).
+    """
+    resultado = dia.para_dict()
+    resultado.update(resumo)
+    resultado["processado_em"] = datetime.now().isoformat(timespec="seconds")
+    if erro is not None:
+        resultado["erro"] = str(erro)
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "Falha ao reprocessar o feed '{feed}' em {data:%d/%m/%Y}: {erro}",
+            exc=erro,
+            feed=dia.feed.nome,
+            data=dia.data,
+            erro=str(erro),
+        )
+        return resultado
+    if resultado["status"] != "ERRO":
+        _gravar_resultado(
+            _caminho_resultado(dia.feed.pasta_destino, dia.data), resultado
+        )
+    logger_quantum.info(
+        f"Feed '{dia.feed.nome}' reprocessado para {dia.data:%d/%m/%Y}.",
+        extra_data=resultado,
+    )
+    return resultado
+
+
+def _registrar_dias_sem_email(feeds, inicio: date, fim: date):
+    """Avisa os dias do período sem resultado (sem e-mail ou anexo na caixa postal)."""
+    for feed in feeds:
+        faltantes = [
+            inicio + timedelta(days=i)
+            for i in range((fim - inicio).days + 1)
+            if not _caminho_resultado(
+                feed.pasta_destino, inicio + timedelta(days=i)
+            ).is_file()
+        ]
+        if not faltantes:
+            continue
+        registrar_evento(
+            "AVISO",
+            ETAPA,
+            "Feed '{feed}': {quantidade} dia(s) sem resultado no período: {dias}.",
+            theme_color=Fore.YELLOW,
+            feed=feed.nome,
+            quantidade=len(faltantes),
+            dias=", ".join(f"{d:%d/%m/%Y}" for d in faltantes),
+        )
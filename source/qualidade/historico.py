@@ -0,0 +1,257 @@
+import hashlib
+import math
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+# Importações locais
+from source.qualidade.motor_regras import normalizar_para_hash
+
+# O pandas e o numpy só são importados quando uma planilha é resumida
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Dias de histórico exigidos antes de uma métrica ser comparada com a tendência
+MINIMO_DIAS_HISTORICO = 7
+
+
+class EstatisticasPlanilha:
+    """
+    Resumo compacto de uma planilha para o histórico diário: quantidade de
+    linhas, hash das colunas-chave e, por coluna, nulos e mínimo, máximo e
+    média dos valores numéricos.
+
+    O resumo é acumulado com `acumular`, uma vez com o DataFrame inteiro ou uma
+    vez por lote (veja `ler_excel_em_lotes`), com o mesmo resultado.
+    """
+
+    def __init__(self, colunas_chave: list = None):
+        """
+        Args:
+                colunas_chave (list): Colunas do hash de conteúdo (padrão: todas).
+        """
+        self.colunas_chave = list(colunas_chave) if colunas_chave else None
+        self.linhas = 0
+        self._colunas = {}
+        self._hash = hashlib.sha256()
+        self._hash_completo = True
+
+    def acumular(self, dataframe: "pd.DataFrame"):
+        """Acrescenta as linhas de um DataFrame (ou de um lote) ao resumo."""
+        import numpy as np
+        import pandas as pd
+
+        self.linhas += len(dataframe)
+        nulos = dataframe.isna().sum().tolist()
+        for nome, serie, nulos_coluna in zip(
+            dataframe.columns, (s for _, s in dataframe.items()), nulos
+        ):
+            acumulado = self._colunas.setdefault(
+                str(nome),
+                {
+                    "nulos": 0,
+                    "soma": 0.0,
+                    "contagem": 0,
+                    "minimo": None,
+                    "maximo": None,
+                },
+            )
+            acumulado["nulos"] += int(nulos_coluna)
+            if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(
+                serie
+            ):
+                continue
+            valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+            valores = valores[~np.isnan(valores)]
+            if not valores.size:
+                continue
+            acumulado["soma"] += float(valores.sum())
+            acumulado["contagem"] += int(valores.size)
+            minimo, maximo = float(valores.min()), float(valores.max())
+            acumulado["minimo"] = (
+                minimo
+                if acumulado["minimo"] is None
+                else min(acumulado["minimo"], minimo)
+            )
+            acumulado["maximo"] = (
+                maximo
+                if acumulado["maximo"] is None
+                else max(acumulado["maximo"], maximo)
+            )
+
+        colunas_chave = self.colunas_chave or list(dataframe.columns)
+        if any(coluna not in dataframe.columns for coluna in colunas_chave):
+            self._hash_completo = False
+        elif len(dataframe):
+            self._hash.update(
+                pd.util.hash_pandas_object(
+                    normalizar_para_hash(dataframe[colunas_chave]), index=False
+                )
+                .to_numpy()
+                .tobytes()
+            )
+
+    def registrar_contagem(self, coluna: str, linhas: int, nulos: int):
+        """Resumo parcial, de uma única coluna (validação em streaming)."""
+        self.linhas = linhas
+        self._colunas[coluna] = {
+            "nulos": int(nulos),
+            "soma": 0.0,
+            "contagem": 0,
+            "minimo": None,
+            "maximo": None,
+        }
+        self._hash_completo = False
+
+    @property
+    def hash_chaves(self) -> str:
+        """SHA-256 das colunas-chave, linha a linha, ou None se indisponível."""
+        if not self._hash_completo or not self.linhas:
+            return None
+        return self._hash.hexdigest()
+
+    def colunas(self) -> dict:
+        """{coluna: {"nulos", "minimo", "maximo", "media"}}"""
+        return {
+            nome: {
+                "nulos": valores["nulos"],
+                "minimo": valores["minimo"],
+                "maximo": valores["maximo"],
+                "media": (
+                    valores["soma"] / valores["contagem"]
+                    if valores["contagem"]
+                    else None
+                ),
+            }
+            for nome, valores in self._colunas.items()
+        }
+
+
+class Anomalia:
+    """Uma métrica do dia fora da tendência do histórico ou igual à do dia anterior."""
+
+    def __init__(
+        self,
+        metrica: str,
+        valor,
+        referencia,
+        detalhe: str,
+        coluna: str = None,
+        desvios: float = None,
+    ):
+        self.metrica = metrica
+        self.coluna = coluna
+        self.valor = valor
+        self.referencia = referencia
+        self.desvios = desvios
+        self.detalhe = detalhe
+
+    def __str__(self):
+        return self.detalhe
+
+    def para_dict(self) -> dict:
+        return {
+            "metrica": self.metrica,
+            "coluna": self.coluna,
+            "valor": self.valor,
+            "referencia": self.referencia,
+            "desvios": self.desvios,
+            "detalhe": self.detalhe,
+        }
+
+
+def _fora_da_tendencia(valor, media, variancia, desvios: float):
+    """
+    Quantos desvios-padrão `valor` está da média, se passar de `desvios`
+    (inf se o histórico for constante e o valor diferente), ou None.
+    """
+    if valor is None or media is None or variancia is None:
+        return None
+    distancia = abs(valor - media)
+    desvio_padrao = math.sqrt(variancia)
+    if desvio_padrao == 0:
+        # Histórico constante: tolera apenas o erro de arredondamento do SQLite
+        return math.inf if distancia > 1e-9 * max(1.0, abs(media)) else None
+    quantidade = distancia / desvio_padrao
+    return round(quantidade, 2) if quantidade > desvios else None
+
+
+def verificar_tendencias(
+    indice,
+    data: date,
+    estatisticas: EstatisticasPlanilha,
+    janela_dias: int = 90,
+    desvios: float = 3.0,
+) -> list:
+    """
+    Compara o resumo do dia com o histórico do índice, sem reler planilhas:
+
+    - linhas, nulos e média de cada coluna contra os `janela_dias` anteriores
+      (média e desvio-padrão calculados pelo SQLite), quando há pelo menos
+      MINIMO_DIAS_HISTORICO dias;
+    - hash das colunas-chave contra o do dia anterior com planilha, para
+      detectar o reenvio de um arquivo antigo.
+
+    Args:
+            indice (IndiceProcessados): O índice da pasta do feed.
+            data (date): A data de referência da planilha.
+            estatisticas (EstatisticasPlanilha): O resumo da planilha do dia.
+            janela_dias (int): Dias de histórico considerados.
+            desvios (float): Distância da média, em desvios-padrão, a partir da qual
+                    a métrica é considerada anômala.
+
+    Returns:
+            list[Anomalia]: As métricas fora da tendência (vazia se nenhuma).
+    """
+    inicio = data - timedelta(days=janela_dias)
+    anomalias = []
+
+    dias, media, variancia = indice.resumo_linhas(inicio, data)
+    if dias >= MINIMO_DIAS_HISTORICO:
+        distancia = _fora_da_tendencia(estatisticas.linhas, media, variancia, desvios)
+        if distancia is not None:
+            anomalias.append(
+                Anomalia(
+                    "linhas",
+                    estatisticas.linhas,
+                    round(media, 2),
+                    f"{estatisticas.linhas} linhas; média de {media:.1f} nos últimos"
+                    f" {dias} dias ({distancia} desvios-padrão)",
+                    desvios=distancia,
+                )
+            )
+
+    historico = indice.resumo_colunas(inicio, data)
+    for coluna, atual in estatisticas.colunas().items():
+        resumo = historico.get(coluna)
+        if resumo is None or resumo["dias"] < MINIMO_DIAS_HISTORICO:
+            continue
+        for metrica, nome in (("nulos", "nulos"), ("media", "média")):
+            media, variancia = resumo[metrica]
+            distancia = _fora_da_tendencia(atual[metrica], media, variancia, desvios)
+            if distancia is None:
+                continue
+            anomalias.append(
+                Anomalia(
+                    metrica,
+                    atual[metrica],
+                    media,
+                    f"'{coluna}': {nome} {atual[metrica]:.6g}; média de {media:.6g}"
+                    f" nos últimos {resumo['dias']} dias ({distancia} desvios-padrão)",
+                    coluna=coluna,
+                    desvios=distancia,
+                )
+            )
+
+    anterior = indice.dia_anterior(data)
+    hash_chaves = estatisticas.hash_chaves
+    if anterior is not None and hash_chaves and anterior[2] == hash_chaves:
+        anomalias.append(
+            Anomalia(
+                "conteudo_repetido",
+                hash_chaves,
+                anterior[0].isoformat(),
+                "Colunas-chave idênticas às da planilha de"
+                f" {anterior[0]:%d/%m/%Y}: possível reenvio de um arquivo antigo",
+            )
+        )
+    return anomalias
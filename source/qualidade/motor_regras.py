@@ -0,0 +1,423 @@
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# Importações locais
+from source.logger.logger_config import logger_quantum
+
+# O PyYAML é opcional: sem ele, apenas arquivos de regras em JSON são aceitos
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# O pandas e o numpy só são importados quando uma planilha é avaliada, para que
+# montar o motor a partir da configuração não pese na inicialização
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+TIPOS_REGRA = ("nulos", "tipo", "intervalo", "chave_unica", "variacao_linhas")
+TIPOS_DADO = ("numerico", "data")
+NOMES_TIPOS_DADO = {"numerico": "numéricos", "data": "datas"}
+
+
+class Regra:
+    """
+    Uma regra de qualidade declarada na configuração:
+
+        {"tipo": "nulos", "coluna": "Retorno", "limite": 30}
+        {"tipo": "tipo", "coluna": "Cota", "dado": "numerico"}
+        {"tipo": "intervalo", "coluna": "Retorno", "minimo": -0.5, "maximo": 0.5}
+        {"tipo": "chave_unica", "colunas": ["Data", "Fundo"]}
+        {"tipo": "variacao_linhas", "maxima_percentual": 20}
+
+    `limite` é a quantidade de linhas em desacordo tolerada (padrão: 0).
+    """
+
+    def __init__(
+        self,
+        tipo: str,
+        coluna: str = None,
+        colunas: list = None,
+        limite: int = 0,
+        dado: str = None,
+        minimo: float = None,
+        maximo: float = None,
+        maxima_percentual: float = None,
+    ):
+        self.tipo = tipo
+        self.coluna = coluna
+        self.colunas = list(colunas) if colunas else ([coluna] if coluna else [])
+        self.limite = limite
+        self.dado = dado
+        self.minimo = minimo
+        self.maximo = maximo
+        self.maxima_percentual = maxima_percentual
+
+    @classmethod
+    def de_dict(cls, definicao: dict) -> "Regra":
+        """Cria a regra a partir da sua definição, verificando os campos obrigatórios."""
+        definicao = dict(definicao)
+        tipo = definicao.pop("tipo", None)
+        if tipo not in TIPOS_REGRA:
+            raise ValueError(
+                f"Tipo de regra inválido: {tipo!r}. Use um de: {', '.join(TIPOS_REGRA)}."
+            )
+        regra = cls(tipo, **definicao)
+        if tipo in ("nulos", "tipo", "intervalo") and not regra.coluna:
+            raise ValueError(f"A regra '{tipo}' exige o campo 'coluna'.")
+        if tipo == "tipo" and regra.dado not in TIPOS_DADO:
+            raise ValueError(
+                f"A regra 'tipo' exige 'dado' igual a um de: {', '.join(TIPOS_DADO)}."
+            )
+        if tipo == "intervalo" and regra.minimo is None and regra.maximo is None:
+            raise ValueError("A regra 'intervalo' exige 'minimo' e/ou 'maximo'.")
+        if tipo == "chave_unica" and not regra.colunas:
+            raise ValueError("A regra 'chave_unica' exige o campo 'colunas'.")
+        if tipo == "variacao_linhas" and regra.maxima_percentual is None:
+            raise ValueError("A regra 'variacao_linhas' exige 'maxima_percentual'.")
+        return regra
+
+    @property
+    def descricao(self) -> str:
+        if self.tipo == "nulos":
+            return f"Nulos em '{self.coluna}'"
+        if self.tipo == "tipo":
+            return f"Valores não {NOMES_TIPOS_DADO[self.dado]} em '{self.coluna}'"
+        if self.tipo == "intervalo":
+            minimo = "-∞" if self.minimo is None else self.minimo
+            maximo = "+∞" if self.maximo is None else self.maximo
+            return f"'{self.coluna}' fora de [{minimo}, {maximo}]"
+        if self.tipo == "chave_unica":
+            return f"Chaves duplicadas ({', '.join(self.colunas)})"
+        return "Variação de linhas (dia anterior)"
+
+
+class ResultadoRegra:
+    """O valor medido por uma regra e se ele ficou dentro do limite."""
+
+    def __init__(self, regra: Regra, valor, aprovado: bool, detalhe: str = None):
+        self.regra = regra
+        self.valor = valor
+        self.aprovado = aprovado
+        self.detalhe = detalhe
+
+    @property
+    def limite(self):
+        if self.regra.tipo == "variacao_linhas":
+            return f"{self.regra.maxima_percentual}%"
+        return self.regra.limite
+
+    @property
+    def resumo(self) -> str:
+        if self.detalhe:
+            return self.detalhe
+        if self.regra.tipo == "variacao_linhas":
+            return f"{self.valor:.1f}% (limite: {self.limite})"
+        return f"{self.valor} (limite: {self.limite})"
+
+    def para_dict(self) -> dict:
+        return {
+            "regra": self.regra.descricao,
+            "tipo": self.regra.tipo,
+            "colunas": self.regra.colunas,
+            "valor": self.valor,
+            "limite": self.limite,
+            "aprovado": self.aprovado,
+            "detalhe": self.detalhe,
+        }
+
+
+class RelatorioQualidade:
+    """Resultado de todas as regras de uma planilha, pronto para ser notificado."""
+
+    def __init__(self, linhas: int, resultados: list, duracao: float = 0.0):
+        self.linhas = linhas
+        self.resultados = resultados
+        self.duracao = duracao
+
+    @property
+    def aprovado(self) -> bool:
+        return all(r.aprovado for r in self.resultados)
+
+    @property
+    def falhas(self):
+        return [r for r in self.resultados if not r.aprovado]
+
+    def contagem_nulos(self, coluna: str):
+        """Nulos medidos na coluna por uma regra 'nulos', ou None se não houver."""
+        for resultado in self.resultados:
+            if resultado.regra.tipo == "nulos" and resultado.regra.coluna == coluna:
+                return resultado.valor
+        return None
+
+    def fatos(self, apenas_falhas: bool = False):
+        """Pares (descrição, resumo) das regras, na forma usada pelos cards e e-mails."""
+        resultados = self.falhas if apenas_falhas else self.resultados
+        return [(r.regra.descricao, r.resumo) for r in resultados]
+
+    def para_dict(self) -> dict:
+        return {
+            "aprovado": self.aprovado,
+            "linhas": self.linhas,
+            "duracao_s": round(self.duracao, 4),
+            "resultados": [r.para_dict() for r in self.resultados],
+        }
+
+    def __str__(self):
+        return (
+            f"{len(self.falhas)} de {len(self.resultados)} regras de qualidade"
+            " falharam"
+        )
+
+
+class MotorRegras:
+    """
+    Avalia um conjunto de regras de qualidade sobre um DataFrame.
+
+    As regras são agrupadas por tipo na criação do motor e avaliadas em bloco,
+    com operações vetorizadas do NumPy: uma única máscara de nulos para todas
+    as colunas das regras 'nulos' e 'tipo', e uma única conversão numérica por
+    coluna, compartilhada pelas regras 'tipo' e 'intervalo' dessa coluna.
+    Assim, várias regras sobre a mesma coluna não repetem a conversão nem a
+    leitura da planilha.
+    """
+
+    def __init__(self, regras):
+        self.regras = [r if isinstance(r, Regra) else Regra.de_dict(r) for r in regras]
+        self._por_tipo = {tipo: [] for tipo in TIPOS_REGRA}
+        for posicao, regra in enumerate(self.regras):
+            self._por_tipo[regra.tipo].append((posicao, regra))
+
+    @property
+    def colunas_chave(self):
+        """As colunas da primeira regra 'chave_unica', ou None se não houver."""
+        chaves = self._por_tipo["chave_unica"]
+        return list(chaves[0][1].colunas) if chaves else None
+
+    @classmethod
+    def de_config(cls, config) -> "MotorRegras":
+        """
+        Cria o motor a partir de uma lista de regras ou do caminho de um arquivo
+        JSON/YAML com a chave "regras" (ou uma lista na raiz).
+        """
+        if isinstance(config, (str, Path)):
+            config = carregar_regras(config)
+        return cls(config)
+
+    def avaliar(self, dataframe: "pd.DataFrame", linhas_anteriores: int = None):
+        """
+        Aplica todas as regras ao DataFrame.
+
+        Args:
+                dataframe (pd.DataFrame): A planilha lida.
+                linhas_anteriores (int): Linhas da planilha do dia anterior, para a
+                        regra 'variacao_linhas' (opcional).
+
+        Returns:
+                RelatorioQualidade: O resultado de cada regra, na ordem da configuração.
+        """
+        return self.avaliar_em_lotes((dataframe,), linhas_anteriores)
+
+    def avaliar_em_lotes(self, lotes, linhas_anteriores: int = None):
+        """
+        Aplica todas as regras a uma planilha lida em lotes de linhas (veja
+        `ler_excel_em_lotes`), sem juntar os lotes em um único DataFrame.
+
+        As contagens de cada regra são somadas lote a lote. Para 'chave_unica',
+        apenas um hash de 8 bytes por linha é mantido até o fim, então a memória
+        fica limitada ao tamanho do lote.
+
+        Args:
+                lotes (Iterable[pd.DataFrame]): Os lotes, todos com as mesmas colunas.
+                linhas_anteriores (int): Linhas da planilha do dia anterior (opcional).
+
+        Returns:
+                RelatorioQualidade: O resultado de cada regra, na ordem da configuração.
+        """
+        import numpy as np
+        import pandas as pd
+
+        inicio = time.perf_counter()
+        resultados = [None] * len(self.regras)
+        parciais = [0] * len(self.regras)
+        hashes = {posicao: [] for posicao, _ in self._por_tipo["chave_unica"]}
+        aplicaveis = None
+        linhas = 0
+
+        for dataframe in lotes:
+            if aplicaveis is None:
+                aplicaveis = self._aplicaveis(set(dataframe.columns), resultados)
+            linhas += len(dataframe)
+
+            # Máscara de nulos única para as colunas das regras 'nulos' e 'tipo'
+            colunas_nulos = list(
+                dict.fromkeys(
+                    r.coluna for _, r in aplicaveis["nulos"] + aplicaveis["tipo"]
+                )
+            )
+            nulos = {}
+            if colunas_nulos:
+                mascara = dataframe[colunas_nulos].isna().to_numpy()
+                nulos = dict(zip(colunas_nulos, mascara.sum(axis=0).tolist()))
+            for posicao, regra in aplicaveis["nulos"]:
+                parciais[posicao] += nulos[regra.coluna]
+
+            # Conversões feitas uma vez por coluna e compartilhadas entre as regras
+            numericos = {}
+            for _, regra in aplicaveis["intervalo"] + [
+                (p, r) for p, r in aplicaveis["tipo"] if r.dado == "numerico"
+            ]:
+                if regra.coluna not in numericos:
+                    numericos[regra.coluna] = _como_numerico(dataframe[regra.coluna])
+
+            for posicao, regra in aplicaveis["tipo"]:
+                if regra.dado == "numerico":
+                    validos = np.count_nonzero(~np.isnan(numericos[regra.coluna]))
+                else:
+                    validos = _como_data(dataframe[regra.coluna]).notna().sum()
+                parciais[posicao] += int(len(dataframe) - nulos[regra.coluna] - validos)
+
+            # Comparações sobre os arrays já convertidos; comparações com NaN são
+            # falsas, então nulos não contam como fora do intervalo
+            for posicao, regra in aplicaveis["intervalo"]:
+                valores = numericos[regra.coluna]
+                fora = np.zeros(len(valores), dtype=bool)
+                if regra.minimo is not None:
+                    fora |= valores < regra.minimo
+                if regra.maximo is not None:
+                    fora |= valores > regra.maximo
+                parciais[posicao] += int(np.count_nonzero(fora))
+
+            for posicao, regra in aplicaveis["chave_unica"]:
+                hashes[posicao].append(
+                    pd.util.hash_pandas_object(
+                        normalizar_para_hash(dataframe[regra.colunas]), index=False
+                    ).to_numpy()
+                )
+
+        if aplicaveis is None:
+            # Planilha sem nenhum lote: todas as colunas estão ausentes
+            aplicaveis = self._aplicaveis(set(), resultados)
+
+        for tipo in ("nulos", "tipo", "intervalo"):
+            for posicao, regra in aplicaveis[tipo]:
+                valor = parciais[posicao]
+                resultados[posicao] = ResultadoRegra(
+                    regra, valor, valor <= regra.limite
+                )
+
+        for posicao, regra in aplicaveis["chave_unica"]:
+            todos = (
+                np.concatenate(hashes[posicao])
+                if hashes[posicao]
+                else np.empty(0, dtype="uint64")
+            )
+            valor = int(len(todos) - len(np.unique(todos)))
+            resultados[posicao] = ResultadoRegra(regra, valor, valor <= regra.limite)
+
+        for posicao, regra in aplicaveis["variacao_linhas"]:
+            if not linhas_anteriores:
+                resultados[posicao] = ResultadoRegra(
+                    regra, None, True, "Sem histórico do dia anterior"
+                )
+                continue
+            valor = abs(linhas - linhas_anteriores) / linhas_anteriores * 100
+            resultados[posicao] = ResultadoRegra(
+                regra,
+                round(valor, 2),
+                valor <= regra.maxima_percentual,
+                f"{linhas} linhas, {linhas_anteriores} no dia anterior"
+                f" ({valor:.1f}%, limite: {regra.maxima_percentual}%)",
+            )
+
+        relatorio = RelatorioQualidade(linhas, resultados, time.perf_counter() - inicio)
+        logger_quantum.info(
+            f"Regras de qualidade avaliadas: {relatorio}.",
+            extra_data=relatorio.para_dict(),
+        )
+        return relatorio
+
+    def _aplicaveis(self, presentes: set, resultados: list) -> dict:
+        """
+        Separa, por tipo, as regras cujas colunas existem na planilha. As demais
+        são reprovadas em `resultados` por coluna ausente.
+        """
+        aplicaveis = {}
+        for tipo, regras in self._por_tipo.items():
+            aplicaveis[tipo] = []
+            for posicao, regra in regras:
+                ausentes = [c for c in regra.colunas if c not in presentes]
+                if ausentes:
+                    resultados[posicao] = ResultadoRegra(
+                        regra,
+                        None,
+                        False,
+                        f"Coluna(s) ausente(s): {', '.join(ausentes)}",
+                    )
+                else:
+                    aplicaveis[tipo].append((posicao, regra))
+        return aplicaveis
+
+
+def normalizar_para_hash(dataframe: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Uniformiza os tipos das colunas antes do hash da regra 'chave_unica' (e do
+    hash de conteúdo do histórico): a leitura em lotes pode reduzir a mesma coluna para tipos diferentes em cada
+    lote (int8 em um, float64 em outro, categoria...), e o hash depende do tipo.
+    """
+    import pandas as pd
+
+    colunas = {}
+    for nome, serie in dataframe.items():
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype(serie.cat.categories.dtype)
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(
+            serie
+        ):
+            serie = serie.astype("float64")
+        colunas[nome] = serie
+    return pd.DataFrame(colunas)
+
+
+def _como_numerico(serie: "pd.Series") -> "np.ndarray":
+    """Valores da coluna como float64, com NaN onde não há um número."""
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.to_numeric(serie, errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+
+
+def _como_data(serie: "pd.Series") -> "pd.Series":
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    return pd.to_datetime(serie, errors="coerce")
+
+
+def carregar_regras(caminho_config):
+    """
+    Lê as regras de um arquivo JSON ou YAML (.yaml/.yml, requer o PyYAML).
+
+    Returns:
+            list[dict]: As definições das regras.
+    """
+    caminho_config = Path(caminho_config)
+    with open(caminho_config, encoding="utf-8") as f:
+        if caminho_config.suffix.lower() in (".yaml", ".yml"):
+            if yaml is None:
+                raise ValueError(
+                    f"O arquivo de regras '{caminho_config}' é YAML, mas o PyYAML"
+                    " não está instalado."
+                )
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+    return config["regras"] if isinstance(config, dict) else config
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+# Campos de uma expressão cron, na ordem: (nome, mínimo, máximo)
+CAMPOS_CRON = (
+    ("minuto", 0, 59),
+    ("hora", 0, 23),
+    ("dia do mês", 1, 31),
+    ("mês", 1, 12),
+    ("dia da semana", 0, 7),
+)
+
+
+def _interpretar_campo(texto: str, nome: str, minimo: int, maximo: int) -> frozenset:
+    """Valores aceitos por um campo: '*', 'n', 'a-b', listas com ',' e passos com '/'."""
+    valores = set()
+    for parte in texto.split(","):
+        intervalo, barra, passo = parte.partition("/")
+        try:
+            passo = int(passo) if barra else 1
+            if intervalo == "*":
+                inicio, fim = minimo, maximo
+            elif "-" in intervalo:
+                inicio, fim = (int(valor) for valor in intervalo.split("-", 1))
+            else:
+                inicio = int(intervalo)
+                # "5/15" equivale a "5-<máximo>/15"
+                fim = maximo if barra else inicio
+        except ValueError:
+            raise ValueError(f"Campo '{nome}' inválido: '{parte}'.") from None
+        if passo < 1 or not minimo <= inicio <= fim <= maximo:
+            raise ValueError(
+                f"Campo '{nome}' fora do intervalo {minimo}-{maximo}: '{parte}'."
+            )
+        valores.update(range(inicio, fim + 1, passo))
+    return frozenset(valores)
+
+
+class ExpressaoCron:
+    """
+    Uma expressão cron de cinco campos (minuto, hora, dia do mês, mês e dia da
+    semana, com 0 ou 7 para domingo), como "*/15 7-10 * * 1-5".
+
+    Como no cron, se o dia do mês e o dia da semana forem ambos restritos,
+    basta um deles corresponder. Os horários são os locais da máquina.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = " ".join(texto.split())
+        campos = self.texto.split(" ")
+        if len(campos) != len(CAMPOS_CRON):
+            raise ValueError(
+                f"A agenda '{texto}' deve ter {len(CAMPOS_CRON)} campos"
+                " (minuto hora dia mês dia-da-semana)."
+            )
+        try:
+            (
+                self.minutos,
+                self.horas,
+                self.dias,
+                self.meses,
+                dias_semana,
+            ) = (
+                _interpretar_campo(campo, nome, minimo, maximo)
+                for campo, (nome, minimo, maximo) in zip(campos, CAMPOS_CRON)
+            )
+        except ValueError as e:
+            raise ValueError(f"Agenda '{texto}' inválida. {e}") from None
+        self.dias_semana = frozenset(dia % 7 for dia in dias_semana)
+        # Como no cron, um campo que começa com "*" (inclusive "*/2") não restringe
+        self._dia_restrito = not campos[2].startswith("*")
+        self._dia_semana_restrito = not campos[4].startswith("*")
+        # Rejeita já na configuração datas impossíveis, como "0 0 31 2 *"
+        self.proxima(datetime.now())
+
+    def __repr__(self):
+        return f"ExpressaoCron('{self.texto}')"
+
+    def _dia_corresponde(self, momento: datetime) -> bool:
+        no_mes = momento.day in self.dias
+        # datetime.weekday(): segunda = 0; no cron, domingo = 0
+        na_semana = (momento.weekday() + 1) % 7 in self.dias_semana
+        if self._dia_restrito and self._dia_semana_restrito:
+            return no_mes or na_semana
+        return no_mes and na_semana
+
+    def corresponde(self, momento: datetime) -> bool:
+        """Indica se o minuto de `momento` está na agenda."""
+        return (
+            momento.minute in self.minutos
+            and momento.hour in self.horas
+            and momento.month in self.meses
+            and self._dia_corresponde(momento)
+        )
+
+    def proxima(self, apos: datetime) -> datetime:
+        """
+        O primeiro minuto da agenda estritamente depois de `apos`.
+
+        Raises:
+                ValueError: Se a expressão nunca ocorre (ex: "0 0 31 2 *").
+        """
+        momento = apos.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Quatro anos cobrem qualquer combinação válida, inclusive 29 de fevereiro
+        limite = momento + timedelta(days=4 * 366)
+        while momento < limite:
+            if momento.month not in self.meses:
+                proximo_mes = momento.replace(day=1, hour=0, minute=0) + timedelta(
+                    days=32
+                )
+                momento = proximo_mes.replace(day=1)
+            elif not self._dia_corresponde(momento):
+                momento = momento.replace(hour=0, minute=0) + timedelta(days=1)
+            elif momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return momento
+        raise ValueError(f"A agenda '{self.texto}' nunca ocorre.")
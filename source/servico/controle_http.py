@@ -0,0 +1,115 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Importações locais
+from source.logger.logger_config import logger_quantum
+from source.observabilidade.medicoes import formatar_metricas, medidor
+
+# Nomes aceitos no Host e no Origin das requisições que alteram o serviço
+HOSTS_LOCAIS = frozenset({"127.0.0.1", "localhost", "::1"})
+
+
+class _ManipuladorControle(BaseHTTPRequestHandler):
+    """
+    Rotas do endpoint de controle do serviço:
+
+        GET  /status                  estado do serviço e de cada feed (JSON)
+        GET  /metricas                totais por etapa no formato do Prometheus
+        POST /executar[?feed=nome...] dispara os feeds informados (padrão: todos)
+        POST /encerrar                encerra o serviço
+
+    As rotas POST exigem `Content-Type: application/json`, que obriga o
+    navegador a fazer um preflight (recusado) antes de um POST de outra
+    origem, e um Host e um Origin (se enviado) locais. Assim uma página aberta
+    no navegador do operador não consegue encerrar o serviço nem disparar feeds.
+    """
+
+    server_version = "QuantumServico"
+
+    def _responder(self, codigo: int, corpo, tipo: str = "application/json"):
+        if tipo == "application/json":
+            corpo = json.dumps(corpo, ensure_ascii=False, default=str)
+        dados = corpo.encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        rota = urlsplit(self.path).path
+        if rota == "/status":
+            return self._responder(200, self.server.servico.status())
+        if rota == "/metricas":
+            return self._responder(
+                200, formatar_metricas(medidor.resumo()), "text/plain; version=0.0.4"
+            )
+        self._responder(404, {"erro": f"Rota desconhecida: {rota}"})
+
+    def _requisicao_local(self) -> bool:
+        """Indica se o Host e o Origin (quando presente) são endereços locais."""
+        hosts = HOSTS_LOCAIS | {self.server.server_address[0]}
+        host = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        origem = self.headers.get("Origin")
+        return host in hosts and (origem is None or urlsplit(origem).hostname in hosts)
+
+    def do_POST(self):
+        if not self._requisicao_local():
+            logger_quantum.error(
+                "Controle do serviço: requisição de origem não local recusada.",
+                extra_data={
+                    "cliente": self.client_address[0],
+                    "host": self.headers.get("Host"),
+                    "origin": self.headers.get("Origin"),
+                },
+            )
+            return self._responder(403, {"erro": "Origem não permitida."})
+        tipo = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if tipo != "application/json":
+            return self._responder(
+                415, {"erro": "Use 'Content-Type: application/json'."}
+            )
+        url = urlsplit(self.path)
+        if url.path == "/executar":
+            nomes = parse_qs(url.query).get("feed")
+            try:
+                disparo = self.server.servico.disparar(nomes)
+            except KeyError as e:
+                return self._responder(404, {"erro": f"Feed desconhecido: {e}"})
+            return self._responder(202, disparo)
+        if url.path == "/encerrar":
+            self._responder(202, {"encerrando": True})
+            return self.server.servico.parar()
+        self._responder(404, {"erro": f"Rota desconhecida: {url.path}"})
+
+    def log_message(self, formato, *args):
+        # Vai para o log de arquivos, não para o terminal
+        logger_quantum.info(
+            f"Controle do serviço: {formato % args}",
+            extra_data={"cliente": self.client_address[0]},
+        )
+
+
+def iniciar_controle(servico, host: str, porta: int) -> ThreadingHTTPServer:
+    """
+    Inicia o endpoint de controle do `servico` em uma thread em segundo plano.
+
+    Args:
+            servico (ServicoQuantum): O serviço controlado.
+            host (str): O endereço de escuta; use apenas endereços locais, pois as
+                    rotas não têm autenticação (as rotas POST só aceitam
+                    requisições com Host e Origin locais).
+            porta (int): A porta de escuta (0 escolhe uma porta livre).
+
+    Returns:
+            ThreadingHTTPServer: O servidor; `shutdown()` o encerra.
+    """
+    servidor = ThreadingHTTPServer((host, porta), _ManipuladorControle)
+    servidor.daemon_threads = True
+    servidor.servico = servico
+    threading.Thread(
+        target=servidor.serve_forever, name="servico-controle", daemon=True
+    ).start()
+    return servidor
@@ -0,0 +1,254 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from colorama import Fore
+
+# Importações locais
+from source.logger.logger_config import (
+    console,
+    logger_quantum,
+    print_log,
+    registrar_evento,
+)
+from source.observabilidade.medicoes import medidor
+from source.pipeline.executor_async import ExecutorPipeline, Trabalho
+from source.servico.agenda import ExpressaoCron
+from source.servico.controle_http import iniciar_controle
+
+THEME_COLOR = Fore.MAGENTA
+ETAPA = "servico"
+
+# Intervalo máximo entre verificações da agenda; cobre ajustes do relógio
+INTERVALO_MAXIMO_ESPERA_SEGUNDOS = 60.0
+
+
+class EstadoFeed:
+    """A agenda de um feed no serviço e o resultado da sua última execução."""
+
+    def __init__(self, feed, agenda: ExpressaoCron, agora: datetime):
+        self.feed = feed
+        self.agenda = agenda
+        self.proxima = agenda.proxima(agora)
+        self.em_execucao = False
+        self.execucoes = 0
+        self.ultima = None
+
+    def para_dict(self) -> dict:
+        return {
+            "nome": self.feed.nome,
+            "agenda": self.agenda.texto,
+            "proxima_execucao": self.proxima.isoformat(timespec="seconds"),
+            "em_execucao": self.em_execucao,
+            "execucoes": self.execucoes,
+            "ultima_execucao": self.ultima,
+        }
+
+
+class ServicoQuantum:
+    """
+    Mantém o pipeline aquecido entre execuções: um único `ExecutorPipeline`
+    (caixa postal conectada, executores de validação com o pandas já
+    importado, caches e índices abertos) atende todas as execuções, que rodam
+    concorrentemente em um laço de eventos próprio.
+
+    Cada feed é executado nos horários da sua agenda cron; um feed que ainda
+    está em execução não é disparado de novo. O endpoint HTTP local (veja
+    `controle_http`) permite consultar o estado e disparar execuções.
+    """
+
+    def __init__(
+        self,
+        feeds,
+        agenda_padrao: str,
+        pipeline: ExecutorPipeline,
+        porta: int,
+        host: str = "127.0.0.1",
+        apos_execucao=None,
+    ):
+        """
+        Args:
+                feeds (list[Feed]): Os feeds atendidos pelo serviço.
+                agenda_padrao (str): A agenda cron dos feeds que não têm a sua.
+                pipeline (ExecutorPipeline): O executor compartilhado pelas execuções.
+                porta (int): A porta do endpoint de controle (0 escolhe uma livre).
+                host (str): O endereço do endpoint de controle (padrão: apenas local).
+                apos_execucao (callable): Chamada ao fim de cada execução (ex: para
+                        exportar as métricas).
+        """
+        agora = datetime.now()
+        padrao = ExpressaoCron(agenda_padrao)
+        self.estados = {
+            feed.nome: EstadoFeed(feed, feed.agenda or padrao, agora) for feed in feeds
+        }
+        self.pipeline = pipeline
+        self.porta = porta
+        self.host = host
+        self.apos_execucao = apos_execucao
+        self.iniciado_em = None
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._em_andamento = set()
+        self._loop = None
+        self._thread_loop = None
+        self._controle = None
+
+    def iniciar(self):
+        """Aquece o pipeline e inicia o laço de eventos e o endpoint de controle."""
+        self.pipeline.aquecer()
+        self._loop = asyncio.new_event_loop()
+        self._thread_loop = threading.Thread(
+            target=self._loop.run_forever, name="servico-loop", daemon=True
+        )
+        self._thread_loop.start()
+        self._controle = iniciar_controle(self, self.host, self.porta)
+        self.porta = self._controle.server_address[1]
+        self.iniciado_em = datetime.now()
+
+        registrar_evento(
+            "INFO",
+            ETAPA,
+            "Serviço iniciado com {total_feeds} feed(s). Controle em"
+            " http://{host}:{porta}.",
+            theme_color=THEME_COLOR,
+            total_feeds=len(self.estados),
+            host=self.host,
+            porta=self.porta,
+            **self.status(),
+        )
+
+    def disparar(self, nomes=None, origem: str = "manual") -> dict:
+        """
+        Agenda a execução imediata dos feeds informados (padrão: todos).
+
+        Returns:
+                dict: "disparados" e "em_execucao" (feeds ignorados por já estarem
+                rodando).
+
+        Raises:
+                KeyError: Se algum nome não for de um feed do serviço.
+        """
+        nomes = list(nomes) if nomes else list(self.estados)
+        desconhecidos = [nome for nome in nomes if nome not in self.estados]
+        if desconhecidos:
+            raise KeyError(", ".join(desconhecidos))
+
+        disparados, em_execucao = [], []
+        with self._trava:
+            for nome in nomes:
+                estado = self.estados[nome]
+                if estado.em_execucao:
+                    em_execucao.append(nome)
+                    continue
+                estado.em_execucao = True
+                futuro = asyncio.run_coroutine_threadsafe(
+                    self._executar(estado, origem), self._loop
+                )
+                self._em_andamento.add(futuro)
+                futuro.add_done_callback(self._em_andamento.discard)
+                disparados.append(nome)
+        if em_execucao:
+            logger_quantum.info(
+                f"Execução ({origem}) ignorada: feed(s) ainda em execução:"
+                f" {', '.join(em_execucao)}."
+            )
+        return {"disparados": disparados, "em_execucao": em_execucao}
+
+    async def _executar(self, estado: EstadoFeed, origem: str):
+        inicio = datetime.now()
+        ultima = {"inicio": inicio.isoformat(timespec="seconds"), "origem": origem}
+        try:
+            (resultado,) = await self.pipeline.executar([Trabalho(estado.feed)])
+            ultima.update(status=resultado.status, tempos=resultado.tempos)
+        except Exception as e:
+            registrar_evento(
+                "ERROR",
+                ETAPA,
+                "Falha na execução do feed '{feed}': {erro}",
+                exc=e,
+                feed=estado.feed.nome,
+                origem=origem,
+                erro=str(e),
+            )
+            ultima["status"] = "ERRO"
+        finally:
+            ultima["duracao_s"] = round((datetime.now() - inicio).total_seconds(), 4)
+            with self._trava:
+                estado.em_execucao = False
+                estado.execucoes += 1
+                estado.ultima = ultima
+        if self.apos_execucao is not None:
+            self.apos_execucao()
+
+    def status(self) -> dict:
+        """O estado do serviço e de cada feed, para o endpoint de controle."""
+        with self._trava:
+            feeds = [estado.para_dict() for estado in self.estados.values()]
+        return {
+            "iniciado_em": (
+                self.iniciado_em.isoformat(timespec="seconds")
+                if self.iniciado_em
+                else None
+            ),
+            "feeds": feeds,
+            "etapas": medidor.resumo(),
+        }
+
+    def _disparar_agendados(self, agora: datetime):
+        devidos = []
+        with self._trava:
+            for nome, estado in self.estados.items():
+                if estado.proxima <= agora:
+                    devidos.append(nome)
+                    estado.proxima = estado.agenda.proxima(agora)
+        if devidos:
+            self.disparar(devidos, origem="agenda")
+
+    def executar(self):
+        """
+        Inicia o serviço e dispara os feeds nos horários das suas agendas até
+        `parar()` ser chamado (pelo endpoint de controle ou por Ctrl+C).
+        """
+        self.iniciar()
+        try:
+            while not self._parar.is_set():
+                agora = datetime.now()
+                self._disparar_agendados(agora)
+                with self._trava:
+                    proxima = min(estado.proxima for estado in self.estados.values())
+                espera = (proxima - datetime.now()).total_seconds()
+                console.descarregar()
+                self._parar.wait(min(max(espera, 0), INTERVALO_MAXIMO_ESPERA_SEGUNDOS))
+        except KeyboardInterrupt:
+            print_log("AVISO", "Interrupção recebida.", theme_color=Fore.YELLOW)
+        finally:
+            self.encerrar()
+
+    def parar(self):
+        """Pede o encerramento do serviço (atendido pelo laço de `executar`)."""
+        self._parar.set()
+
+    def encerrar(self):
+        """Aguarda as execuções em andamento e libera o pipeline e o controle."""
+        self._parar.set()
+        registrar_evento(
+            "INFO",
+            ETAPA,
+            "Encerrando o serviço; aguardando as execuções em andamento...",
+            theme_color=THEME_COLOR,
+            em_andamento=len(self._em_andamento),
+        )
+        if self._controle is not None:
+            self._controle.shutdown()
+            self._controle.server_close()
+        for futuro in list(self._em_andamento):
+            try:
+                futuro.result()
+            except Exception:
+                pass  # Já registrado em _executar
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread_loop.join()
+            self._loop.close()
+        self.pipeline.encerrar()
+        logger_quantum.info("Serviço encerrado.", extra_data=self.status())
@@ -1,43 +1,56 @@
-import json
-import os
-
-import requests
-import urllib3
 from colorama import Fore
-from dotenv import load_dotenv
 
 # Importações locais
-from source.logger.logger_config import logger_quantum, print_log
-
-# Desabilita avisos de certificado inseguro
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+from source.manipulacao_excel.manipulacao_excel import descrever_contagem_nan
+from source.notificacao.despachante import despachante
+from source.qualidade.motor_regras import RelatorioQualidade
 
-# Carrega as variáveis de ambiente
-load_dotenv()
+ETAPA = "notificacao"
 
 
-def enviar_teams_alerta(contagem_nan: int, limite: int):
+def enviar_teams_alerta(
+    contagem_nan: int = None,
+    limite: int = None,
+    relatorio: RelatorioQualidade = None,
+    feed: str = None,
+):
     """
     Envia um alerta para o Microsoft Teams via Webhook sobre a baixa qualidade dos dados.
+    O card é entregue em segundo plano pelo despachante de notificações.
+
+    Sem `contagem_nan` nem `relatorio`, o alerta informa que a planilha não
+    pôde ser lida.
 
     Args:
-        contagem_nan (int): O número de valores NaN encontrados.
+        contagem_nan (int): O número de valores NaN encontrados (exibido como
+            "> limite" se for uma `ContagemParcial`).
         limite (int): O limite máximo permitido.
+        relatorio (RelatorioQualidade): O relatório das regras de qualidade; se
+            informado, o card lista as regras que falharam.
+        feed (str): O nome do feed, exibido no card (útil com vários feeds).
     """
     theme_color = Fore.RED
     print_log(
         "AÇÃO", "Preparando envio de alerta para o Teams...", theme_color=theme_color
     )
 
-    webhook_url = os.getenv("TEAMS_WEBHOOK_URL")
+    webhook_url = configuracao.teams_webhook_url
 
     if not webhook_url:
-        error_msg = "A variável de ambiente TEAMS_WEBHOOK_URL não foi encontrada."
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "A variável de ambiente TEAMS_WEBHOOK_URL não foi encontrada.",
+            canal="teams",
+        )
         return
 
+    nulos = (
+        None if contagem_nan is None else descrever_contagem_nan(contagem_nan, limite)
+    )
+
     # Card do Teams (Adaptive Card ou Message Card simples)
     # Usando formato simples de MessageCard para compatibilidade geral com Webhooks
     card_data = {
@@ -51,28 +64,38 @@ def enviar_teams_alerta(contagem_nan: int, limite: int):
                 "activitySubtitle": "Quantum - Automated Data Check",
                 "facts": [
                     {"name": "Status:", "value": "FALHA NA VALIDAÇÃO"},
-                    {"name": "Valores Nulos Encontrados:", "value": str(contagem_nan)},
+                    {"name": "Valores Nulos Encontrados:", "value": nulos},
                     {"name": "Limite Permitido:", "value": str(limite)},
                 ],
                 "text": "A quantidade de dados ausentes na planilha excedeu o limite configurado. Por favor, verifique a planilha de origem.",
             }
         ],
     }
-
-    try:
-        response = requests.post(
-            webhook_url,
-            data=json.dumps(card_data),
-            headers={"Content-Type": "application/json"},
-            verify=False,
+    secao = card_data["sections"][0]
+    if relatorio is not None:
+        secao["facts"] = [
+            {"name": "Status:", "value": "FALHA NA VALIDAÇÃO"},
+            {"name": "Regras com Falha:", "value": str(relatorio)},
+        ] + [
+            {"name": f"{descricao}:", "value": resumo}
+            for descricao, resumo in relatorio.fatos(apenas_falhas=True)
+        ]
+        secao["text"] = (
+            "Uma ou mais regras de qualidade configuradas falharam. Por favor,"
+            " verifique a planilha de origem."
         )
-        response.raise_for_status()
-
-        success_msg = "Alerta enviado com sucesso para o Teams!"
-        print_log("INFO", success_msg, theme_color=Fore.GREEN)
-        logger_quantum.info(success_msg)
+    elif contagem_nan is None:
+        secao["facts"] = [
+            {"name": "Status:", "value": "FALHA NA LEITURA DA PLANILHA"},
+            {"name": "Limite Permitido:", "value": str(limite)},
+        ]
+        secao["text"] = (
+            "Não foi possível ler a planilha recebida, por isso a validação não"
+            " foi feita. Por favor, verifique a planilha de origem."
+        )
+    if feed:
+        secao["facts"].insert(0, {"name": "Feed:", "value": feed})
+        card_data["summary"] = f"Alerta de Qualidade de Dados: {feed}"
 
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Falha ao enviar alerta para o Teams: {e}"
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg, exc=e)
+    despachante.enviar_teams(webhook_url, card_data)
+    logger_quantum.info("Alerta do Teams enfileirado para envio.")
@@ -1,24 +1,22 @@
-import json
-import os
-
-import requests
-import urllib3
 from colorama import Fore
-from dotenv import load_dotenv
 
 # Importações locais
-from source.logger.logger_config import logger_quantum, print_log
-
-# Desabilita avisos de certificado inseguro
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from source.configuracao.configuracao import configuracao
+from source.logger.logger_config import logger_quantum, print_log, registrar_evento
+from source.notificacao.despachante import despachante
+from source.qualidade.motor_regras import RelatorioQualidade
 
-# Carrega as variáveis de ambiente
-load_dotenv()
+ETAPA = "notificacao"
 
 
-def enviar_teams_sucesso():
+def enviar_teams_sucesso(relatorio: RelatorioQualidade = None):
     """
     Envia uma confirmação de sucesso para o Microsoft Teams via Webhook.
+    O card é entregue em segundo plano pelo despachante de notificações.
+
+    Args:
+        relatorio (RelatorioQualidade): O relatório das regras de qualidade; se
+            informado, o card lista o resultado de cada regra.
     """
     theme_color = Fore.GREEN
     print_log(
@@ -27,12 +25,15 @@ def enviar_teams_sucesso():
         theme_color=theme_color,
     )
 
-    webhook_url = os.getenv("TEAMS_WEBHOOK_URL")
+    webhook_url = configuracao.teams_webhook_url
 
     if not webhook_url:
-        error_msg = "A variável de ambiente TEAMS_WEBHOOK_URL não foi encontrada."
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg)
+        registrar_evento(
+            "ERROR",
+            ETAPA,
+            "A variável de ambiente TEAMS_WEBHOOK_URL não foi encontrada.",
+            canal="teams",
+        )
         return
 
     # Card do Teams
@@ -49,21 +50,11 @@ def enviar_teams_sucesso():
             }
         ],
     }
-
-    try:
-        response = requests.post(
-            webhook_url,
-            data=json.dumps(card_data),
-            headers={"Content-Type": "application/json"},
-            verify=False,
-        )
-        response.raise_for_status()
-
-        success_msg = "Confirmação de sucesso enviada para o Teams!"
-        print_log("INFO", success_msg, theme_color=theme_color)
-        logger_quantum.info(success_msg)
-
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Falha ao enviar confirmação para o Teams: {e}"
-        print_log("ERROR", error_msg)
-        logger_quantum.error(error_msg, exc=e)
+    if relatorio is not None:
+        card_data["sections"][0]["facts"] = [
+            {"name": f"{descricao}:", "value": resumo}
+            for descricao, resumo in relatorio.fatos()
+        ]
+
+    despachante.enviar_teams(webhook_url, card_data)
+    logger_quantum.info("Confirmação de sucesso do Teams enfileirada para envio.")
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Os módulos são importados a partir da raiz do repositório, como em `main.py`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# O logger em arquivo precisa de uma pasta; os testes não usam a do ambiente
+os.environ["PASTA_LOG"] = tempfile.mkdtemp(prefix="quantum_testes_logs_")
@@ -0,0 +1,48 @@
+"""Marcas de falha do `CacheColunar`: só para conversões que falhariam de novo."""
+
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from pyarrow import feather  # noqa: E402
+
+from source.manipulacao_excel.cache_colunar import (  # noqa: E402
+    VALIDADE_FALHA_SEGUNDOS,
+    CacheColunar,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheColunar(tmp_path / "cache", 1024 * 1024)
+
+
+def test_falha_ao_gravar_nao_desativa_o_cache(cache, monkeypatch):
+    df = pd.DataFrame({"Retorno": [0.1, None]})
+
+    def disco_cheio(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(feather, "write_feather", disco_cheio)
+    assert not cache.guardar("abc", df)
+    monkeypatch.undo()
+
+    assert list(cache.diretorio.glob("*.falha")) == []
+    assert cache.guardar("abc", df)
+    assert cache.obter("abc").equals(df)
+
+
+def test_marca_de_conteudo_nao_representavel_expira(cache):
+    df = pd.DataFrame({"Retorno": [0.1, "texto"]})
+
+    assert not cache.guardar("abc", df)
+    (marca,) = cache.diretorio.glob("*.falha")
+    assert not cache.guardar("abc", df)
+
+    vencida = marca.stat().st_mtime - VALIDADE_FALHA_SEGUNDOS - 1
+    os.utime(marca, (vencida, vencida))
+    assert cache.guardar("def", pd.DataFrame({"Retorno": [0.1]}))
+    assert not marca.exists()
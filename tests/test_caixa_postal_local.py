@@ -0,0 +1,70 @@
+"""Cache de cabeçalhos da `CaixaPostalLocal` com uma pasta de arquivos .eml."""
+
+import os
+from datetime import date
+
+from source.email.caixa_postal import CaixaPostalLocal
+
+MENSAGEM = (
+    b"From: relatorios@exemplo.com\r\n"
+    b"To: quantum@exemplo.com\r\n"
+    b"Subject: Daily Fundos 17/10\r\n"
+    b"Date: Fri, 17 Oct 2025 08:00:00 -0300\r\n"
+    b"Message-ID: <daily-1@exemplo.com>\r\n"
+    b"\r\n"
+    b"Corpo.\r\n"
+)
+
+
+def buscar(caixa: CaixaPostalLocal):
+    dia = date(2025, 10, 17)
+    return list(caixa.buscar_periodo("Daily Fundos", dia, dia))
+
+
+def test_reler_eml_que_ainda_estava_sendo_gravado(tmp_path):
+    caminho = tmp_path / "daily.eml"
+    # Só o começo dos cabeçalhos foi copiado quando a busca leu o arquivo
+    caminho.write_bytes(MENSAGEM[:40])
+    caixa = CaixaPostalLocal(str(tmp_path))
+    assert buscar(caixa) == []
+
+    caminho.write_bytes(MENSAGEM)
+    encontradas = buscar(caixa)
+
+    assert [m.id_mensagem for m in encontradas] == ["<daily-1@exemplo.com>"]
+
+
+def test_reaproveita_cabecalhos_de_arquivo_inalterado(tmp_path):
+    (tmp_path / "daily.eml").write_bytes(MENSAGEM)
+    caixa = CaixaPostalLocal(str(tmp_path))
+
+    primeira = buscar(caixa)
+    segunda = buscar(caixa)
+
+    assert len(primeira) == 1
+    assert segunda[0] is primeira[0]
+
+
+def test_ignora_arquivos_ocultos_e_de_outras_extensoes(tmp_path):
+    (tmp_path / "daily.eml").write_bytes(MENSAGEM)
+    (tmp_path / ".daily.eml").write_bytes(MENSAGEM)
+    (tmp_path / "daily.eml.tmp").write_bytes(MENSAGEM)
+    os.mkdir(tmp_path / "pasta.eml")
+
+    assert len(buscar(CaixaPostalLocal(str(tmp_path)))) == 1
+
+
+def test_decodifica_assunto_codificado_rfc2047(tmp_path):
+    (tmp_path / "relatorio.eml").write_bytes(
+        MENSAGEM.replace(
+            b"Subject: Daily Fundos 17/10",
+            b"Subject: =?utf-8?q?Relat=C3=B3rio_Di=C3=A1rio?=\r\n"
+            b" =?utf-8?q?_17/10?=",
+        )
+    )
+    caixa = CaixaPostalLocal(str(tmp_path))
+    dia = date(2025, 10, 17)
+
+    (mensagem,) = caixa.buscar_mensagens("Relatório", dia)
+
+    assert mensagem.assunto == "Relatório Diário 17/10"
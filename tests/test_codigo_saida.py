@@ -0,0 +1,46 @@
+"""Código de saída de `main.py` para o agendador: 1 quando a validação falha."""
+
+import os
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from benchmarks.geradores import HEADLINE_PREFIX, gerar_caixa_periodo, gerar_planilha
+
+MAIN = Path(__file__).resolve().parents[1] / "main.py"
+
+
+def executar_main(tmp_path, proporcao_nulos: float):
+    planilha = gerar_planilha(
+        tmp_path / "modelo.xlsx", 200, proporcao_nulos=proporcao_nulos
+    ).read_bytes()
+    caixa = gerar_caixa_periodo(tmp_path / "caixa", {date.today(): planilha})
+    ambiente = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in ("ARQUIVO_FEEDS", "ARQUIVO_REGRAS", "TEAMS_WEBHOOK_URL")
+    }
+    ambiente.update(
+        CAIXA_POSTAL_LOCAL=str(caixa),
+        HEADLINE_PREFIX=HEADLINE_PREFIX,
+        PASTA_RAIZ_QUANTUM=str(tmp_path / "feed"),
+    )
+    return subprocess.run(
+        [sys.executable, str(MAIN), "--dry-run", "--quiet"],
+        cwd=tmp_path,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+@pytest.mark.parametrize("proporcao_nulos, codigo", [(0.0, 0), (0.5, 1)])
+def test_codigo_de_saida_reflete_a_validacao(tmp_path, proporcao_nulos, codigo):
+    processo = executar_main(tmp_path, proporcao_nulos)
+
+    assert processo.returncode == codigo, processo.stdout + processo.stderr
+    assert "Traceback" not in processo.stderr
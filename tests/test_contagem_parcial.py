@@ -0,0 +1,53 @@
+"""
+Leituras em streaming interrompidas ao exceder o limite devolvem uma
+`ContagemParcial`: o alerta mostra "> limite" e o índice não a reaproveita.
+"""
+
+import pandas as pd
+
+from source.configuracao.configuracao import configuracao
+from source.indice.indice_processados import indice_da_pasta
+from source.manipulacao_excel.manipulacao_excel import (
+    ContagemParcial,
+    validar_arquivo_excel,
+)
+from source.notificacao.despachante import despachante
+from source.teams.envia_teams_alerta import enviar_teams_alerta
+
+
+def gravar_planilha(caminho, nulos: int):
+    pd.DataFrame({"Fundo": ["A"] * nulos, "Retorno": [None] * nulos}).to_excel(
+        caminho, index=False
+    )
+    return caminho
+
+
+def test_leitura_interrompida_devolve_contagem_parcial_fora_do_indice(tmp_path):
+    caminho = gravar_planilha(tmp_path / "daily.xlsx", nulos=100)
+    indice = indice_da_pasta(tmp_path)
+
+    contagem = validar_arquivo_excel(caminho, limites_null=30, indice=indice)
+
+    assert isinstance(contagem, ContagemParcial)
+    assert 30 < contagem < 100
+    hash_conteudo = indice.hash_do_arquivo(caminho)
+    assert indice.validacao_registrada(hash_conteudo, "Retorno", 30) is None
+
+
+def test_alerta_do_teams_mostra_contagem_parcial_como_acima_do_limite(monkeypatch):
+    cards = []
+    monkeypatch.setattr(configuracao, "teams_webhook_url", "http://webhook")
+    monkeypatch.setattr(
+        despachante, "enviar_teams", lambda url, card: cards.append(card)
+    )
+
+    enviar_teams_alerta(ContagemParcial(31), 30)
+    enviar_teams_alerta(45, 30)
+
+    valores = [
+        fato["value"]
+        for card in cards
+        for fato in card["sections"][0]["facts"]
+        if fato["name"] == "Valores Nulos Encontrados:"
+    ]
+    assert valores == ["> 30", "45"]
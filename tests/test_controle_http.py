@@ -0,0 +1,88 @@
+"""Proteção das rotas POST do endpoint de controle contra requisições de outras origens."""
+
+import http.client
+import threading
+
+import pytest
+
+from source.servico.controle_http import iniciar_controle
+
+
+class ServicoFalso:
+    def __init__(self):
+        self.disparos = []
+        self.parado = threading.Event()
+
+    def disparar(self, nomes=None):
+        self.disparos.append(nomes)
+        return {"disparados": nomes or ["quantum"], "em_execucao": []}
+
+    def parar(self):
+        self.parado.set()
+
+    def status(self):
+        return {"feeds": []}
+
+
+@pytest.fixture
+def controle():
+    servico = ServicoFalso()
+    servidor = iniciar_controle(servico, "127.0.0.1", 0)
+    yield servico, servidor.server_address[1]
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def post(porta: int, rota: str, cabecalhos: dict) -> int:
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=5)
+    try:
+        conexao.request("POST", rota, body=b"{}", headers=cabecalhos)
+        return conexao.getresponse().status
+    finally:
+        conexao.close()
+
+
+JSON = {"Content-Type": "application/json"}
+
+
+def test_aceita_post_local_em_json(controle):
+    servico, porta = controle
+
+    assert post(porta, "/executar?feed=quantum", JSON) == 202
+    assert post(porta, "/encerrar", JSON) == 202
+    assert servico.disparos == [["quantum"]]
+    # O serviço é parado depois de a resposta ser enviada
+    assert servico.parado.wait(5)
+
+
+def test_recusa_post_sem_json(controle):
+    # Um formulário ou fetch "simples" de outra página não faz preflight
+    servico, porta = controle
+
+    assert post(porta, "/encerrar", {"Content-Type": "text/plain"}) == 415
+    assert not servico.parado.is_set()
+
+
+@pytest.mark.parametrize(
+    "cabecalhos",
+    [
+        {"Origin": "https://exemplo.com"},
+        {"Origin": "null"},
+        {"Host": "exemplo.com"},  # DNS rebinding
+    ],
+)
+def test_recusa_post_de_origem_nao_local(controle, cabecalhos):
+    servico, porta = controle
+
+    assert post(porta, "/encerrar", {**JSON, **cabecalhos}) == 403
+    assert post(porta, "/executar", {**JSON, **cabecalhos}) == 403
+    assert not servico.parado.is_set()
+    assert servico.disparos == []
+
+
+def test_status_continua_aberto(controle):
+    _, porta = controle
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=5)
+    conexao.request("GET", "/status")
+    assert conexao.getresponse().status == 200
+    conexao.close()
@@ -0,0 +1,272 @@
+"""
+Entrega do `DespachanteNotificacoes` contra um webhook HTTP local e um servidor
+SMTP local: agrupamento, novas tentativas do POST e reaproveitamento da conexão
+SMTP.
+"""
+
+import json
+import select
+import socket
+import socketserver
+import threading
+import time
+from email import message_from_bytes, policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from source.notificacao.despachante import DespachanteNotificacoes
+
+
+class WebhookLocal(ThreadingHTTPServer):
+    """Webhook que responde 503 às primeiras `falhas` requisições."""
+
+    daemon_threads = True
+
+    def __init__(self, falhas: int = 0):
+        super().__init__(("127.0.0.1", 0), TratadorWebhook)
+        self.falhas = falhas
+        self.tentativas = 0
+        self.cards = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/webhook"
+
+
+class TratadorWebhook(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.tentativas += 1
+        if self.server.falhas:
+            self.server.falhas -= 1
+            status = 503
+        else:
+            self.server.cards.append(json.loads(corpo))
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SmtpLocal(socketserver.ThreadingTCPServer):
+    """Servidor SMTP mínimo que registra as conexões, os NOOPs e as mensagens."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), TratadorSmtp)
+        self.conexoes = 0
+        self.noops = 0
+        self.atraso_dados = 0.0
+        # Comandos recebidos antes da resposta ao DATA (conexão usada em paralelo)
+        self.comandos_durante_envio = 0
+        self.mensagens = []
+        self._abertas = []
+
+    @property
+    def porta(self) -> int:
+        return self.server_address[1]
+
+    def derrubar_conexoes(self):
+        """Fecha as conexões abertas, como um servidor que expira a sessão."""
+        for conexao in self._abertas:
+            try:
+                conexao.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Já encerrada pelo cliente
+        self._abertas.clear()
+
+
+class TratadorSmtp(socketserver.StreamRequestHandler):
+    def responder(self, linha: str):
+        self.wfile.write(linha.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.conexoes += 1
+        self.server._abertas.append(self.request)
+        self.responder("220 smtp-local")
+        try:
+            for linha in self.rfile:
+                comando = linha.decode().strip().upper()
+                if comando.startswith(("EHLO", "HELO")):
+                    self.responder("250 smtp-local")
+                elif comando == "NOOP":
+                    self.server.noops += 1
+                    self.responder("250 OK")
+                elif comando.startswith(("MAIL", "RCPT", "RSET")):
+                    self.responder("250 OK")
+                elif comando == "DATA":
+                    self.responder("354 Fim com <CRLF>.<CRLF>")
+                    self.server.mensagens.append(self.ler_dados())
+                    time.sleep(self.server.atraso_dados)
+                    if select.select([self.request], [], [], 0)[0]:
+                        self.server.comandos_durante_envio += 1
+                    self.responder("250 OK")
+                elif comando == "QUIT":
+                    self.responder("221 Até logo")
+                    return
+                else:
+                    self.responder("502 Comando não implementado")
+        except OSError:
+            pass  # Conexão derrubada pelo teste
+
+    def ler_dados(self):
+        linhas = []
+        for linha in self.rfile:
+            if linha == b".\r\n":
+                break
+            linhas.append(linha[1:] if linha.startswith(b"..") else linha)
+        return message_from_bytes(b"".join(linhas), policy=policy.default)
+
+
+def iniciar(servidor):
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+@pytest.fixture
+def webhook():
+    servidor = iniciar(WebhookLocal())
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def smtp():
+    servidor = iniciar(SmtpLocal())
+    yield servidor
+    servidor.shutdown()
+    servidor.derrubar_conexoes()
+    servidor.server_close()
+
+
+@pytest.fixture
+def criar_despachante(smtp):
+    criados = []
+
+    def criar(**kwargs):
+        kwargs.setdefault("janela_agrupamento", 0.05)
+        despachante = DespachanteNotificacoes(
+            timeout=5,
+            espera_inicial=0,
+            dormir=lambda segundos: None,
+            servidor_smtp="127.0.0.1",
+            porta_smtp=smtp.porta,
+            usar_starttls=False,
+            **kwargs,
+        )
+        criados.append(despachante)
+        return despachante
+
+    yield criar
+    for despachante in criados:
+        despachante.encerrar(timeout=5)
+
+
+def card(resumo: str, cor: str = "00FF00") -> dict:
+    return {
+        "themeColor": cor,
+        "summary": resumo,
+        "sections": [{"activityTitle": resumo}],
+    }
+
+
+def enviar_email(despachante, assunto: str, destinatarios=("time@exemplo.com",)):
+    despachante.enviar_email(
+        "quantum@exemplo.com", None, list(destinatarios), assunto, f"<p>{assunto}</p>"
+    )
+
+
+def test_agrupa_as_notificacoes_da_janela_por_destino(webhook, smtp, criar_despachante):
+    despachante = criar_despachante(janela_agrupamento=0.5)
+    outro_webhook = webhook.url.replace("/webhook", "/outro")
+
+    despachante.enviar_teams(webhook.url, card("Feed A"))
+    despachante.enviar_teams(webhook.url, card("Feed B", cor="d9534f"))
+    despachante.enviar_teams(outro_webhook, card("Feed C"))
+    enviar_email(despachante, "Feed A")
+    enviar_email(despachante, "Feed B")
+    assert despachante.aguardar(10)
+
+    agrupado = next(c for c in webhook.cards if len(c["sections"]) == 2)
+    assert len(webhook.cards) == 2
+    assert agrupado["themeColor"] == "d9534f"
+    assert agrupado["summary"] == "2 notificações: Feed A; Feed B"
+    assert len(smtp.mensagens) == 1
+    assert smtp.mensagens[0]["Subject"] == "2 notificações: Feed A; Feed B"
+    assert despachante.envios == 3
+    assert despachante.falhas == 0
+
+
+def test_repete_o_post_quando_o_webhook_responde_503(webhook, criar_despachante):
+    webhook.falhas = 2
+    despachante = criar_despachante(tentativas=3)
+
+    despachante.enviar_teams(webhook.url, card("Feed A"))
+    assert despachante.aguardar(10)
+
+    assert webhook.tentativas == 3
+    assert [c["summary"] for c in webhook.cards] == ["Feed A"]
+    assert despachante.falhas == 0
+
+
+def test_desiste_do_post_quando_as_tentativas_acabam(webhook, criar_despachante):
+    webhook.falhas = 10
+    despachante = criar_despachante(tentativas=2)
+
+    despachante.enviar_teams(webhook.url, card("Feed A"))
+    assert despachante.aguardar(10)
+
+    assert webhook.tentativas == 3  # A primeira requisição e duas novas tentativas
+    assert webhook.cards == []
+    assert despachante.falhas == 1
+
+
+def test_reaproveita_a_conexao_smtp_entre_envios(smtp, criar_despachante):
+    despachante = criar_despachante()
+
+    enviar_email(despachante, "Feed A")
+    assert despachante.aguardar(10)
+    enviar_email(despachante, "Feed B")
+    assert despachante.aguardar(10)
+
+    assert [m["Subject"] for m in smtp.mensagens] == ["Feed A", "Feed B"]
+    assert smtp.conexoes == 1
+    assert smtp.noops == 1
+
+
+def test_reconecta_quando_o_servidor_smtp_encerra_a_sessao(smtp, criar_despachante):
+    despachante = criar_despachante()
+
+    enviar_email(despachante, "Feed A")
+    assert despachante.aguardar(10)
+    smtp.derrubar_conexoes()
+    enviar_email(despachante, "Feed B")
+    assert despachante.aguardar(10)
+
+    assert [m["Subject"] for m in smtp.mensagens] == ["Feed A", "Feed B"]
+    assert smtp.conexoes == 2
+    assert despachante.falhas == 0
+
+
+def test_encerrar_nao_fecha_o_smtp_durante_um_envio(smtp, criar_despachante):
+    smtp.atraso_dados = 0.5
+    despachante = criar_despachante(janela_agrupamento=0)
+
+    enviar_email(despachante, "Feed A")
+    while not smtp.mensagens:
+        time.sleep(0.01)
+    despachante.encerrar(timeout=0.1)
+
+    assert despachante.aguardar(10)
+    assert smtp.comandos_durante_envio == 0
+    assert [m["Subject"] for m in smtp.mensagens] == ["Feed A"]
+    assert despachante.falhas == 0
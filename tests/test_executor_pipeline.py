@@ -0,0 +1,39 @@
+"""Execuções repetidas do `ExecutorPipeline` com `apenas_novos`, como no modo serviço."""
+
+import asyncio
+from datetime import date
+
+from benchmarks.geradores import HEADLINE_PREFIX, gerar_caixa_periodo, gerar_planilha
+from source.email.caixa_postal import CaixaPostalLocal
+from source.feeds.processar_feeds import Feed
+from source.pipeline.executor_async import ExecutorPipeline, Trabalho
+
+
+def test_nao_repete_mensagem_atendida_sem_persistir_anexos(tmp_path):
+    planilha = gerar_planilha(tmp_path / "modelo.xlsx", 50).read_bytes()
+    caixa = CaixaPostalLocal(
+        str(gerar_caixa_periodo(tmp_path / "caixa", {date.today(): planilha}))
+    )
+    feed = Feed("teste", HEADLINE_PREFIX, tmp_path / "feed")
+    pipeline = ExecutorPipeline(
+        caixa,
+        tentativas=1,
+        persistir_anexos=False,
+        notificar=False,
+        apenas_novos=True,
+    )
+
+    async def duas_execucoes():
+        pipeline.iniciar()
+        try:
+            (primeira,) = await pipeline.executar([Trabalho(feed)])
+            (segunda,) = await pipeline.executar([Trabalho(feed)])
+        finally:
+            pipeline.encerrar()
+        return primeira, segunda
+
+    primeira, segunda = asyncio.run(duas_execucoes())
+
+    assert primeira.status == "OK"
+    assert segunda.status == "JA PROCESSADO"
+    assert list((tmp_path / "feed").glob("*.xlsx")) == []
@@ -0,0 +1,33 @@
+"""Planilhas .xls, que o modo somente leitura do openpyxl não abre, vão para o pandas."""
+
+import pandas as pd
+
+from source.manipulacao_excel.manipulacao_excel import (
+    PlanilhaValidada,
+    contar_nan_streaming,
+    validar_arquivo_excel,
+)
+
+
+def gravar_planilha(caminho):
+    # O pandas identifica o formato pelo conteúdo; o openpyxl recusa a extensão
+    pd.DataFrame({"Fundo": ["A", "B", "C"], "Retorno": [0.1, None, None]}).to_excel(
+        caminho, index=False, engine="openpyxl"
+    )
+    return caminho
+
+
+def test_contagem_em_streaming_de_xls_usa_o_pandas(tmp_path):
+    caminho = gravar_planilha(tmp_path / "daily.xls")
+
+    assert contar_nan_streaming(caminho) == 2
+
+
+def test_valida_xls_com_streaming_ligado(tmp_path):
+    caminho = gravar_planilha(tmp_path / "daily.xls")
+
+    validada = validar_arquivo_excel(caminho, limites_null=5)
+
+    assert isinstance(validada, PlanilhaValidada)
+    assert validada.contagem_nan == 2
+    assert [len(lote) for lote in validada.em_lotes(2)] == [2, 1]
@@ -0,0 +1,41 @@
+"""Um fork com linhas ainda no buffer do arquivo de log não as grava duas vezes."""
+
+import os
+import time
+
+import pytest
+
+from source.logger.logger_config import Logger
+
+# Cabem no buffer do arquivo (8 KiB) sem nenhuma gravação em disco
+LINHAS = 50
+
+
+def linhas_gravadas(pasta) -> list:
+    return [
+        linha
+        for caminho in sorted(pasta.rglob("*.jsonl"))
+        for linha in caminho.read_text(encoding="utf-8").splitlines()
+    ]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork só existe em sistemas Unix")
+def test_filho_nao_grava_de_novo_o_buffer_herdado(tmp_path):
+    # Sem flush periódico: as linhas ficam no buffer do arquivo até o close
+    logger = Logger(tmp_path, name_prefix="teste", intervalo_flush=60)
+    for i in range(LINHAS):
+        logger.info(f"linha {i}")
+    while not logger._fila.empty():
+        time.sleep(0.01)
+    time.sleep(0.1)  # A última entrada retirada da fila ainda está sendo escrita
+    assert linhas_gravadas(tmp_path) == []
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    logger.close()
+
+    mensagens = [linha for linha in linhas_gravadas(tmp_path) if "linha " in linha]
+    assert len(mensagens) == LINHAS
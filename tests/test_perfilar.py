@@ -0,0 +1,27 @@
+"""O `perfilar` soma ao perfil o trabalho feito nas threads dos executores."""
+
+import pstats
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from source.observabilidade.medicoes import perfilar
+
+
+def trabalho_no_executor():
+    fim = time.perf_counter() + 0.05
+    while time.perf_counter() < fim:
+        pass
+
+
+def test_perfil_inclui_as_threads_iniciadas_no_bloco(tmp_path):
+    with perfilar(tmp_path) as caminho:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for futuro in [executor.submit(trabalho_no_executor) for _ in range(2)]:
+                futuro.result()
+
+    funcoes = {
+        (nome, chamadas)
+        for (_, _, nome), (_, chamadas, *_) in pstats.Stats(str(caminho)).stats.items()
+    }
+    assert ("trabalho_no_executor", 2) in funcoes
+    assert caminho.with_suffix(".txt").is_file()
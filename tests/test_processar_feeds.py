@@ -0,0 +1,26 @@
+"""Modo em lote (`processar_feeds`) em simulação: nada é gravado nos feeds."""
+
+from datetime import date
+
+from benchmarks.geradores import HEADLINE_PREFIX, gerar_caixa_periodo, gerar_planilha
+from source.email.caixa_postal import CaixaPostalLocal
+from source.feeds.processar_feeds import Feed, processar_feeds
+from source.indice.indice_processados import indice_da_pasta
+
+
+def test_simulacao_valida_em_memoria_sem_gravar_anexos_nem_indice(tmp_path):
+    planilha = gerar_planilha(tmp_path / "modelo.xlsx", 50).read_bytes()
+    caixa = CaixaPostalLocal(
+        str(gerar_caixa_periodo(tmp_path / "caixa", {date.today(): planilha}))
+    )
+    pasta_feed = tmp_path / "feed"
+    pasta_feed.mkdir()
+    feed = Feed("teste", HEADLINE_PREFIX, pasta_feed)
+
+    (resultado,) = processar_feeds([feed], caixa_postal=caixa, persistir=False)
+
+    assert resultado.status == "OK"
+    assert list(pasta_feed.rglob("*.xlsx")) == []
+    assert caixa.conectar()
+    (mensagem,) = caixa.buscar_mensagens(HEADLINE_PREFIX, date.today())
+    assert not indice_da_pasta(pasta_feed).mensagem_registrada(mensagem.id_mensagem)
@@ -0,0 +1,37 @@
+"""O reprocessamento de um período não tira da execução diária o anexo de hoje."""
+
+from datetime import date, timedelta
+
+from benchmarks.geradores import HEADLINE_PREFIX, gerar_caixa_periodo, gerar_planilha
+from source.email.caixa_postal import CaixaPostalLocal
+from source.email.extrair_excel_email import ingerir_excel_email
+from source.feeds.processar_feeds import Feed
+from source.pipeline.reprocessamento import reprocessar_periodo
+
+
+def test_anexo_guardado_pelo_reprocessamento_continua_novo_para_o_dia(tmp_path):
+    hoje = date.today()
+    planilha = gerar_planilha(tmp_path / "modelo.xlsx", 50).read_bytes()
+    caixa = CaixaPostalLocal(
+        str(
+            gerar_caixa_periodo(
+                tmp_path / "caixa",
+                {hoje - timedelta(days=i): planilha for i in range(3)},
+            )
+        )
+    )
+    pasta = tmp_path / "feed"
+    feed = Feed("teste", HEADLINE_PREFIX, pasta)
+
+    resultados = reprocessar_periodo(
+        [feed], hoje - timedelta(days=2), hoje, caixa, processos_validacao=1
+    )
+    assert len(resultados) == 3
+
+    anexo = ingerir_excel_email(pasta, HEADLINE_PREFIX, caixa, data=hoje)
+
+    assert not anexo.ja_processado
+    assert anexo.aguardar_persistencia()
+    assert anexo.caminho.read_bytes() == planilha
+    anexo_repetido = ingerir_excel_email(pasta, HEADLINE_PREFIX, caixa, data=hoje)
+    assert anexo_repetido.ja_processado
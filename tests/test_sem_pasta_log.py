@@ -0,0 +1,38 @@
+"""
+Sem PASTA_LOG o logger é importado mesmo assim, para que `--help` funcione e
+`--check-only` aponte a variável ausente em vez de falhar na importação.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+MAIN = Path(__file__).resolve().parents[1] / "main.py"
+
+
+def executar(*argumentos, cwd):
+    ambiente = {k: v for k, v in os.environ.items() if k != "PASTA_LOG"}
+    return subprocess.run(
+        [sys.executable, str(MAIN), *argumentos],
+        cwd=cwd,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_help_funciona_sem_pasta_log(tmp_path):
+    processo = executar("--help", cwd=tmp_path)
+
+    assert processo.returncode == 0, processo.stderr
+    assert "--check-only" in processo.stdout
+
+
+def test_check_only_aponta_pasta_log_ausente(tmp_path):
+    processo = executar("--check-only", cwd=tmp_path)
+
+    assert processo.returncode == 1
+    assert "Traceback" not in processo.stderr
+    assert "PASTA_LOG" in processo.stdout + processo.stderr
@@ -0,0 +1,203 @@
+"""
+Reconexão da `SessaoOutlook` e entrega do evento NewMailEx na
+`CaixaPostalOutlook`, contra objetos COM falsos (sem o Outlook instalado).
+"""
+
+import pytest
+
+from source.email.caixa_postal import CaixaPostalOutlook
+from source.email.sessao_outlook import SessaoOutlook
+from source.logger.logger_config import console
+
+
+class CaixaEntradaFalsa:
+    def __init__(self, aplicacao):
+        self.Application = aplicacao
+        self.ativa = True
+
+    @property
+    def EntryID(self):
+        if not self.ativa:
+            raise OSError("O servidor RPC não está disponível.")
+        return "CAIXA-DE-ENTRADA"
+
+
+class PastaFalsa:
+    def __init__(self, nome, subpastas=None):
+        self.Name = nome
+        self.Folders = subpastas or {}
+
+
+class NamespaceFalso:
+    def __init__(self, contas):
+        self.Folders = contas
+
+
+class AplicacaoFalsa:
+    def __init__(self, conta: str):
+        self.inbox = CaixaEntradaFalsa(self)
+        self._namespace = NamespaceFalso(
+            [PastaFalsa(conta, {"Caixa de Entrada": self.inbox})]
+        )
+
+    def GetNamespace(self, nome):
+        assert nome == "MAPI"
+        return self._namespace
+
+
+class OutlookFalso:
+    """Cada `dispatch` devolve uma nova aplicação, como após um reinício."""
+
+    def __init__(self, conta: str = "quantum@asa.com.br", falhas: int = 0):
+        self.conta = conta
+        self.falhas = falhas
+        self.aplicacoes = []
+        self.reinicios = 0
+        self.esperas = []
+
+    def dispatch(self, prog_id):
+        assert prog_id == "Outlook.Application"
+        if self.falhas:
+            self.falhas -= 1
+            raise OSError("Falha na chamada de procedimento remoto.")
+        self.aplicacoes.append(AplicacaoFalsa(self.conta))
+        return self.aplicacoes[-1]
+
+    def reiniciar(self):
+        self.reinicios += 1
+
+    def sessao(self, **kwargs) -> SessaoOutlook:
+        return SessaoOutlook(
+            dispatch=self.dispatch,
+            reiniciar_outlook=self.reiniciar,
+            dormir=self.esperas.append,
+            **kwargs,
+        )
+
+
+class EventosFalsos:
+    """Assinaturas do NewMailEx e a fila de e-mails entregue ao bombear."""
+
+    def __init__(self):
+        self.assinaturas = []
+        self.pendentes = []
+
+    def assinar(self, aplicacao, ao_receber):
+        self.assinaturas.append((aplicacao, ao_receber))
+        return object()
+
+    def novo_email(self, aplicacao):
+        self.pendentes.append(aplicacao)
+
+    def bombear(self):
+        # Só a assinatura da aplicação que recebeu o e-mail é avisada
+        for aplicacao in self.pendentes:
+            for assinada, ao_receber in self.assinaturas:
+                if assinada is aplicacao:
+                    ao_receber()
+        self.pendentes.clear()
+
+
+def saida_console(capsys) -> str:
+    console.descarregar()
+    return capsys.readouterr().out
+
+
+def test_reaproveita_a_conexao_enquanto_ela_responde():
+    outlook = OutlookFalso()
+    sessao = outlook.sessao()
+
+    inbox = sessao.obter_caixa_entrada()
+
+    assert inbox is outlook.aplicacoes[0].inbox
+    assert sessao.obter_caixa_entrada() is inbox
+    assert sessao.conexoes == 1
+    assert outlook.reinicios == 0
+
+
+def test_reconecta_sem_reiniciar_quando_a_conexao_deixa_de_responder():
+    outlook = OutlookFalso()
+    sessao = outlook.sessao()
+    sessao.obter_caixa_entrada().ativa = False
+
+    inbox = sessao.obter_caixa_entrada()
+
+    assert inbox is outlook.aplicacoes[1].inbox
+    assert sessao.conexoes == 2
+    assert outlook.reinicios == 0
+
+
+def test_reinicia_o_outlook_e_aguarda_com_espera_exponencial(capsys):
+    # A primeira conexão e as duas primeiras verificações após o reinício falham
+    outlook = OutlookFalso(falhas=3)
+    sessao = outlook.sessao()
+
+    inbox = sessao.obter_caixa_entrada()
+
+    assert inbox is outlook.aplicacoes[0].inbox
+    assert outlook.reinicios == sessao.reinicios == 1
+    assert outlook.esperas == [0.5, 1.0, 2.0]
+    assert "restabelecida após reinicialização" in saida_console(capsys)
+
+
+def test_desiste_quando_o_prazo_do_reinicio_acaba():
+    outlook = OutlookFalso(falhas=100)
+    sessao = outlook.sessao(prazo_reinicio=10)
+
+    assert sessao.obter_caixa_entrada() is None
+    assert sum(outlook.esperas) >= 10
+    assert max(outlook.esperas) == sessao.espera_maxima
+
+
+def test_nao_anuncia_sucesso_quando_a_conta_nao_existe(capsys):
+    outlook = OutlookFalso(conta="outra@exemplo.com")
+    sessao = outlook.sessao()
+
+    assert sessao.obter_caixa_entrada() is None
+
+    saida = saida_console(capsys)
+    assert "Conta de e-mail da ASA não foi encontrada" in saida
+    assert "estabelecida com sucesso" not in saida
+    assert outlook.reinicios == 0
+
+
+@pytest.fixture
+def caixa_com_eventos():
+    outlook = OutlookFalso()
+    eventos = EventosFalsos()
+    caixa = CaixaPostalOutlook(
+        outlook.sessao(),
+        assinar_eventos=eventos.assinar,
+        bombear_mensagens=eventos.bombear,
+    )
+    assert caixa.conectar()
+    return outlook, eventos, caixa
+
+
+def test_entrega_o_evento_de_novo_email(caixa_com_eventos):
+    outlook, eventos, caixa = caixa_com_eventos
+
+    # A primeira espera só assina: algo pode ter chegado antes da assinatura
+    assert caixa.aguardar_novas_mensagens(0.1)
+    assert [a for a, _ in eventos.assinaturas] == [outlook.aplicacoes[0]]
+
+    assert not caixa.aguardar_novas_mensagens(0.1)
+    eventos.novo_email(outlook.aplicacoes[0])
+    assert caixa.aguardar_novas_mensagens(5)
+    assert not caixa.aguardar_novas_mensagens(0.1)
+    assert len(eventos.assinaturas) == 1
+
+
+def test_assina_de_novo_apos_a_reconexao(caixa_com_eventos):
+    outlook, eventos, caixa = caixa_com_eventos
+    caixa.aguardar_novas_mensagens(0.1)
+
+    outlook.aplicacoes[0].inbox.ativa = False
+    assert caixa.conectar()
+    nova = outlook.aplicacoes[1]
+
+    assert caixa.aguardar_novas_mensagens(0.1)
+    assert [a for a, _ in eventos.assinaturas] == [outlook.aplicacoes[0], nova]
+
+    eventos.novo_email(nova)
+    assert caixa.aguardar_novas_mensagens(5)
@@ -0,0 +1,17 @@
+"""Validação em lote de uma pasta inexistente: erro, sem criar nada no disco."""
+
+import pytest
+
+from source.indice.manifesto_pasta import manifesto_da_pasta
+from source.manipulacao_excel.manipulacao_excel import validar_pasta_em_lote
+
+
+def test_pasta_inexistente_falha_sem_ser_criada(tmp_path):
+    pasta = tmp_path / "nao_existe"
+
+    with pytest.raises(NotADirectoryError):
+        list(validar_pasta_em_lote(pasta, 30))
+    with pytest.raises(NotADirectoryError):
+        manifesto_da_pasta(pasta)
+
+    assert not pasta.exists()